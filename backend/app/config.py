@@ -25,10 +25,15 @@ TEMP_DIR = DATA_DIR / "temp"
 SCAN_DIR = DATA_DIR / "scan"
 RSS_THUMBS_DIR = DATA_DIR / "rss_thumbs"
 TEXTS_DIR = DATA_DIR / "texts"
+HLS_DIR = DATA_DIR / "hls"            # Segment-Cache (HLS-Packaging, LRU)
+THUMB_CACHE_DIR = DATA_DIR / "thumb_cache"  # Thumbnail-Varianten (WebP, content-addressed)
+YTDLP_CACHE_DIR = DATA_DIR / "ytdlp_cache"  # Info-Dicts aus yt-dlp (utils/info_cache.py)
 
 # Datenbank
 DB_PATH = DB_DIR / "tubevault.db"
 SCAN_DB_PATH = DB_DIR / "scan_index.db"
+# Lese-Pool: Anzahl WAL-Reader-Connections neben dem einen Writer (0 = alles über Writer)
+DB_READ_POOL_SIZE = int(os.getenv("TUBEVAULT_DB_READERS", "4"))
 
 # Server
 HOST = os.getenv("TUBEVAULT_HOST", "0.0.0.0")
@@ -51,5 +56,6 @@ CORS_ORIGINS = ["*"]
 def ensure_directories():
     """Alle Datenverzeichnisse erstellen falls nicht vorhanden."""
     for d in [VIDEOS_DIR, AUDIO_DIR, THUMBNAILS_DIR, METADATA_DIR,
-              SUBTITLES_DIR, AVATARS_DIR, BANNERS_DIR, DB_DIR, EXPORTS_DIR, TEMP_DIR, RSS_THUMBS_DIR, TEXTS_DIR]:
+              SUBTITLES_DIR, AVATARS_DIR, BANNERS_DIR, DB_DIR, EXPORTS_DIR, TEMP_DIR, RSS_THUMBS_DIR, TEXTS_DIR, HLS_DIR,
+              THUMB_CACHE_DIR, YTDLP_CACHE_DIR]:
         d.mkdir(parents=True, exist_ok=True)
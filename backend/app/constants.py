@@ -13,7 +13,8 @@ class SettingsKeys:
     # ── Download-Verhalten ────────────────────────────────
     DOWNLOAD_QUALITY = "download.quality"
     DOWNLOAD_FORMAT = "download.format"
-    DOWNLOAD_CONCURRENT = "download.concurrent"
+    DOWNLOAD_CONCURRENT = "download.concurrent"          # Video-Lane
+    DOWNLOAD_AUDIO_CONCURRENT = "download.audio_concurrent"  # Audio-Lane
     DOWNLOAD_AUTO_THUMBNAIL = "download.auto_thumbnail"
     DOWNLOAD_AUTO_SUBTITLE = "download.auto_subtitle"
     DOWNLOAD_SUBTITLE_LANG = "download.subtitle_lang"
@@ -23,6 +24,21 @@ class SettingsKeys:
     DOWNLOAD_COOLDOWN_BASE_S = "download.cooldown_base_s"
     DOWNLOAD_THROTTLE_KBPS = "download.throttle_kbps"
     DOWNLOAD_THROTTLE_REALTIME = "download.throttle_realtime"
+    DOWNLOAD_SEGMENTS = "download.segments"            # Range-Segmente je Stream
+
+    # ── Merge (adaptive Downloads) ────────────────────────
+    DOWNLOAD_MERGE_CONTAINER = "download.merge_container"  # mp4 / auto / mkv
+    DOWNLOAD_FASTSTART = "download.faststart"              # immediate / deferred / off
+
+    # ── Backfills (Thumbnails, Banner) ────────────────────
+    BACKFILL_WORKERS = "backfill.workers"              # parallele Fetches
+
+    # ── RSS / Abos ────────────────────────────────────────
+    RSS_WORKERS = "rss.workers"                        # parallele Feed-Abrufe pro Tick
+    RSS_FEED_PROBE = "rss.feed_probe"                  # Atom-Feed vor yt-dlp (true/false)
+
+    # ── Speicher ──────────────────────────────────────────
+    STORAGE_VERIFY_MAX_AGE_S = "storage.verify_max_age_s"  # Datei-Existenz-Prüfung
 
     # ── Queue / System ────────────────────────────────────
     QUEUE_PAUSED = "queue.paused"
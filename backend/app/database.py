@@ -1,17 +1,22 @@
 """
-TubeVault Backend – Datenbank v1.5.1
+TubeVault Backend – Datenbank v1.5.3
+v1.5.3: faststart_pending (Schema v41)
+v1.5.2: Transaktion gehört dem öffnenden Task (nicht mehr per ContextVar vererbt)
 © HalloWelt42 – Private Nutzung
 """
 
 import aiosqlite
+import asyncio
 import logging
 import os
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from app.config import DB_PATH
+from app.config import DB_PATH, DB_READ_POOL_SIZE
 
 logger = logging.getLogger(__name__)
 
-SCHEMA_VERSION = 31
+SCHEMA_VERSION = 41
 
 SCHEMA_SQL = """
 -- Videos (YouTube + lokale eigene Videos)
@@ -230,6 +235,11 @@ CREATE TABLE IF NOT EXISTS subscriptions (
     live_count INTEGER DEFAULT 0,
     banner_url TEXT,
     channel_tags TEXT DEFAULT '[]',
+    feed_etag TEXT,
+    feed_last_modified TEXT,
+    feed_full_fetch TEXT,
+    next_check_at TEXT,
+    upload_cadence TEXT,
     created_at TEXT DEFAULT (datetime('now')),
     FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE SET NULL
 );
@@ -298,6 +308,7 @@ CREATE TABLE IF NOT EXISTS jobs (
     metadata TEXT DEFAULT '{}',
     parent_id INTEGER,
     priority INTEGER DEFAULT 0,
+    retry_after TEXT,
     created_at TEXT DEFAULT (datetime('now')),
     started_at TEXT,
     completed_at TEXT,
@@ -366,6 +377,7 @@ CREATE INDEX IF NOT EXISTS idx_favorites_list ON favorites(list_name);
 CREATE INDEX IF NOT EXISTS idx_watch_history_video ON watch_history(video_id);
 CREATE INDEX IF NOT EXISTS idx_subscriptions_channel ON subscriptions(channel_id);
 CREATE INDEX IF NOT EXISTS idx_subscriptions_enabled ON subscriptions(enabled);
+CREATE INDEX IF NOT EXISTS idx_subscriptions_next_check ON subscriptions(enabled, next_check_at);
 CREATE INDEX IF NOT EXISTS idx_rss_entries_status ON rss_entries(status);
 CREATE INDEX IF NOT EXISTS idx_rss_entries_channel ON rss_entries(channel_id);
 CREATE INDEX IF NOT EXISTS idx_rss_entries_type ON rss_entries(video_type);
@@ -385,17 +397,126 @@ CREATE INDEX IF NOT EXISTS idx_videos_status_archived_upload ON videos(status, i
 CREATE INDEX IF NOT EXISTS idx_videos_channel_archived ON videos(channel_id, is_archived, upload_date DESC);
 -- Queue-Pick: type='download' AND status='queued' ORDER BY priority DESC, created_at ASC
 CREATE INDEX IF NOT EXISTS idx_jobs_queue_pick ON jobs(type, status, priority DESC, created_at ASC);
+-- Retry-Timer: fällige retry_wait-Jobs + nächster Fälligkeitszeitpunkt (MIN) per Index
+CREATE INDEX IF NOT EXISTS idx_jobs_retry_due ON jobs(type, status, retry_after);
 -- Jobs per Video-ID (viele EXISTS-Subqueries in rss/feed/search): expression-index
 -- auf json_extract(metadata, '$.video_id') – spart Full-Scan ueber jobs bei Feed-Darstellung
 CREATE INDEX IF NOT EXISTS idx_jobs_metadata_video_id ON jobs(type, json_extract(metadata, '$.video_id'));
 -- RSS-Entries Feed-Darstellung: channel + feed_status sortiert nach published
 CREATE INDEX IF NOT EXISTS idx_rss_entries_channel_feed_status ON rss_entries(channel_id, feed_status, published DESC);
+-- Tag-Filter (case-insensitiv wie früher LIKE) als Index-Lookup (Migration v33)
+CREATE INDEX IF NOT EXISTS idx_video_tags_tag ON video_tags(tag COLLATE NOCASE, video_id);
+CREATE INDEX IF NOT EXISTS idx_rss_entry_keywords_keyword ON rss_entry_keywords(keyword COLLATE NOCASE, entry_id);
+"""
+
+def _json_array_or_empty(expr: str) -> str:
+    """SQL-Ausdruck: expr wenn gültiges JSON-Array, sonst '[]'. Verschachteltes
+    CASE, weil json_type() auf kaputtem JSON wirft und SQLite AND nicht
+    garantiert kurzschließt."""
+    return (
+        f"CASE WHEN json_valid({expr}) THEN "
+        f"CASE WHEN json_type({expr}) = 'array' THEN {expr} ELSE '[]' END "
+        f"ELSE '[]' END"
+    )
+
+
+# Normalisierte Tags (Migration v33): Tag-Filter als Index-Lookup, Tag-Wolke als GROUP BY.
+# AFTER INSERT löscht zuerst – INSERT OR REPLACE feuert ohne recursive_triggers
+# keinen DELETE-Trigger für die ersetzte Zeile.
+TAG_TABLES_SQL = f"""
+CREATE TABLE IF NOT EXISTS video_tags (
+    video_id TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (video_id, tag)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS rss_entry_keywords (
+    entry_id INTEGER NOT NULL,
+    keyword TEXT NOT NULL,
+    PRIMARY KEY (entry_id, keyword)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_videos_tags_insert AFTER INSERT ON videos BEGIN
+    DELETE FROM video_tags WHERE video_id = NEW.id;
+    INSERT OR IGNORE INTO video_tags (video_id, tag)
+        SELECT NEW.id, trim(j.value) FROM json_each({_json_array_or_empty('NEW.tags')}) j
+        WHERE j.type IN ('text', 'integer', 'real') AND trim(j.value) != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_videos_tags_update AFTER UPDATE OF id, tags ON videos BEGIN
+    DELETE FROM video_tags WHERE video_id = OLD.id;
+    INSERT OR IGNORE INTO video_tags (video_id, tag)
+        SELECT NEW.id, trim(j.value) FROM json_each({_json_array_or_empty('NEW.tags')}) j
+        WHERE j.type IN ('text', 'integer', 'real') AND trim(j.value) != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_videos_tags_delete AFTER DELETE ON videos BEGIN
+    DELETE FROM video_tags WHERE video_id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rss_keywords_insert AFTER INSERT ON rss_entries BEGIN
+    DELETE FROM rss_entry_keywords WHERE entry_id = NEW.id;
+    INSERT OR IGNORE INTO rss_entry_keywords (entry_id, keyword)
+        SELECT NEW.id, trim(j.value) FROM json_each({_json_array_or_empty('NEW.keywords')}) j
+        WHERE j.type IN ('text', 'integer', 'real') AND trim(j.value) != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rss_keywords_update AFTER UPDATE OF keywords ON rss_entries BEGIN
+    DELETE FROM rss_entry_keywords WHERE entry_id = OLD.id;
+    INSERT OR IGNORE INTO rss_entry_keywords (entry_id, keyword)
+        SELECT NEW.id, trim(j.value) FROM json_each({_json_array_or_empty('NEW.keywords')}) j
+        WHERE j.type IN ('text', 'integer', 'real') AND trim(j.value) != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rss_keywords_delete AFTER DELETE ON rss_entries BEGIN
+    DELETE FROM rss_entry_keywords WHERE entry_id = OLD.id;
+END;
+"""
+
+
+# FTS-Änderungsqueue (Migration v34): Trigger merken nur die rowid, den Index
+# schreibt der Hintergrund-Indexer (services/fts_indexer) in Batches.
+# Doppelte Einträge sind erlaubt – der Indexer indiziert den aktuellen Stand.
+# BEFORE INSERT merkt die alte rowid bei INSERT OR REPLACE (neue rowid, kein
+# DELETE-Trigger), damit deren Index-Eintrag verschwindet.
+FTS_QUEUE_SQL = """
+CREATE TABLE IF NOT EXISTS fts_queue (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_rowid INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_videos_fts_replace BEFORE INSERT ON videos BEGIN
+    INSERT INTO fts_queue (video_rowid) SELECT rowid FROM videos WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_videos_fts_insert AFTER INSERT ON videos
+WHEN NEW.status = 'ready' BEGIN
+    INSERT INTO fts_queue (video_rowid) VALUES (NEW.rowid);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_videos_fts_update
+AFTER UPDATE OF title, channel_name, description, tags, notes, status ON videos
+WHEN (NEW.status = 'ready' OR OLD.status = 'ready')
+ AND (NEW.title IS NOT OLD.title OR NEW.channel_name IS NOT OLD.channel_name
+      OR NEW.description IS NOT OLD.description OR NEW.tags IS NOT OLD.tags
+      OR NEW.notes IS NOT OLD.notes OR NEW.status IS NOT OLD.status) BEGIN
+    INSERT INTO fts_queue (video_rowid) VALUES (NEW.rowid);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_videos_fts_delete AFTER DELETE ON videos
+WHEN OLD.status = 'ready' BEGIN
+    INSERT INTO fts_queue (video_rowid) VALUES (OLD.rowid);
+END;
 """
 
 DEFAULT_SETTINGS = [
     ("download.quality", "720p", "Standard Download-Qualität", "download"),
     ("download.format", "mp4", "Standard Download-Format", "download"),
     ("download.concurrent", "2", "Gleichzeitige Downloads", "download"),
+    ("download.audio_concurrent", "2", "Gleichzeitige Audio-Downloads (eigene Lane)", "download"),
+    ("download.segments", "4", "Parallele Range-Segmente je Stream (1 = aus)", "download"),
+    ("download.merge_container", "mp4", "Container beim Merge: mp4, auto (WebM bei VP9/AV1 + Opus) oder mkv", "download"),
+    ("download.faststart", "deferred", "MP4-faststart: immediate, deferred (im Leerlauf) oder off", "download"),
     ("download.auto_thumbnail", "true", "Thumbnail automatisch herunterladen", "download"),
     ("download.auto_subtitle", "false", "Untertitel automatisch herunterladen", "download"),
     ("download.subtitle_lang", "de,en", "Bevorzugte Untertitel-Sprachen", "download"),
@@ -404,6 +525,9 @@ DEFAULT_SETTINGS = [
     ("player.autoplay", "false", "Automatische Wiedergabe", "player"),
     ("player.speed", "1.0", "Standard-Geschwindigkeit", "player"),
     ("player.save_position", "true", "Wiedergabeposition automatisch speichern", "player"),
+    ("player.hls_cache_mb", "4096", "HLS-Segment-Cache auf Platte (MB, LRU)", "player"),
+    ("player.hls_renditions", "480p", "HLS-Renditions im Hintergrund (z.B. 480p,360p, leer = aus)", "player"),
+    ("player.thumb_cache_mb", "512", "Thumbnail-Varianten-Cache auf Platte (MB, LRU)", "player"),
     ("theme.mode", "dark", "Theme-Modus (dark/light)", "theme"),
     ("theme.accent", "#6366f1", "Accent-Farbe", "theme"),
     ("general.videos_per_page", "24", "Videos pro Seite", "general"),
@@ -413,20 +537,45 @@ DEFAULT_SETTINGS = [
     ("rss.auto_quality", "720p", "Qualität für Auto-Downloads", "rss"),
     ("rss.auto_dl_daily_limit", "20", "Max Auto-Downloads pro Tag", "rss"),
     ("rss.max_age_days", "90", "Neue Videos nur wenn juenger als X Tage", "rss"),
+    ("rss.workers", "4", "Parallele Feed-Abrufe pro Tick (1 = seriell)", "rss"),
+    ("rss.feed_probe", "true", "Erst Atom-Feed prüfen, yt-dlp nur bei neuen Videos", "rss"),
     ("feed.hide_shorts", "false", "Shorts im Feed ausblenden", "feed"),
     ("feed.auto_classify", "true", "Neue RSS-Videos automatisch als Short erkennen", "feed"),
     ("feed.auto_refresh", "true", "Kanaele periodisch im Hintergrund re-scannen", "feed"),
     ("feed.refresh_interval_days", "7", "Re-Scan Intervall in Tagen", "feed"),
     ("archive.mount_check_interval", "30", "Mount-Prüfung Intervall in Sekunden", "archive"),
+    ("backfill.workers", "6", "Parallele Fetches beim Thumbnail-/Banner-Backfill", "general"),
+    ("storage.verify_max_age_s", "21600", "Datei-Existenz erneut prüfen nach (Sekunden, 0 = immer)", "general"),
 ]
 
 
 class Database:
-    """Async SQLite Database Manager."""
+    """Async SQLite Database Manager.
 
-    def __init__(self, db_path: Path = DB_PATH):
+    Ein Writer (`_connection`) für alle Schreibzugriffe + Schema, daneben ein
+    Pool aus WAL-Reader-Connections für fetch_one/fetch_all/fetch_val. So
+    blockiert ein langer RSS-/Import-Schreibvorgang nicht mehr jede Lesung
+    der Library, Badges, Feeds und Queue."""
+
+    def __init__(self, db_path: Path = DB_PATH, read_pool_size: int = DB_READ_POOL_SIZE):
         self.db_path = db_path
+        self.read_pool_size = max(0, int(read_pool_size))
         self._connection: aiosqlite.Connection | None = None
+        self._readers: list[aiosqlite.Connection] = []
+        self._reader_queue: asyncio.Queue | None = None
+        # Serialisiert Commits auf dem Writer: eine offene Transaktion darf nicht
+        # vom execute() eines anderen Tasks mit-committet werden.
+        self._write_lock = asyncio.Lock()
+        # Task, der gerade eine explizite Transaktion auf dem Writer hält.
+        # Nur DIESER Task schreibt ohne Lock (execute() committet dann nicht
+        # selbst) und liest über den Writer (Read-your-writes). Bewusst keine
+        # ContextVar: per create_task() gestartete Kinder erben deren Wert und
+        # würden sonst am Lock vorbei in die offene Transaktion schreiben.
+        self._tx_owner: asyncio.Task | None = None
+
+    def _owns_transaction(self) -> bool:
+        owner = self._tx_owner
+        return owner is not None and owner is asyncio.current_task()
 
     async def connect(self):
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -434,8 +583,57 @@ class Database:
         self._connection.row_factory = aiosqlite.Row
         await self._connection.execute("PRAGMA journal_mode=WAL")
         await self._connection.execute("PRAGMA foreign_keys=ON")
+        await self._connection.execute("PRAGMA busy_timeout=5000")
         await self._init_schema()
-        logger.info(f"Datenbank verbunden: {self.db_path}")
+        # Reader erst NACH Schema-Init öffnen (sehen sonst alte Tabellen)
+        await self._open_readers()
+        logger.info(
+            f"Datenbank verbunden: {self.db_path} "
+            f"(1 Writer + {len(self._readers)} Reader)"
+        )
+
+    async def _open_readers(self):
+        """WAL-Reader-Pool aufbauen. Reader sind query_only – ein versehentlicher
+        Schreibzugriff über den Lesepfad knallt sofort statt still zu blockieren."""
+        await self._close_readers()
+        queue: asyncio.Queue = asyncio.Queue()
+        for _ in range(self.read_pool_size):
+            try:
+                reader = await aiosqlite.connect(str(self.db_path))
+                reader.row_factory = aiosqlite.Row
+                await reader.execute("PRAGMA busy_timeout=5000")
+                await reader.execute("PRAGMA query_only=1")
+            except Exception as e:
+                logger.warning(f"Reader-Connection fehlgeschlagen, nutze Writer: {e}")
+                break
+            self._readers.append(reader)
+            queue.put_nowait(reader)
+        self._reader_queue = queue if self._readers else None
+
+    async def _close_readers(self):
+        readers, self._readers = self._readers, []
+        self._reader_queue = None
+        for reader in readers:
+            try:
+                await reader.close()
+            except Exception:
+                pass
+
+    @asynccontextmanager
+    async def _reader(self):
+        """Reader aus dem Pool leihen. Ohne Pool (0 Reader / nicht verbunden)
+        oder innerhalb einer Transaktion geht die Lesung über den Writer."""
+        queue = self._reader_queue
+        if queue is None or self._owns_transaction():
+            yield self.conn
+            return
+        reader = await queue.get()
+        try:
+            yield reader
+        finally:
+            # Pool wurde zwischenzeitlich neu aufgebaut (Restore) → nicht zurücklegen
+            if queue is self._reader_queue:
+                queue.put_nowait(reader)
 
     async def audit_identity(self) -> dict:
         """Identitäts-Snapshot der verbundenen DB für das Startup-Audit-Log.
@@ -461,15 +659,59 @@ class Database:
         }
 
     async def disconnect(self):
+        await self._close_readers()
         if self._connection:
             await self._connection.close()
             self._connection = None
             logger.info("Datenbank getrennt")
 
     async def commit(self):
-        """Expliziter Commit (für Batch-Operationen)."""
-        if self._connection:
-            await self._connection.commit()
+        """Expliziter Commit (für Batch-Operationen). Innerhalb von
+        transaction() ein No-Op – dort committet der Kontext am Ende."""
+        if self._connection and not self._owns_transaction():
+            async with self._write_lock:
+                await self._connection.commit()
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Explizite Schreib-Transaktion: alle execute()/execute_many() im Block
+        landen in EINEM Commit (ein fsync statt einer pro Statement).
+
+            async with db.transaction():
+                await db.execute(...)
+                await db.execute_many(...)
+
+        Exception im Block → Rollback. Verschachtelte Aufrufe desselben Tasks
+        hängen sich an die äußere Transaktion an.
+
+        Der Write-Lock wird für den GANZEN Block gehalten. Andere Tasks (auch
+        im Block per create_task() gestartete) schreiben erst nach dem Commit.
+        Im Block daher nie auf einen anderen Task warten, der selbst schreibt –
+        das ist ein Deadlock. Solche Arbeit vor oder nach dem Block erledigen."""
+        if self._owns_transaction():
+            yield self
+            return
+        async with self._write_lock:
+            conn = self.conn
+            if conn.in_transaction:
+                # Liegengebliebene implizite Transaktion (direkter conn-Zugriff)
+                await conn.commit()
+            self._tx_owner = asyncio.current_task()
+            try:
+                await conn.execute("BEGIN")
+                yield self
+            except BaseException:
+                await conn.rollback()
+                raise
+            else:
+                await conn.commit()
+            finally:
+                self._tx_owner = None
+
+    def write_batch(self, max_statements: int = 500, max_delay_ms: int = 1000) -> "WriteBatch":
+        """Write-Coalescing für verstreute Einzel-Writes (Group-Commit).
+        Siehe WriteBatch."""
+        return WriteBatch(self, max_statements=max_statements, max_delay_ms=max_delay_ms)
 
     async def _init_schema(self):
         # 1. Tabellen erstellen (ohne Indexes auf neue Spalten)
@@ -1056,7 +1298,7 @@ class Database:
             rows = await self._connection.execute_fetchall(
                 "SELECT id, tags FROM videos WHERE tags IS NOT NULL AND tags != '[]'"
             )
-            cleaned = 0
+            updates = []
             for row in rows:
                 try:
                     tags = _json.loads(row[1]) if isinstance(row[1], str) else row[1]
@@ -1064,15 +1306,15 @@ class Database:
                         continue
                     sanitized = sanitize_tags(tags)
                     if sanitized != tags:
-                        await self._connection.execute(
-                            "UPDATE videos SET tags = ? WHERE id = ?",
-                            (_json.dumps(sanitized, ensure_ascii=False), row[0])
-                        )
-                        cleaned += 1
+                        updates.append((_json.dumps(sanitized, ensure_ascii=False), row[0]))
                 except Exception:
                     pass
+            if updates:
+                await self._connection.executemany(
+                    "UPDATE videos SET tags = ? WHERE id = ?", updates
+                )
             await self._connection.commit()
-            logger.info(f"Migration v30: {cleaned} Videos mit bereinigten Tags")
+            logger.info(f"Migration v30: {len(updates)} Videos mit bereinigten Tags")
 
             # FTS5 Volltextsuche
             await self._connection.execute("""
@@ -1106,6 +1348,198 @@ class Database:
             await self._connection.commit()
             logger.info(f"Migration v30: {len(dead_settings)} tote Settings entfernt")
 
+        if current_version < 32:
+            # is_archived-NULLs normalisieren: Library-Filter vergleicht ohne
+            # COALESCE, damit idx_videos_status_archived_upload als Range greift
+            await self._connection.execute(
+                "UPDATE videos SET is_archived = 0 WHERE is_archived IS NULL"
+            )
+            await self._connection.commit()
+            logger.info("Migration v32: is_archived normalisiert")
+
+        # Normalisierte Tag-Tabellen (videos.tags / rss_entries.keywords bleiben
+        # JSON-Quelle der Wahrheit). Trigger halten sie bei JEDEM Schreibpfad
+        # synchron (update_video, Downloader, Importe, Rebuild) – kein Pfad
+        # kann das Nachziehen vergessen. IF NOT EXISTS → jeder Start.
+        await self._connection.executescript(TAG_TABLES_SQL)
+
+        if current_version < 33:
+            # Einmaliger Backfill aus den JSON-Spalten
+            try:
+                await self._connection.execute(
+                    f"""INSERT OR IGNORE INTO video_tags (video_id, tag)
+                        SELECT v.id, trim(j.value) FROM videos v,
+                               json_each({_json_array_or_empty('v.tags')}) j
+                        WHERE j.type IN ('text', 'integer', 'real') AND trim(j.value) != ''"""
+                )
+                await self._connection.execute(
+                    f"""INSERT OR IGNORE INTO rss_entry_keywords (entry_id, keyword)
+                        SELECT r.id, trim(j.value) FROM rss_entries r,
+                               json_each({_json_array_or_empty('r.keywords')}) j
+                        WHERE j.type IN ('text', 'integer', 'real') AND trim(j.value) != ''"""
+                )
+                await self._connection.commit()
+                n_tags = (await self._connection.execute_fetchall(
+                    "SELECT COUNT(*) FROM video_tags"))[0][0]
+                n_kw = (await self._connection.execute_fetchall(
+                    "SELECT COUNT(*) FROM rss_entry_keywords"))[0][0]
+                logger.info(f"Migration v33: video_tags ({n_tags}) + rss_entry_keywords ({n_kw}) befüllt")
+            except Exception as e:
+                logger.warning(f"Migration v33 Fehler: {e}")
+
+        # FTS-Änderungsqueue + Trigger (IF NOT EXISTS → jeder Start)
+        await self._connection.executescript(FTS_QUEUE_SQL)
+
+        if current_version < 34:
+            # videos_fts als normale FTS5-Tabelle (eigener Content) statt
+            # external content: Löschen per rowid braucht dann nicht mehr die
+            # exakt damals indizierten Werte (description kommt aus Dateien).
+            try:
+                await self._connection.execute("DROP TABLE IF EXISTS videos_fts")
+                await self._connection.execute("""
+                    CREATE VIRTUAL TABLE videos_fts USING fts5(
+                        id UNINDEXED, title, channel_name, description, tags, notes,
+                        tokenize='unicode61 remove_diacritics 2'
+                    )
+                """)
+                # Sofort suchbar mit der DB-description; Datei-Beschreibungen
+                # zieht der Indexer über die Queue nach
+                await self._connection.execute("""
+                    INSERT INTO videos_fts(rowid, id, title, channel_name, description, tags, notes)
+                    SELECT rowid, id, COALESCE(title,''), COALESCE(channel_name,''),
+                           COALESCE(description,''), COALESCE(tags,''), COALESCE(notes,'')
+                    FROM videos WHERE status = 'ready'
+                """)
+                await self._connection.execute(
+                    "INSERT INTO fts_queue (video_rowid) SELECT rowid FROM videos WHERE status = 'ready'"
+                )
+                await self._connection.commit()
+                logger.info("Migration v34: videos_fts neu angelegt, Queue befüllt")
+            except Exception as e:
+                logger.warning(f"Migration v34 Fehler: {e}")
+
+        if current_version < 35:
+            # retry_after als echte Spalte statt in metadata-JSON: der Queue-
+            # Worker fragt fällige Retries per Index ab statt jede Zeile zu parsen
+            try:
+                await self._connection.execute("ALTER TABLE jobs ADD COLUMN retry_after TEXT")
+            except Exception:
+                pass  # Neuinstallation: Spalte steht schon im CREATE TABLE
+            try:
+                await self._connection.execute("""
+                    UPDATE jobs SET retry_after = json_extract(metadata, '$.retry_after'),
+                                    metadata = json_remove(metadata, '$.retry_after')
+                    WHERE json_valid(metadata)
+                      AND json_extract(metadata, '$.retry_after') IS NOT NULL
+                """)
+                await self._connection.commit()
+                logger.info("Migration v35: jobs.retry_after als Spalte übernommen")
+            except Exception as e:
+                logger.warning(f"Migration v35 Fehler: {e}")
+
+        if current_version < 36:
+            # Backfill-Fortschritt pro Item: Neustarts setzen fort, erledigte
+            # Items fallen per SQL raus statt per exists()/stat() im Dateisystem
+            try:
+                await self._connection.executescript("""
+                    CREATE TABLE IF NOT EXISTS backfill_state (
+                        kind TEXT NOT NULL,
+                        item_key TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        attempts INTEGER DEFAULT 0,
+                        updated_at TEXT,
+                        PRIMARY KEY (kind, item_key)
+                    ) WITHOUT ROWID;
+                """)
+                logger.info("Migration v36: backfill_state Tabelle erstellt")
+            except Exception as e:
+                logger.warning(f"Migration v36 Fehler: {e}")
+
+        if current_version < 37:
+            # Datei-Index je Archiv: Rescans vergleichen Größe/mtime/Inode und
+            # prüfen nur geänderte Dateien (kein FFprobe für Bekanntes)
+            try:
+                await self._connection.executescript("""
+                    CREATE TABLE IF NOT EXISTS archive_files (
+                        archive_id INTEGER NOT NULL,
+                        path TEXT NOT NULL,
+                        size INTEGER,
+                        mtime_ns INTEGER,
+                        inode INTEGER,
+                        video_id TEXT,
+                        scanned_at TEXT,
+                        PRIMARY KEY (archive_id, path)
+                    ) WITHOUT ROWID;
+                """)
+                logger.info("Migration v37: archive_files Tabelle erstellt")
+            except Exception as e:
+                logger.warning(f"Migration v37 Fehler: {e}")
+
+        if current_version < 38:
+            # Datei-Existenz je Video: Ghost-Checks prüfen nur, was älter als
+            # storage.verify_max_age_s ist oder dessen Pfad sich geändert hat
+            try:
+                await self._connection.executescript("""
+                    CREATE TABLE IF NOT EXISTS file_presence (
+                        video_id TEXT PRIMARY KEY,
+                        path TEXT,
+                        size INTEGER,
+                        mtime_ns INTEGER,
+                        present INTEGER NOT NULL DEFAULT 1,
+                        last_verified TEXT
+                    ) WITHOUT ROWID;
+                """)
+                logger.info("Migration v38: file_presence Tabelle erstellt")
+            except Exception as e:
+                logger.warning(f"Migration v38 Fehler: {e}")
+
+        # Migration v39: Conditional-GET-Zustand des Atom-Feeds pro Abo –
+        # der Tick fragt zuerst den Feed (ETag/Last-Modified) und ruft
+        # yt-dlp nur für Kanäle mit neuen Videos auf
+        if current_version < 39:
+            for sql in (
+                "ALTER TABLE subscriptions ADD COLUMN feed_etag TEXT",
+                "ALTER TABLE subscriptions ADD COLUMN feed_last_modified TEXT",
+                "ALTER TABLE subscriptions ADD COLUMN feed_full_fetch TEXT",
+            ):
+                try:
+                    await self._connection.execute(sql)
+                except Exception:
+                    pass
+            logger.info("Migration v39: Feed-Probe-Spalten in subscriptions")
+
+        # Migration v40: Fälligkeit als Spalte (indexierbar) statt
+        # last_checked + check_interval-Rechnung, dazu die Upload-Kadenz
+        if current_version < 40:
+            for sql in (
+                "ALTER TABLE subscriptions ADD COLUMN next_check_at TEXT",
+                "ALTER TABLE subscriptions ADD COLUMN upload_cadence TEXT",
+            ):
+                try:
+                    await self._connection.execute(sql)
+                except Exception:
+                    pass
+            await self._connection.execute(
+                """UPDATE subscriptions
+                   SET next_check_at = datetime(last_checked, '+' || check_interval || ' seconds')
+                   WHERE next_check_at IS NULL""")
+            logger.info("Migration v40: subscriptions.next_check_at + upload_cadence")
+
+        if current_version < 41:
+            # Vorgemerktes faststart (download.faststart=deferred) überlebt
+            # Neustarts – sonst blieben MP4s ohne vorgezogenes moov-Atom
+            try:
+                await self._connection.executescript("""
+                    CREATE TABLE IF NOT EXISTS faststart_pending (
+                        video_id TEXT PRIMARY KEY,
+                        path TEXT NOT NULL,
+                        queued_at TEXT
+                    ) WITHOUT ROWID;
+                """)
+                logger.info("Migration v41: faststart_pending Tabelle erstellt")
+            except Exception as e:
+                logger.warning(f"Migration v41 Fehler: {e}")
+
         # 4. Indexes NACH Migration (braucht source-Spalte)
         await self._connection.executescript(INDEXES_SQL)
 
@@ -1132,17 +1566,34 @@ class Database:
         return self._connection
 
     async def execute(self, sql: str, params=None):
-        cursor = await self.conn.execute(sql, params or ())
-        await self.conn.commit()
-        return cursor
+        """Schreibzugriff – immer über den Writer. Sofort committed, außer
+        innerhalb von transaction() (dort committet der Kontext)."""
+        if self._owns_transaction():
+            return await self.conn.execute(sql, params or ())
+        async with self._write_lock:
+            cursor = await self.conn.execute(sql, params or ())
+            await self.conn.commit()
+            return cursor
+
+    async def execute_many(self, sql: str, params_list) -> int:
+        """Ein Statement für viele Parameter-Tupel, ein Commit.
+        Gibt die Summe der betroffenen Zeilen zurück."""
+        params_list = list(params_list)
+        if not params_list:
+            return 0
+        async with self.transaction():
+            cursor = await self.conn.executemany(sql, params_list)
+            return max(cursor.rowcount, 0)
 
     async def fetch_one(self, sql: str, params=None):
-        cursor = await self.conn.execute(sql, params or ())
-        return await cursor.fetchone()
+        async with self._reader() as conn:
+            cursor = await conn.execute(sql, params or ())
+            return await cursor.fetchone()
 
     async def fetch_all(self, sql: str, params=None):
-        cursor = await self.conn.execute(sql, params or ())
-        return await cursor.fetchall()
+        async with self._reader() as conn:
+            cursor = await conn.execute(sql, params or ())
+            return await cursor.fetchall()
 
     async def fetch_val(self, sql: str, params=None):
         row = await self.fetch_one(sql, params)
@@ -1151,85 +1602,37 @@ class Database:
     # ─── FTS5 Sync ──────────────────────────────────────────────────
 
     async def fts_sync_video(self, video_id: str):
-        """FTS5 Index für ein Video aktualisieren.
-        description kommt aus text_resolver (File-first, DB-Fallback), damit
-        der Index auch funktioniert nachdem die DB-Spalte geleert ist."""
+        """Video für den FTS5-Index einreihen. Änderungen an den videos-Spalten
+        reiht der Trigger schon selbst ein; dieser Aufruf ist für Fälle, die
+        kein Trigger sieht (neu geschriebene description.txt). Indiziert wird
+        gebündelt im Hintergrund (services/fts_indexer)."""
+        from app.services.fts_indexer import fts_indexer
         try:
-            row = await self.fetch_one(
-                "SELECT rowid, id, title, channel_name, description, tags, notes FROM videos WHERE id = ?",
-                (video_id,)
-            )
-            if not row:
-                return
-            # description: File-first (unabhängig von der DB-Spalte)
-            from app.services.text_resolver import get_description
-            description = await get_description(video_id) or ""
-            # Alte DB-description als Delete-Key verwenden (das ist was der
-            # Index evtl. noch aus der vorherigen Synchronisation kennt)
-            old_description = row["description"] or description
-            await self.conn.execute(
-                "INSERT INTO videos_fts(videos_fts, rowid, id, title, channel_name, description, tags, notes) VALUES('delete', ?, ?, ?, ?, ?, ?, ?)",
-                (row["rowid"], row["id"], row["title"] or "", row["channel_name"] or "", old_description, row["tags"] or "", row["notes"] or "")
-            )
-            await self.conn.execute(
-                "INSERT INTO videos_fts(rowid, id, title, channel_name, description, tags, notes) VALUES(?, ?, ?, ?, ?, ?, ?)",
-                (row["rowid"], row["id"], row["title"] or "", row["channel_name"] or "", description, row["tags"] or "", row["notes"] or "")
-            )
-            await self.conn.commit()
+            await fts_indexer.enqueue([video_id])
         except Exception as e:
             logger.debug(f"FTS sync für {video_id}: {e}")
 
-    async def fts_delete_video(self, video_id: str):
-        """FTS5 Eintrag für ein Video entfernen."""
-        try:
-            row = await self.fetch_one(
-                "SELECT rowid, id, title, channel_name, description, tags, notes FROM videos WHERE id = ?",
-                (video_id,)
-            )
-            if row:
-                await self.conn.execute(
-                    "INSERT INTO videos_fts(videos_fts, rowid, id, title, channel_name, description, tags, notes) VALUES('delete', ?, ?, ?, ?, ?, ?, ?)",
-                    (row["rowid"], row["id"], row["title"] or "", row["channel_name"] or "", row["description"] or "", row["tags"] or "", row["notes"] or "")
-                )
-                await self.conn.commit()
-        except Exception as e:
-            logger.debug(f"FTS delete für {video_id}: {e}")
-
     async def fts_rebuild_from_resolver(self) -> dict:
         """FTS5-Index komplett neu aufbauen – description kommt aus dem
         text_resolver (File-first). So bleibt die Volltextsuche funktionsfähig,
-        auch wenn die DB-Spalte videos.description später geleert wird."""
-        from app.services.text_resolver import get_description
-        # Alles flushen – 'delete-all' löscht alle Einträge
-        await self.conn.execute("INSERT INTO videos_fts(videos_fts) VALUES('delete-all')")
-        rows = await self.fetch_all(
-            "SELECT rowid, id, title, channel_name, tags, notes FROM videos WHERE status='ready'"
-        )
-        written = 0
-        for r in rows:
-            description = await get_description(r["id"]) or ""
-            await self.conn.execute(
-                "INSERT INTO videos_fts(rowid, id, title, channel_name, description, tags, notes) VALUES(?, ?, ?, ?, ?, ?, ?)",
-                (r["rowid"], r["id"], r["title"] or "", r["channel_name"] or "",
-                 description, r["tags"] or "", r["notes"] or "")
-            )
-            written += 1
-        await self.conn.commit()
-        count = await self.fetch_val("SELECT COUNT(*) FROM videos_fts")
-        return {"rebuilt": written, "fts_count": count}
+        auch wenn die DB-Spalte videos.description später geleert wird.
+        Chunkweise, der bestehende Index bleibt währenddessen suchbar."""
+        from app.services.fts_indexer import fts_indexer
+        return await fts_indexer.rebuild()
 
     async def fts_search(self, query: str, limit: int = 50, offset: int = 0) -> list:
-        """FTS5 Volltextsuche über Videos."""
+        """FTS5 Volltextsuche über Videos (bm25-gewichtet, Titel vor Kanal/Tags/Beschreibung)."""
+        from app.utils.fts_query import FTS_RANK, build_match_query
+        fts_query = build_match_query(query)
+        if not fts_query:
+            return []
         try:
-            # Suchbegriffe für FTS5 aufbereiten (Spaces → AND)
-            terms = query.strip().split()
-            fts_query = " AND ".join(f'"{t}"' for t in terms if t)
             rows = await self.fetch_all(
-                """SELECT v.* FROM videos_fts f
-                   JOIN videos v ON v.id = f.id
+                f"""SELECT v.* FROM videos_fts
+                   JOIN videos v ON v.rowid = videos_fts.rowid
                    WHERE videos_fts MATCH ?
-                   AND v.status = 'ready' AND COALESCE(v.is_archived, 0) = 0
-                   ORDER BY rank
+                   AND v.status = 'ready' AND v.is_archived = 0
+                   ORDER BY {FTS_RANK}
                    LIMIT ? OFFSET ?""",
                 (fts_query, limit, offset)
             )
@@ -1239,5 +1642,90 @@ class Database:
             return []
 
 
+class WriteBatch:
+    """Write-Coalescing (Group-Commit) für Schreiber, die über längere Zeit
+    einzelne, voneinander unabhängige Writes absetzen (z.B. Backfills mit
+    HTTP-Fetch zwischen den Writes).
+
+    Statements werden gepuffert und gemeinsam in EINER Transaktion geschrieben,
+    sobald max_statements erreicht sind oder max_delay_ms seit dem ersten
+    gepufferten Statement vergangen sind. Am Ende des async-with-Blocks wird
+    der Rest geflusht.
+
+        async with db.write_batch() as batch:
+            for row in rows:
+                await batch.execute("UPDATE ...", (...))
+
+    Nicht geeignet wenn direkt danach gelesen wird (Read-after-Write) oder
+    rowcount/lastrowid gebraucht werden – dafür transaction() nutzen.
+    """
+
+    def __init__(self, database: Database, max_statements: int = 500, max_delay_ms: int = 1000):
+        self._db = database
+        self.max_statements = max(1, int(max_statements))
+        self.max_delay = max(0, int(max_delay_ms)) / 1000
+        self._pending: list[tuple[str, tuple]] = []
+        self._first_at: float | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+        self.flushes = 0
+        self.statements = 0
+
+    async def __aenter__(self) -> "WriteBatch":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._cancel_timer()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        # Auch bei Exception im Block: bereits gepufferte Writes nicht verlieren
+        await self.flush()
+
+    async def execute(self, sql: str, params=None):
+        self._pending.append((sql, tuple(params or ())))
+        if self._first_at is None:
+            self._first_at = time.monotonic()
+            if self.max_delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(
+                    self.max_delay, self._flush_from_timer
+                )
+        if (len(self._pending) >= self.max_statements
+                or time.monotonic() - self._first_at >= self.max_delay):
+            await self.flush()
+
+    def _cancel_timer(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def _flush_from_timer(self):
+        """Timer abgelaufen ohne dass der Schreiber weitere Writes liefert
+        (z.B. wartet er auf HTTP) → im Hintergrund flushen."""
+        self._timer = None
+        task = asyncio.ensure_future(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self) -> int:
+        self._cancel_timer()
+        pending, self._pending = self._pending, []
+        self._first_at = None
+        if not pending:
+            return 0
+        async with self._db.transaction():
+            # Aufeinanderfolgende gleiche Statements als executemany
+            i = 0
+            while i < len(pending):
+                sql = pending[i][0]
+                j = i
+                while j < len(pending) and pending[j][0] == sql:
+                    j += 1
+                await self._db.execute_many(sql, [p for _, p in pending[i:j]])
+                i = j
+        self.flushes += 1
+        self.statements += len(pending)
+        return len(pending)
+
+
 # Singleton
 db = Database()
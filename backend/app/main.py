@@ -23,6 +23,10 @@ from app.database import db
 from app.database_scan import scan_db
 from app.services.download_service import download_service
 from app.services.job_service import job_service
+from app.services.fts_indexer import fts_indexer
+from app.services.file_presence_service import file_presence_service
+from app.services.thumbnail_derivative_service import thumbnail_derivative_service
+from app.services.http_clients import http_clients
 from app.services.rss_service import rss_service
 from app.services.task_manager import task_manager
 from app.routers import (
@@ -47,41 +51,8 @@ logging.getLogger("httpcore").setLevel(logging.WARNING)
 
 
 async def _backfill_banners():
-    """Externe Banner-URLs beim Start lokal cachen."""
-    import asyncio
-    await asyncio.sleep(30)  # Warte bis System bereit
-    try:
-        import httpx
-        from app.config import BANNERS_DIR
-        BANNERS_DIR.mkdir(parents=True, exist_ok=True)
-        rows = await db.fetch_all(
-            "SELECT channel_id, banner_url FROM subscriptions "
-            "WHERE banner_url IS NOT NULL AND banner_url NOT LIKE '/api/%'")
-        cached = 0
-        for row in rows:
-            dest = BANNERS_DIR / f"{row['channel_id']}.jpg"
-            if dest.exists() and dest.stat().st_size > 1000:
-                await db.execute(
-                    "UPDATE subscriptions SET banner_url = ? WHERE channel_id = ?",
-                    (f"/api/subscriptions/banner/{row['channel_id']}", row["channel_id"]))
-                cached += 1
-                continue
-            try:
-                async with httpx.AsyncClient(timeout=15) as client:
-                    resp = await client.get(row["banner_url"])
-                    if resp.status_code == 200 and len(resp.content) > 1000:
-                        dest.write_bytes(resp.content)
-                        await db.execute(
-                            "UPDATE subscriptions SET banner_url = ? WHERE channel_id = ?",
-                            (f"/api/subscriptions/banner/{row['channel_id']}", row["channel_id"]))
-                        cached += 1
-            except Exception:
-                pass
-            await asyncio.sleep(1)
-        if cached:
-            logger.info(f"Banner-Backfill: {cached} Banner lokal gecacht")
-    except Exception as e:
-        logger.warning(f"Banner-Backfill Fehler: {e}")
+    """Externe Banner-URLs beim Start lokal cachen (Backfill-Engine, setzt fort)."""
+    await rss_service.backfill_banners()
 
 
 async def _drip_cron_loop():
@@ -233,30 +204,14 @@ async def _ghost_check_bg():
     """Ghost-Bereinigung im Hintergrund (blockiert den Start NICHT).
 
     Die Datei-Existenzprüfung über alle 'ready'-Videos ist auf einer grossen
-    USB-Platte zehntausende einzelne stat()-Aufrufe. Frueher lief das synchron
-    im Lifespan-Startup und blockierte den Event-Loop minutenlang (der Server
-    band den Port erst danach). Jetzt: einmal die Zeilen laden, die stat()-Schleife
-    in einem Thread abarbeiten (Event-Loop bleibt frei), nur die tatsaechlichen
-    Ghosts per DB-Update markieren.
+    USB-Platte zehntausende einzelne stat()-Aufrufe. file_presence_service
+    prüft nur Einträge, deren letzte Prüfung älter als storage.verify_max_age_s
+    ist, parallel im Thread-Pool, und markiert Ghosts in einer Transaktion.
     """
     try:
-        from pathlib import Path as _P
-        rows = await db.fetch_all(
-            "SELECT id, file_path FROM videos WHERE status = 'ready'")
-
-        def _find_ghosts(rs):
-            out = []
-            for gr in rs:
-                fp = gr["file_path"]
-                if not fp or not _P(fp).exists():
-                    out.append(gr["id"])
-            return out
-
-        ghost_ids = await asyncio.to_thread(_find_ghosts, rows)
-        for gid in ghost_ids:
-            await db.execute("UPDATE videos SET status = 'ghost' WHERE id = ?", (gid,))
-        if ghost_ids:
-            logger.info(f"[STARTUP] {len(ghost_ids)} Ghost-Einträge bereinigt (keine Datei)")
+        report = await file_presence_service.verify()
+        if report.missing:
+            logger.info(f"[STARTUP] {len(report.missing)} Ghost-Einträge bereinigt (keine Datei)")
     except Exception as e:
         logger.warning(f"[STARTUP] Ghost-Check Fehler: {e}")
 
@@ -311,6 +266,8 @@ async def lifespan(app: FastAPI):
                           _backfill_banners, auto_restart=False, essential=False)
     task_manager.register("userdata_export", "Nutzerdaten-Export (täglich)",
                           _userdata_export_loop, auto_restart=True, essential=False)
+    task_manager.register("fts_indexer", "Volltext-Indexer",
+                          fts_indexer.run, auto_restart=True, essential=False)
     await task_manager.start_all()
     logger.info(f"[OK] {APP_NAME} v{VERSION} bereit")
     logger.info(f"   API: http://{HOST}:{PORT}")
@@ -322,9 +279,13 @@ async def lifespan(app: FastAPI):
     # --- SHUTDOWN ---
     logger.info(f"[STOP] {APP_NAME} wird heruntergefahren...")
     await task_manager.stop_all()
+    fts_indexer.shutdown()
+    thumbnail_derivative_service.shutdown()
+    file_presence_service.shutdown()
     await rss_service.stop_worker()
     await download_service.stop_worker()
     await job_service.shutdown()
+    await http_clients.aclose()
     await db.disconnect()
     await scan_db.disconnect()
     logger.info(f"[BYE] {APP_NAME} gestoppt")
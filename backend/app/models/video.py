@@ -61,10 +61,11 @@ class VideoResponse(VideoBase):
 
 class VideoListResponse(BaseModel):
     videos: list[VideoResponse]
-    total: int
+    total: Optional[int] = None  # None wenn with_total=false
     page: int = 1
     per_page: int = 24
     total_pages: int = 1
+    next_cursor: Optional[str] = None  # Keyset-Modus: Cursor der nächsten Seite
 
 
 class VideoInfo(BaseModel):
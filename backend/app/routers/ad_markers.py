@@ -14,6 +14,7 @@ from pydantic import BaseModel
 
 from app.database import db
 from app.services.endpoint_service import get_service_url
+from app.services.http_clients import http_clients
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/ad-markers", tags=["AdMarkers"])
@@ -42,8 +43,7 @@ async def import_sponsorblock_segments(video_id: str, cat_list: list = None) ->
     sb_url = await get_service_url("sponsorblock_api") or SB_API_BASE
     url = f"{sb_url}/api/skipSegments?videoID={video_id}&categories={cats_param}"
 
-    async with httpx.AsyncClient(timeout=10) as client:
-        resp = await client.get(url)
+    resp = await http_clients.get(url, category="api", timeout=10)
 
     if resp.status_code == 404:
         return 0
@@ -190,8 +190,7 @@ async def fetch_sponsorblock(
         cats_param = '["' + '","'.join(cat_list) + '"]'
         sb_url = await get_service_url("sponsorblock_api") or SB_API_BASE
         url = f"{sb_url}/api/skipSegments?videoID={video_id}&categories={cats_param}"
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(url)
+        resp = await http_clients.get(url, category="api", timeout=10)
 
         if resp.status_code == 404:
             return {"video_id": video_id, "found": 0, "imported": 0,
@@ -261,8 +260,7 @@ async def check_sponsorblock(video_id: str):
     try:
         sb_url = await get_service_url("sponsorblock_api") or SB_API_BASE
         url = f"{sb_url}/api/skipSegments?videoID={video_id}"
-        async with httpx.AsyncClient(timeout=8) as client:
-            resp = await client.get(url)
+        resp = await http_clients.get(url, category="api", timeout=8)
 
         if resp.status_code == 404:
             return {"available": False, "count": 0}
@@ -320,9 +320,10 @@ async def audit_description():
 async def fts_rebuild():
     """FTS5-Volltextindex neu aufbauen – description wird aus dem Resolver
     geholt (File-first), damit die Suche auch nach dem Leeren der DB-Spalte
-    weiter funktioniert."""
-    from app.database import db as _db
-    return await _db.fts_rebuild_from_resolver()
+    weiter funktioniert. Läuft als Job (Fortschritt im Job-Panel), die Suche
+    bleibt währenddessen verfügbar."""
+    from app.services.fts_indexer import fts_indexer
+    return await fts_indexer.start_rebuild_job()
 
 
 @router.post("/text-export/purge-db-descriptions")
@@ -13,6 +13,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 from app.database import db
+from app.services.http_clients import http_clients
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/endpoints", tags=["API Endpoints"])
@@ -96,8 +97,8 @@ async def test_endpoint(ep_id: int):
 
     now = datetime.utcnow().isoformat()
     try:
-        async with httpx.AsyncClient(timeout=10, follow_redirects=True) as client:
-            resp = await client.get(full_url)
+        async with http_clients.slot("api", full_url) as client:
+            resp = await client.get(full_url, timeout=10)
             status = f"{resp.status_code} {resp.reason_phrase}"
             ok = 200 <= resp.status_code < 400
 
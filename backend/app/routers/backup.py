@@ -1,6 +1,7 @@
 """
-TubeVault – Backup Router v1.5.79
+TubeVault – Backup Router v1.5.80
 DB-Backup erstellen, herunterladen, wiederherstellen.
+v1.5.80: Restore leert den Pfad-Cache von archive_service
 © HalloWelt42 – Private Nutzung
 """
 
@@ -14,6 +15,7 @@ from fastapi.responses import FileResponse
 
 from app.config import DATA_DIR, DB_DIR, EXPORTS_DIR, VERSION
 from app.database import db
+from app.services.archive_service import archive_service
 
 logger = logging.getLogger(__name__)
 
@@ -164,6 +166,8 @@ async def restore_backup(filename: str):
         # 5. Verbindung neu öffnen
         await db.connect()
         await db._init_schema()
+        # Aufgelöste Pfade stammen aus der alten DB (file_path/Archiv-Zuordnung)
+        archive_service.invalidate_path()
 
         logger.info(f"[RESTORE] Wiederhergestellt aus: {filename}")
         return {
@@ -178,6 +182,7 @@ async def restore_backup(filename: str):
             shutil.copy2(str(safety_path), str(db_path))
             await db.connect()
             await db._init_schema()
+            archive_service.invalidate_path()
         except Exception:
             pass
         raise HTTPException(status_code=500, detail=f"Restore fehlgeschlagen: {e}")
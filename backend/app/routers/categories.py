@@ -8,6 +8,8 @@ Alle Video-Queries filtern auf status='ready'.
 from fastapi import APIRouter, HTTPException, Query
 from app.models.category import CategoryCreate, CategoryUpdate, CategoryResponse
 from app.database import db
+from app.services.counts_service import counts_service
+from app.utils.fts_query import FTS_ROWIDS, build_match_query
 
 router = APIRouter(prefix="/api/categories", tags=["Kategorien"])
 
@@ -87,6 +89,7 @@ async def create_category(cat: CategoryCreate):
            VALUES (?, ?, ?, ?, ?)""",
         (cat.name, cat.description, cat.color, cat.icon, cat.sort_order)
     )
+    counts_service.invalidate("categories")
     return {"id": cursor.lastrowid, "name": cat.name}
 
 
@@ -112,6 +115,7 @@ async def delete_category(category_id: int):
     """Kategorie löschen (Zuordnungen werden explizit entfernt)."""
     await db.execute("DELETE FROM video_categories WHERE category_id = ?", (category_id,))
     await db.execute("DELETE FROM categories WHERE id = ?", (category_id,))
+    counts_service.invalidate("categories")
     return {"deleted": True}
 
 
@@ -134,9 +138,11 @@ async def get_category_videos(
     params = [category_id]
 
     if search:
-        conditions.append("(v.title LIKE ? OR v.channel_name LIKE ?)")
-        term = f"%{search}%"
-        params.extend([term, term])
+        match = build_match_query(search, ["title", "channel_name"])
+        if not match:
+            return []
+        conditions.append(f"v.rowid IN ({FTS_ROWIDS})")
+        params.append(match)
 
     where = " AND ".join(conditions)
     rows = await db.fetch_all(
@@ -300,6 +306,7 @@ async def quick_channel_assign(channel_name: str, category_id: int = None):
                 "INSERT INTO categories (name, description, color) VALUES (?, ?, ?)",
                 (channel_name, f"Videos von {channel_name}", color)
             )
+            counts_service.invalidate("categories")
             cat_id = cursor.lastrowid
             cat_name = channel_name
 
@@ -348,6 +355,7 @@ async def quick_channel_assign_all():
                 "INSERT INTO categories (name, description, color) VALUES (?, ?, ?)",
                 (name, f"Videos von {name}", color)
             )
+            counts_service.invalidate("categories")
             cat_id = cursor.lastrowid
             categories_created += 1
 
@@ -11,6 +11,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 from app.database import db
+from app.services.counts_service import counts_service
 from app.services.job_service import job_service
 
 router = APIRouter(prefix="/api/subscriptions", tags=["Kanal-Playlists (YouTube)"])
@@ -187,4 +188,5 @@ async def toggle_playlist_visibility(playlist_id: int, data: dict):
         raise HTTPException(status_code=400, detail="Ungültig: 'global' oder 'channel'")
     await db.execute(
         "UPDATE playlists SET visibility = ? WHERE id = ?", (visibility, playlist_id))
+    counts_service.invalidate("playlists")
     return {"status": "ok", "playlist_id": playlist_id, "visibility": visibility}
@@ -62,6 +62,12 @@ async def get_download_queue():
 
 # ---- Spezifische Routen VOR /{queue_id} ----
 
+@router.get("/lanes")
+async def get_download_lanes():
+    """Download-Lanes: Parallelität, Cooldown und Durchsatz je Lane."""
+    return {"lanes": download_service.get_lane_stats()}
+
+
 @router.delete("/completed/clear")
 async def clear_completed():
     """Abgeschlossene Downloads aus Queue entfernen."""
@@ -6,6 +6,7 @@ TubeVault – Favorites Router v1.0.0
 from fastapi import APIRouter, HTTPException
 from app.models.category import FavoriteCreate, FavoriteResponse, FavoriteListResponse
 from app.database import db
+from app.services.counts_service import counts_service
 
 router = APIRouter(prefix="/api/favorites", tags=["Favoriten"])
 
@@ -71,6 +72,7 @@ async def add_favorite(fav: FavoriteCreate):
         "INSERT INTO favorites (video_id, list_name, position) VALUES (?, ?, ?)",
         (fav.video_id, fav.list_name, max_pos + 1)
     )
+    counts_service.invalidate("favorites")
     return {"id": cursor.lastrowid, "video_id": fav.video_id, "list_name": fav.list_name}
 
 
@@ -78,6 +80,7 @@ async def add_favorite(fav: FavoriteCreate):
 async def remove_favorite(favorite_id: int):
     """Favorit entfernen."""
     await db.execute("DELETE FROM favorites WHERE id = ?", (favorite_id,))
+    counts_service.invalidate("favorites")
     return {"deleted": True}
 
 
@@ -91,6 +94,7 @@ async def remove_favorite_by_video(video_id: str, list_name: str = None):
         )
     else:
         await db.execute("DELETE FROM favorites WHERE video_id = ?", (video_id,))
+    counts_service.invalidate("favorites")
     return {"deleted": True, "video_id": video_id}
 
 
@@ -7,7 +7,6 @@ Extrahiert aus subscriptions.py für bessere Modularität.
 
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -51,24 +50,15 @@ async def get_feed_tags(feed_tab: str = Query("active")):
         status_filter = f"AND r.feed_status = '{feed_tab}'"
 
     rows = await db.fetch_all(
-        f"""SELECT r.keywords FROM rss_entries r
+        f"""SELECT k.keyword AS tag, COUNT(*) AS count
+            FROM rss_entry_keywords k
+            JOIN rss_entries r ON r.id = k.entry_id
             JOIN subscriptions s ON r.channel_id = s.channel_id
-            WHERE r.keywords IS NOT NULL AND r.keywords != '[]'
-            {status_filter}"""
+            WHERE 1=1 {status_filter}
+            GROUP BY k.keyword
+            ORDER BY count DESC, k.keyword"""
     )
-    tag_counts = {}
-    for row in rows:
-        try:
-            kws = json.loads(row["keywords"]) if isinstance(row["keywords"], str) else row["keywords"]
-            if isinstance(kws, list):
-                for kw in kws:
-                    kw = str(kw).strip()
-                    if kw:
-                        tag_counts[kw] = tag_counts.get(kw, 0) + 1
-        except (json.JSONDecodeError, TypeError):
-            pass
-    sorted_tags = sorted(tag_counts.items(), key=lambda x: -x[1])
-    return [{"tag": t, "count": c} for t, c in sorted_tags]
+    return [{"tag": r["tag"], "count": r["count"]} for r in rows]
 
 
 @router.get("/feed")
@@ -83,12 +73,18 @@ async def get_feed_videos(
     feed_tab: str = Query("active"),
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
 ):
-    """Neue Videos aus RSS-Feeds – mit Mehrfach-Typ/Kanal/Tag/Dauer-Filter, Feed-Tabs und Pagination."""
-    return await rss_service.get_new_videos(
-        channel_id, channel_ids, video_type, video_types, feed_tab, page, per_page,
-        keywords=keywords, duration_min=duration_min, duration_max=duration_max
-    )
+    """Neue Videos aus RSS-Feeds – mit Mehrfach-Typ/Kanal/Tag/Dauer-Filter, Feed-Tabs und Pagination.
+    Keyset-Modus: cursor="" für die erste Seite, danach next_cursor aus der Antwort."""
+    try:
+        return await rss_service.get_new_videos(
+            channel_id, channel_ids, video_type, video_types, feed_tab, page, per_page,
+            keywords=keywords, duration_min=duration_min, duration_max=duration_max,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/feed/{entry_id}/status")
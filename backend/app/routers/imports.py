@@ -19,6 +19,7 @@ from pydantic import BaseModel
 from app.database import db
 from app.config import VIDEOS_DIR, THUMBNAILS_DIR
 from app.services.rate_limiter import rate_limiter
+from app.services.rss_service import rss_service
 from app.utils.file_utils import now_sqlite
 
 logger = logging.getLogger(__name__)
@@ -349,6 +350,7 @@ async def import_freetube_subscriptions(file: UploadFile = File(...)):
         except (json.JSONDecodeError, TypeError):
             continue
     
+    rss_service.invalidate_schedule()  # neue Abos sofort fällig
     return {"imported": imported, "source": "freetube_profiles"}
 
 
@@ -488,6 +490,7 @@ async def import_youtube_takeout_subs(file: UploadFile = File(...)):
                     (cid, name, thumb)
                 )
                 imported += 1
+        rss_service.invalidate_schedule()  # neue Abos sofort fällig
         return {"imported": imported, "source": "youtube_takeout_subscriptions_json"}
     except (json.JSONDecodeError, TypeError):
         pass
@@ -522,4 +525,5 @@ async def import_youtube_takeout_subs(file: UploadFile = File(...)):
             )
             imported += 1
     
+    rss_service.invalidate_schedule()  # neue Abos sofort fällig
     return {"imported": imported, "source": "youtube_takeout_subscriptions_csv"}
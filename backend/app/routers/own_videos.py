@@ -17,6 +17,7 @@ from fastapi.responses import FileResponse, StreamingResponse
 from app.config import SCAN_DIR, VIDEOS_DIR
 from pydantic import BaseModel
 
+from app.services.archive_service import archive_service
 from app.services.import_service import import_service
 
 logger = logging.getLogger(__name__)
@@ -327,6 +328,7 @@ async def delete_own_video(video_id: str):
             pass
 
     await db.execute("DELETE FROM videos WHERE id = ?", (video_id,))
+    archive_service.invalidate_path(video_id)
     logger.info(f"Import zurückgenommen: {video_id} ({video['title']})")
 
     return {
@@ -614,6 +616,7 @@ async def link_youtube(staging_id: int, req: LinkYoutubeRequest):
              meta["duration"], meta["view_count"], thumb_path, str(dest), file_size,
              tags_json, now, meta.get("publish_date"), now, yt_id)
         )
+        archive_service.invalidate_path(yt_id)
     else:
         await db.execute(
             """INSERT INTO videos (id, title, channel_name, channel_id, description,
@@ -804,6 +807,7 @@ async def import_own(staging_id: int, req: ImportOwnRequest):
          row.get("duration"), str(dest), file_size,
          "ready", source, thumb_path, now, now, now)
     )
+    archive_service.invalidate_path(video_id)
 
     try:
         from app.services import text_export
@@ -906,6 +910,7 @@ async def replace_video(staging_id: int):
            updated_at = ?, download_date = ? WHERE id = ?""",
         (str(dest), file_size, now, now, vid_id)
     )
+    archive_service.invalidate_path(vid_id)
 
     # FTS5
     try:
@@ -1,40 +1,43 @@
 """
-TubeVault – Player Router v1.3.0
+TubeVault – Player Router v1.6.0
 Video-Streaming mit Range Requests + Archive-Support
+v1.6.0: Thumbnail-Varianten: /{id}/thumbnail?w= → /thumbs/<sha256>_<w>.webp (immutable)
+v1.5.0: HLS (fMP4) on-demand: /{id}/hls/master.m3u8 + Segmente (hls_service)
+v1.4.0: Range-Auslieferung über RangeFileResponse (Threadpool/sendfile, Multi-Range,
+        If-Range, 304) statt Generator mit blockierendem f.read() im Event-Loop
 Subtitles, Audio-Extraktion
 © HalloWelt42 – Private Nutzung
 """
 
-import os
 import mimetypes
 from pathlib import Path
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import StreamingResponse, FileResponse, RedirectResponse
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse, RedirectResponse, Response
 
 from app.database import db
 from app.config import THUMBNAILS_DIR
 from app.services.archive_service import archive_service
+from app.services.hls_service import hls_service
+from app.services.thumbnail_derivative_service import (
+    snap_width, thumbnail_derivative_service, variant_name,
+)
+from app.utils.range_response import RangeFileResponse
 
 router = APIRouter(prefix="/api/player", tags=["Player"])
 
-CHUNK_SIZE = 1024 * 1024  # 1MB
-
 
 @router.get("/{video_id}")
-async def stream_video(video_id: str, request: Request):
-    """Video streamen – prüft lokale + Archiv-Pfade."""
-    video = await db.fetch_one(
-        "SELECT file_path, file_size, storage_type, status FROM videos WHERE id = ?",
-        (video_id,)
-    )
-    if not video:
-        raise HTTPException(status_code=404, detail="Video nicht gefunden")
-
+async def stream_video(video_id: str):
+    """Video streamen – prüft lokale + Archiv-Pfade.
+    Pfad kommt beim Seeken aus dem Cache des archive_service (keine DB, kein stat)."""
     # Pfad auflösen: lokal → Archiv → offline
     resolved = await archive_service.resolve_video_path(video_id)
 
     if not resolved["available"]:
+        if resolved.get("storage_type") is None:
+            raise HTTPException(status_code=404, detail="Video nicht gefunden")
         if resolved.get("archive_name"):
             raise HTTPException(
                 status_code=503,
@@ -45,66 +48,48 @@ async def stream_video(video_id: str, request: Request):
 
     file_path = resolved["path"]
 
-    file_size = os.path.getsize(file_path)
     mime_type = mimetypes.guess_type(file_path)[0] or "video/mp4"
 
-    # Range Request Header parsen
-    range_header = request.headers.get("range")
-
-    if range_header:
-        # Range: bytes=start-end
-        range_str = range_header.replace("bytes=", "")
-        parts = range_str.split("-")
-        start = int(parts[0]) if parts[0] else 0
-        end = int(parts[1]) if parts[1] else file_size - 1
-
-        # Grenzen prüfen
-        if start >= file_size:
-            raise HTTPException(status_code=416, detail="Range Not Satisfiable")
-        end = min(end, file_size - 1)
-        content_length = end - start + 1
-
-        async def generate():
-            with open(file_path, "rb") as f:
-                f.seek(start)
-                remaining = content_length
-                while remaining > 0:
-                    chunk = f.read(min(CHUNK_SIZE, remaining))
-                    if not chunk:
-                        break
-                    remaining -= len(chunk)
-                    yield chunk
-
-        return StreamingResponse(
-            generate(),
-            status_code=206,
-            media_type=mime_type,
-            headers={
-                "Content-Range": f"bytes {start}-{end}/{file_size}",
-                "Content-Length": str(content_length),
-                "Accept-Ranges": "bytes",
-                "Cache-Control": "no-cache",
-            },
-        )
-    else:
-        # Kein Range Request → komplette Datei
-        async def generate_full():
-            with open(file_path, "rb") as f:
-                while chunk := f.read(CHUNK_SIZE):
-                    yield chunk
-
-        return StreamingResponse(
-            generate_full(),
-            media_type=mime_type,
-            headers={
-                "Content-Length": str(file_size),
-                "Accept-Ranges": "bytes",
-            },
-        )
+    # Range/Multi-Range, If-Range und 304 über ETag/Last-Modified;
+    # Datei wird im Threadpool (oder per sendfile) gelesen, nie im Event-Loop.
+    return RangeFileResponse(file_path, media_type=mime_type,
+                             headers={"Cache-Control": "no-cache"},
+                             on_missing=lambda: archive_service.invalidate_path(video_id))
+
+
+@router.get("/{video_id}/hls/master.m3u8")
+async def hls_master(video_id: str):
+    """HLS-Master-Playlist. Packt bei Bedarf on-demand (ffmpeg -c copy) und
+    antwortet, sobald das erste Segment da ist."""
+    try:
+        playlist = await hls_service.master_playlist(video_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Video-Datei nicht gefunden")
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e)[:200])
+    return Response(playlist, media_type="application/vnd.apple.mpegurl",
+                    headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/{video_id}/hls/{rendition}/{name}")
+async def hls_file(video_id: str, rendition: str, name: str):
+    """Media-Playlist, Init-Segment oder Segment einer Rendition."""
+    try:
+        path = await hls_service.file_path(video_id, rendition, name)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e)[:200])
+    if not path:
+        raise HTTPException(status_code=404, detail="HLS-Datei nicht gefunden")
+    if name.endswith(".m3u8"):
+        # Playlist wächst während des Packagings → nie cachen
+        return FileResponse(str(path), media_type="application/vnd.apple.mpegurl",
+                            headers={"Cache-Control": "no-cache"})
+    return RangeFileResponse(str(path), media_type="video/mp4",
+                             headers={"Cache-Control": "public, max-age=3600"})
 
 
 @router.get("/{video_id}/stream/{stream_id}")
-async def stream_specific(video_id: str, stream_id: int, request: Request):
+async def stream_specific(video_id: str, stream_id: int):
     """Spezifischen Stream (Audio oder Video) streamen."""
     stream = await db.fetch_one(
         "SELECT file_path, mime_type FROM streams WHERE id = ? AND video_id = ? AND downloaded = 1",
@@ -117,67 +102,66 @@ async def stream_specific(video_id: str, stream_id: int, request: Request):
     if not file_path or not Path(file_path).exists():
         raise HTTPException(status_code=404, detail="Stream-Datei nicht gefunden")
 
-    file_size = os.path.getsize(file_path)
     mime_type = stream["mime_type"] or "application/octet-stream"
-
-    range_header = request.headers.get("range")
-    if range_header:
-        range_str = range_header.replace("bytes=", "")
-        parts = range_str.split("-")
-        start = int(parts[0]) if parts[0] else 0
-        end = int(parts[1]) if parts[1] else file_size - 1
-        end = min(end, file_size - 1)
-        content_length = end - start + 1
-
-        async def generate():
-            with open(file_path, "rb") as f:
-                f.seek(start)
-                remaining = content_length
-                while remaining > 0:
-                    chunk = f.read(min(CHUNK_SIZE, remaining))
-                    if not chunk:
-                        break
-                    remaining -= len(chunk)
-                    yield chunk
-
-        return StreamingResponse(
-            generate(),
-            status_code=206,
-            media_type=mime_type,
-            headers={
-                "Content-Range": f"bytes {start}-{end}/{file_size}",
-                "Content-Length": str(content_length),
-                "Accept-Ranges": "bytes",
-            },
-        )
-
-    return FileResponse(file_path, media_type=mime_type)
+    return RangeFileResponse(file_path, media_type=mime_type,
+                             headers={"Cache-Control": "no-cache"})
 
 
-@router.get("/{video_id}/thumbnail")
-async def get_thumbnail(video_id: str):
-    """Thumbnail abrufen – mit Cache-Control für Browser/Nginx."""
+async def _thumbnail_source(video_id: str):
+    """Lokales Thumbnail eines Videos → (Pfad, Media-Type) oder None."""
     video = await db.fetch_one(
         "SELECT thumbnail_path FROM videos WHERE id = ?", (video_id,)
     )
-
-    cache_headers = {"Cache-Control": "public, max-age=86400", "Vary": "Accept"}
-
     if video and video["thumbnail_path"]:
         thumb_path = Path(video["thumbnail_path"])
         if thumb_path.exists():
-            return FileResponse(str(thumb_path), media_type="image/jpeg", headers=cache_headers)
+            return thumb_path, "image/jpeg"
 
     # Fallback 1: Standard-Pfad (YT-Downloads: video_id/thumbnail.jpg)
     thumb_path = THUMBNAILS_DIR / video_id / "thumbnail.jpg"
     if thumb_path.exists():
-        return FileResponse(str(thumb_path), media_type="image/jpeg", headers=cache_headers)
+        return thumb_path, "image/jpeg"
 
     # Fallback 2: Flacher Pfad (Importe: video_id.jpg)
     for ext in [".jpg", ".png", ".webp"]:
         thumb_path = THUMBNAILS_DIR / f"{video_id}{ext}"
         if thumb_path.exists():
-            return FileResponse(str(thumb_path), media_type=f"image/{'jpeg' if ext == '.jpg' else ext[1:]}", headers=cache_headers)
+            return thumb_path, f"image/{'jpeg' if ext == '.jpg' else ext[1:]}"
+    return None
+
+
+@router.get("/thumbs/{name}")
+async def get_thumbnail_variant(name: str):
+    """Content-addressed Thumbnail-Variante (<sha256>_<breite>.webp).
+    Inhalt ändert sich nie → immutable + starkes ETag."""
+    found = thumbnail_derivative_service.file_for(name)
+    if not found:
+        raise HTTPException(status_code=404, detail="Thumbnail-Variante nicht gefunden")
+    etag, path = found
+    return RangeFileResponse(str(path), media_type="image/webp", headers={
+        "ETag": f'"{etag}"', "Cache-Control": "public, max-age=31536000, immutable"})
+
+
+@router.get("/{video_id}/thumbnail")
+async def get_thumbnail(video_id: str, w: Optional[int] = Query(None, ge=1, le=4096)):
+    """Thumbnail abrufen – mit Cache-Control für Browser/Nginx.
+    Mit ?w= (Grid-Kacheln): Redirect auf die passende WebP-Variante unter
+    /thumbs/, die beim ersten Abruf im Prozess-Pool entsteht."""
+    cache_headers = {"Cache-Control": "public, max-age=86400", "Vary": "Accept"}
+
+    source = await _thumbnail_source(video_id)
+    if source:
+        thumb_path, media_type = source
+        width = snap_width(w) if w else None
+        if width:
+            variant = await thumbnail_derivative_service.variant(thumb_path, width)
+            if variant:
+                # Kurz cachen: ein neues Thumbnail bekommt einen neuen Digest
+                return RedirectResponse(
+                    url=f"/api/player/thumbs/{variant_name(variant[0], width)}",
+                    status_code=307, headers={"Cache-Control": "public, max-age=300"},
+                )
+        return FileResponse(str(thumb_path), media_type=media_type, headers=cache_headers)
 
     # Fallback 3: Kein lokales Thumbnail, aber gültige YouTube-ID → auf den
     # rss-thumb-Endpoint umleiten (proxyt + cached YouTube-Thumbnail). Damit
@@ -398,42 +382,14 @@ async def audiofix_build(video_id: str):
 
 
 @router.get("/{video_id}/audiofix/preview")
-async def audiofix_preview(video_id: str, request: Request):
+async def audiofix_preview(video_id: str):
     """Schritt 4 (Gate 2): neu gebautes Video prüfen (mit Range-Support)."""
     from app.services import audio_fix
     fixed = audio_fix._staging_dir(video_id) / "fixed.mp4"
     if not fixed.exists():
         raise HTTPException(status_code=404, detail="Kein gebautes Video")
-    file_size = fixed.stat().st_size
-    range_header = request.headers.get("range")
-    if range_header and range_header.startswith("bytes="):
-        rng = range_header.replace("bytes=", "").split("-")
-        start = int(rng[0]) if rng[0] else 0
-        end = int(rng[1]) if len(rng) > 1 and rng[1] else file_size - 1
-        end = min(end, file_size - 1)
-        length = end - start + 1
-
-        async def gen():
-            with open(fixed, "rb") as f:
-                f.seek(start)
-                remaining = length
-                while remaining > 0:
-                    chunk = f.read(min(CHUNK_SIZE, remaining))
-                    if not chunk:
-                        break
-                    remaining -= len(chunk)
-                    yield chunk
-
-        return StreamingResponse(
-            gen(), status_code=206,
-            headers={
-                "Content-Range": f"bytes {start}-{end}/{file_size}",
-                "Accept-Ranges": "bytes",
-                "Content-Length": str(length),
-                "Content-Type": "video/mp4",
-            },
-        )
-    return FileResponse(str(fixed), media_type="video/mp4")
+    return RangeFileResponse(str(fixed), media_type="video/mp4",
+                             headers={"Cache-Control": "no-cache"})
 
 
 @router.post("/{video_id}/audiofix/commit")
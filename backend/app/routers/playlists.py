@@ -10,6 +10,7 @@ from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
 from app.database import db
+from app.services.counts_service import counts_service
 
 router = APIRouter(prefix="/api/playlists", tags=["Playlists (Lokal)"])
 
@@ -65,6 +66,7 @@ async def create_playlist(data: PlaylistCreate):
         "INSERT INTO playlists (name, description) VALUES (?, ?)",
         (data.name, data.description)
     )
+    counts_service.invalidate("playlists")
     return {"id": cursor.lastrowid, "name": data.name, "created": True}
 
 
@@ -109,6 +111,7 @@ async def update_playlist(playlist_id: int, data: PlaylistUpdate):
     set_clause = ", ".join(f"{k} = ?" for k in updates)
     values = list(updates.values()) + [playlist_id]
     await db.execute(f"UPDATE playlists SET {set_clause} WHERE id = ?", values)
+    counts_service.invalidate("playlists")
     return {"updated": True}
 
 
@@ -116,6 +119,7 @@ async def update_playlist(playlist_id: int, data: PlaylistUpdate):
 async def delete_playlist(playlist_id: int):
     """Playlist löschen."""
     await db.execute("DELETE FROM playlists WHERE id = ?", (playlist_id,))
+    counts_service.invalidate("playlists")
     return {"deleted": True}
 
 
@@ -1,7 +1,8 @@
 """
-TubeVault – Search Router v1.6.0
+TubeVault – Search Router v1.6.1
 YouTube-Suche via pytubefix Search + lokale DB-Suche
 Unified: Ein Search()-Call liefert Videos, Shorts, Playlists, Channels
+v1.6.1: lokale Suche findet noch nicht indizierte Videos (fts_queue) per LIKE
 © HalloWelt42 – Private Nutzung
 """
 
@@ -14,7 +15,9 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
 
 from app.database import db
+from app.services.fts_indexer import fts_indexer
 from app.services.rate_limiter import rate_limiter
+from app.utils.fts_query import FTS_RANK, FTS_ROWIDS, build_match_query, like_condition
 from app.routers.blocked_channels import get_blocked_ids
 
 logger = logging.getLogger(__name__)
@@ -399,77 +402,64 @@ async def search_local(
     source: Optional[str] = None,
     scope: Optional[str] = None,
 ):
-    """Lokale Suche – FTS5 bevorzugt, LIKE als Fallback."""
-    offset = (page - 1) * per_page
+    """Lokale Suche über den FTS5-Index, auch mit source/scope-Filter.
 
-    # Scope/Source-Filter für FTS5 nicht direkt möglich → nur bei einfacher Suche FTS5
-    use_fts = (not source and not scope)
+    Syntax: Wörter = Präfixsuche, "…" = exakte Phrase. Sortierung nach bm25
+    (Titel > Kanal > Tags > Notizen > Beschreibung).
 
-    if use_fts:
-        try:
-            terms = q.strip().split()
-            fts_query = " AND ".join(f'"{t}"' for t in terms if t)
-            total = await db.fetch_val(
-                """SELECT COUNT(*) FROM videos_fts f
-                   JOIN videos v ON v.id = f.id
-                   WHERE videos_fts MATCH ?
-                   AND v.status = 'ready' AND COALESCE(v.is_archived, 0) = 0""",
-                (fts_query,)
-            ) or 0
-            rows = await db.fetch_all(
-                """SELECT v.* FROM videos_fts f
-                   JOIN videos v ON v.id = f.id
-                   WHERE videos_fts MATCH ?
-                   AND v.status = 'ready' AND COALESCE(v.is_archived, 0) = 0
-                   ORDER BY rank
-                   LIMIT ? OFFSET ?""",
-                (fts_query, per_page, offset)
-            )
-            videos = []
-            for r in rows:
-                d = dict(r)
-                if isinstance(d.get("tags"), str):
-                    try: d["tags"] = json.loads(d["tags"])
-                    except: d["tags"] = []
-                d.pop("ai_summary", None); d.pop("ai_tags", None)
-                videos.append(d)
-            return {"query": q, "videos": videos, "total": total,
-                    "page": page, "per_page": per_page,
-                    "total_pages": max(1, (total + per_page - 1) // per_page),
-                    "engine": "fts5"}
-        except Exception as e:
-            logger.debug(f"FTS5 Fallback: {e}")
+    Videos, die noch in der fts_queue stehen (gerade fertig/bearbeitet, vom
+    Indexer noch nicht erfasst), werden per LIKE gefunden und vor den
+    Index-Treffern geliefert – die Suche ist sofort konsistent."""
+    offset = (page - 1) * per_page
+    fts_query = build_match_query(q)
+    if not fts_query:
+        return {"query": q, "videos": [], "total": 0,
+                "page": page, "per_page": per_page,
+                "total_pages": 1, "engine": "fts5"}
 
-    # LIKE-Fallback (auch für scope/source-Filter)
-    conditions = [
-        "v.status = 'ready'",
-        "COALESCE(v.is_archived, 0) = 0",
-        "(v.title LIKE ? OR v.channel_name LIKE ? OR v.description LIKE ? OR v.tags LIKE ?)",
-    ]
-    search_term = f"%{q}%"
-    params = [search_term, search_term, search_term, search_term]
+    filters = ["v.status = 'ready'", "v.is_archived = 0"]
+    filter_params = []
 
     if source:
-        conditions.append("v.source = ?")
-        params.append(source)
+        filters.append("v.source = ?")
+        filter_params.append(source)
 
     if scope == "favorites":
-        conditions.append("v.id IN (SELECT video_id FROM favorites)")
+        filters.append("v.id IN (SELECT video_id FROM favorites)")
     elif scope == "playlists":
-        conditions.append("v.id IN (SELECT video_id FROM playlist_videos)")
+        filters.append("v.id IN (SELECT video_id FROM playlist_videos)")
     elif scope == "own":
-        conditions.append("v.source IN ('local', 'imported')")
-
-    where = f"WHERE {' AND '.join(conditions)}"
-    total = await db.fetch_val(f"SELECT COUNT(*) FROM videos v {where}", params)
-    offset = (page - 1) * per_page
-
-    rows = await db.fetch_all(
-        f"""SELECT v.* FROM videos v {where}
-            ORDER BY v.play_count DESC, v.updated_at DESC
-            LIMIT ? OFFSET ?""",
-        params + [per_page, offset]
-    )
+        filters.append("v.source IN ('local', 'imported')")
+
+    # Noch nicht indizierte Änderungen: LIKE nur über die (kleine) Queue,
+    # ohne Zeilen, die der Index schon findet
+    fresh_rows = []
+    if await db.fetch_val("SELECT EXISTS (SELECT 1 FROM fts_queue)"):
+        fts_indexer.kick()
+        like, like_params = like_condition(
+            q, ["title", "channel_name", "description", "tags", "notes"])
+        fresh_rows = await db.fetch_all(
+            f"""SELECT v.* FROM videos v
+                WHERE v.rowid IN (SELECT video_rowid FROM fts_queue)
+                AND v.rowid NOT IN ({FTS_ROWIDS})
+                AND {like} AND {' AND '.join(filters)}
+                ORDER BY v.play_count DESC""",
+            [fts_query, *like_params, *filter_params])
+
+    # Treffermenge kommt aus dem Index, die Filter prüfen nur noch die Treffer
+    where = f"WHERE videos_fts MATCH ? AND {' AND '.join(filters)}"
+    params = [fts_query, *filter_params]
+    from_sql = "FROM videos_fts JOIN videos v ON v.rowid = videos_fts.rowid"
+    total = await db.fetch_val(f"SELECT COUNT(*) {from_sql} {where}", params) or 0
+    rows = list(fresh_rows[offset:offset + per_page])
+    if len(rows) < per_page:
+        rows += await db.fetch_all(
+            f"""SELECT v.* {from_sql} {where}
+                ORDER BY {FTS_RANK}, v.play_count DESC
+                LIMIT ? OFFSET ?""",
+            params + [per_page - len(rows), max(0, offset - len(fresh_rows))]
+        )
+    total += len(fresh_rows)
 
     videos = []
     for r in rows:
@@ -483,4 +473,4 @@ async def search_local(
     total_pages = max(1, (total + per_page - 1) // per_page)
     return {"query": q, "videos": videos, "total": total,
             "page": page, "per_page": per_page,
-            "total_pages": total_pages, "engine": "like"}
+            "total_pages": total_pages, "engine": "fts5"}
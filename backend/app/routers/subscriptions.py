@@ -1,5 +1,5 @@
 """
-TubeVault – Subscriptions Router v1.6.0
+TubeVault – Subscriptions Router v1.6.2
 RSS-Abo-Verwaltung + Kanal-Details + Avatare + Shorts/Live/Debug
 © HalloWelt42 – Private Nutzung
 """
@@ -11,12 +11,12 @@ from typing import Optional
 import json
 from pathlib import Path
 import logging
-import httpx
 
 logger = logging.getLogger(__name__)
 
 from app.config import AVATARS_DIR, RSS_THUMBS_DIR
 from app.database import db
+from app.services.http_clients import http_clients
 from app.services.rss_service import rss_service
 from app.routers.jobs import activity_ws
 
@@ -758,6 +758,11 @@ async def get_channel_filesystem(channel_id: str):
     totals = {"video": 0, "thumb": 0, "subs": 0, "lyrics": 0, "chapters": 0,
               "meta_json": 0, "total_videos": len(dl_videos)}
 
+    # Videodateien: gemerkte Existenz (file_presence), nur veraltete werden
+    # neu geprüft – parallel im Thread-Pool statt stat() pro Video im Loop
+    from app.services.file_presence_service import file_presence_service
+    presence = await file_presence_service.presence([v["id"] for v in dl_videos[:100]])
+
     for v in dl_videos[:100]:  # Max 100 für Performance
         vid = v["id"]
         entry = {"id": vid, "title": v["title"], "type": v.get("video_type", "video"), "files": {}}
@@ -765,11 +770,17 @@ async def get_channel_filesystem(channel_id: str):
         try:
             # Video-Datei
             fp = v["file_path"]
-            if fp and fp.strip():
-                vpath = Path(fp)
+            known = presence.get(vid)
+            if fp and fp.strip() and known:
+                entry["files"]["video"] = {
+                    "docker": fp, "host": fp.replace(str(DATA_DIR), HOST_DATA),
+                    "exists": known["present"], "verified_at": known["last_verified"],
+                }
+                if known["present"]:
+                    entry["files"]["video"]["size"] = known["size"]
             else:
-                vpath = VIDEOS_DIR / f"{vid}.mp4"
-            entry["files"]["video"] = check(vpath)
+                entry["files"]["video"] = check(Path(fp) if fp and fp.strip()
+                                                else VIDEOS_DIR / f"{vid}.mp4")
             if entry["files"]["video"]["exists"]:
                 totals["video"] += 1
 
@@ -966,14 +977,13 @@ async def reset_all_errors():
     default_interval = 3600
     result = await db.execute(
         """UPDATE subscriptions SET error_count = 0, last_error = NULL,
-           enabled = 1, check_interval = ?
+           enabled = 1, check_interval = ?,
+           next_check_at = datetime(last_checked, '+' || ? || ' seconds')
            WHERE error_count > 0 OR enabled = 0""",
-        (default_interval,))
-    count = result.rowcount if hasattr(result, 'rowcount') else 0
-    # Fallback: manuell zählen
-    if count == 0:
-        count = await db.fetch_val(
-            "SELECT changes()") or 0
+        (default_interval, default_interval))
+    rss_service.invalidate_schedule()
+    # changes() ist pro Connection – über den Reader-Pool immer 0
+    count = max(result.rowcount, 0)
     return {"reset": count, "message": f"{count} Abos zurückgesetzt"}
 
 
@@ -987,8 +997,10 @@ async def reset_channel_error(channel_id: str):
         raise HTTPException(status_code=404, detail="Kanal nicht gefunden")
     await db.execute(
         """UPDATE subscriptions SET error_count = 0, last_error = NULL,
-           enabled = 1, check_interval = 3600 WHERE channel_id = ?""",
+           enabled = 1, check_interval = 3600,
+           next_check_at = datetime(last_checked, '+3600 seconds') WHERE channel_id = ?""",
         (channel_id,))
+    rss_service.invalidate_schedule()
     return {"status": "ok", "channel": sub["channel_name"],
             "was_disabled": not sub["enabled"], "was_errors": sub["error_count"]}
 
@@ -1042,9 +1054,12 @@ async def reset_all_intervals():
         or 1800
     )
     await db.execute(
-        "UPDATE subscriptions SET check_interval = ? WHERE enabled = 1",
-        (default_interval,)
+        """UPDATE subscriptions SET check_interval = ?,
+           next_check_at = datetime(last_checked, '+' || ? || ' seconds')
+           WHERE enabled = 1""",
+        (default_interval, default_interval)
     )
+    rss_service.invalidate_schedule()
     count = await db.fetch_val("SELECT COUNT(*) FROM subscriptions WHERE enabled = 1")
     return {"reset": count, "interval": default_interval}
 
@@ -1061,7 +1076,11 @@ async def halve_interval(sub_id: int):
         raise HTTPException(status_code=404, detail="Kanal nicht gefunden")
     current = sub["check_interval"] or default_interval
     new_interval = max(default_interval, current // 2)
-    await db.execute("UPDATE subscriptions SET check_interval = ? WHERE id = ?", (new_interval, sub_id))
+    await db.execute(
+        """UPDATE subscriptions SET check_interval = ?,
+           next_check_at = datetime(last_checked, '+' || ? || ' seconds') WHERE id = ?""",
+        (new_interval, new_interval, sub_id))
+    rss_service.invalidate_schedule()
     return {"id": sub_id, "old_interval": current, "new_interval": new_interval}
 
 
@@ -1075,7 +1094,11 @@ async def reset_interval(sub_id: int):
     sub = await db.fetch_one("SELECT check_interval FROM subscriptions WHERE id = ?", (sub_id,))
     if not sub:
         raise HTTPException(status_code=404, detail="Kanal nicht gefunden")
-    await db.execute("UPDATE subscriptions SET check_interval = ? WHERE id = ?", (default_interval, sub_id))
+    await db.execute(
+        """UPDATE subscriptions SET check_interval = ?,
+           next_check_at = datetime(last_checked, '+' || ? || ' seconds') WHERE id = ?""",
+        (default_interval, default_interval, sub_id))
+    rss_service.invalidate_schedule()
     return {"id": sub_id, "old_interval": sub["check_interval"], "new_interval": default_interval}
 
 
@@ -1156,16 +1179,15 @@ async def get_channel_banner(channel_id: str):
         "SELECT banner_url FROM subscriptions WHERE channel_id = ?", (channel_id,))
     if sub and sub["banner_url"] and not sub["banner_url"].startswith("/api/"):
         try:
-            async with httpx.AsyncClient(timeout=15) as client:
-                resp = await client.get(sub["banner_url"])
-                if resp.status_code == 200 and len(resp.content) > 1000:
-                    cached.write_bytes(resp.content)
-                    # URL auf lokal umstellen
-                    await db.execute(
-                        "UPDATE subscriptions SET banner_url = ? WHERE channel_id = ?",
-                        (f"/api/subscriptions/banner/{channel_id}", channel_id))
-                    return FileResponse(str(cached), media_type="image/jpeg",
-                                        headers={"Cache-Control": "public, max-age=604800"})
+            resp = await http_clients.get(sub["banner_url"], category="thumbnail")
+            if resp.status_code == 200 and len(resp.content) > 1000:
+                cached.write_bytes(resp.content)
+                # URL auf lokal umstellen
+                await db.execute(
+                    "UPDATE subscriptions SET banner_url = ? WHERE channel_id = ?",
+                    (f"/api/subscriptions/banner/{channel_id}", channel_id))
+                return FileResponse(str(cached), media_type="image/jpeg",
+                                    headers={"Cache-Control": "public, max-age=604800"})
         except Exception:
             pass
 
@@ -1176,19 +1198,7 @@ async def get_channel_banner(channel_id: str):
 async def cache_all_rss_thumbnails(background_tasks: BackgroundTasks):
     """Alle fehlenden RSS-Thumbnails im Hintergrund cachen."""
     async def _cache_missing():
-        rows = await db.fetch_all(
-            "SELECT video_id, thumbnail_url FROM rss_entries WHERE thumbnail_url IS NOT NULL")
-        cached = 0
-        for row in rows:
-            dest = RSS_THUMBS_DIR / f"{row['video_id']}.jpg"
-            if dest.exists() and dest.stat().st_size > 500:
-                continue
-            try:
-                await rss_service._cache_rss_thumbnail(row["video_id"], row["thumbnail_url"])
-                cached += 1
-            except Exception:
-                pass
-        logger.info(f"RSS-Thumb-Cache: {cached} neue Thumbnails gecacht")
+        await rss_service.backfill_missing_thumbnails(delay=0, manual=True)
 
     background_tasks.add_task(_cache_missing)
     return {"status": "started", "message": "Caching läuft im Hintergrund"}
@@ -1197,35 +1207,8 @@ async def cache_all_rss_thumbnails(background_tasks: BackgroundTasks):
 @router.post("/cache-banners")
 async def cache_all_banners(background_tasks: BackgroundTasks):
     """Alle externen Kanal-Banner lokal cachen und DB-URLs umstellen."""
-    from app.config import BANNERS_DIR
-
     async def _cache_banners():
-        BANNERS_DIR.mkdir(parents=True, exist_ok=True)
-        rows = await db.fetch_all(
-            "SELECT channel_id, banner_url FROM subscriptions WHERE banner_url IS NOT NULL AND banner_url NOT LIKE '/api/%'")
-        cached = 0
-        for row in rows:
-            dest = BANNERS_DIR / f"{row['channel_id']}.jpg"
-            if dest.exists() and dest.stat().st_size > 1000:
-                await db.execute(
-                    "UPDATE subscriptions SET banner_url = ? WHERE channel_id = ?",
-                    (f"/api/subscriptions/banner/{row['channel_id']}", row["channel_id"]))
-                cached += 1
-                continue
-            try:
-                async with httpx.AsyncClient(timeout=15) as client:
-                    resp = await client.get(row["banner_url"])
-                    if resp.status_code == 200 and len(resp.content) > 1000:
-                        dest.write_bytes(resp.content)
-                        await db.execute(
-                            "UPDATE subscriptions SET banner_url = ? WHERE channel_id = ?",
-                            (f"/api/subscriptions/banner/{row['channel_id']}", row["channel_id"]))
-                        cached += 1
-            except Exception as e:
-                logger.debug(f"Banner-Cache {row['channel_id']}: {e}")
-            import asyncio
-            await asyncio.sleep(0.5)
-        logger.info(f"Banner-Cache: {cached} Banner lokal gecacht")
+        await rss_service.backfill_banners(delay=0, manual=True)
 
     background_tasks.add_task(_cache_banners)
     return {"status": "started", "message": "Banner-Caching läuft im Hintergrund"}
@@ -1,5 +1,5 @@
 """
-TubeVault – System Router v1.5.54
+TubeVault – System Router v1.5.55
 System-Status, Rate-Limiter Stats, Health, Live-Logs
 © HalloWelt42 – Private Nutzung
 """
@@ -16,6 +16,7 @@ from app.config import VERSION, APP_NAME, DATA_DIR, DB_PATH, DB_DIR, VIDEOS_DIR,
 from app.database import db
 from app.utils.file_utils import get_disk_usage, get_directory_size, human_size
 from app.services.metadata_service import metadata_service
+from app.services.file_presence_service import file_presence_service
 from app.services.rate_limiter import rate_limiter
 from app.services.job_service import job_service
 
@@ -339,27 +340,15 @@ async def get_badges():
     Alle Definitionen zentral aus counts_service (eine Quelle der Wahrheit).
     Jedes Badge zählt exakt das, was seine Zielseite anzeigt."""
     from app.services.counts_service import counts_service as cs
-    active_dl = await db.fetch_val(
-        "SELECT COUNT(*) FROM jobs WHERE type='download' AND status IN ('queued','active')") or 0
-    # Batch-Queue: Sicher abfragen (Tabelle existiert evtl. noch nicht)
-    try:
-        batch_waiting = await db.fetch_val(
-            "SELECT COUNT(*) FROM batch_queue WHERE status IN ('waiting','downloading')") or 0
-    except Exception:
-        batch_waiting = 0
-    return {
-        "videos": await cs.library_videos(),
-        "subscriptions": await cs.subscriptions_enabled(),
-        "new_feed": await cs.feed_new(),
-        "active_downloads": active_dl,
-        "favorites": await cs.favorites(),
-        "playlists": await cs.playlists_global(),
-        "categories": await cs.categories(),
-        "history": await cs.history_played(),
-        "archives": await cs.archived_videos(),
-        "own_videos": await cs.own_videos(),   # jetzt = OwnVideos-Seite (file_size>0)
-        "batch_queue": batch_waiting,
-    }
+    return await cs.badges()
+
+
+@router.get("/counts")
+async def get_counts():
+    """Alle Zähler in einer Antwort: Badges, Job-/Queue-Zähler, Bibliotheks-
+    Summen. Aus dem counts_service-Cache – billig genug für Polling."""
+    from app.services.counts_service import counts_service as cs
+    return await cs.snapshot()
 
 
 @router.get("/version")
@@ -425,9 +414,9 @@ async def get_system_stats():
     disk_meta = mounts["meta"]
     db_size = DB_PATH.stat().st_size if DB_PATH.exists() else 0
 
-    active_dl = await db.fetch_val("SELECT COUNT(*) FROM jobs WHERE type='download' AND status = 'active'") or 0
-    pending_dl = await db.fetch_val("SELECT COUNT(*) FROM jobs WHERE type='download' AND status = 'queued'") or 0
-    active_jobs = await db.fetch_val("SELECT COUNT(*) FROM jobs WHERE status = 'active'") or 0
+    queue = await cs.queue_counts()
+    active_dl, pending_dl = queue["active"], queue["queued"]
+    active_jobs = (await cs.job_counts())["active"]
     total_subs = await cs.subscriptions_total()
     error_subs = await cs.subscriptions_error()
 
@@ -456,11 +445,13 @@ async def get_system_stats():
 async def get_full_status():
     """Gesamtstatus aller Services – für Frontend-Header/Footer.
 
-    Zeigt: Rate-Limiter, RSS-Worker, Download-Queue, Service-Health, Jobs.
+    Zeigt: Rate-Limiter, RSS-Worker, Download-Queue, Service-Health, Jobs,
+    yt-dlp-Extract-Cache (Hits/Misses).
     Frontend pollt z.B. alle 10s für Live-Status-Anzeige mit LEDs.
     """
     from app.services.rss_service import rss_service
     from app.services.download_service import download_service
+    from app.utils.info_cache import info_cache
 
     # Rate Limiter
     rl_stats = rate_limiter.get_stats()
@@ -523,6 +514,7 @@ async def get_full_status():
             "queued": queued_jobs,
         },
         "cooldown": cooldown_state,
+        "ytdlp_cache": info_cache.stats(),
     }
 
 
@@ -596,6 +588,8 @@ async def get_storage_details():
             },
         },
     }
+    # Videodateien laut letzter Existenzprüfung (kein stat() pro Datei)
+    result["video_files"] = await file_presence_service.summary()
     if is_split:
         result["disk_media"] = {**disk_media, "label": "Medien (USB)"}
         result["disk_meta"] = {**disk_meta, "label": "System (NVMe)"}
@@ -622,30 +616,15 @@ async def cleanup_temp():
 
 @router.post("/cleanup-ghosts")
 async def cleanup_ghost_entries():
-    """Ghost-Einträge finden und bereinigen: Videos mit status='ready' aber ohne Datei."""
-    from pathlib import Path
-
-    rows = await db.fetch_all(
-        "SELECT id, title, file_path, status FROM videos WHERE status = 'ready'"
-    )
-    ghosts = []
-    for row in rows:
-        fp = row["file_path"]
-        if not fp or not Path(fp).exists():
-            ghosts.append({"id": row["id"], "title": row["title"], "file_path": fp})
-
-    if not ghosts:
-        return {"ghosts_found": 0, "cleaned": 0, "entries": []}
-
+    """Ghost-Einträge finden und bereinigen: Videos mit status='ready' aber ohne Datei.
+    Manueller Aufruf → alle Dateien neu prüfen (max_age=0)."""
     # Ghost-Einträge auf status='ghost' setzen (nicht löschen, recoverable)
-    for g in ghosts:
-        await db.execute(
-            "UPDATE videos SET status = 'ghost' WHERE id = ?", (g["id"],))
-
+    report = await file_presence_service.verify(max_age=0)
     return {
-        "ghosts_found": len(ghosts),
-        "cleaned": len(ghosts),
-        "entries": ghosts,
+        "ghosts_found": len(report.missing),
+        "cleaned": len(report.missing),
+        "entries": report.missing,
+        "verify": report.as_dict(),
     }
 
 
@@ -669,11 +648,10 @@ async def full_cleanup():
 
     # 1. Ghost-Videos (status='ready' ohne Datei)
     try:
-        ready = await db.fetch_all("SELECT id, title, file_path FROM videos WHERE status = 'ready'")
-        ghosts = [r for r in ready if not r["file_path"] or not Path(r["file_path"]).exists()]
-        for g in ghosts:
-            await db.execute("UPDATE videos SET status = 'ghost' WHERE id = ?", (g["id"],))
-        log("ghost_videos", f"{len(ghosts)} Videos ohne Datei → status='ghost'", len(ghosts))
+        report = await file_presence_service.verify()
+        ghosts = report.missing
+        log("ghost_videos", f"{len(ghosts)} Videos ohne Datei → status='ghost' "
+            f"({report.checked} geprüft, {report.skipped} kürzlich geprüft)", len(ghosts))
     except Exception as e:
         log_error("ghost_videos", e)
 
@@ -1,5 +1,6 @@
 """
-TubeVault – Videos Router v1.3.0
+TubeVault – Videos Router v1.3.2
+v1.3.2: Notizsuche findet auch Videos außerhalb des FTS-Index (LIKE)
 © HalloWelt42 – Private Nutzung
 """
 
@@ -13,6 +14,7 @@ from app.services.download_service import download_service
 from app.services.metadata_service import metadata_service
 from app.database import db
 from app.utils.file_utils import now_sqlite
+from app.utils.fts_query import FTS_ROWIDS, build_match_query, like_condition
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/videos", tags=["Videos"])
@@ -36,17 +38,24 @@ async def list_videos(
     video_types: Optional[str] = None,
     is_archived: Optional[bool] = None,
     is_music: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    with_total: bool = True,
 ):
-    """Alle Videos abrufen (paginiert, filterbar, sortierbar). Mehrfachfilter via Komma-getrennte IDs."""
-    result = await metadata_service.get_videos(
-        page=page, per_page=per_page, status=status,
-        sort_by=sort_by, sort_order=sort_order,
-        search=search, category_id=category_id,
-        category_ids=category_ids,
-        channel_id=channel_id, channel_ids=channel_ids,
-        tag=tag, tags=tags, video_type=video_type, video_types=video_types,
-        is_archived=is_archived, is_music=is_music,
-    )
+    """Alle Videos abrufen (paginiert, filterbar, sortierbar). Mehrfachfilter via Komma-getrennte IDs.
+    Keyset-Modus: cursor="" für die erste Seite, danach next_cursor aus der Antwort."""
+    try:
+        result = await metadata_service.get_videos(
+            page=page, per_page=per_page, status=status,
+            sort_by=sort_by, sort_order=sort_order,
+            search=search, category_id=category_id,
+            category_ids=category_ids,
+            channel_id=channel_id, channel_ids=channel_ids,
+            tag=tag, tags=tags, video_type=video_type, video_types=video_types,
+            is_archived=is_archived, is_music=is_music,
+            cursor=cursor, with_total=with_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return result
 
 
@@ -141,12 +150,19 @@ async def get_video_streams(video_id: str):
 
 @router.get("/search/notes")
 async def search_notes(q: str = Query(..., min_length=1)):
-    """Globale Suche in Video-Notizen."""
+    """Globale Suche in Video-Notizen (FTS5, nur Spalte notes). Videos außerhalb
+    des Index (status != 'ready': Archiv, Ghost, Pending …) per LIKE."""
+    match = build_match_query(q, ["notes"])
+    if not match:
+        return {"results": [], "query": q}
+    like, like_params = like_condition(q, ["notes"])
     rows = await db.fetch_all(
-        """SELECT id, title, channel_name, notes, thumbnail_path
-           FROM videos WHERE notes IS NOT NULL AND notes != ''
-           AND notes LIKE ? ORDER BY updated_at DESC LIMIT 50""",
-        (f"%{q}%",))
+        f"""SELECT v.id, v.title, v.channel_name, v.notes, v.thumbnail_path
+           FROM videos v
+           WHERE (v.rowid IN ({FTS_ROWIDS}) OR (v.status != 'ready' AND {like}))
+           AND v.notes IS NOT NULL AND v.notes != ''
+           ORDER BY v.updated_at DESC LIMIT 50""",
+        (match, *like_params))
     return {"results": [dict(r) for r in rows], "query": q}
 
 
@@ -234,7 +250,7 @@ async def get_video_preview(video_id: str):
     # Liefert: title, description, duration, view_count, channel, thumbnail etc.
     try:
         from app.utils.ytdlp_adapter import _ydl_extract
-        info = _ydl_extract(f"https://www.youtube.com/watch?v={video_id}")
+        info = _ydl_extract(f"https://www.youtube.com/watch?v={video_id}", need_streams=False)
         return {
             "id": video_id,
             "title": info.get("title") or video_id,
@@ -377,6 +393,7 @@ async def archive_video(video_id: str):
         "UPDATE videos SET is_archived = 1, updated_at = datetime('now') WHERE id = ?",
         (video_id,)
     )
+    metadata_service.invalidate_counts()
     from app.services import meta_sidecar
     await meta_sidecar.write_sidecar(video_id)
     return {"video_id": video_id, "is_archived": True}
@@ -392,6 +409,7 @@ async def unarchive_video(video_id: str):
         "UPDATE videos SET is_archived = 0, updated_at = datetime('now') WHERE id = ?",
         (video_id,)
     )
+    metadata_service.invalidate_counts()
     from app.services import meta_sidecar
     await meta_sidecar.write_sidecar(video_id)
     return {"video_id": video_id, "is_archived": False}
@@ -410,6 +428,7 @@ async def archive_batch(video_ids: list[str], unarchive: bool = False):
         )
         count += cursor.rowcount
         await meta_sidecar.write_sidecar(vid)
+    metadata_service.invalidate_counts()
     return {"updated": count, "is_archived": not unarchive}
 
 
@@ -628,6 +647,7 @@ async def auto_link_description(video_id: str):
 async def upgrade_video(video_id: str, quality: str = "best"):
     """Video in besserer Qualität neu herunterladen. DB-Daten bleiben erhalten."""
     from pathlib import Path
+    from app.services.archive_service import archive_service
     from app.services.download_service import download_service
 
     video = await db.fetch_one(
@@ -646,6 +666,7 @@ async def upgrade_video(video_id: str, quality: str = "best"):
         if p.exists():
             p.unlink()
             logger.info(f"[UPGRADE] Alte Datei gelöscht: {p}")
+    archive_service.invalidate_path(video_id)
 
     # Status auf 'upgrading' setzen
     await db.execute(
@@ -1,6 +1,15 @@
 """
-TubeVault – Archive Service v1.1.0
+TubeVault – Archive Service v1.3.2
 Externes Archiv-Management mit Mount-Erkennung und Background-Scan
+v1.2.0: LRU-Cache aufgelöster Pfade (resolve_video_path) – Seeks im Player
+        kosten keine DB-Joins und keine stat()-Calls auf USB-Platten mehr
+v1.3.0: Inkrementeller Scan – Index archive_files (Pfad, Größe, mtime, Inode,
+        Video-ID) pro Archiv; Rescans prüfen nur geänderte Dateien. Verzeichnisse
+        werden parallel gelesen, FFprobe läuft in begrenzter Anzahl Prozesse
+v1.3.1: Fehler pro Datei (FFprobe, DB-Write) werden geloggt und übersprungen
+        statt den ganzen Scan abzubrechen; übersprungene Dateien bleiben aus
+        dem Index und werden beim nächsten Scan erneut geprüft
+v1.3.2: unveränderte Dateien ohne Archiv-Link bekommen Link/Video neu
 © HalloWelt42 – Private Nutzung
 
 Konzept:
@@ -18,9 +27,12 @@ storage_type Werte:
 """
 
 import asyncio
+import fnmatch
 import logging
 import os
 import re
+import time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -42,6 +54,49 @@ YT_ID_PATTERNS = [
 
 DEFAULT_PATTERNS = ["*.mp4", "*.mkv", "*.webm", "*.avi", "*.mov"]
 
+# Aufgelöste Pfade im Speicher (nur verfügbare). Invalidierung über
+# invalidate_path(): Mount-Wechsel, Download/Import/Löschen, Datei fehlt beim Öffnen.
+PATH_CACHE_SIZE = 1024
+
+# Archiv-Scan: parallel gelesene Verzeichnisse, gleichzeitige FFprobe-Prozesse
+SCAN_WALK_WORKERS = 8
+FFPROBE_CONCURRENCY = 4
+# Dateien pro IN (...)-Abfrage beim Abgleich mit videos
+_ID_CHUNK = 500
+
+_SQL_FILE = """INSERT OR REPLACE INTO archive_files
+               (archive_id, path, size, mtime_ns, inode, video_id, scanned_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)"""
+_SQL_VIDEO = """INSERT OR IGNORE INTO videos
+                (id, title, status, storage_type, archive_id, file_path, file_size,
+                 created_at, updated_at)
+                VALUES (?, ?, 'archived', 'archive', ?, ?, ?, datetime('now'), datetime('now'))"""
+_SQL_LINK = """INSERT OR IGNORE INTO video_archives
+               (video_id, archive_id, file_path, file_size)
+               VALUES (?, ?, ?, ?)"""
+_SQL_MOVE = """UPDATE video_archives SET file_path = ?, file_size = ?
+               WHERE video_id = ? AND archive_id = ?"""
+
+
+def _scan_dir(path: str, patterns: list[str]) -> tuple[list[str], list[tuple]]:
+    """Ein Verzeichnis lesen (läuft im Thread): Unterordner + passende Dateien
+    als (Pfad, Größe, mtime_ns, Inode). Symlink-Ordner werden nicht verfolgt."""
+    dirs, files = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.path)
+                    elif any(fnmatch.fnmatch(entry.name, p) for p in patterns):
+                        st = entry.stat()
+                        files.append((entry.path, st.st_size, st.st_mtime_ns, st.st_ino))
+                except OSError:
+                    continue
+    except OSError as e:
+        logger.debug(f"Scan: {path} nicht lesbar: {e}")
+    return dirs, files
+
 
 class ArchiveService:
     """Verwaltet externe Video-Archive."""
@@ -50,6 +105,7 @@ class ArchiveService:
         self._mount_watcher_task: Optional[asyncio.Task] = None
         self._scanner_task: Optional[asyncio.Task] = None
         self._mount_status: dict[int, bool] = {}  # archive_id → is_mounted
+        self._path_cache: OrderedDict[str, dict] = OrderedDict()  # video_id → resolved
 
     # === Lifecycle ===
 
@@ -110,8 +166,10 @@ class ArchiveService:
             (archive_id,)
         )
         await db.execute("DELETE FROM video_archives WHERE archive_id = ?", (archive_id,))
+        await db.execute("DELETE FROM archive_files WHERE archive_id = ?", (archive_id,))
         await db.execute("DELETE FROM archives WHERE id = ?", (archive_id,))
         self._mount_status.pop(archive_id, None)
+        self.invalidate_path()
 
     async def get_archives(self) -> list[dict]:
         """Alle Archive mit aktuellem Mount-Status."""
@@ -163,6 +221,8 @@ class ArchiveService:
                 else:
                     logger.warning(f"Archiv #{aid} ist jetzt OFFLINE: {a['mount_path']}")
 
+        if changed:
+            self.invalidate_path()
         return changed
 
     def is_archive_mounted(self, archive_id: int) -> bool:
@@ -170,9 +230,18 @@ class ArchiveService:
 
     # === Video-Datei Zugriff ===
 
+    def invalidate_path(self, video_id: Optional[str] = None):
+        """Pfad-Cache leeren – für ein Video oder komplett (Mount-Wechsel)."""
+        if video_id is None:
+            self._path_cache.clear()
+        else:
+            self._path_cache.pop(video_id, None)
+
     async def resolve_video_path(self, video_id: str) -> dict:
         """Prüft wo ein Video liegt und ob es erreichbar ist.
 
+        Verfügbare Ergebnisse kommen aus dem LRU-Cache (keine DB, kein stat()).
+
         Returns:
             {
                 "available": bool,
@@ -182,6 +251,20 @@ class ArchiveService:
                 "archive_mounted": bool,
             }
         """
+        cached = self._path_cache.get(video_id)
+        if cached is not None:
+            self._path_cache.move_to_end(video_id)
+            return dict(cached)
+
+        resolved = await self._resolve_video_path(video_id)
+        if resolved["available"]:
+            self._path_cache[video_id] = resolved
+            if len(self._path_cache) > PATH_CACHE_SIZE:
+                self._path_cache.popitem(last=False)
+            return dict(resolved)
+        return resolved
+
+    async def _resolve_video_path(self, video_id: str) -> dict:
         video = await db.fetch_one(
             "SELECT file_path, storage_type, archive_id FROM videos WHERE id = ?",
             (video_id,)
@@ -239,7 +322,12 @@ class ArchiveService:
     # === Background-Scanner ===
 
     async def scan_archive(self, archive_id: int) -> dict:
-        """Archiv nach YouTube-Videos durchsuchen."""
+        """Archiv nach YouTube-Videos durchsuchen (inkrementell über archive_files).
+
+        Unveränderte Dateien (gleiche Größe, mtime, Inode) übernehmen die
+        gespeicherte Video-ID – kein FFprobe; geschrieben wird für sie nur,
+        wenn Archiv-Link oder Video fehlen (z.B. gelöscht). Umbenannte Dateien
+        werden über die Inode erkannt."""
         archive = await self.get_archive(archive_id)
         if not archive:
             raise ValueError(f"Archiv #{archive_id} nicht gefunden")
@@ -252,99 +340,200 @@ class ArchiveService:
             description=f"Durchsuche {archive['mount_path']}",
         )
         await job_service.start(job["id"])
+        t0 = time.monotonic()
 
         mount = Path(archive["mount_path"])
-        patterns = (archive.get("scan_pattern") or "*.mp4,*.mkv,*.webm").split(",")
+        patterns = [p.strip() for p in
+                    (archive.get("scan_pattern") or "*.mp4,*.mkv,*.webm").split(",") if p.strip()]
+
+        # Dateien sammeln (parallel) und mit dem Index abgleichen
+        files = await self._walk(mount, patterns)
+        index = {r["path"]: dict(r) for r in await db.fetch_all(
+            "SELECT path, size, mtime_ns, inode, video_id FROM archive_files WHERE archive_id = ?",
+            (archive_id,))}
+        walked = {f[0] for f in files}
+        removed = [p for p in index if p not in walked]
+        # Verschwundene Einträge nach Inode → Umbenennung ohne neuen FFprobe
+        by_inode = {(index[p]["inode"], index[p]["size"], index[p]["mtime_ns"]): index[p]
+                    for p in removed}
 
-        # Dateien sammeln
-        files = []
-        for pattern in patterns:
-            pattern = pattern.strip()
-            files.extend(mount.rglob(pattern))
-
-        found = 0
-        new_videos = 0
-        linked = 0
-        ffprobe_found = 0
         total = len(files)
-
-        logger.info(f"Archiv-Scan: {total} Dateien in '{archive['name']}'")
-
-        for i, fpath in enumerate(files):
-            try:
-                # Step 1: ID aus Dateiname
-                video_id = self._extract_video_id(fpath)
-
-                # Step 2: Fallback FFprobe Metadaten
-                if not video_id:
-                    video_id = await self._extract_video_id_ffprobe(fpath)
-                    if video_id:
-                        ffprobe_found += 1
-
-                if not video_id:
-                    continue
-
-                found += 1
-                file_size = fpath.stat().st_size
-
-                # Bereits in video_archives?
-                existing_link = await db.fetch_one(
-                    "SELECT id FROM video_archives WHERE video_id = ? AND archive_id = ?",
-                    (video_id, archive_id)
-                )
-                if existing_link:
+        ids: dict[str, Optional[str]] = {}
+        changed = []
+        for path, size, mtime_ns, inode in files:
+            old = index.get(path)
+            if old and (old["size"], old["mtime_ns"], old["inode"]) == (size, mtime_ns, inode):
+                ids[path] = old["video_id"]
+            else:
+                changed.append((path, size, mtime_ns, inode))
+
+        logger.info(f"Archiv-Scan: {total} Dateien in '{archive['name']}', "
+                    f"{len(changed)} neu/geändert, {len(removed)} entfernt")
+        await job_service.progress(
+            job["id"], 0.1, f"{total} Dateien, {len(changed)} neu/geändert – werte aus…")
+
+        # Video-IDs der geänderten Dateien: Dateiname → Inode-Treffer → FFprobe
+        to_probe = []
+        for path, size, mtime_ns, inode in changed:
+            video_id = self._extract_video_id(Path(path))
+            if not video_id:
+                moved = by_inode.get((inode, size, mtime_ns))
+                if moved is not None:
+                    video_id = moved["video_id"]
+                else:
+                    to_probe.append(path)
                     continue
+            ids[path] = video_id
 
-                # Video in DB?
-                video = await db.fetch_one("SELECT id FROM videos WHERE id = ?", (video_id,))
-
-                if not video:
-                    # Neues Video nur aus Dateiname → Minimal-Eintrag
-                    title = fpath.stem
-                    # Video-ID aus Titel entfernen
-                    for p in YT_ID_PATTERNS:
-                        title = p.sub("", title).strip(" -_")
+        ffprobe_found = 0
+        probed = 0
+        probe_slots = asyncio.Semaphore(FFPROBE_CONCURRENCY)
 
-                    await db.execute(
-                        """INSERT OR IGNORE INTO videos
-                           (id, title, status, storage_type, archive_id, file_path, file_size,
-                            created_at, updated_at)
-                           VALUES (?, ?, 'archived', 'archive', ?, ?, ?, datetime('now'), datetime('now'))""",
-                        (video_id, title or video_id, archive_id, str(fpath), file_size)
-                    )
-                    new_videos += 1
-
-                # Link erstellen
-                await db.execute(
-                    """INSERT OR IGNORE INTO video_archives
-                       (video_id, archive_id, file_path, file_size)
-                       VALUES (?, ?, ?, ?)""",
-                    (video_id, archive_id, str(fpath), file_size)
-                )
-                linked += 1
+        # Pfade mit Fehler: nicht in den Index → nächster Scan versucht es erneut
+        skipped: set[str] = set()
 
+        async def _probe(path: str):
+            nonlocal ffprobe_found, probed
+            try:
+                async with probe_slots:
+                    video_id = await self._extract_video_id_ffprobe(Path(path))
             except Exception as e:
-                logger.debug(f"Scan skip {fpath.name}: {e}")
-
-            if i % 100 == 0 and total > 0:
+                logger.warning(f"Archiv-Scan: {Path(path).name} übersprungen (FFprobe): {e}")
+                skipped.add(path)
+                video_id = None
+            ids[path] = video_id
+            probed += 1
+            if video_id:
+                ffprobe_found += 1
+            if probed % 50 == 0:
                 await job_service.progress(
-                    job["id"], (i + 1) / total,
-                    f"{found} erkannt ({ffprobe_found} via FFprobe), {new_videos} neu, {linked} verlinkt"
-                )
-
-        # Statistik updaten
-        total_size = sum(f.stat().st_size for f in files if f.exists())
+                    job["id"], 0.1 + 0.8 * probed / len(to_probe),
+                    f"FFprobe {probed}/{len(to_probe)} ({ffprobe_found} erkannt)")
+
+        await asyncio.gather(*(_probe(p) for p in to_probe))
+
+        # Verknüpfungen für geänderte Dateien anlegen/aktualisieren, für
+        # unveränderte nur, wenn Link (oder Video) inzwischen gelöscht wurde
+        linked_rows = await db.fetch_all(
+            "SELECT video_id, file_path FROM video_archives WHERE archive_id = ?", (archive_id,))
+        linked_paths = {r["video_id"]: r["file_path"] for r in linked_rows}
+        sizes = {f[0]: f[1] for f in files}
+        changed_paths = {f[0] for f in changed}
+        candidates = {ids[p]: p for p in walked
+                      if p not in changed_paths and ids.get(p) and ids[p] not in linked_paths}
+        candidates.update((ids[p], p) for p, *_ in changed if ids.get(p))
+        missing = [vid for vid in candidates if vid not in linked_paths]
+        known: set[str] = set()
+        for i in range(0, len(missing), _ID_CHUNK):
+            chunk = missing[i:i + _ID_CHUNK]
+            rows = await db.fetch_all(
+                f"SELECT id FROM videos WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            known.update(r["id"] for r in rows)
+
+        # Writes je Datei: (Pfad, SQL, Parameter)
+        now = now_sqlite()
+        writes: list[tuple[str, str, tuple]] = [
+            (path, _SQL_FILE, (archive_id, path, size, mtime_ns, inode, ids.get(path), now))
+            for path, size, mtime_ns, inode in changed if path not in skipped]
+        for video_id, path in candidates.items():
+            if path in skipped:
+                continue
+            size = sizes[path]
+            if video_id in linked_paths:
+                if linked_paths[video_id] != path and linked_paths[video_id] not in walked:
+                    writes.append((path, _SQL_MOVE, (path, size, video_id, archive_id)))
+                continue
+            if video_id not in known:
+                # Neues Video nur aus Dateiname → Minimal-Eintrag
+                title = Path(path).stem
+                # Video-ID aus Titel entfernen
+                for p in YT_ID_PATTERNS:
+                    title = p.sub("", title).strip(" -_")
+                writes.append((path, _SQL_VIDEO, (video_id, title or video_id, archive_id, path, size)))
+            writes.append((path, _SQL_LINK, (video_id, archive_id, path, size)))
+
+        await self._write_scan(archive_id, removed, writes, skipped)
+
+        new_videos = [w for w in writes if w[1] == _SQL_VIDEO and w[0] not in skipped]
+        new_links = [w for w in writes if w[1] == _SQL_LINK and w[0] not in skipped]
+        moved_links = [w for w in writes if w[1] == _SQL_MOVE and w[0] not in skipped]
+
+        # Statistik updaten (Größen aus dem Walk, kein zweites stat())
+        found = sum(1 for p in walked if ids.get(p) and p not in skipped)
+        total_size = sum(f[1] for f in files)
         await db.execute(
             "UPDATE archives SET last_scan = ?, total_videos = ?, total_size = ? WHERE id = ?",
-            (now_sqlite(), found, total_size, archive_id)
+            (now, found, total_size, archive_id)
         )
+        if moved_links:
+            self.invalidate_path()
 
+        seconds = round(time.monotonic() - t0, 1)
         result_msg = (f"{found} Videos erkannt ({ffprobe_found} via FFprobe), "
-                      f"{new_videos} neu hinzugefügt, {linked} verlinkt")
+                      f"{len(new_videos)} neu hinzugefügt, {len(new_links)} verlinkt · "
+                      f"{len(changed)} geänderte Dateien in {seconds}s")
+        if skipped:
+            result_msg += f" · {len(skipped)} übersprungen (Fehler)"
         await job_service.complete(job["id"], result_msg)
         logger.info(f"Archiv-Scan abgeschlossen: {result_msg}")
 
-        return {"found": found, "new_videos": new_videos, "linked": linked, "total_files": total}
+        return {"found": found, "new_videos": len(new_videos), "linked": len(new_links),
+                "total_files": total, "changed": len(changed), "removed": len(removed),
+                "probed": len(to_probe), "skipped": len(skipped), "seconds": seconds}
+
+    async def _write_scan(self, archive_id: int, removed: list[str],
+                          writes: list[tuple[str, str, tuple]], skipped: set[str]):
+        """Scan-Ergebnis schreiben: erst alles in EINER Transaktion; schlägt die
+        fehl, je Datei eine eigene Transaktion – eine kaputte Zeile kostet dann
+        nur diese Datei (landet in skipped), nicht den ganzen Scan."""
+        try:
+            async with db.transaction():
+                if removed:
+                    await db.execute_many(
+                        "DELETE FROM archive_files WHERE archive_id = ? AND path = ?",
+                        [(archive_id, p) for p in removed])
+                # Reihenfolge der Statement-Arten beibehalten (Datei → Video → Link)
+                for sql in (_SQL_FILE, _SQL_VIDEO, _SQL_LINK, _SQL_MOVE):
+                    params = [w[2] for w in writes if w[1] == sql]
+                    if params:
+                        await db.execute_many(sql, params)
+            return
+        except Exception as e:
+            logger.warning(f"Archiv-Scan #{archive_id}: Sammel-Write fehlgeschlagen ({e}) "
+                           f"– schreibe dateiweise")
+
+        if removed:
+            await db.execute_many(
+                "DELETE FROM archive_files WHERE archive_id = ? AND path = ?",
+                [(archive_id, p) for p in removed])
+        per_file: dict[str, list[tuple[str, tuple]]] = {}
+        for path, sql, params in writes:
+            per_file.setdefault(path, []).append((sql, params))
+        for path, statements in per_file.items():
+            try:
+                async with db.transaction():
+                    for sql, params in statements:
+                        await db.execute(sql, params)
+            except Exception as e:
+                logger.warning(f"Archiv-Scan: {Path(path).name} übersprungen (DB): {e}")
+                skipped.add(path)
+
+    async def _walk(self, mount: Path, patterns: list[str]) -> list[tuple]:
+        """Verzeichnisbaum parallel lesen (SCAN_WALK_WORKERS Threads).
+        Rückgabe: [(Pfad, Größe, mtime_ns, Inode), …]"""
+        loop = asyncio.get_running_loop()
+        pending = [str(mount)]
+        running: set[asyncio.Future] = set()
+        files: list[tuple] = []
+        while pending or running:
+            while pending and len(running) < SCAN_WALK_WORKERS:
+                running.add(loop.run_in_executor(None, _scan_dir, pending.pop(), patterns))
+            done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for fut in done:
+                dirs, found = fut.result()
+                pending.extend(dirs)
+                files.extend(found)
+        return files
 
     def _extract_video_id(self, filepath: Path) -> Optional[str]:
         """YouTube Video-ID aus Dateinamen extrahieren.
@@ -395,6 +584,10 @@ class ArchiveService:
                     return url_match.group(1)
 
             return None
+        except OSError:
+            # ffprobe fehlt / Datei nicht lesbar → Caller überspringt die Datei,
+            # statt sie dauerhaft als "ohne ID" zu indizieren
+            raise
         except Exception:
             return None
 
@@ -1,5 +1,5 @@
 """
-TubeVault – Audio-Fix Service v1.0.0
+TubeVault – Audio-Fix Service v1.0.1
 
 Nachträgliche Korrektur der Tonspur bei Videos, die mit der falschen
 Audiospur heruntergeladen wurden (z.B. englische KI-Dub statt deutschem
@@ -84,7 +84,8 @@ async def probe_tracks(video_id: str) -> dict:
     from app.utils.ytdlp_adapter import _ydl_extract
 
     url = f"https://www.youtube.com/watch?v={video_id}"
-    info = await asyncio.to_thread(_ydl_extract, url)
+    # nur Formatliste/Sprachen, keine Stream-URLs → auch älterer Cache-Eintrag reicht
+    info = await asyncio.to_thread(_ydl_extract, url, need_streams=False)
     orig_lang = info.get("language")
     fmts = info.get("formats") or []
     seen = {}
@@ -0,0 +1,259 @@
+"""
+TubeVault – Backfill Service v1.0.1
+v1.0.1: reopen() für manuelle Läufe – Fehlgeschlagene/Ausgereizte wieder offen,
+        erledigte Items mit fehlender Datei neu
+Generische Backfill-Engine: viele kleine Fetches (RSS-Thumbnails, Banner …)
+mit begrenzter Parallelität, Fortschritt in der DB und Job-Anzeige.
+
+- N Worker (Setting backfill.workers) ziehen aus einer Queue; die Anzahl
+  gleichzeitiger Requests pro Host begrenzt zusätzlich http_clients
+- rate-limit-aware: Fehler gehen an rate_limiter.error() (429/403 → Backoff);
+  solange ein Backoff aktiv ist, läuft jeder Fetch durch rate_limiter.acquire();
+  bei Bot-Erkennung bricht der Lauf ab und setzt beim nächsten Start fort
+- Status pro Item in backfill_state (kind, item_key): erledigte Items fallen
+  schon in der SQL-Abfrage raus – kein exists()/stat() beim nächsten Start.
+  Fehlgeschlagene Items werden bis MAX_ATTEMPTS erneut versucht
+- Writes gesammelt über db.write_batch (Group-Commit)
+- Job (type "backfill") mit Durchsatz (Items/s) und ETA in metadata
+© HalloWelt42 – Private Nutzung
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Iterable, Optional
+
+from app.constants import SettingsKeys
+from app.database import db
+from app.services.job_service import job_service
+from app.services.rate_limiter import DEFAULT_INTERVALS, rate_limiter
+from app.utils.file_utils import now_sqlite
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 6
+MAX_WORKERS = 32
+MAX_ATTEMPTS = 3
+PROGRESS_INTERVAL = 2.0   # Sekunden zwischen Job-Updates
+
+_UPSERT_SQL = """
+    INSERT INTO backfill_state (kind, item_key, status, attempts, updated_at)
+    VALUES (?, ?, ?, 1, ?)
+    ON CONFLICT(kind, item_key) DO UPDATE SET
+        status = excluded.status,
+        attempts = backfill_state.attempts + 1,
+        updated_at = excluded.updated_at
+"""
+
+
+@dataclass
+class BackfillTask:
+    """Beschreibung eines Backfills.
+
+    query liefert die Kandidaten mit einer Spalte item_key (+ beliebige
+    weitere Spalten für fetch). fetch(row) → True = erledigt, False =
+    fehlgeschlagen (z.B. 404); Exceptions zählen als Fehler und gehen an
+    den rate_limiter. on_done(row) → (sql, params) wird bei Erfolg im selben
+    Group-Commit wie der Status geschrieben."""
+    kind: str
+    title: str
+    query: str
+    fetch: Callable[[dict], Awaitable[bool]]
+    params: tuple = ()
+    category: str = "thumbnail"
+    on_done: Optional[Callable[[dict], tuple[str, tuple]]] = None
+
+
+@dataclass
+class BackfillStats:
+    total: int = 0
+    done: int = 0
+    failed: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def processed(self) -> int:
+        return self.done + self.failed
+
+    @property
+    def rate(self) -> float:
+        """Items pro Sekunde seit Start."""
+        elapsed = time.monotonic() - self.started
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        rate = self.rate
+        if not rate:
+            return None
+        return (self.total - self.processed) / rate
+
+    def as_dict(self) -> dict:
+        eta = self.eta
+        return {"total": self.total, "done": self.done, "failed": self.failed,
+                "items_per_s": round(self.rate, 2),
+                "eta_s": round(eta) if eta is not None else None}
+
+
+class BackfillService:
+    """Führt BackfillTasks aus; ein Lauf pro kind gleichzeitig."""
+
+    def __init__(self):
+        self._running: set[str] = set()
+
+    async def _workers(self) -> int:
+        val = await db.fetch_val("SELECT value FROM settings WHERE key = ?",
+                                 (SettingsKeys.BACKFILL_WORKERS,))
+        try:
+            return max(1, min(MAX_WORKERS, int(val)))
+        except (TypeError, ValueError):
+            return DEFAULT_WORKERS
+
+    async def pending(self, task: BackfillTask) -> list[dict]:
+        """Offene Items: weder erledigt noch zu oft fehlgeschlagen."""
+        rows = await db.fetch_all(
+            f"""SELECT q.* FROM ({task.query}) q
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM backfill_state b
+                    WHERE b.kind = ? AND b.item_key = q.item_key
+                      AND (b.status = 'done' OR b.attempts >= ?))""",
+            tuple(task.params) + (task.kind, MAX_ATTEMPTS),
+        )
+        return [dict(r) for r in rows]
+
+    async def forget(self, kind: str, item_keys: Iterable[str] = None,
+                     failed_only: bool = False):
+        """Status verwerfen (z.B. Cache-Ordner geleert) → beim nächsten Lauf neu.
+        Ohne item_keys: alle Items von kind (failed_only: nur nicht erledigte)."""
+        if item_keys is not None:
+            await db.execute_many(
+                "DELETE FROM backfill_state WHERE kind = ? AND item_key = ?",
+                [(kind, str(k)) for k in item_keys])
+        elif failed_only:
+            await db.execute(
+                "DELETE FROM backfill_state WHERE kind = ? AND status != 'done'", (kind,))
+        else:
+            await db.execute("DELETE FROM backfill_state WHERE kind = ?", (kind,))
+
+    async def reopen(self, kind: str, present: Callable[[str], bool]) -> int:
+        """Vor einem manuellen Lauf (Button): fehlgeschlagene und ausgereizte
+        Items wieder freigeben, 'done'-Items gegen die Platte prüfen –
+        present(item_key) False (Datei gelöscht) → wieder offen.
+        Rückgabe: Anzahl erledigter Items, deren Datei fehlte."""
+        await self.forget(kind, failed_only=True)
+        keys = [r["item_key"] for r in await db.fetch_all(
+            "SELECT item_key FROM backfill_state WHERE kind = ? AND status = 'done'", (kind,))]
+        missing = await asyncio.to_thread(lambda: [k for k in keys if not present(k)])
+        if missing:
+            await self.forget(kind, missing)
+        return len(missing)
+
+    async def run(self, task: BackfillTask, workers: int = None) -> dict:
+        """Backfill ausführen. Ohne offene Items wird kein Job angelegt."""
+        if task.kind in self._running:
+            return {"status": "running"}
+        self._running.add(task.kind)
+        try:
+            rows = await self.pending(task)
+            if not rows:
+                return BackfillStats().as_dict()
+            return await self._run(task, rows, workers or await self._workers())
+        finally:
+            self._running.discard(task.kind)
+
+    async def _run(self, task: BackfillTask, rows: list[dict], workers: int) -> dict:
+        stats = BackfillStats(total=len(rows))
+        job = await job_service.create(
+            job_type="backfill", title=task.title,
+            description=f"{len(rows)} offen, {workers} Worker",
+            metadata={"kind": task.kind, **stats.as_dict()},
+        )
+        job_id = job["id"]
+        await job_service.start(job_id, exclusive=False)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for row in rows:
+            queue.put_nowait(row)
+        aborted: list[str] = []
+
+        async def worker(batch):
+            while not aborted:
+                try:
+                    row = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                if job_service.is_cancelled(job_id):
+                    aborted.append("abgebrochen")
+                    return
+                ok = await self._process(task, row, aborted)
+                if ok is None:
+                    return
+                if ok:
+                    stats.done += 1
+                    if task.on_done:
+                        await batch.execute(*task.on_done(row))
+                else:
+                    stats.failed += 1
+                await batch.execute(_UPSERT_SQL, (task.kind, str(row["item_key"]),
+                                                  "done" if ok else "failed", now_sqlite()))
+
+        async def reporter():
+            while True:
+                await asyncio.sleep(PROGRESS_INTERVAL)
+                await self._report(job_id, stats)
+
+        progress_task = asyncio.create_task(reporter())
+        try:
+            async with db.write_batch(max_statements=200, max_delay_ms=2000) as batch:
+                await asyncio.gather(*(worker(batch) for _ in range(min(workers, len(rows)))))
+        except Exception as e:
+            await job_service.fail(job_id, str(e)[:200])
+            raise
+        finally:
+            progress_task.cancel()
+
+        result = stats.as_dict()
+        summary = f"{stats.done} geladen, {stats.failed} fehlgeschlagen ({result['items_per_s']}/s)"
+        if aborted:
+            await job_service.fail(job_id, f"{aborted[0]} – {summary}; Rest beim nächsten Lauf")
+            result["aborted"] = aborted[0]
+        else:
+            await job_service.progress(job_id, 1.0, metadata=result)
+            await job_service.complete(job_id, summary)
+        logger.info(f"[Backfill] {task.kind}: {summary}")
+        return result
+
+    async def _process(self, task: BackfillTask, row: dict, aborted: list) -> Optional[bool]:
+        """Ein Item holen. None = Lauf abbrechen (Item bleibt offen)."""
+        category = task.category
+        if rate_limiter.is_bot_detected():
+            aborted.append("YouTube Bot-Erkennung")
+            return None
+        # Backoff aktiv → wieder im Takt des rate_limiter statt parallel
+        backoff = rate_limiter.intervals.get(category, 0) > DEFAULT_INTERVALS.get(category, 0)
+        if backoff:
+            await rate_limiter.acquire(category)
+        try:
+            ok = bool(await task.fetch(row))
+        except Exception as e:
+            rate_limiter.error(category, str(e))
+            return False
+        if ok and backoff:
+            rate_limiter.success(category)
+        return ok
+
+    async def _report(self, job_id: int, stats: BackfillStats):
+        eta = stats.eta
+        desc = f"{stats.processed}/{stats.total} · {stats.rate:.1f}/s"
+        if eta is not None:
+            desc += f" · noch ~{int(eta // 60)}:{int(eta % 60):02d} min"
+        try:
+            await job_service.progress(job_id, stats.processed / max(stats.total, 1),
+                                       desc, metadata=stats.as_dict())
+        except Exception as e:
+            logger.debug(f"[Backfill] Fortschritt: {e}")
+
+
+# Singleton
+backfill_service = BackfillService()
@@ -1,7 +1,8 @@
 """
-TubeVault – Channel Scanner v1.8.95
+TubeVault – Channel Scanner v1.8.96
 Vollständiger Kanal-Scan via pytubefix (Videos/Shorts/Live).
 Pre-Count via video_urls, paketweises Speichern, Phase-Transparenz.
+v1.8.96: rss_entries per Upsert (executemany) statt INSERT + UPDATE je Eintrag
 Memory-Fix: ch.url_generator() statt ch.videos/shorts/live
 → DeferredGeneratorList cached ALLE YouTube-Objekte in _elements
 → Bei 3500+ Videos = hunderte MB RAM, OOM auf Pi 16GB
@@ -17,10 +18,9 @@ import threading
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-import httpx
-
 from app.database import db
 from app.services.job_service import job_service
+from app.services.http_clients import http_clients
 from app.utils.file_utils import now_sqlite
 from app.utils.tag_utils import sanitize_tags
 from app.services.rate_limiter import rate_limiter
@@ -31,55 +31,92 @@ _executor = ThreadPoolExecutor(max_workers=1)  # Pi: nur 1 gleichzeitiger Scan
 
 # Batch-Größe: alle N Einträge automatisch in DB speichern
 BATCH_SIZE = 15  # Kleine Batches = weniger Memory-Spitzen auf Pi (16GB)
+# Rest-Speichern nach dem Fetch: Einträge pro Transaktion
+SAVE_CHUNK_SIZE = 200
+
+
+# Upsert für rss_entries: neue Einträge einfügen, vorhandene anreichern
+# (leere/fehlende Werte überschreiben nichts; published/status bleiben)
+_UPSERT_SQL = """
+    INSERT INTO rss_entries
+       (video_id, channel_id, title, published, thumbnail_url,
+        duration, views, description, video_type, keywords, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'new')
+    ON CONFLICT(video_id, channel_id) DO UPDATE SET
+        duration = COALESCE(excluded.duration, duration),
+        views = COALESCE(excluded.views, views),
+        description = CASE WHEN excluded.description != '' THEN excluded.description ELSE description END,
+        title = COALESCE(excluded.title, title),
+        thumbnail_url = COALESCE(excluded.thumbnail_url, thumbnail_url),
+        video_type = COALESCE(?, video_type),
+        keywords = CASE WHEN excluded.keywords != '[]' THEN excluded.keywords ELSE keywords END
+"""
+_ID_CHUNK = 500
+
+
+def _entry_params(v: dict, channel_id: str) -> tuple:
+    if not v.get("video_id"):
+        raise ValueError("video_id fehlt")
+    return (v["video_id"], channel_id, v.get("title"),
+            v.get("published"), v.get("thumbnail_url"),
+            v.get("duration"), v.get("views"),
+            (v.get("description") or "")[:5000],
+            v.get("video_type") or "video",
+            json.dumps(v.get("keywords", [])),
+            v.get("video_type"))  # Update: ohne Typ bleibt der bisherige
 
 
 async def _save_entries_batch(entries, channel_id):
-    """Batch von Einträgen in rss_entries speichern. Gibt (inserted, updated, errors) zurück."""
-    inserted = 0
-    updated = 0
+    """Batch von Einträgen in rss_entries speichern. Gibt (inserted, updated, errors) zurück.
+    Ein Upsert (INSERT … ON CONFLICT DO UPDATE) per executemany in EINER
+    Transaktion statt INSERT + UPDATE pro Eintrag; neu/vorhanden wird vorab
+    per Primärschlüssel-Lookup gezählt. Scheitert der Batch, wird zeilenweise
+    wiederholt, damit ein fehlerhafter Eintrag nur sich selbst kostet."""
     errors = 0
+    rows = []
     for v in entries:
         try:
-            cursor = await db.execute(
-                """INSERT OR IGNORE INTO rss_entries
-                   (video_id, channel_id, title, published, thumbnail_url,
-                    duration, views, description, video_type, keywords, status)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'new')""",
-                (v["video_id"], channel_id, v.get("title"),
-                 v.get("published"), v.get("thumbnail_url"),
-                 v.get("duration"), v.get("views"),
-                 (v.get("description") or "")[:5000],
-                 v.get("video_type", "video"),
-                 json.dumps(v.get("keywords", [])))
-            )
-            if cursor.rowcount > 0:
-                inserted += 1
-            else:
-                await db.execute(
-                    """UPDATE rss_entries SET
-                        duration = COALESCE(?, duration),
-                        views = COALESCE(?, views),
-                        description = CASE WHEN ? IS NOT NULL AND ? != '' THEN ? ELSE description END,
-                        title = COALESCE(?, title),
-                        thumbnail_url = COALESCE(?, thumbnail_url),
-                        video_type = COALESCE(?, video_type),
-                        keywords = CASE WHEN ? != '[]' THEN ? ELSE keywords END
-                       WHERE video_id = ? AND channel_id = ?""",
-                    (v.get("duration"), v.get("views"),
-                     v.get("description"), v.get("description"),
-                     (v.get("description") or "")[:5000],
-                     v.get("title"), v.get("thumbnail_url"),
-                     v.get("video_type"),
-                     json.dumps(v.get("keywords", [])),
-                     json.dumps(v.get("keywords", [])),
-                     v["video_id"], channel_id)
-                )
-                updated += 1
+            rows.append(_entry_params(v, channel_id))
         except Exception as e:
             errors += 1
             if errors <= 3:
                 logger.warning(f"Batch-Save Eintrag {v.get('video_id')} Fehler: {e}")
-    return inserted, updated, errors
+    if not rows:
+        return 0, 0, errors
+
+    ids = list({r[0] for r in rows})
+    known = set()
+    for i in range(0, len(ids), _ID_CHUNK):
+        chunk = ids[i:i + _ID_CHUNK]
+        found = await db.fetch_all(
+            f"""SELECT video_id FROM rss_entries
+                WHERE channel_id = ? AND video_id IN ({','.join('?' * len(chunk))})""",
+            (channel_id, *chunk))
+        known.update(r["video_id"] for r in found)
+
+    try:
+        async with db.transaction():
+            await db.execute_many(_UPSERT_SQL, rows)
+        saved = rows
+    except Exception as e:
+        logger.warning(f"Batch-Save {channel_id}: {e} – speichere zeilenweise")
+        saved = []
+        async with db.transaction():
+            for r in rows:
+                try:
+                    await db.execute(_UPSERT_SQL, r)
+                    saved.append(r)
+                except Exception as e:
+                    errors += 1
+                    if errors <= 3:
+                        logger.warning(f"Batch-Save Eintrag {r[0]} Fehler: {e}")
+
+    inserted = 0
+    for r in saved:
+        if r[0] not in known:
+            known.add(r[0])  # Duplikat im selben Batch = Update
+            inserted += 1
+    return inserted, len(saved) - inserted, errors
 
 
 async def fetch_all_channel_videos(channel_id: str, job_id: int = None) -> dict:
@@ -513,61 +550,26 @@ async def fetch_all_channel_videos(channel_id: str, job_id: int = None) -> dict:
         inserted = batch_ins
         updated = batch_upd
         entry_errors = batch_errs
-        for i, v in enumerate(remaining):
-            # Abbruch-Check alle 100 Einträge
-            if i % 100 == 0 and not cancelled_early and job_service.is_cancelled(job_id):
+        for i in range(0, total_to_save, SAVE_CHUNK_SIZE):
+            # Abbruch-Check pro Chunk
+            if not cancelled_early and job_service.is_cancelled(job_id):
                 await job_service.progress(job_id, 0, f"Abgebrochen bei {i}/{total_to_save} Einträgen")
                 job_service.clear_cancel(job_id)
                 return {"total": total_entries, "saved": already_saved + i, "cancelled": True}
 
-            try:
-                cursor = await db.execute(
-                    """INSERT OR IGNORE INTO rss_entries
-                       (video_id, channel_id, title, published, thumbnail_url,
-                        duration, views, description, video_type, keywords, status)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'new')""",
-                    (v["video_id"], channel_id, v.get("title"),
-                     v.get("published"), v.get("thumbnail_url"),
-                     v.get("duration"), v.get("views"),
-                     (v.get("description") or "")[:5000],
-                     v.get("video_type", "video"),
-                     json.dumps(v.get("keywords", [])))
-                )
-                if cursor.rowcount > 0:
-                    inserted += 1
-                else:
-                    await db.execute(
-                        """UPDATE rss_entries SET
-                            duration = COALESCE(?, duration),
-                            views = COALESCE(?, views),
-                            description = CASE WHEN ? IS NOT NULL AND ? != '' THEN ? ELSE description END,
-                            title = COALESCE(?, title),
-                            thumbnail_url = COALESCE(?, thumbnail_url),
-                            video_type = COALESCE(?, video_type),
-                            keywords = CASE WHEN ? != '[]' THEN ? ELSE keywords END
-                           WHERE video_id = ? AND channel_id = ?""",
-                        (v.get("duration"), v.get("views"),
-                         v.get("description"), v.get("description"),
-                         (v.get("description") or "")[:5000],
-                         v.get("title"), v.get("thumbnail_url"),
-                         v.get("video_type"),
-                         json.dumps(v.get("keywords", [])),
-                         json.dumps(v.get("keywords", [])),
-                         v["video_id"], channel_id)
-                    )
-                    updated += 1
-            except Exception as e:
-                entry_errors += 1
-                if entry_errors <= 5:
-                    logger.warning(f"Eintrag {v.get('video_id')} Fehler: {e}")
-
-            if i % 25 == 0 and total_to_save > 0:
-                save_pct = 0.70 + (i / total_to_save) * 0.28
-                await job_service.progress(
-                    job_id, save_pct,
-                    f"Speichere: {inserted} neu, {updated} aktualisiert ({already_saved + i + 1}/{total_entries})",
-                    metadata={"save_current": already_saved + i + 1, "save_total": total_entries}
-                )
+            chunk = remaining[i:i + SAVE_CHUNK_SIZE]
+            ins, upd, errs = await _save_entries_batch(chunk, channel_id)
+            inserted += ins
+            updated += upd
+            entry_errors += errs
+
+            done = i + len(chunk)
+            save_pct = 0.70 + (done / total_to_save) * 0.28
+            await job_service.progress(
+                job_id, save_pct,
+                f"Speichere: {inserted} neu, {updated} aktualisiert ({already_saved + done}/{total_entries})",
+                metadata={"save_current": already_saved + done, "save_total": total_entries}
+            )
 
         # ─── Kanal-Metadaten in subscriptions aktualisieren ───
         now = now_sqlite()
@@ -589,16 +591,15 @@ async def fetch_all_channel_videos(channel_id: str, job_id: int = None) -> dict:
                 from app.config import BANNERS_DIR
                 BANNERS_DIR.mkdir(parents=True, exist_ok=True)
                 banner_dest = BANNERS_DIR / f"{channel_id}.jpg"
-                async with httpx.AsyncClient(timeout=15) as client:
-                    resp = await client.get(channel_meta["banner_url"])
-                    if resp.status_code == 200 and len(resp.content) > 1000:
-                        banner_dest.write_bytes(resp.content)
-                        updates.append("banner_url = ?")
-                        params.append(f"/api/subscriptions/banner/{channel_id}")
-                        logger.info(f"Banner gecacht: {channel_id}")
-                    else:
-                        updates.append("banner_url = ?")
-                        params.append(channel_meta["banner_url"])
+                resp = await http_clients.get(channel_meta["banner_url"], category="thumbnail")
+                if resp.status_code == 200 and len(resp.content) > 1000:
+                    banner_dest.write_bytes(resp.content)
+                    updates.append("banner_url = ?")
+                    params.append(f"/api/subscriptions/banner/{channel_id}")
+                    logger.info(f"Banner gecacht: {channel_id}")
+                else:
+                    updates.append("banner_url = ?")
+                    params.append(channel_meta["banner_url"])
             except Exception as e:
                 logger.warning(f"Banner-Cache fehlgeschlagen: {e}")
                 updates.append("banner_url = ?")
@@ -1,5 +1,5 @@
 """
-TubeVault – Counts Service v1.0.0
+TubeVault – Counts Service v1.1.0
 
 EINE Quelle der Wahrheit für alle Zählungen (Badges, Dashboard-Stats,
 Queue-Tabs, Disk). Jede Definition steht genau einmal hier, dokumentiert;
@@ -12,121 +12,207 @@ Leitregel: **Ein Badge zählt exakt das, was seine Zielseite anzeigt.**
 - own_videos  == OwnVideos-Seite (source local/imported, ready, echte Datei)
   → Fix ggü. früher: file_size>0 wie die Seite; KEIN Archiv-Filter, weil die
     Seite archivierte eigene Videos ebenfalls listet.
+
+Seit v1.1.0: In-Memory-Cache pro Tabelle, invalidiert von den Schreibpfaden
+(metadata/job/rss/download_service, Favoriten/Playlists/Kategorien) plus
+TTL-Fallback. /api/system/counts liefert alles in einer Antwort.
 """
 import logging
 import os
+import time
 
 from app.database import db
 from app.config import VIDEOS_DIR, DB_DIR
 
 logger = logging.getLogger(__name__)
 
+# TTL-Fallback für Schreibpfade, die (noch) nicht invalidieren, und für
+# zeitabhängige Werte (done_today nach Mitternacht)
+CACHE_TTL = 30.0
+
 
 class CountsService:
+    """Zähler mit In-Memory-Cache pro Tabelle.
+
+    Jede Tabelle wird mit EINER Aggregat-Query gezählt (statt einer Query pro
+    Zähler) und das Ergebnis gecacht. Schreibpfade rufen invalidate("videos",
+    ...) auf; was nicht invalidiert, veraltet höchstens CACHE_TTL Sekunden.
+    Ein Badge-Poll mit warmem Cache ist damit reine Dict-Arbeit."""
+
+    def __init__(self, ttl: float = CACHE_TTL):
+        self.ttl = ttl
+        self._cache: dict[str, tuple[float, object]] = {}
+        # Generation pro Tabelle: Invalidierung während einer laufenden Zählung
+        # verhindert, dass das (veraltete) Ergebnis noch gecacht wird
+        self._gen: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, *tables: str):
+        """Cache für die Tabellen verwerfen. Ohne Argument: alles."""
+        for t in tables or list(self._cache):
+            self._cache.pop(t, None)
+            self._gen[t] = self._gen.get(t, 0) + 1
+
+    async def _cached(self, table: str, compute):
+        hit = self._cache.get(table)
+        if hit and time.monotonic() - hit[0] < self.ttl:
+            self.hits += 1
+            return hit[1]
+        self.misses += 1
+        gen = self._gen.get(table, 0)
+        value = await compute()
+        if self._gen.get(table, 0) == gen:
+            self._cache[table] = (time.monotonic(), value)
+        return value
+
+    # ─── Aggregat-Queries (eine pro Tabelle) ──────────────────────
+    async def _videos(self) -> dict:
+        async def _q():
+            row = await db.fetch_one(
+                """SELECT
+                     SUM(status='ready' AND COALESCE(is_archived,0)=0) AS library,
+                     SUM(status='ready' AND COALESCE(is_archived,0)=1) AS archived,
+                     SUM(source IN ('local','imported') AND status='ready'
+                         AND file_path IS NOT NULL AND file_path != ''
+                         AND file_size > 0) AS own,
+                     SUM(CASE WHEN status='ready' AND COALESCE(is_archived,0)=0
+                              THEN file_size END) AS size,
+                     SUM(CASE WHEN status='ready' AND COALESCE(is_archived,0)=0
+                              THEN duration END) AS duration,
+                     SUM(play_count > 0) AS played
+                   FROM videos"""
+            )
+            return {k: (row[k] or 0) if row else 0
+                    for k in ("library", "archived", "own", "size", "duration", "played")}
+        return await self._cached("videos", _q)
+
+    async def _subscriptions(self) -> dict:
+        async def _q():
+            row = await db.fetch_one(
+                """SELECT COUNT(*) AS total, SUM(enabled=1) AS enabled,
+                          SUM(error_count > 0) AS error
+                   FROM subscriptions"""
+            )
+            return {k: (row[k] or 0) if row else 0 for k in ("total", "enabled", "error")}
+        return await self._cached("subscriptions", _q)
+
+    async def _playlists(self) -> dict:
+        async def _q():
+            row = await db.fetch_one(
+                """SELECT COUNT(*) AS total,
+                          SUM(COALESCE(visibility,'global')='global') AS global_
+                   FROM playlists"""
+            )
+            return {"total": (row["total"] or 0) if row else 0,
+                    "global": (row["global_"] or 0) if row else 0}
+        return await self._cached("playlists", _q)
+
+    async def _jobs(self) -> dict:
+        """{(type, status): [n, done_today]} – ein GROUP-BY für alle Job-Zähler."""
+        async def _q():
+            rows = await db.fetch_all(
+                """SELECT type, status, COUNT(*) AS n,
+                          SUM(status='done' AND completed_at >= date('now','localtime')) AS today
+                   FROM jobs GROUP BY type, status"""
+            )
+            return {(r["type"], r["status"]): (r["n"], r["today"] or 0) for r in rows}
+        return await self._cached("jobs", _q)
+
+    async def _count(self, table: str, sql: str) -> int:
+        async def _q():
+            return await db.fetch_val(sql) or 0
+        return await self._cached(table, _q)
+
     # ─── Bibliothek / Videos ──────────────────────────────────────
     async def library_videos(self) -> int:
         """Ready & nicht archiviert (jede source) – wie die Library-Seite."""
-        return await db.fetch_val(
-            "SELECT COUNT(*) FROM videos WHERE status='ready' AND COALESCE(is_archived,0)=0"
-        ) or 0
+        return (await self._videos())["library"]
 
     async def archived_videos(self) -> int:
         """Ready & archiviert – wie die Archiv-Seite."""
-        return await db.fetch_val(
-            "SELECT COUNT(*) FROM videos WHERE status='ready' AND COALESCE(is_archived,0)=1"
-        ) or 0
+        return (await self._videos())["archived"]
 
     async def own_videos(self) -> int:
         """Eigene/importierte mit echter Datei – wie die OwnVideos-Seite
         (import_service.get_own_videos: source, ready, file_path, file_size>0)."""
-        return await db.fetch_val(
-            "SELECT COUNT(*) FROM videos WHERE source IN ('local','imported') "
-            "AND status='ready' AND file_path IS NOT NULL AND file_path != '' "
-            "AND file_size > 0"
-        ) or 0
+        return (await self._videos())["own"]
 
     async def library_size_bytes(self) -> int:
-        return await db.fetch_val(
-            "SELECT COALESCE(SUM(file_size),0) FROM videos "
-            "WHERE status='ready' AND COALESCE(is_archived,0)=0"
-        ) or 0
+        return (await self._videos())["size"]
 
     async def library_duration_seconds(self) -> int:
-        return await db.fetch_val(
-            "SELECT COALESCE(SUM(duration),0) FROM videos "
-            "WHERE status='ready' AND COALESCE(is_archived,0)=0"
-        ) or 0
+        return (await self._videos())["duration"]
 
     # ─── Feed / Abos ──────────────────────────────────────────────
     async def feed_new(self) -> int:
         """Neue RSS-Einträge in aktiven Feeds – wie das Feed-Badge/-Tab."""
-        return await db.fetch_val(
+        return await self._count(
+            "rss_entries",
             "SELECT COUNT(*) FROM rss_entries WHERE status='new' "
-            "AND COALESCE(feed_status,'active')='active'"
-        ) or 0
+            "AND COALESCE(feed_status,'active')='active'",
+        )
 
     async def subscriptions_enabled(self) -> int:
-        return await db.fetch_val(
-            "SELECT COUNT(*) FROM subscriptions WHERE enabled=1"
-        ) or 0
+        return (await self._subscriptions())["enabled"]
 
     async def subscriptions_total(self) -> int:
-        return await db.fetch_val("SELECT COUNT(*) FROM subscriptions") or 0
+        return (await self._subscriptions())["total"]
 
     async def subscriptions_error(self) -> int:
-        return await db.fetch_val(
-            "SELECT COUNT(*) FROM subscriptions WHERE error_count > 0"
-        ) or 0
+        return (await self._subscriptions())["error"]
 
     # ─── Sammlungen ───────────────────────────────────────────────
     async def favorites(self) -> int:
-        return await db.fetch_val("SELECT COUNT(*) FROM favorites") or 0
+        return await self._count("favorites", "SELECT COUNT(*) FROM favorites")
 
     async def playlists_global(self) -> int:
         """Globale Playlists (Badge) – ohne versteckte/lokale."""
-        return await db.fetch_val(
-            "SELECT COUNT(*) FROM playlists WHERE COALESCE(visibility,'global')='global'"
-        ) or 0
+        return (await self._playlists())["global"]
 
     async def playlists_total(self) -> int:
-        return await db.fetch_val("SELECT COUNT(*) FROM playlists") or 0
+        return (await self._playlists())["total"]
 
     async def categories(self) -> int:
-        return await db.fetch_val("SELECT COUNT(*) FROM categories") or 0
+        return await self._count("categories", "SELECT COUNT(*) FROM categories")
 
     async def streams(self) -> int:
-        return await db.fetch_val("SELECT COUNT(*) FROM streams") or 0
+        return await self._count("streams", "SELECT COUNT(*) FROM streams")
+
+    async def batch_waiting(self) -> int:
+        """Batch-Queue (wartend/ladend). Tabelle existiert evtl. noch nicht."""
+        try:
+            return await self._count(
+                "batch_queue",
+                "SELECT COUNT(*) FROM batch_queue WHERE status IN ('waiting','downloading')",
+            )
+        except Exception:
+            return 0
 
     # ─── Verlauf (zwei bewusst getrennte Konzepte) ────────────────
     async def history_played(self) -> int:
         """Videos, die mind. 1× abgespielt wurden (Badge zeigt „Verlauf")."""
-        return await db.fetch_val(
-            "SELECT COUNT(*) FROM videos WHERE play_count > 0"
-        ) or 0
+        return (await self._videos())["played"]
 
     async def history_entries(self) -> int:
         """Distinkte Videos in der watch_history (Stats – kann abweichen,
         z.B. wenn play_count zurückgesetzt wurde). Dokumentierte Divergenz."""
-        return await db.fetch_val(
-            "SELECT COUNT(DISTINCT video_id) FROM watch_history"
-        ) or 0
+        return await self._count(
+            "watch_history", "SELECT COUNT(DISTINCT video_id) FROM watch_history")
 
     # ─── Jobs / Download-Queue ────────────────────────────────────
     async def job_counts(self, job_type: str | None = None) -> dict:
-        """Status-Zählung über jobs (optional gefiltert auf job_type) in EINEM
-        GROUP-BY. `done` = fertig innerhalb der Retention (job_service.cleanup
-        prunt ältere ~48h); `done_today` = seit Mitternacht (lokal)."""
-        where = "WHERE type = ?" if job_type else ""
-        params = (job_type,) if job_type else ()
-        rows = await db.fetch_all(
-            f"SELECT status, COUNT(*) AS n FROM jobs {where} GROUP BY status", params)
-        counts = {r["status"]: r["n"] for r in rows}
-        done_today = await db.fetch_val(
-            f"SELECT COUNT(*) FROM jobs WHERE status='done' "
-            f"AND completed_at >= date('now','localtime')"
-            + (" AND type = ?" if job_type else ""),
-            params,
-        ) or 0
+        """Status-Zählung über jobs (optional gefiltert auf job_type) aus EINEM
+        gecachten GROUP-BY. `done` = fertig innerhalb der Retention
+        (job_service.cleanup prunt ältere ~48h); `done_today` = seit
+        Mitternacht (lokal)."""
+        counts: dict[str, int] = {}
+        done_today = 0
+        for (jtype, status), (n, today) in (await self._jobs()).items():
+            if job_type and jtype != job_type:
+                continue
+            counts[status] = counts.get(status, 0) + n
+            done_today += today
         return {
             "active": counts.get("active", 0),
             "queued": counts.get("queued", 0),
@@ -145,6 +231,42 @@ class CountsService:
         c["failed"] = c["error"] + c["parked"]
         return c
 
+    # ─── Kombiniert ───────────────────────────────────────────────
+    async def badges(self) -> dict:
+        """Alle Sidebar-Badges. Jedes Badge zählt exakt das, was seine
+        Zielseite anzeigt."""
+        q = await self.queue_counts()
+        return {
+            "videos": await self.library_videos(),
+            "subscriptions": await self.subscriptions_enabled(),
+            "new_feed": await self.feed_new(),
+            "active_downloads": q["queued"] + q["active"],
+            "favorites": await self.favorites(),
+            "playlists": await self.playlists_global(),
+            "categories": await self.categories(),
+            "history": await self.history_played(),
+            "archives": await self.archived_videos(),
+            "own_videos": await self.own_videos(),
+            "batch_queue": await self.batch_waiting(),
+        }
+
+    async def snapshot(self) -> dict:
+        """Badges + Job-/Queue-Zähler + Bibliotheks-Summen in einer Antwort
+        (für Clients, die sonst badges, stats und jobs/stats einzeln pollen)."""
+        return {
+            "badges": await self.badges(),
+            "jobs": await self.job_counts(),
+            "queue": await self.queue_counts(),
+            "library": {
+                "total_size_bytes": await self.library_size_bytes(),
+                "total_duration_seconds": await self.library_duration_seconds(),
+                "streams_count": await self.streams(),
+                "playlists_count": await self.playlists_total(),
+                "history_count": await self.history_entries(),
+            },
+            "subscriptions": dict(await self._subscriptions()),
+        }
+
     # ─── Disk ─────────────────────────────────────────────────────
     def disk_mounts(self) -> dict:
         """Immer beide Mounts mit Label + Nutzung; same_device via st_dev
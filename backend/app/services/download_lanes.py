@@ -0,0 +1,134 @@
+"""
+Download-Lanes (pure, keine I/O).
+
+Die Download-Queue läuft in mehreren Lanes parallel. Jede Lane hat eigene
+Slots (Parallelität), eigene rate_limiter-Kategorie, eigenen Cooldown/Backoff
+und eigene Durchsatz-Metriken. So blockiert ein langer 1080p-Download nicht
+die Audio-Jobs dahinter – und ein Rate-Limit im Video-Pfad bremst nur diesen.
+
+Lanes:
+  video : komplette Videos (Standard)       → rate_limiter "download"
+  audio : audio_only-Jobs (klein, schnell)  → rate_limiter "download_audio"
+
+Zuordnung über download_options.audio_only (SQL-Filter im Queue-Pick).
+
+Slots begrenzen nur die Netzwerk-Phase: ein Job, der fertig geladen hat,
+merged/finalisiert als "finishing" weiter, während der Slot schon den
+nächsten Job zieht. Stufen-Zeiten (stage_timings) werden je Lane gemittelt.
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+# Fenster für den Durchsatz (Jobs/h, MB/h)
+THROUGHPUT_WINDOW_S = 3600
+
+
+@dataclass
+class DownloadLane:
+    """Konfiguration + Laufzeit-Zustand einer Lane."""
+    name: str
+    label: str
+    # rate_limiter-Kategorie (acquire/success/error im Download-Schritt)
+    category: str
+    # SQL-Bedingung auf jobs (Queue-Pick)
+    where: str
+    # Setting-Key für die Parallelität + Default
+    concurrency_key: str
+    concurrency: int = 1
+    # Anteil des globalen Cooldown-Basiswerts (download.cooldown_base_s)
+    cooldown_factor: float = 1.0
+
+    # ─── Cooldown-Zustand ───
+    cooldown: int = 30
+    cooldown_until: float = 0.0
+    cooldown_active: bool = False
+
+    # ─── Metriken ───
+    started: int = 0
+    done: int = 0
+    failed: int = 0
+    bytes_done: int = 0
+    busy_seconds: float = 0.0
+    active: set = field(default_factory=set)
+    # aktive Jobs nach der Netzwerk-Phase (Merge/Finalize, Slot schon frei)
+    finishing: set = field(default_factory=set)
+    # Stufe → (Summe Sekunden, Anzahl) aus den stage_timings der Jobs
+    stage_seconds: dict = field(default_factory=dict)
+    _recent: deque = field(default_factory=deque)  # (t_done, bytes)
+    # Starts einer Lane laufen nacheinander durch ihren Cooldown (gestaffelt)
+    gate: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def base_cooldown(self, global_base: int) -> int:
+        return int(global_base * self.cooldown_factor)
+
+    def record(self, ok: bool, seconds: float, size: int = 0):
+        """Ergebnis eines Jobs verbuchen."""
+        self.busy_seconds += seconds
+        if ok:
+            self.done += 1
+            self.bytes_done += size
+            self._recent.append((time.time(), size))
+        else:
+            self.failed += 1
+
+    def record_stages(self, timings: dict):
+        """Stufen-Zeiten eines Jobs (resolve, download, merge …) verbuchen."""
+        for stage, seconds in timings.items():
+            total, count = self.stage_seconds.get(stage, (0.0, 0))
+            self.stage_seconds[stage] = (total + seconds, count + 1)
+
+    def _trim(self, now: float):
+        while self._recent and now - self._recent[0][0] > THROUGHPUT_WINDOW_S:
+            self._recent.popleft()
+
+    def snapshot(self, global_base: int) -> dict:
+        now = time.time()
+        self._trim(now)
+        finished = self.done + self.failed
+        return {
+            "name": self.name,
+            "label": self.label,
+            "category": self.category,
+            "concurrency": self.concurrency,
+            "active": len(self.active),
+            "finishing": len(self.finishing),
+            "cooldown": self.cooldown,
+            "cooldown_base": self.base_cooldown(global_base),
+            "cooldown_active": self.cooldown_active,
+            "cooldown_remaining": round(max(0, self.cooldown_until - now)) if self.cooldown_until else 0,
+            "started": self.started,
+            "done": self.done,
+            "failed": self.failed,
+            "bytes_done": self.bytes_done,
+            "done_last_hour": len(self._recent),
+            "mb_last_hour": round(sum(b for _, b in self._recent) / 1024 / 1024, 1),
+            "avg_seconds": round(self.busy_seconds / finished, 1) if finished else 0,
+            "avg_stage_seconds": {k: round(t / n, 2) for k, (t, n) in self.stage_seconds.items()},
+        }
+
+
+_AUDIO_ONLY = "json_extract(metadata, '$.download_options.audio_only')"
+
+
+def build_lanes() -> dict[str, DownloadLane]:
+    """Lane-Definitionen (Reihenfolge = Anzeige-Reihenfolge)."""
+    return {
+        "video": DownloadLane(
+            name="video", label="Video", category="download",
+            where=f"COALESCE({_AUDIO_ONLY}, 0) = 0",
+            concurrency_key="download.concurrent", concurrency=1,
+        ),
+        "audio": DownloadLane(
+            name="audio", label="Audio", category="download_audio",
+            where=f"{_AUDIO_ONLY} = 1",
+            concurrency_key="download.audio_concurrent", concurrency=2,
+            cooldown_factor=0.5,
+        ),
+    }
+
+
+def lane_for(opts: dict) -> str:
+    """Lane-Name für die download_options eines Jobs (Gegenstück zu where)."""
+    return "audio" if opts.get("audio_only") else "video"
@@ -1,5 +1,5 @@
 """
-TubeVault – Download Service v1.8.48
+TubeVault – Download Service v1.13.1
 Live-Progress, Stufen, FFmpeg-Merge, Rate-Limiting, Resume, Job-Tracking, Adaptive Cooldown
 pytubefix: Chapters, Captions, Audio-Only nativ
 © HalloWelt42 – Private Nutzung
@@ -8,10 +8,29 @@ Download-Stufen:
 1. resolving         – Video-Info von YouTube laden
 2. resolved          – Streams erkannt
 3. downloading_video – Video-Spur wird heruntergeladen
-4. downloading_audio – Audio-Spur wird heruntergeladen (nur adaptive)
-5. merging           – FFmpeg merged Video+Audio
+4. downloading_audio – Audio-Spur wird heruntergeladen (nur adaptive,
+                       parallel zur Video-Spur)
+5. merging           – FFmpeg merged Video+Audio (Container/Audio-Copy
+                       per ffprobe, siehe merge_plan.py)
 6. finalizing        – Thumbnail, DB-Eintrag
 7. done              – Fertig
+
+Queue-Worker ereignisgesteuert: wacht nur bei job_service.notify()-Ereignissen
+(neuer/zurückgestellter Download, System-Job fertig, Resume) oder zum nächsten
+retry_after-Zeitpunkt auf – kein 2–3s-Polling der jobs-Tabelle.
+
+Lanes (download_lanes.py): Video- und Audio-Jobs laufen in getrennten Lanes
+mit eigener Parallelität, eigenem Cooldown/Backoff und eigenen Metriken.
+
+Pipeline: ein Lane-Slot ist nur bis zum Ende der Netzwerk-Phase belegt.
+Merge + Finalize laufen danach als eigener Task weiter (höchstens
+POST_PROCESS_CONCURRENCY gleichzeitig), der Slot lädt schon den nächsten Job.
+Stufen-Zeiten je Job landen in jobs.metadata.stage_timings.
+
+Merge: kompatible Audio-Spuren (AAC) werden kopiert statt umkodiert; mit
+download.faststart=deferred schiebt ein Leerlauf-Task das moov-Atom erst
+nach vorn, wenn kein Job aktiv ist. Vorgemerkte Dateien stehen in
+faststart_pending (v1.13.1) und werden nach einem Neustart fortgesetzt.
 """
 
 import asyncio
@@ -22,6 +41,7 @@ import time as _time
 import re
 import subprocess
 import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, Callable
@@ -33,16 +53,29 @@ from app.config import (
     MAX_CONCURRENT_DOWNLOADS, DEFAULT_QUALITY, DEFAULT_FORMAT,
 )
 from app.database import db
+from app.services.archive_service import archive_service
+from app.services.counts_service import counts_service
+from app.services.download_lanes import DownloadLane, build_lanes, lane_for
+from app.services.http_clients import http_clients
+from app.services.merge_plan import MergePlan, plan as plan_merge
 from app.services.rate_limiter import rate_limiter
 from app.services.job_service import job_service
+from app.services.thumbnail_derivative_service import thumbnail_derivative_service
 from app.utils.file_utils import now_sqlite, future_sqlite
-from app.utils.pytube_client import make_youtube
+from app.utils.pytube_client import is_cached, make_youtube
 from app.utils.tag_utils import sanitize_tags
 
 logger = logging.getLogger(__name__)
 
 _last_ws_time: dict[int, float] = {}
 WS_THROTTLE = 0.4
+# Sicherheitsnetz für Schreibpfade ohne notify() (z.B. direkte SQL-Updates)
+QUEUE_IDLE_FALLBACK = 60.0
+# Jobs gleichzeitig in Merge/Finalize (nach Freigabe des Lane-Slots) –
+# weitere fertig geladene Jobs halten ihren Slot, bis einer frei wird
+POST_PROCESS_CONCURRENCY = 2
+# Nachgelagertes faststart: Prüfintervall, solange noch Jobs aktiv sind
+FASTSTART_IDLE_POLL = 30.0
 
 
 def _srt_to_vtt(srt_text: str) -> str:
@@ -118,22 +151,61 @@ class DownloadService:
         self._active_downloads: dict[int, asyncio.Task] = {}
         self._progress_callbacks: list[Callable] = []
         self._worker_task: Optional[asyncio.Task] = None
-        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
         self._loop: Optional[asyncio.AbstractEventLoop] = None
-        # Aktuell laufender Job → wird vom Adapter-Hook genutzt um Job-Description
-        # bei jedem yt-dlp-Retry zu aktualisieren (Live-UI-Sichtbarkeit der Versuche)
-        self._current_job_id: Optional[int] = None
-        self._current_video_id: Optional[str] = None
+        # Laufende Downloads video_id → job_id → wird vom Adapter-Hook genutzt um
+        # die Job-Description bei jedem yt-dlp-Retry zu aktualisieren
+        # (Live-UI-Sichtbarkeit der Versuche); Label beginnt mit der Video-ID
+        self._running: dict[str, int] = {}
         self._phases_cache: dict[int, list] = {}  # job_id → letzte phases
         self._last_db_write: dict[int, float] = {}  # job_id → timestamp des letzten DB-Writes
         self._job_opts: dict[int, dict] = {}  # job_id → download_options (für _stage Phasen-Wahl)
         self._rate_samples: dict[int, list] = {}  # job_id → [(t_s, bytes_done), ...] für ETA-Berechnung
-        # Cooldown-State (initialisiert in _queue_loop, hier Defaults für get_cooldown_state)
-        self._cooldown = 30
+        # Lanes mit eigenem Cooldown/Backoff + Metriken (download_lanes.py)
+        self._lanes = build_lanes()
+        # Cooldown-Basis (Setting) – die Lanes leiten ihren Basiswert davon ab
         self._cooldown_base = 30
         self._cooldown_max = 7200
-        self._cooldown_until = 0.0
-        self._cooldown_active = False
+        # Weck-Signale der Lane-Slots (gesetzt von kick() / _on_job_event)
+        self._wake_events: set[asyncio.Event] = set()
+        self._job_listener = False
+        # Queue-Pick: Retries befördern + Job reservieren, eine Lane zur Zeit
+        self._pick_lock = asyncio.Lock()
+        self._claimed: set[int] = set()
+        # Pipeline: job_id → Event "Netzwerk-Phase fertig" (nur für Jobs aus
+        # einem Lane-Slot), belegte Post-Slots und weiterlaufende Post-Tasks
+        self._network_done: dict[int, asyncio.Event] = {}
+        self._post_slots = asyncio.Semaphore(POST_PROCESS_CONCURRENCY)
+        self._post_held: set[int] = set()
+        self._post_tasks: set[asyncio.Task] = set()
+        self._timings: dict[int, dict] = {}  # job_id → Stufe → Sekunden
+        # Nachgelagertes faststart: Vormerkungen in faststart_pending (DB)
+        self._faststart_task: Optional[asyncio.Task] = None
+
+    # Kompatibilität: der globale Cooldown ist der der Video-Lane
+    # (Endpoints, WebSocket-Payload, Tests)
+    @property
+    def _cooldown(self) -> int:
+        return self._lanes["video"].cooldown
+
+    @_cooldown.setter
+    def _cooldown(self, value: int):
+        self._lanes["video"].cooldown = value
+
+    @property
+    def _cooldown_until(self) -> float:
+        return self._lanes["video"].cooldown_until
+
+    @_cooldown_until.setter
+    def _cooldown_until(self, value: float):
+        self._lanes["video"].cooldown_until = value
+
+    @property
+    def _cooldown_active(self) -> bool:
+        return self._lanes["video"].cooldown_active
+
+    @_cooldown_active.setter
+    def _cooldown_active(self, value: bool):
+        self._lanes["video"].cooldown_active = value
 
     async def _get_setting(self, key: str, default: str = "") -> str:
         val = await db.fetch_val("SELECT value FROM settings WHERE key = ?", (key,))
@@ -324,7 +396,9 @@ class DownloadService:
 
         existing = await db.fetch_one("SELECT id, status FROM videos WHERE id = ?", (video_id,))
 
-        await rate_limiter.acquire("pytubefix")
+        # Info im Extract-Cache → kein YouTube-Call, kein Rate-Limit-Slot
+        if not is_cached(f"https://www.youtube.com/watch?v={video_id}"):
+            await rate_limiter.acquire("pytubefix")
 
         def _fetch():
             try:
@@ -542,13 +616,10 @@ class DownloadService:
             set_retry_hook(self._on_yt_retry)
         except Exception as e:
             logger.warning(f"set_retry_hook fehlgeschlagen: {e}")
-        # Concurrent-Einstellung aus DB lesen
-        try:
-            concurrent = int(await self._get_setting("download.concurrent", str(MAX_CONCURRENT_DOWNLOADS)))
-            self._semaphore = asyncio.Semaphore(max(1, concurrent))
-            logger.info(f"Download Semaphore: {concurrent} gleichzeitig")
-        except (ValueError, TypeError):
-            pass
+        # Job-Ereignisse wecken den Worker (statt Polling)
+        if not self._job_listener:
+            job_service.add_callback(self._on_job_event)
+            self._job_listener = True
         # Resume: stale 'active' Download-Jobs zurücksetzen auf 'queued'.
         # Hinweis: job_service._recover_stale_jobs() läuft davor und markiert active als error.
         # Dieser Call fängt den seltenen Fall ab, dass ein Worker-Restart ohne App-Restart passiert.
@@ -576,6 +647,8 @@ class DownloadService:
                 logger.info(f"Titel-Fixup: {fixed} queued Jobs mit echtem Titel aktualisiert")
         except Exception as e:
             logger.warning(f"Titel-Fixup Fehler: {e}")
+        # Vor dem Neustart vorgemerktes faststart fortsetzen
+        await self.resume_faststart()
         self._worker_task = asyncio.create_task(self._queue_loop())
         self._worker_task.add_done_callback(self._on_worker_done)
         # Watchdog starten
@@ -621,12 +694,14 @@ class DownloadService:
 
     def _on_yt_retry(self, label: str, attempt: int, total: int, cat: str, msg: str):
         """Sync-Callback aus dem ytdlp_adapter bei jedem Retry-Versuch.
-        Wir kennen den aktuell aktiven Job (single-job-worker) – damit
-        können wir die Job-Description live aktualisieren, ohne den
+        Das Label beginnt mit der Video-ID → zugehöriger Job aus _running;
+        damit können wir die Job-Description live aktualisieren, ohne den
         synchronen yt-dlp-Run zu blockieren.
         Wichtig: dieser Callback wird aus dem yt-dlp-Thread aufgerufen,
         also kein await – wir scheduln einen Task im event loop."""
-        job_id = self._current_job_id
+        job_id = self._running.get((label or "")[:11])
+        if job_id is None and len(self._running) == 1:
+            job_id = next(iter(self._running.values()))
         loop = self._loop
         if not job_id or loop is None:
             return
@@ -666,6 +741,9 @@ class DownloadService:
         return {"restarted": True, "alive": self.worker_alive}
 
     async def stop_worker(self):
+        if self._faststart_task and not self._faststart_task.done():
+            self._faststart_task.cancel()
+            await asyncio.gather(self._faststart_task, return_exceptions=True)
         # Watchdog stoppen
         if getattr(self, '_watchdog_task', None) and not self._watchdog_task.done():
             self._watchdog_task.cancel()
@@ -681,8 +759,11 @@ class DownloadService:
                 pass
 
     async def _queue_loop(self):
-        # ─── Globaler Cooldown ────────────────────────
-        # Basis: aus Setting (default 30s). Bei Fehler verdoppeln bis max 7200s.
+        """Supervisor: Lanes konfigurieren, pro Lane-Slot einen Task starten.
+        restart_worker/stop_worker/Watchdog steuern nur diesen Task."""
+        # ─── Cooldown pro Lane ────────────────────────
+        # Basis: aus Setting (default 30s), je Lane skaliert. Bei Fehler
+        # verdoppeln bis max 7200s.
         from app.constants import SettingsKeys as K, Defaults as D
         try:
             row = await db.fetch_one(
@@ -691,108 +772,272 @@ class DownloadService:
             self._cooldown_base = int(row["value"]) if row and row["value"] else D.COOLDOWN_BASE_S
         except Exception:
             self._cooldown_base = D.COOLDOWN_BASE_S
-        self._cooldown = self._cooldown_base    # aktuelle Wartezeit in Sekunden
         self._cooldown_max = D.COOLDOWN_HARD_MAX_S
-        self._cooldown_until = 0.0              # Timestamp wann Cooldown endet
-        self._cooldown_active = False           # True während countdown läuft
+        await self._configure_lanes()
 
-        while True:
+        slots = [
+            asyncio.create_task(self._lane_slot(lane))
+            for lane in self._lanes.values()
+            for _ in range(lane.concurrency)
+        ]
+        try:
+            await asyncio.gather(*slots)
+        finally:
+            running = slots + list(self._post_tasks)
+            for t in running:
+                t.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            self._claimed.clear()
+
+    async def _configure_lanes(self):
+        """Parallelität je Lane aus den Settings, Cooldown-Zustand zurücksetzen."""
+        for lane in self._lanes.values():
+            default = MAX_CONCURRENT_DOWNLOADS if lane.name == "video" else lane.concurrency
             try:
-                # Retry-Wait Items prüfen: zurück auf queued wenn Zeit abgelaufen
-                now = now_sqlite()
-                retry_rows = await db.fetch_all(
-                    "SELECT id, metadata FROM jobs WHERE type='download' AND status='retry_wait'"
-                )
-                for rr in retry_rows:
-                    meta = json.loads(rr["metadata"] or "{}")
-                    if meta.get("retry_after") and meta["retry_after"] <= now:
-                        # retry_count NICHT reset — Retry-Zähler muss erhalten bleiben
-                        await job_service.requeue(rr["id"], reset_retry=False, reset_progress=False)
-
-                # Warten wenn Queue pausiert ist (User-Pause oder max-Cooldown-Pause)
-                if job_service.is_paused():
-                    await asyncio.sleep(3)
-                    continue
-
-                # Warten wenn ein SYSTEM-Job aktiv ist (Channel-Scan, Cleanup etc.)
-                # RSS-Cycles laufen parallel zu Downloads – KEIN gegenseitiges Blockieren!
-                has_blocking_job = await db.fetch_val(
-                    """SELECT COUNT(*) FROM jobs
-                       WHERE status='active'
-                       AND type NOT IN ('download', 'rss_cycle', 'avatar_fetch')"""
-                )
-                if has_blocking_job:
-                    await asyncio.sleep(3)
-                    continue
-
-                item = await db.fetch_one(
-                    "SELECT * FROM jobs WHERE type='download' AND status='queued' ORDER BY priority DESC, created_at ASC LIMIT 1"
-                )
-                if item:
+                lane.concurrency = max(1, int(await self._get_setting(lane.concurrency_key, str(default))))
+            except (ValueError, TypeError):
+                lane.concurrency = max(1, default)
+            lane.cooldown = lane.base_cooldown(self._cooldown_base)
+            lane.cooldown_until = 0.0
+            lane.cooldown_active = False
+            lane.gate = asyncio.Lock()  # an den Loop dieses Tasks binden
+        self._pick_lock = asyncio.Lock()
+        self._post_slots = asyncio.Semaphore(POST_PROCESS_CONCURRENCY)
+        self._post_held.clear()
+        logger.info("Download-Lanes: " + ", ".join(
+            f"{l.name}×{l.concurrency}" for l in self._lanes.values()))
+
+    async def _lane_slot(self, lane: DownloadLane):
+        """Ein Slot einer Lane: nächsten passenden Job reservieren, Lane-
+        Cooldown abwarten, verarbeiten. Schläft, solange es nichts zu tun gibt.
+        Nach der Netzwerk-Phase des Jobs ist der Slot wieder frei (Pipeline)."""
+        wake = asyncio.Event()
+        self._wake_events.add(wake)
+        try:
+            while True:
+                try:
+                    # Vor den Abfragen leeren: was danach eintrifft, weckt erneut
+                    wake.clear()
+                    item, next_due = await self._claim_next(lane)
+                    if item is None:
+                        await self._wait_for_work(wake, next_due)
+                        continue
                     job_id = item["id"]
+                    try:
+                        # Cooldown VOR dem eigentlichen Download abwarten – pro Lane,
+                        # Starts innerhalb einer Lane laufen gestaffelt durch das Gate.
+                        # Job bleibt 'queued' während Cooldown → blockiert nichts!
+                        async with lane.gate:
+                            await self._lane_cooldown(lane)
+                            # Nach Cooldown: Pause / System-Job / inzwischen abgebrochen?
+                            # → Reservierung freigeben, nächste Runde entscheidet neu
+                            if job_service.is_paused():
+                                continue
+                            if await self._blocking_job_active():
+                                logger.info(f"Download {job_id} yielding to active system job")
+                                continue
+                            current = await job_service.get(job_id)
+                            if not current or current["status"] != "queued":
+                                continue
+                            # JETZT erst als aktiv markieren – Download startet wirklich.
+                            await job_service.start(job_id, exclusive=False)
+                        await self._run_pipelined(lane, item)
+                    finally:
+                        self._claimed.discard(job_id)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Worker error ({lane.name}): {e}", exc_info=True)
+                    await asyncio.sleep(5)
+        finally:
+            self._wake_events.discard(wake)
+
+    async def _claim_next(self, lane: DownloadLane) -> tuple[Optional[dict], Optional[str]]:
+        """Fällige Retries befördern und den nächsten queued-Job der Lane
+        reservieren. Rückgabe: (Job oder None, nächster retry_after)."""
+        async with self._pick_lock:
+            next_due = await self._promote_due_retries()
+
+            # Warten wenn Queue pausiert ist (User-Pause oder max-Cooldown-Pause)
+            # → resume_queue() weckt über notify
+            if job_service.is_paused():
+                return None, None
+
+            # Warten wenn ein SYSTEM-Job aktiv ist (Channel-Scan, Cleanup etc.)
+            # RSS-Cycles laufen parallel zu Downloads – KEIN gegenseitiges Blockieren!
+            if await self._blocking_job_active():
+                return None, next_due
+
+            claimed = tuple(self._claimed)
+            exclude = f" AND id NOT IN ({','.join('?' * len(claimed))})" if claimed else ""
+            item = await db.fetch_one(
+                f"""SELECT * FROM jobs WHERE type='download' AND status='queued'
+                    AND {lane.where}{exclude}
+                    ORDER BY priority DESC, created_at ASC LIMIT 1""",
+                claimed,
+            )
+            if item:
+                self._claimed.add(item["id"])
+                return dict(item), next_due
+            return None, next_due
+
+    async def _lane_cooldown(self, lane: DownloadLane):
+        """Cooldown der Lane mit Jitter und Live-Countdown abwarten."""
+        if lane.cooldown <= 0:
+            return
+        # Anti-Bot: ±30% Zufalls-Jitter macht den Rhythmus
+        # weniger maschinell. min 50% des Base-Werts, max +30%.
+        import random as _rnd
+        _jitter = _rnd.uniform(-0.3, 0.3)
+        _eff_cooldown = max(
+            int(lane.base_cooldown(self._cooldown_base) * 0.5),
+            int(lane.cooldown * (1.0 + _jitter)),
+        )
+        logger.info(
+            f"[cooldown:{lane.name}] base={lane.cooldown}s "
+            f"jitter={_jitter:+.2f} → effective={_eff_cooldown}s"
+        )
+        lane.cooldown_until = _time.time() + _eff_cooldown
+        lane.cooldown_active = True
+        await self._broadcast_cooldown()
+        remaining = _eff_cooldown
+        try:
+            while remaining > 0:
+                sleep_step = min(remaining, 1.0)
+                await asyncio.sleep(sleep_step)
+                remaining -= sleep_step
+                # LIVE-Reaktion: wenn User den Cooldown während Warten senkt,
+                # Countdown entsprechend kürzen (z.B. von 30s auf 5s).
+                if remaining > lane.cooldown:
+                    remaining = lane.cooldown
+                lane.cooldown_until = _time.time() + remaining
+                if remaining <= 0 or int(remaining) % 5 == 0:
+                    await self._broadcast_cooldown()
+        finally:
+            lane.cooldown_active = False
+            lane.cooldown_until = 0.0
+        await self._broadcast_cooldown()
 
-                    # Cooldown VOR dem eigentlichen Download abwarten
-                    # Job bleibt 'queued' während Cooldown → blockiert nichts!
-                    if self._cooldown > 0:
-                        # Anti-Bot: ±30% Zufalls-Jitter macht den Rhythmus
-                        # weniger maschinell. min 50% des Base-Werts, max +30%.
-                        import random as _rnd
-                        _jitter = _rnd.uniform(-0.3, 0.3)
-                        _eff_cooldown = max(
-                            int(self._cooldown_base * 0.5),
-                            int(self._cooldown * (1.0 + _jitter)),
-                        )
-                        logger.info(
-                            f"[cooldown] base={self._cooldown}s "
-                            f"jitter={_jitter:+.2f} → effective={_eff_cooldown}s"
-                        )
-                        self._cooldown_until = _time.time() + _eff_cooldown
-                        self._cooldown_active = True
-                        await self._broadcast_cooldown()
-                        remaining = _eff_cooldown
-                        while remaining > 0:
-                            sleep_step = min(remaining, 1.0)
-                            await asyncio.sleep(sleep_step)
-                            remaining -= sleep_step
-                            # LIVE-Reaktion: wenn User _cooldown während Warten senkt,
-                            # Countdown entsprechend kürzen (z.B. von 30s auf 5s).
-                            if remaining > self._cooldown:
-                                remaining = self._cooldown
-                            self._cooldown_until = _time.time() + remaining
-                            if remaining <= 0 or int(remaining) % 5 == 0:
-                                await self._broadcast_cooldown()
-                        self._cooldown_active = False
-                        self._cooldown_until = 0.0
-                        await self._broadcast_cooldown()
-
-                        # Nach Cooldown: Pause prüfen
-                        if job_service.is_paused():
-                            continue
-
-                        # System-Job aktiv? → warten
-                        has_system = await db.fetch_val(
-                            """SELECT COUNT(*) FROM jobs
-                               WHERE status='active'
-                               AND type NOT IN ('download', 'rss_cycle', 'avatar_fetch')"""
-                        )
-                        if has_system:
-                            logger.info(f"Download {job_id} yielding to active system job")
-                            await asyncio.sleep(3)
-                            continue
-
-                    # JETZT erst als aktiv markieren – Download startet wirklich.
-                    # Doppel-start aus _process entfernt: wir übernehmen hier zentral via job_service.
-                    await job_service.start(job_id, exclusive=False)
-
-                    async with self._semaphore:
-                        await self._process(dict(item))
-                else:
-                    await asyncio.sleep(2)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Worker error: {e}", exc_info=True)
-                await asyncio.sleep(5)
+    async def _run_pipelined(self, lane: DownloadLane, item: dict):
+        """Job starten und nur bis zum Ende seiner Netzwerk-Phase warten.
+        Merge/Finalize laufen danach als Post-Task weiter."""
+        job_id = item["id"]
+        network_done = asyncio.Event()
+        self._network_done[job_id] = network_done
+        run = asyncio.create_task(self._run_in_lane(lane, item))
+        waiter = asyncio.create_task(network_done.wait())
+        try:
+            await asyncio.wait({run, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            run.cancel()
+            raise
+        finally:
+            waiter.cancel()
+            self._network_done.pop(job_id, None)
+        if run.done():
+            run.result()
+            return
+        lane.finishing.add(job_id)
+        self._post_tasks.add(run)
+        run.add_done_callback(self._post_tasks.discard)
+
+    async def _release_network(self, job_id: int):
+        """Netzwerk-Phase beendet: Post-Slot belegen und den Lane-Slot
+        freigeben. Ohne Lane-Slot (direkter _process-Aufruf) wirkungslos."""
+        network_done = self._network_done.get(job_id)
+        if network_done is None:
+            return
+        with self._stage_timer(job_id, "post_wait"):
+            await self._post_slots.acquire()
+        self._post_held.add(job_id)
+        network_done.set()
+
+    @contextmanager
+    def _stage_timer(self, job_id: int, stage: str):
+        """Dauer einer Stufe in den stage_timings des Jobs verbuchen."""
+        t0 = _time.monotonic()
+        try:
+            yield
+        finally:
+            timings = self._timings.get(job_id)
+            if timings is not None:
+                timings[stage] = round(_time.monotonic() - t0, 2)
+
+    async def _run_in_lane(self, lane: DownloadLane, item: dict):
+        """Job verarbeiten und in den Lane-Metriken verbuchen."""
+        lane.started += 1
+        lane.active.add(item["id"])
+        t0 = _time.monotonic()
+        size = None
+        try:
+            size = await self._process(item, lane)
+        finally:
+            lane.active.discard(item["id"])
+            lane.finishing.discard(item["id"])
+            if item["id"] in self._post_held:
+                self._post_held.discard(item["id"])
+                self._post_slots.release()
+            lane.record(size is not None, _time.monotonic() - t0, size or 0)
+
+    def get_lane_stats(self) -> list[dict]:
+        """Lane-Zustand + Durchsatz für Queue-Ansicht und Status-Endpoint."""
+        return [l.snapshot(self._cooldown_base) for l in self._lanes.values()]
+
+    # --- Queue-Signal ---
+
+    def kick(self):
+        """Alle wartenden Lane-Slots wecken."""
+        for ev in self._wake_events:
+            ev.set()
+
+    async def _on_job_event(self, event: dict):
+        """job_service-Listener: weckt den Worker nur bei Ereignissen, die die
+        Queue betreffen – Fortschritts-Updates bleiben folgenlos."""
+        job = event.get("job") or {}
+        jtype, status = job.get("type"), job.get("status")
+        if jtype == "download":
+            # neu/zurück in Queue, oder neuer retry_after → Timer neu berechnen
+            if status in ("queued", "retry_wait"):
+                self.kick()
+        elif jtype == "queue_resumed" or status in ("done", "error", "cancelled", "parked"):
+            # Resume, oder ein (evtl. blockierender) System-Job ist beendet
+            self.kick()
+
+    async def _promote_due_retries(self) -> Optional[str]:
+        """Fällige retry_wait-Downloads zurück auf queued (Index auf retry_after).
+        Rückgabe: nächster retry_after-Zeitpunkt oder None."""
+        due = await db.fetch_all(
+            "SELECT id FROM jobs WHERE type='download' AND status='retry_wait' AND retry_after <= ?",
+            (now_sqlite(),)
+        )
+        for r in due:
+            # retry_count NICHT reset — Retry-Zähler muss erhalten bleiben
+            await job_service.requeue(r["id"], reset_retry=False, reset_progress=False)
+        return await db.fetch_val(
+            "SELECT MIN(retry_after) FROM jobs WHERE type='download' AND status='retry_wait'"
+        )
+
+    async def _blocking_job_active(self) -> bool:
+        """Aktiver System-Job, dem Downloads den Vortritt lassen."""
+        return bool(await db.fetch_val(
+            """SELECT COUNT(*) FROM jobs
+               WHERE status='active'
+               AND type NOT IN ('download', 'rss_cycle', 'avatar_fetch')"""
+        ))
+
+    async def _wait_for_work(self, wake: asyncio.Event, next_due: Optional[str] = None):
+        """Schlafen bis kick() oder bis der nächste Retry fällig ist."""
+        timeout = QUEUE_IDLE_FALLBACK
+        if next_due:
+            try:
+                due = datetime.strptime(next_due, "%Y-%m-%d %H:%M:%S")
+                timeout = min(timeout, max((due - datetime.now()).total_seconds(), 0.05))
+            except ValueError:
+                pass
+        try:
+            await asyncio.wait_for(wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
 
     async def _broadcast_cooldown(self):
         """Cooldown-Status an Frontend senden (inkl. aktueller Throttle-Wert)."""
@@ -810,6 +1055,7 @@ class DownloadService:
             "cooldown_remaining": round(remaining),
             "cooldown_active": self._cooldown_active,
             "current_throttle_kbps": current_throttle,
+            "lanes": self.get_lane_stats(),
         })
 
     async def _throttle_broadcast_loop(self):
@@ -840,9 +1086,10 @@ class DownloadService:
             if new_base != self._cooldown_base:
                 logger.info(f"Cooldown-Base: {self._cooldown_base}s → {new_base}s (aktuell={self._cooldown}s)")
                 self._cooldown_base = max(0, new_base)
-                # IMMER den aktiven _cooldown auf neuen Base setzen – User-Input
-                # hat Vorrang ueber Backoff-Eskalation.
-                self._cooldown = self._cooldown_base
+                # IMMER den aktiven Cooldown aller Lanes auf neuen Base setzen –
+                # User-Input hat Vorrang ueber Backoff-Eskalation.
+                for lane in self._lanes.values():
+                    lane.cooldown = lane.base_cooldown(self._cooldown_base)
                 await self._broadcast_cooldown()
         except Exception as e:
             logger.warning(f"reload_cooldown_base failed: {e}")
@@ -855,11 +1102,13 @@ class DownloadService:
             "cooldown_base": getattr(self, '_cooldown_base', 30),
             "cooldown_remaining": round(remaining),
             "cooldown_active": getattr(self, '_cooldown_active', False),
+            "lanes": self.get_lane_stats(),
         }
 
     # --- Download-Pipeline ---
 
-    async def _process(self, item: dict):
+    async def _process(self, item: dict, lane: Optional[DownloadLane] = None) -> Optional[int]:
+        """Einen Download-Job ausführen. Rückgabe: Dateigröße bei Erfolg, sonst None."""
         job_id = item["id"]
         meta_raw = json.loads(item.get("metadata") or "{}")
         vid = meta_raw.get("video_id", "")
@@ -884,6 +1133,7 @@ class DownloadService:
                     "DELETE FROM jobs WHERE type='download' AND json_extract(metadata, '$.video_id') = ?",
                     (vid,),
                 )
+                counts_service.invalidate("jobs")
                 await self._ws_broadcast({
                     "job_id": job_id, "queue_id": job_id, "video_id": vid,
                     "status": "removed", "progress": 0, "stage": "removed",
@@ -892,14 +1142,21 @@ class DownloadService:
                 self._job_opts.pop(job_id, None)
                 return
 
-        # Job wurde bereits von _queue_loop via job_service.start(exclusive=False) auf active gesetzt.
+        if lane is None:
+            lane = self._lanes[lane_for(opts)]
+
+        # Job wurde bereits von _lane_slot via job_service.start(exclusive=False) auf active gesetzt.
         # KEIN zweiter start() hier — das war die Quelle von Doppel-Transitions.
 
+        self._timings[job_id] = {}
+        t_start = _time.monotonic()
         try:
-            # Stage 1: RESOLVING (rate-limited)
-            await rate_limiter.acquire("pytubefix")
+            # Stage 1: RESOLVING (rate-limited, außer Info schon im Extract-Cache)
+            if not is_cached(url):
+                await rate_limiter.acquire("pytubefix")
             await self._stage(job_id, vid, "resolving", 0.02, "Video wird aufgelöst…")
-            meta = await self._resolve(url)
+            with self._stage_timer(job_id, "resolve"):
+                meta = await self._resolve(url)
             rate_limiter.success("pytubefix")
             await self._stage(job_id, vid, "resolved", 0.05,
                               f"Gefunden: {meta['title'][:120]} ({meta['stream_count']} Streams)")
@@ -916,11 +1173,12 @@ class DownloadService:
                 pass
 
             # Stage 2+3: DOWNLOAD (rate-limited)
-            await rate_limiter.acquire("download")
+            await rate_limiter.acquire(lane.category)
             final_path, file_size, stream_info, merged = await self._download(job_id, vid, url, opts, meta)
-            rate_limiter.success("download")
+            rate_limiter.success(lane.category)
 
             # Stage 4: FINALIZE
+            t_finalize = _time.monotonic()
             await self._stage(job_id, vid, "finalizing", 0.96, "Thumbnail, Kapitel & DB-Eintrag…")
             thumb = None
             if opts.get("download_thumbnail", True) and meta.get("thumbnail_url"):
@@ -968,6 +1226,8 @@ class DownloadService:
                      meta["description"], meta["duration"], meta.get("upload_date"),
                      now, thumb, meta.get("view_count"), tags_json,
                      str(final_path), file_size, source_url, video_type, now, now))
+            counts_service.invalidate("videos")
+            archive_service.invalidate_path(vid)
 
             try:
                 from app.services import text_export
@@ -987,6 +1247,7 @@ class DownloadService:
                  stream_info["quality"], stream_info["codec"],
                  str(final_path), file_size, 1 if not merged else 0)
             )
+            counts_service.invalidate("streams")
 
             # Auto-Category aus dem Abo übernehmen: wenn der Kanal dem Nutzer
             # eine Kategorie zugewiesen hat (subscriptions.category_id),
@@ -1020,6 +1281,8 @@ class DownloadService:
                 except Exception as e:
                     logger.warning(f"text_export chapters {vid}: {e}")
 
+            self._timings[job_id]["finalize"] = round(_time.monotonic() - t_finalize, 2)
+
             # DONE zuerst markieren – Captions blockieren NICHT den Abschluss!
             # Bei 429-Rate-Limits (120s Backoff) hing der Job vorher minutenlang
             # auf 100% bevor "fertig" gesetzt wurde.
@@ -1062,9 +1325,10 @@ class DownloadService:
                 pass
 
             # Erfolg → Cooldown auf Basis zurücksetzen
-            if self._cooldown > self._cooldown_base:
-                logger.info(f"Download OK → Cooldown {self._cooldown}s → {self._cooldown_base}s")
-                self._cooldown = self._cooldown_base
+            lane_base = lane.base_cooldown(self._cooldown_base)
+            if lane.cooldown > lane_base:
+                logger.info(f"Download OK ({lane.name}) → Cooldown {lane.cooldown}s → {lane_base}s")
+                lane.cooldown = lane_base
 
             # Like/Dislike-Daten abrufen (Return YouTube Dislike API)
             try:
@@ -1073,10 +1337,12 @@ class DownloadService:
             except Exception as e:
                 logger.debug(f"RYD-Fetch für {vid}: {e}")
 
+            return file_size
+
         except Exception as e:
             err = str(e)[:500]
             logger.error(f"[ERR] {vid}: {e}", exc_info=True)
-            rate_limiter.error("download", str(e)[:200])
+            rate_limiter.error(lane.category, str(e)[:200])
 
             # Auto-Retry bei Throttle/Rate-Limit/Temporary Fehlern
             retry_count = meta_raw.get("retry_count", 0) or 0
@@ -1117,6 +1383,7 @@ class DownloadService:
                     "DELETE FROM jobs WHERE type='download' AND json_extract(metadata, '$.video_id') = ?",
                     (vid,),
                 )
+                counts_service.invalidate("jobs")
                 await self._ws_broadcast({
                     "job_id": job_id, "queue_id": job_id, "video_id": vid,
                     "status": "removed", "progress": 0, "stage": "removed",
@@ -1179,6 +1446,7 @@ class DownloadService:
                     "DELETE FROM jobs WHERE type='download' AND json_extract(metadata, '$.video_id') = ?",
                     (vid,),
                 )
+                counts_service.invalidate("jobs")
                 await self._ws_broadcast({
                     "job_id": job_id, "queue_id": job_id, "video_id": vid,
                     "status": "removed", "progress": 0, "stage": "removed",
@@ -1211,20 +1479,22 @@ class DownloadService:
                 logger.info(f"[RETRY] {vid}: Retry {retry_count + 1} in {delay}s ({('throttle' if is_throttle else 'temporary')})")
 
                 # Adaptive Cooldown hochschrauben
-                old_cd = self._cooldown
+                old_cd = lane.cooldown
                 if is_bot:
-                    # Bot-Erkennung: sofort auf mindestens 1 Stunde
-                    self._cooldown = max(3600, self._cooldown)
-                    logger.warning(f"Bot-Erkennung bei {vid} → Cooldown {old_cd}s → {self._cooldown}s (1h Minimum)")
+                    # Bot-Erkennung gilt für die IP, nicht nur die Lane:
+                    # alle Lanes sofort auf mindestens 1 Stunde
+                    for l in self._lanes.values():
+                        l.cooldown = max(3600, l.cooldown)
+                    logger.warning(f"Bot-Erkennung bei {vid} → Cooldown {old_cd}s → {lane.cooldown}s (1h Minimum, alle Lanes)")
                 else:
-                    self._cooldown = min(self._cooldown * 2, self._cooldown_max)
-                    logger.warning(f"Rate-Limit bei {vid} → Cooldown {old_cd}s → {self._cooldown}s")
+                    lane.cooldown = min(lane.cooldown * 2, self._cooldown_max)
+                    logger.warning(f"Rate-Limit bei {vid} ({lane.name}) → Cooldown {old_cd}s → {lane.cooldown}s")
 
                 # Bei Maximum (2h) erreicht → harte Pause wie User
-                if self._cooldown >= self._cooldown_max:
+                if lane.cooldown >= self._cooldown_max:
                     if not job_service.is_paused():
                         await job_service.pause_queue("rate_limit")
-                        self._cooldown = self._cooldown_base  # Reset für nächsten Start
+                        lane.cooldown = lane.base_cooldown(self._cooldown_base)  # Reset für nächsten Start
                         logger.warning(f"Cooldown-Maximum ({self._cooldown_max}s) erreicht → Queue pausiert")
 
             elif (is_throttle or is_temporary or is_bot) and retry_count >= max_retries:
@@ -1249,6 +1519,7 @@ class DownloadService:
             _last_ws_time.pop(job_id, None)
             self._job_opts.pop(job_id, None)
             self._rate_samples.pop(job_id, None)
+            await self._save_timings(job_id, lane, _time.monotonic() - t_start)
             # Safety-Net: falls der Job trotzdem noch auf 'active' steht
             # (Exception im Exception-Handler, Netz-Ausfall etc.) → auf error setzen.
             # Verhindert Zombie-"active"-Einträge wie in der pytubefix-Nacht.
@@ -1268,6 +1539,22 @@ class DownloadService:
                     f"Safety-Net-Fehler für Job #{job_id}: {_safety_err}", exc_info=True
                 )
 
+    async def _save_timings(self, job_id: int, lane: DownloadLane, total: float):
+        """Stufen-Zeiten in jobs.metadata.stage_timings + Lane-Mittelwerte."""
+        timings = self._timings.pop(job_id, None)
+        if not timings:
+            return
+        timings["total"] = round(total, 2)
+        lane.record_stages(timings)
+        try:
+            await db.execute(
+                """UPDATE jobs SET metadata = json_set(COALESCE(metadata, '{}'),
+                   '$.stage_timings', json(?)) WHERE id = ?""",
+                (json.dumps(timings), job_id),
+            )
+        except Exception as e:
+            logger.debug(f"stage_timings #{job_id}: {e}")
+
     async def _resolve(self, url: str) -> dict:
         def _r():
             yt = make_youtube(url)
@@ -1305,14 +1592,12 @@ class DownloadService:
         return result
 
     async def _download(self, job_id: int, vid: str, url: str, opts: dict, meta: dict):
-        # Tracking fürs Retry-Hook: welcher Job läuft gerade?
-        self._current_job_id = job_id
-        self._current_video_id = vid
+        # Tracking fürs Retry-Hook: welcher Job lädt dieses Video?
+        self._running[vid] = job_id
         try:
             return await self._download_inner(job_id, vid, url, opts, meta)
         finally:
-            self._current_job_id = None
-            self._current_video_id = None
+            self._running.pop(vid, None)
 
     async def _download_inner(self, job_id: int, vid: str, url: str, opts: dict, meta: dict):
         quality = opts.get("quality", DEFAULT_QUALITY)
@@ -1324,23 +1609,26 @@ class DownloadService:
 
         vdir = VIDEOS_DIR / vid
         vdir.mkdir(parents=True, exist_ok=True)
-        dl = {"phase": "audio" if is_audio_only else "video", "done": 0, "total": 0}
+        # Fortschritt je Stream (itag → (done, total)); Video und Audio laden
+        # parallel, Gesamtfortschritt nach Bytes über beide Streams. Die Keys
+        # stehen vor dem Start fest – die Threads ersetzen nur Werte.
+        dl = {"parts": {}, "kinds": {}}
 
         def _on_progress(stream, chunk, remaining):
-            total = stream.filesize
-            if total <= 0:
+            stream_total = stream.filesize
+            key = str(stream.itag)
+            if stream_total <= 0 or key not in dl["parts"]:
                 return
-            done = total - remaining
-            dl["done"] = done
-            dl["total"] = total
+            dl["parts"][key] = (stream_total - remaining, stream_total)
+            done = sum(d for d, _ in dl["parts"].values())
+            total = sum(t for _, t in dl["parts"].values())
             pct = done / total
-
-            if dl["phase"] == "video":
-                overall = 0.05 + pct * 0.55
-            elif is_audio_only:
-                overall = 0.05 + pct * 0.85
-            else:
-                overall = 0.60 + pct * 0.30
+            overall = 0.05 + pct * 0.85
+            # Stufe: Video, solange die Video-Spur läuft, danach Audio
+            phase = "audio"
+            for itag, (d, t) in dl["parts"].items():
+                if dl["kinds"].get(itag) == "video" and d < t:
+                    phase = "video"
 
             now_t = time.time()
             if now_t - _last_ws_time.get(job_id, 0) < WS_THROTTLE:
@@ -1365,7 +1653,10 @@ class DownloadService:
 
             mb_d = done / 1048576
             mb_t = total / 1048576
-            phase_label = "Video" if dl["phase"] == "video" else "Audio"
+            if len(dl["parts"]) > 1:
+                phase_label = "Video + Audio"
+            else:
+                phase_label = "Video" if phase == "video" else "Audio"
             label_parts = [f"{phase_label}: {mb_d:.1f}/{mb_t:.1f} MB ({pct*100:.0f}%)"]
             if eta_sec is not None and eta_sec > 0:
                 if eta_sec < 60:
@@ -1384,14 +1675,14 @@ class DownloadService:
             self._ws_broadcast_sync({
                 "job_id": job_id, "queue_id": job_id, "video_id": vid, "status": "active",
                 "progress": round(overall, 3),
-                "stage": f"downloading_{dl['phase']}",
+                "stage": f"downloading_{phase}",
                 "stage_label": " · ".join(label_parts),
                 "bytes_done": done, "bytes_total": total,
                 "eta_seconds": eta_sec,
                 "rate_bps": rate_bps,
             })
 
-        def _do():
+        def _select():
             yt = make_youtube(url, on_progress_callback=_on_progress)
             vs = None
             aus = None
@@ -1427,51 +1718,99 @@ class DownloadService:
                     vs = yt.streams.get_highest_resolution()
             if not vs:
                 raise ValueError("Kein passender Stream")
+            return vs, aus if adaptive else None, adaptive
 
-            dl["phase"] = "audio" if is_audio_only else "video"
-            suffix = vs.subtype or ("m4a" if is_audio_only else "mp4")
-            vf = f"{'audio' if is_audio_only else 'video'}_tmp.{suffix}"
-            vpath = vs.download(output_path=str(vdir), filename=vf)
-
-            apath = None
-            if adaptive and aus:
-                dl["phase"] = "audio"
-                dl["done"] = 0
-                dl["total"] = 0
-                af = f"audio_tmp.{aus.subtype or 'mp4'}"
-                apath = aus.download(output_path=str(vdir), filename=af)
+        def _fetch(stream, filename: str, stage: str):
+            with self._stage_timer(job_id, stage):
+                return stream.download(output_path=str(vdir), filename=filename)
 
-            si = {
+        def _stream_info(vs):
+            return {
                 "type": vs.type, "itag": vs.itag, "mime": vs.mime_type,
                 "quality": getattr(vs, "resolution", None) or getattr(vs, "abr", None),
                 "codec": vs.codecs[0] if vs.codecs else None,
             }
-            return vpath, apath, adaptive, si
 
         stage_name = "downloading_audio" if is_audio_only else "downloading_video"
         stage_label = "Audio wird heruntergeladen…" if is_audio_only else "Video wird heruntergeladen…"
         await self._stage(job_id, vid, stage_name, 0.06, stage_label)
 
-        vpath, apath, adaptive, si = await asyncio.get_event_loop().run_in_executor(None, _do)
+        loop = asyncio.get_event_loop()
+        with self._stage_timer(job_id, "download"):
+            vs, aus, adaptive = await loop.run_in_executor(None, _select)
+            dl["kinds"][str(vs.itag)] = "audio" if is_audio_only else "video"
+            dl["parts"][str(vs.itag)] = (0, 0)
+            suffix = vs.subtype or ("m4a" if is_audio_only else "mp4")
+            vf = f"{'audio' if is_audio_only else 'video'}_tmp.{suffix}"
+            fetches = [loop.run_in_executor(
+                None, _fetch, vs, vf, "download_audio" if is_audio_only else "download_video")]
+            if aus:
+                # Audio-Spur parallel zur Video-Spur laden
+                dl["kinds"][str(aus.itag)] = "audio"
+                dl["parts"][str(aus.itag)] = (0, 0)
+                fetches.append(loop.run_in_executor(
+                    None, _fetch, aus, f"audio_tmp.{aus.subtype or 'mp4'}", "download_audio"))
+            # Beide Threads abwarten, auch wenn einer scheitert – erst dann Fehler werfen
+            results = await asyncio.gather(*fetches, return_exceptions=True)
+        for r in results:
+            if isinstance(r, BaseException):
+                raise r
+        vpath, apath = results[0], (results[1] if aus else None)
+        si = _stream_info(vs)
+
+        # Netzwerk-Phase vorbei → Lane-Slot frei für den nächsten Job
+        await self._release_network(job_id)
 
         final = vpath
         if adaptive and apath:
             duration = meta.get("duration", 0) or 0
             await self._stage(job_id, vid, "merging", 0.90, "FFmpeg: Merge wird vorbereitet…")
-            final = await self._ffmpeg_merge(vdir, vpath, apath, duration, job_id, vid)
+            with self._stage_timer(job_id, "merge"):
+                final = await self._ffmpeg_merge(vdir, vpath, apath, duration, job_id, vid)
 
         fsize = Path(final).stat().st_size
         return final, fsize, si, adaptive
 
+    async def _probe_codec(self, path: str, kind: str) -> Optional[str]:
+        """codec_name der ersten Video- ("v") bzw. Audio-Spur ("a") per ffprobe."""
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "ffprobe", "-v", "error", "-select_streams", f"{kind}:0",
+                "-show_entries", "stream=codec_name", "-of", "default=nw=1:nk=1", path,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+            )
+            out, _ = await asyncio.wait_for(proc.communicate(), timeout=30)
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.warning(f"ffprobe {path}: {e}")
+            return None
+        codec = out.decode("utf-8", errors="replace").strip().splitlines()
+        return codec[0] if proc.returncode == 0 and codec else None
+
+    async def _merge_plan(self, vpath: str, apath: str) -> MergePlan:
+        """Container/Audio-Copy/faststart aus ffprobe + Settings."""
+        from app.constants import SettingsKeys as K
+        vcodec, acodec = await asyncio.gather(
+            self._probe_codec(vpath, "v"), self._probe_codec(apath, "a"))
+        result = plan_merge(
+            vcodec, acodec,
+            container=await self._get_setting(K.DOWNLOAD_MERGE_CONTAINER, "mp4"),
+            faststart=await self._get_setting(K.DOWNLOAD_FASTSTART, "deferred"),
+        )
+        logger.info(f"[MERGE] video={vcodec} audio={acodec} → .{result.ext} "
+                    f"({'copy' if result.copy_audio else 'aac'}"
+                    f"{', faststart' if result.faststart else ''}"
+                    f"{', faststart später' if result.defer_faststart else ''})")
+        return result
+
     async def _ffmpeg_merge(self, vdir: Path, vpath: str, apath: str,
                             duration: float = 0, job_id: int = 0, vid: str = "") -> str:
         """FFmpeg Merge mit Live-Fortschritt via stderr-Parsing."""
-        out = str(vdir / "video.mp4")
+        merge_plan = await self._merge_plan(vpath, apath)
+        out = str(vdir / f"video.{merge_plan.ext}")
         cmd = [
             "ffmpeg", "-y",
             "-i", vpath, "-i", apath,
-            "-c:v", "copy", "-c:a", "aac",
-            "-movflags", "+faststart",
+            *merge_plan.ffmpeg_args(),
             "-progress", "pipe:2",   # Fortschritt auf stderr
             out,
         ]
@@ -1530,14 +1869,84 @@ class DownloadService:
             # Restliche stderr für Fehler
             raise RuntimeError(f"FFmpeg Fehler (code {proc.returncode})")
 
-        # Temp-Dateien aufräumen
-        for f in (vpath, apath):
+        # Temp-Dateien aufräumen, ebenso ein altes video.* in anderem Container
+        # (Re-Download mit geänderter Container-Einstellung)
+        stale = [str(p) for p in vdir.glob("video.*")
+                 if p.suffix in (".mp4", ".webm", ".mkv") and str(p) != out]
+        for f in (vpath, apath, *stale):
             try:
                 os.remove(f)
             except OSError:
                 pass
+        if merge_plan.defer_faststart and vid:
+            await self._defer_faststart(vid, out)
         return out
 
+    # --- Nachgelagertes faststart (Leerlauf) ---
+
+    async def _defer_faststart(self, vid: str, path: str):
+        """faststart für eine gemergte MP4 vormerken (persistent, überlebt
+        Neustarts); läuft, sobald kein Job aktiv ist."""
+        await db.execute(
+            "INSERT OR REPLACE INTO faststart_pending (video_id, path, queued_at) VALUES (?, ?, ?)",
+            (vid, path, now_sqlite()))
+        self._start_faststart_loop()
+
+    async def resume_faststart(self) -> int:
+        """Nach einem Neustart: offene Vormerkungen wieder abarbeiten."""
+        pending = await db.fetch_val("SELECT COUNT(*) FROM faststart_pending") or 0
+        if pending:
+            logger.info(f"[FASTSTART] {pending} vorgemerkte Datei(en) aus letztem Lauf")
+            self._start_faststart_loop()
+        return pending
+
+    def _start_faststart_loop(self):
+        if self._faststart_task is None or self._faststart_task.done():
+            self._faststart_task = asyncio.create_task(self._faststart_loop())
+
+    async def _faststart_loop(self):
+        while True:
+            active = await db.fetch_val("SELECT COUNT(*) FROM jobs WHERE status = 'active'")
+            if active:
+                await asyncio.sleep(FASTSTART_IDLE_POLL)
+                continue
+            row = await db.fetch_one(
+                "SELECT video_id, path FROM faststart_pending ORDER BY queued_at, video_id LIMIT 1")
+            if not row:
+                return
+            try:
+                await self._apply_faststart(row["video_id"], Path(row["path"]))
+            except Exception as e:
+                logger.warning(f"[FASTSTART] {row['video_id']}: {e}")
+            finally:
+                # Auch bei Fehlern austragen – sonst hinge der Task an einer kaputten Datei
+                await db.execute(
+                    "DELETE FROM faststart_pending WHERE video_id = ? AND path = ?",
+                    (row["video_id"], row["path"]))
+
+    async def _apply_faststart(self, vid: str, path: Path):
+        """moov-Atom per Remux (-c copy) an den Dateianfang, Datei atomar ersetzen."""
+        current = await db.fetch_val("SELECT file_path FROM videos WHERE id = ?", (vid,))
+        if current != str(path) or not path.exists():
+            return  # inzwischen gelöscht, verschoben oder neu geladen
+        tmp = path.with_name(f"{path.stem}.faststart{path.suffix}")
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-y", "-v", "error", "-i", str(path),
+            "-map", "0", "-c", "copy", "-movflags", "+faststart", str(tmp),
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+        )
+        _, err = await proc.communicate()
+        if proc.returncode != 0 or not tmp.exists():
+            tmp.unlink(missing_ok=True)
+            raise RuntimeError(f"FFmpeg faststart (code {proc.returncode}): "
+                               f"{err.decode('utf-8', errors='replace')[-200:]}")
+        os.replace(tmp, path)
+        size = path.stat().st_size
+        await db.execute("UPDATE videos SET file_size = ? WHERE id = ?", (size, vid))
+        await db.execute("UPDATE streams SET file_size = ? WHERE video_id = ? AND file_path = ?",
+                         (size, vid, str(path)))
+        logger.info(f"[FASTSTART] {vid}: moov nach vorn ({size / 1048576:.1f} MB)")
+
     def _pick_progressive(self, yt, quality, fmt):
         if quality == "audio_only":
             return yt.streams.get_audio_only()
@@ -1600,7 +2009,6 @@ class DownloadService:
         return int(r.replace("p","")) if r.replace("p","").isdigit() else 0
 
     async def _dl_thumbnail(self, vid: str, url: str) -> Optional[str]:
-        import httpx
         tdir = THUMBNAILS_DIR / vid
         tp = tdir / "thumbnail.jpg"
         if tp.exists():
@@ -1608,12 +2016,13 @@ class DownloadService:
         tdir.mkdir(parents=True, exist_ok=True)
         try:
             await rate_limiter.acquire("thumbnail")
-            async with httpx.AsyncClient() as c:
-                r = await c.get(url, follow_redirects=True, timeout=15)
-                r.raise_for_status()
-                tp.write_bytes(r.content)
-                rate_limiter.success("thumbnail")
-                return str(tp)
+            r = await http_clients.get(url, category="thumbnail", timeout=15)
+            r.raise_for_status()
+            tp.write_bytes(r.content)
+            rate_limiter.success("thumbnail")
+            # Grid-Varianten gleich mit erzeugen (Prozess-Pool, im Hintergrund)
+            thumbnail_derivative_service.warm(tp)
+            return str(tp)
         except Exception as e:
             rate_limiter.error("thumbnail", str(e)[:200])
             logger.warning(f"Thumb fail {vid}: {e}")
@@ -1776,6 +2185,7 @@ class DownloadService:
             "cancelled_count": qc["cancelled"],
             "retry_wait_count": qc["retry_wait"],
             "failed_count": qc["failed"],             # error+parked (cancelled separat)
+            "lanes": self.get_lane_stats(),
         }
 
     async def cancel_download(self, job_id: int):
@@ -1813,6 +2223,7 @@ class DownloadService:
 
     async def clear_completed(self):
         await db.execute("DELETE FROM jobs WHERE type='download' AND status IN ('done','cancelled')")
+        counts_service.invalidate("jobs")
 
 
 download_service = DownloadService()
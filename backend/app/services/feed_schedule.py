@@ -0,0 +1,134 @@
+"""
+Adaptive Feed-Planung pro Abo (pure, keine I/O).
+
+Upload-Kadenz eines Kanals als EWMA, gespeichert als JSON in
+subscriptions.upload_cadence:
+  gap     : geglätteter Abstand zwischen zwei Uploads (Sekunden)
+  tod_x/y : geglättete Upload-Uhrzeit als Einheitsvektor (UTC); die Länge
+            (0..1) sagt, wie verlässlich der Kanal zur gleichen Zeit postet
+  last    : Zeitpunkt des letzten bekannten Uploads (epoch)
+  samples : Anzahl eingeflossener Abstände
+
+next_interval() wählt daraus die Wartezeit bis zum nächsten Check:
+  - Kadenz unbekannt (< MIN_SAMPLES): wie bisher – neue Videos → Basis,
+    sonst verdoppeln
+  - nächster Upload erwartet: kurz vorher prüfen, bei verlässlicher Uhrzeit
+    passend zur üblichen Upload-Zeit (+ TOD_SLACK)
+  - überfällig: im Basis-Intervall, mit wachsender Überfälligkeit exponentiell
+    seltener – höchstens einmal pro Kadenz (ruhende Kanäle → max_interval)
+
+Separates Modul, damit das Modell ohne DB testbar ist.
+"""
+import json
+import math
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Optional
+
+DAY = 86400
+ALPHA = 0.3               # Gewicht neuer Beobachtungen
+MIN_SAMPLES = 3           # ab so vielen Abständen gilt die Kadenz als bekannt
+LEAD = 0.1                # vor dem erwarteten Upload: Anteil der Kadenz vorher prüfen
+TOD_MIN_STRENGTH = 0.6    # Uhrzeit-Vektor ab dieser Länge nutzen
+TOD_SLACK = 1800          # nach der üblichen Upload-Zeit (Verarbeitung bei YouTube)
+OVERDUE_GROWTH = 4.0      # Exponent pro überfälliger Kadenz
+
+
+def parse_published(value: str) -> Optional[tuple[float, bool]]:
+    """rss_entries.published → (epoch, Uhrzeit bekannt).
+
+    yt-dlp (flat) liefert nur das Datum (…T00:00:00+00:00) → Uhrzeit unbekannt.
+    Zeitstempel ohne Zone gelten als lokale Zeit (wie now_sqlite())."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    has_time = not (dt.hour == 0 and dt.minute == 0 and dt.second == 0)
+    return dt.timestamp(), has_time
+
+
+@dataclass
+class Cadence:
+    gap: float = 0.0
+    tod_x: float = 0.0
+    tod_y: float = 0.0
+    last: float = 0.0
+    samples: int = 0
+
+    @classmethod
+    def from_json(cls, raw: Optional[str]) -> "Cadence":
+        try:
+            data = json.loads(raw) if raw else {}
+            return cls(**{k: data[k] for k in cls.__dataclass_fields__ if k in data})
+        except (TypeError, ValueError):
+            return cls()
+
+    def to_json(self) -> str:
+        return json.dumps({k: round(v, 4) if isinstance(v, float) else v
+                           for k, v in asdict(self).items()})
+
+    @property
+    def known(self) -> bool:
+        return self.samples >= MIN_SAMPLES and self.gap > 0
+
+    @property
+    def tod_strength(self) -> float:
+        return math.hypot(self.tod_x, self.tod_y)
+
+    @property
+    def tod_seconds(self) -> float:
+        """Übliche Upload-Uhrzeit als Sekunden seit Mitternacht (UTC)."""
+        angle = math.atan2(self.tod_y, self.tod_x) % (2 * math.pi)
+        return angle / (2 * math.pi) * DAY
+
+    def observe(self, uploads: list[tuple[float, bool]]) -> bool:
+        """Neue Uploads (epoch, Uhrzeit bekannt) einrechnen; ältere als `last`
+        werden ignoriert. True, wenn sich das Modell geändert hat."""
+        changed = False
+        for ts, has_time in sorted(uploads):
+            if ts <= self.last:
+                continue
+            if self.last:
+                gap = ts - self.last
+                self.gap = gap if self.samples == 0 else ALPHA * gap + (1 - ALPHA) * self.gap
+                self.samples += 1
+            if has_time:
+                angle = (ts % DAY) / DAY * 2 * math.pi
+                x, y = math.cos(angle), math.sin(angle)
+                if self.tod_x == 0 and self.tod_y == 0:
+                    self.tod_x, self.tod_y = x, y
+                else:
+                    self.tod_x = ALPHA * x + (1 - ALPHA) * self.tod_x
+                    self.tod_y = ALPHA * y + (1 - ALPHA) * self.tod_y
+            self.last = ts
+            changed = True
+        return changed
+
+
+def _snap_to_tod(target: float, tod: float, earliest: float) -> float:
+    """Nächstgelegene übliche Upload-Zeit (+ Slack) um target, nicht vor earliest."""
+    day_start = target - target % DAY
+    options = [day_start + offset * DAY + tod + TOD_SLACK for offset in (-1, 0, 1)]
+    options = [t for t in options if t >= earliest]
+    return min(options, key=lambda t: abs(t - target)) if options else target
+
+
+def next_interval(cadence: Cadence, now: float, base: int, max_interval: int,
+                  current: int, new_videos: int) -> int:
+    """Sekunden bis zum nächsten Check (zwischen base und max_interval)."""
+    if not cadence.known:
+        # Zu wenig Historie → bisheriges Verhalten (Basis / verdoppeln)
+        return base if new_videos else min(max(current, base) * 2, max_interval)
+
+    expected = cadence.last + cadence.gap
+    if now < expected:
+        target = max(expected - LEAD * cadence.gap, now + base)
+        if cadence.gap >= DAY / 2 and cadence.tod_strength >= TOD_MIN_STRENGTH:
+            target = _snap_to_tod(target, cadence.tod_seconds, now + base)
+    else:
+        overdue = (now - expected) / cadence.gap
+        wait = base * 2 ** min(overdue * OVERDUE_GROWTH, 30)
+        target = now + min(wait, max(base, cadence.gap))
+    return int(min(max(target - now, base), max_interval))
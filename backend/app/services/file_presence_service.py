@@ -0,0 +1,198 @@
+"""
+TubeVault – File Presence Service v1.0.1
+Datei-Existenz der Videos mit Gedächtnis: (Pfad, Größe, mtime, last_verified)
+pro Video in file_presence.
+
+- stat() läuft in Batches parallel im Thread-Pool, nie im Event-Loop
+  (zehntausende Dateien auf einer USB-Platte)
+- nur Einträge prüfen, deren letzte Prüfung älter als max_age ist
+  (Setting storage.verify_max_age_s) oder deren Pfad sich geändert hat
+- Ergebnis + Ghost-Markierung (status='ghost') in EINER Transaktion
+- genutzt von Ghost-Check (Startup), /api/system/cleanup-*, /api/system/storage
+  und dem Kanal-Filesystem-Audit
+- v1.0.1: fehlende Dateien fliegen aus dem Pfad-Cache von archive_service
+© HalloWelt42 – Private Nutzung
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.constants import SettingsKeys
+from app.database import db
+from app.services.archive_service import archive_service
+from app.utils.file_utils import now_sqlite, past_sqlite
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE_S = 21600   # 6 h
+BATCH_SIZE = 256
+POOL_WORKERS = 8
+_ID_CHUNK = 500
+
+_UPSERT_SQL = """
+    INSERT INTO file_presence (video_id, path, size, mtime_ns, present, last_verified)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(video_id) DO UPDATE SET
+        path = excluded.path, size = excluded.size, mtime_ns = excluded.mtime_ns,
+        present = excluded.present, last_verified = excluded.last_verified
+"""
+
+
+def _stat_batch(items: list[tuple[str, str]]) -> list[tuple]:
+    """(video_id, Pfad) → (video_id, Pfad, Größe, mtime_ns); Größe None = fehlt."""
+    out = []
+    for video_id, path in items:
+        try:
+            st = os.stat(path) if path else None
+        except (OSError, ValueError):
+            st = None
+        if st is None:
+            out.append((video_id, path, None, None))
+        else:
+            out.append((video_id, path, st.st_size, st.st_mtime_ns))
+    return out
+
+
+@dataclass
+class PresenceReport:
+    checked: int = 0
+    present: int = 0
+    skipped: int = 0          # zuletzt vor < max_age geprüft
+    missing: list[dict] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {"checked": self.checked, "present": self.present, "skipped": self.skipped,
+                "missing": len(self.missing), "seconds": round(self.seconds, 2)}
+
+
+class FilePresenceService:
+    """Prüft und merkt sich, ob die Videodateien noch da sind."""
+
+    def __init__(self):
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=POOL_WORKERS,
+                                            thread_name_prefix="file-presence")
+        return self._pool
+
+    def shutdown(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def max_age(self) -> int:
+        val = await db.fetch_val("SELECT value FROM settings WHERE key = ?",
+                                 (SettingsKeys.STORAGE_VERIFY_MAX_AGE_S,))
+        try:
+            return max(0, int(val))
+        except (TypeError, ValueError):
+            return DEFAULT_MAX_AGE_S
+
+    async def _stat_all(self, items: list[tuple[str, str]]) -> list[tuple]:
+        loop = asyncio.get_running_loop()
+        batches = [items[i:i + BATCH_SIZE] for i in range(0, len(items), BATCH_SIZE)]
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self._executor(), _stat_batch, b) for b in batches))
+        return [r for batch in results for r in batch]
+
+    async def verify(self, video_ids: list[str] = None, max_age: int = None,
+                     mark_ghosts: bool = True) -> PresenceReport:
+        """'ready'-Videos prüfen (alle oder video_ids).
+
+        max_age: Sekunden; jünger geprüfte Einträge mit unverändertem Pfad
+        werden übersprungen (None = Setting, 0 = alles prüfen).
+        mark_ghosts: fehlende Dateien → status='ghost' (recoverable)."""
+        t0 = time.monotonic()
+        if max_age is None:
+            max_age = await self.max_age()
+        cutoff = past_sqlite(seconds=max_age) if max_age else None
+        where, params = "v.status = 'ready'", []
+        if video_ids is not None:
+            if not video_ids:
+                return PresenceReport()
+            where += f" AND v.id IN ({','.join('?' * len(video_ids))})"
+            params += list(video_ids)
+        rows = await db.fetch_all(
+            f"""SELECT v.id, v.title, v.file_path, p.path AS known_path,
+                       p.last_verified, p.present
+                FROM videos v LEFT JOIN file_presence p ON p.video_id = v.id
+                WHERE {where}""", params)
+
+        report = PresenceReport()
+        todo = []
+        titles = {}
+        for r in rows:
+            fresh = (cutoff and r["last_verified"] and r["last_verified"] >= cutoff
+                     and r["known_path"] == (r["file_path"] or "") and r["present"])
+            if fresh:
+                report.skipped += 1
+                continue
+            todo.append((r["id"], r["file_path"] or ""))
+            titles[r["id"]] = r["title"]
+
+        results = await self._stat_all(todo)
+        now = now_sqlite()
+        async with db.transaction():
+            await db.execute_many(_UPSERT_SQL, [
+                (vid, path, size, mtime_ns, 1 if size is not None else 0, now)
+                for vid, path, size, mtime_ns in results])
+            missing = [(vid, path) for vid, path, size, _ in results if size is None]
+            if mark_ghosts and missing:
+                await db.execute_many(
+                    "UPDATE videos SET status = 'ghost' WHERE id = ? AND status = 'ready'",
+                    [(vid,) for vid, _ in missing])
+        # Player/HLS lösen sonst weiter den alten, verfügbaren Pfad auf
+        for vid, _ in missing:
+            archive_service.invalidate_path(vid)
+
+        report.checked = len(results)
+        report.present = report.checked - len(missing)
+        report.missing = [{"id": vid, "title": titles.get(vid), "file_path": path or None}
+                          for vid, path in missing]
+        report.seconds = time.monotonic() - t0
+        if missing:
+            logger.info(f"[PRESENCE] {len(missing)} von {report.checked} Dateien fehlen"
+                        f"{' → ghost' if mark_ghosts else ''}")
+        return report
+
+    async def presence(self, video_ids: list[str], max_age: int = None) -> dict[str, dict]:
+        """Existenz je Video (für Audits), ohne Ghost-Markierung.
+        Rückgabe: video_id → {present, path, size, last_verified}"""
+        result: dict[str, dict] = {}
+        for i in range(0, len(video_ids), _ID_CHUNK):
+            chunk = video_ids[i:i + _ID_CHUNK]
+            await self.verify(chunk, max_age=max_age, mark_ghosts=False)
+            rows = await db.fetch_all(
+                f"""SELECT video_id, path, size, present, last_verified FROM file_presence
+                    WHERE video_id IN ({','.join('?' * len(chunk))})""", chunk)
+            for r in rows:
+                result[r["video_id"]] = {"present": bool(r["present"]), "path": r["path"],
+                                         "size": r["size"], "last_verified": r["last_verified"]}
+        return result
+
+    async def summary(self) -> dict:
+        """Stand der letzten Prüfungen (für /api/system/storage)."""
+        row = await db.fetch_one(
+            """SELECT COUNT(*) AS tracked,
+                      COALESCE(SUM(present), 0) AS present,
+                      COALESCE(SUM(CASE WHEN present THEN size END), 0) AS bytes,
+                      MIN(last_verified) AS oldest_verified,
+                      MAX(last_verified) AS newest_verified
+               FROM file_presence p JOIN videos v ON v.id = p.video_id
+               WHERE v.status IN ('ready', 'ghost')""")
+        d = dict(row)
+        d["missing"] = d["tracked"] - d["present"]
+        d["max_age_s"] = await self.max_age()
+        return d
+
+
+# Singleton
+file_presence_service = FilePresenceService()
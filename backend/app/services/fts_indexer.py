@@ -0,0 +1,204 @@
+"""
+TubeVault – FTS-Indexer v1.0.0
+Arbeitet die fts_queue (befüllt von Triggern auf videos) im Hintergrund ab:
+Chunk aus der Queue lesen, Beschreibungs-Dateien im Thread-Pool lesen,
+Index-Einträge des Chunks in EINER Transaktion ersetzen.
+Voll-Rebuild = alle ready-Videos in die Queue + abarbeiten als Job; der alte
+Index bleibt dabei bis zum jeweiligen Chunk-Commit suchbar.
+© HalloWelt42 – Private Nutzung
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Optional
+
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 200
+POLL_INTERVAL = 5.0
+READ_WORKERS = 4
+
+
+class FtsIndexer:
+    """Batch-Indexer für videos_fts."""
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE, read_workers: int = READ_WORKERS):
+        self.chunk_size = chunk_size
+        self.read_workers = read_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._wakeup = asyncio.Event()
+        # Ein Chunk zur Zeit – sonst indizieren Loop und Rebuild denselben Chunk doppelt
+        self._chunk_lock = asyncio.Lock()
+        self._rebuild_job: Optional[int] = None
+        self.indexed = 0
+
+    def kick(self):
+        """Hintergrund-Loop sofort wecken (statt auf das Poll-Intervall zu warten)."""
+        self._wakeup.set()
+
+    async def enqueue(self, video_ids: list[str]):
+        """Videos explizit einreihen – für Änderungen, die kein Trigger sieht
+        (z.B. neu geschriebene description.txt)."""
+        if not video_ids:
+            return
+        ph = ",".join("?" * len(video_ids))
+        await db.execute(
+            f"INSERT INTO fts_queue (video_rowid) SELECT rowid FROM videos WHERE id IN ({ph})",
+            tuple(video_ids),
+        )
+        self.kick()
+
+    async def pending(self) -> int:
+        return await db.fetch_val("SELECT COUNT(*) FROM fts_queue") or 0
+
+    # ─── Abarbeiten ──────────────────────────────────────────
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.read_workers, thread_name_prefix="fts-read")
+        return self._pool
+
+    async def _read_descriptions(self, video_ids: list[str]) -> list[Optional[str]]:
+        """Beschreibungs-Dateien parallel im Thread-Pool lesen – Datei-I/O
+        bleibt aus dem Event-Loop und aus der Schreib-Transaktion raus."""
+        from app.services.text_resolver import read_description_file
+        loop = asyncio.get_running_loop()
+        pool = self._executor()
+        return await asyncio.gather(
+            *(loop.run_in_executor(pool, read_description_file, vid) for vid in video_ids))
+
+    async def process_chunk(self) -> int:
+        """Einen Chunk der Queue indizieren. Rückgabe: Anzahl Queue-Einträge."""
+        async with self._chunk_lock:
+            queued = await db.fetch_all(
+                "SELECT id, video_rowid FROM fts_queue ORDER BY id LIMIT ?",
+                (self.chunk_size,),
+            )
+            if not queued:
+                return 0
+            last_id = queued[-1]["id"]
+            rowids = list(dict.fromkeys(q["video_rowid"] for q in queued))
+
+            ph = ",".join("?" * len(rowids))
+            rows = await db.fetch_all(
+                f"""SELECT rowid, id, title, channel_name, description, tags, notes
+                    FROM videos WHERE rowid IN ({ph}) AND status = 'ready'""",
+                tuple(rowids),
+            )
+            files = await self._read_descriptions([r["id"] for r in rows])
+
+            inserts = [
+                (r["rowid"], r["id"], r["title"] or "", r["channel_name"] or "",
+                 desc or r["description"] or "", r["tags"] or "", r["notes"] or "")
+                for r, desc in zip(rows, files)
+            ]
+            # Nur Einträge bis last_id löschen – was während des Chunks neu
+            # eingereiht wurde, kommt in der nächsten Runde dran
+            async with db.transaction():
+                await db.execute_many(
+                    "DELETE FROM videos_fts WHERE rowid = ?", [(r,) for r in rowids])
+                await db.execute_many(
+                    "INSERT INTO videos_fts(rowid, id, title, channel_name, description, tags, notes) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    inserts,
+                )
+                await db.execute("DELETE FROM fts_queue WHERE id <= ?", (last_id,))
+            self.indexed += len(inserts)
+            return len(queued)
+
+    async def drain(self, progress: Callable[[int], Awaitable] | None = None) -> int:
+        """Queue leer arbeiten. progress(done) nach jedem Chunk."""
+        done = 0
+        while True:
+            n = await self.process_chunk()
+            if not n:
+                return done
+            done += n
+            if progress:
+                await progress(done)
+            await asyncio.sleep(0)  # anderen Tasks (API-Writes) den Writer lassen
+
+    async def run(self):
+        """Hintergrund-Loop (TaskManager): Queue abarbeiten, dann schlafen bis
+        kick() oder Poll-Intervall."""
+        while True:
+            try:
+                await self.drain()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"FTS-Indexer Fehler: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    # ─── Voll-Rebuild ────────────────────────────────────────
+
+    async def rebuild(self, progress: Callable[[int, int], Awaitable] | None = None) -> dict:
+        """Index komplett neu aufbauen (description File-first). Einträge nicht
+        mehr vorhandener/nicht-ready Videos werden entfernt; alle anderen
+        chunkweise ersetzt. Suchen laufen währenddessen weiter."""
+        async with db.transaction():
+            await db.execute(
+                "DELETE FROM videos_fts WHERE rowid NOT IN (SELECT rowid FROM videos WHERE status = 'ready')")
+            await db.execute(
+                "INSERT INTO fts_queue (video_rowid) SELECT rowid FROM videos WHERE status = 'ready'")
+        total = await self.pending()
+        before = self.indexed
+
+        async def _report(done):
+            if progress:
+                await progress(min(done, total), total)
+
+        await self.drain(_report)
+        count = await db.fetch_val("SELECT COUNT(*) FROM videos_fts")
+        return {"rebuilt": self.indexed - before, "fts_count": count}
+
+    async def start_rebuild_job(self) -> dict:
+        """Rebuild als sichtbaren Job im Hintergrund starten."""
+        from app.services.job_service import job_service
+
+        if self._rebuild_job is not None:
+            return {"started": False, "job_id": self._rebuild_job}
+        job = await job_service.create(
+            job_type="fts_rebuild",
+            title="Volltextindex neu aufbauen",
+            description="Videos werden eingereiht…",
+        )
+        self._rebuild_job = job["id"]
+        asyncio.create_task(self._run_rebuild_job(job["id"]))
+        return {"started": True, "job_id": job["id"]}
+
+    async def _run_rebuild_job(self, job_id: int):
+        from app.services.job_service import job_service
+
+        async def _progress(done, total):
+            await job_service.progress(
+                job_id, done / total if total else 1.0,
+                f"{done}/{total} Einträge indiziert",
+            )
+
+        try:
+            await job_service.start(job_id, exclusive=False)
+            stats = await self.rebuild(_progress)
+            await job_service.complete(
+                job_id, f"{stats['rebuilt']} Videos indiziert, Index: {stats['fts_count']}")
+        except Exception as e:
+            logger.error(f"FTS-Rebuild fehlgeschlagen: {e}")
+            await job_service.fail(job_id, str(e)[:500])
+        finally:
+            self._rebuild_job = None
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+fts_indexer = FtsIndexer()
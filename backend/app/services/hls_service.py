@@ -0,0 +1,323 @@
+"""
+TubeVault – HLS Service v1.0.1
+v1.0.1: Packaging-Start pro Rendition serialisiert (kein Doppel-ffmpeg),
+        fehlendes ffmpeg → PackagingError (500), Segmente nur bei passender
+        Quell-Signatur ausliefern
+On-Demand-Packaging gespeicherter Videos als HLS (fMP4) für adaptive Wiedergabe.
+
+- source-Rendition: ffmpeg -c copy (kein Re-Encode), Segmente à SEGMENT_SECONDS
+- Playlist wächst während des Packagings (EVENT, ENDLIST am Schluss) →
+  Wiedergabe startet nach dem ersten Segment, nicht nach der ganzen Datei
+- Low-Bitrate-Renditions (Setting player.hls_renditions) entstehen im
+  Hintergrund, immer nur ein Transcode gleichzeitig, und tauchen danach in
+  der Master-Playlist auf
+- Segment-Cache größenbegrenzt (player.hls_cache_mb), LRU nach letztem
+  Playlist-Zugriff; geänderte Quelldatei (Größe/mtime) → neu packen
+
+Layout:  HLS_DIR/<video_id>/.access                 mtime = letzter Zugriff
+         HLS_DIR/<video_id>/<rendition>/index.m3u8  + init.mp4, seg_00000.m4s …
+         HLS_DIR/<video_id>/<rendition>/source.json Signatur der Quelle (= fertig)
+© HalloWelt42 – Private Nutzung
+"""
+
+import asyncio
+import json
+import logging
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.config import HLS_DIR
+from app.database import db
+from app.services.archive_service import archive_service
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SECONDS = 4
+# Rendition → (Höhe, Video-kbit/s, Audio-kbit/s)
+RENDITIONS = {
+    "720p": (720, 2500, 128),
+    "480p": (480, 1000, 96),
+    "360p": (360, 600, 64),
+}
+RENDITION_RE = re.compile(r"^(source|\d{3,4}p)$")
+FILE_RE = re.compile(r"^(index\.m3u8|init\.mp4|seg_\d{5}\.m4s)$")
+# Wie lange ein Request auf ein noch entstehendes Segment/Playlist wartet
+SEGMENT_WAIT = 30.0
+DEFAULT_CACHE_MB = 4096
+DEFAULT_SOURCE_BANDWIDTH = 5_000_000
+
+
+class PackagingError(RuntimeError):
+    """ffmpeg fehlt oder Packaging gescheitert – Serverfehler, kein 404."""
+
+
+def playlist_duration(text: str) -> float:
+    """Summe der #EXTINF-Dauern einer Media-Playlist (Sekunden)."""
+    return sum(float(d) for d in re.findall(r"#EXTINF:([\d.]+)", text))
+
+
+def build_master(variants: list[tuple[str, int]]) -> str:
+    """Master-Playlist aus (rendition, bandwidth bit/s), relative URIs."""
+    lines = ["#EXTM3U", "#EXT-X-VERSION:7", "#EXT-X-INDEPENDENT-SEGMENTS"]
+    for name, bandwidth in variants:
+        lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={int(bandwidth)}")
+        lines.append(f"{name}/index.m3u8")
+    return "\n".join(lines) + "\n"
+
+
+def pick_evictions(entries: list[tuple[str, float, int]], limit: int,
+                   keep: set[str] = frozenset()) -> list[str]:
+    """LRU-Auswahl: (video_id, last_access, bytes) → IDs, die weg müssen,
+    bis die Summe ≤ limit ist. IDs in keep (gerade in Arbeit) bleiben."""
+    total = sum(size for _, _, size in entries)
+    evict = []
+    for vid, _, size in sorted(entries, key=lambda e: e[1]):
+        if total <= limit:
+            break
+        if vid in keep:
+            continue
+        evict.append(vid)
+        total -= size
+    return evict
+
+
+def ffmpeg_cmd(src: Path, out: Path, rendition: str) -> list[str]:
+    """ffmpeg-Aufruf für eine Rendition: source = Stream-Copy, sonst x264/AAC."""
+    cmd = ["ffmpeg", "-y", "-v", "error", "-i", str(src),
+           "-map", "0:v:0?", "-map", "0:a:0?"]
+    if rendition == "source":
+        cmd += ["-c", "copy"]
+    else:
+        height, v_kbps, a_kbps = RENDITIONS[rendition]
+        cmd += ["-vf", f"scale=-2:'min({height},ih)'",
+                "-c:v", "libx264", "-preset", "veryfast",
+                "-b:v", f"{v_kbps}k", "-maxrate", f"{v_kbps * 6 // 5}k", "-bufsize", f"{v_kbps * 2}k",
+                "-force_key_frames", f"expr:gte(t,n_forced*{SEGMENT_SECONDS})",
+                "-c:a", "aac", "-b:a", f"{a_kbps}k", "-ac", "2"]
+    cmd += ["-f", "hls", "-hls_time", str(SEGMENT_SECONDS),
+            "-hls_playlist_type", "event",
+            "-hls_segment_type", "fmp4", "-hls_fmp4_init_filename", "init.mp4",
+            "-hls_flags", "independent_segments+temp_file",
+            "-hls_segment_filename", str(out / "seg_%05d.m4s"),
+            str(out / "index.m3u8")]
+    return cmd
+
+
+class HlsService:
+    """Packt Videos on-demand als HLS und verwaltet den Segment-Cache."""
+
+    def __init__(self):
+        self._jobs: dict[str, asyncio.Task] = {}  # "vid/rendition" → laufendes ffmpeg
+        # "vid/rendition" → Lock um Prüfen+Starten: zwischen _jobs.get() und dem
+        # Registrieren liegen awaits, parallele Requests starteten sonst zweimal
+        self._start_locks: dict[str, asyncio.Lock] = {}
+        self._transcode_lock: Optional[asyncio.Lock] = None
+
+    # === Pfade + Signatur ===
+
+    def _dir(self, video_id: str, rendition: str = "") -> Path:
+        base = HLS_DIR / video_id
+        return base / rendition if rendition else base
+
+    @staticmethod
+    def _signature(src: Path) -> dict:
+        st = src.stat()
+        return {"path": str(src), "size": st.st_size, "mtime": int(st.st_mtime)}
+
+    @staticmethod
+    def _is_complete(out: Path, sig: dict) -> bool:
+        try:
+            return json.loads((out / "source.json").read_text()) == sig
+        except (OSError, ValueError):
+            return False
+
+    def _touch(self, video_id: str):
+        marker = self._dir(video_id) / ".access"
+        try:
+            marker.parent.mkdir(parents=True, exist_ok=True)
+            marker.touch()
+        except OSError:
+            pass
+
+    async def _get_setting(self, key: str, default: str) -> str:
+        val = await db.fetch_val("SELECT value FROM settings WHERE key = ?", (key,))
+        return val if val is not None else default
+
+    async def _source(self, video_id: str) -> Path:
+        resolved = await archive_service.resolve_video_path(video_id)
+        if not resolved["available"]:
+            raise FileNotFoundError(f"Video-Datei für {video_id} nicht verfügbar")
+        return Path(resolved["path"])
+
+    # === Packaging ===
+
+    async def ensure(self, video_id: str, rendition: str = "source",
+                     wait_playlist: bool = True) -> Path:
+        """Packaging sicherstellen. Kehrt zurück, sobald index.m3u8 existiert
+        (bzw. sofort bei wait_playlist=False) – nicht erst am Ende."""
+        key = f"{video_id}/{rendition}"
+        out = self._dir(video_id, rendition)
+        async with self._start_locks.setdefault(key, asyncio.Lock()):
+            task = self._jobs.get(key)
+            if task is None:
+                src = await self._source(video_id)
+                sig = await asyncio.to_thread(self._signature, src)
+                if await asyncio.to_thread(self._is_complete, out, sig):
+                    return out
+                # Veraltete/abgebrochene Segmente sofort weg – nicht erst im
+                # Task, sonst liefert file_path() sie bis dahin noch aus
+                await asyncio.to_thread(shutil.rmtree, out, True)
+                task = asyncio.create_task(self._package(video_id, rendition, src, sig))
+                self._jobs[key] = task
+                task.add_done_callback(lambda t, k=key: self._job_done(k, t))
+        if wait_playlist and not await self._wait_for(out / "index.m3u8", task):
+            raise RuntimeError(f"HLS {key}: keine Playlist nach {SEGMENT_WAIT:.0f}s")
+        return out
+
+    def _job_done(self, key: str, task: asyncio.Task):
+        if self._jobs.get(key) is task:
+            self._jobs.pop(key, None)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"[HLS] {key}: {task.exception()}")
+
+    async def _wait_for(self, path: Path, task: Optional[asyncio.Task],
+                        timeout: float = SEGMENT_WAIT) -> bool:
+        """Warten bis path existiert (temp_file → existiert = vollständig)."""
+        deadline = time.monotonic() + timeout
+        while not path.exists():
+            if task is None or task.done():
+                if task is not None and not task.cancelled() and task.exception():
+                    raise task.exception()
+                return path.exists()
+            if time.monotonic() > deadline:
+                return False
+            await asyncio.sleep(0.1)
+        return True
+
+    async def _package(self, video_id: str, rendition: str, src: Path, sig: dict):
+        if rendition != "source":
+            # Transcodes kosten CPU – strikt nacheinander
+            if self._transcode_lock is None:
+                self._transcode_lock = asyncio.Lock()
+            async with self._transcode_lock:
+                await self._run_ffmpeg(video_id, rendition, src, sig)
+        else:
+            await self._run_ffmpeg(video_id, rendition, src, sig)
+        await self.enforce_limit(keep={video_id})
+
+    async def _run_ffmpeg(self, video_id: str, rendition: str, src: Path, sig: dict):
+        out = self._dir(video_id, rendition)
+        out.mkdir(parents=True, exist_ok=True)
+        t0 = time.monotonic()
+        cmd = ffmpeg_cmd(src, out, rendition)
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+            )
+        except FileNotFoundError:
+            # Nicht als FileNotFoundError weiterreichen – der Router macht daraus 404
+            raise PackagingError(f"ffmpeg nicht gefunden ({cmd[0]})")
+        try:
+            _, err = await proc.communicate()
+        except asyncio.CancelledError:
+            proc.kill()
+            await proc.wait()
+            raise
+        if proc.returncode != 0:
+            await asyncio.to_thread(shutil.rmtree, out, True)
+            raise PackagingError(f"ffmpeg hls {rendition}: {err.decode(errors='replace')[-200:]}")
+        (out / "source.json").write_text(json.dumps(sig))
+        logger.info(f"[HLS] {video_id}/{rendition} gepackt in {time.monotonic() - t0:.1f}s")
+
+    # === Auslieferung ===
+
+    async def master_playlist(self, video_id: str) -> str:
+        """Master-Playlist: source sofort, fertige Renditions dazu, fehlende
+        werden im Hintergrund angestoßen."""
+        await self.ensure(video_id, "source")
+        self._touch(video_id)
+        src = await self._source(video_id)
+        sig = await asyncio.to_thread(self._signature, src)
+
+        duration = await db.fetch_val("SELECT duration FROM videos WHERE id = ?", (video_id,))
+        bandwidth = (sig["size"] * 8 / duration) if duration else DEFAULT_SOURCE_BANDWIDTH
+        variants = [("source", bandwidth)]
+
+        wanted = await self._get_setting("player.hls_renditions", "480p")
+        for name in (r.strip() for r in wanted.split(",")):
+            if name not in RENDITIONS:
+                continue
+            _, v_kbps, a_kbps = RENDITIONS[name]
+            if await asyncio.to_thread(self._is_complete, self._dir(video_id, name), sig):
+                variants.append((name, (v_kbps + a_kbps) * 1100))  # +10 % Container
+            else:
+                await self.ensure(video_id, name, wait_playlist=False)
+        return build_master(variants)
+
+    async def file_path(self, video_id: str, rendition: str, name: str) -> Optional[Path]:
+        """Pfad einer Playlist/eines Segments – wartet auf noch entstehende
+        Segmente, packt nach Cache-Eviction oder geänderter Quelle neu."""
+        if not RENDITION_RE.match(rendition) or not FILE_RE.match(name):
+            return None
+        if rendition != "source" and rendition not in RENDITIONS:
+            return None
+        path = self._dir(video_id, rendition) / name
+        if name == "index.m3u8":
+            self._touch(video_id)
+        key = f"{video_id}/{rendition}"
+        task = self._jobs.get(key)
+        if task is None:
+            # Kein Job: Bestand nur ausliefern, wenn die Signatur zur Quelle passt –
+            # ensure() prüft das und packt sonst neu (alte Segmente werden verworfen)
+            try:
+                await self.ensure(video_id, rendition, wait_playlist=False)
+            except FileNotFoundError:
+                return None
+            task = self._jobs.get(key)
+        if path.exists():
+            return path
+        return path if await self._wait_for(path, task) else None
+
+    # === Cache ===
+
+    def _scan_cache(self) -> list[tuple[str, float, int]]:
+        entries = []
+        if not HLS_DIR.exists():
+            return entries
+        for d in HLS_DIR.iterdir():
+            if not d.is_dir():
+                continue
+            size = sum(f.stat().st_size for f in d.rglob("*") if f.is_file())
+            marker = d / ".access"
+            last = marker.stat().st_mtime if marker.exists() else d.stat().st_mtime
+            entries.append((d.name, last, size))
+        return entries
+
+    async def enforce_limit(self, keep: set[str] = frozenset()) -> list[str]:
+        """Cache auf player.hls_cache_mb begrenzen (älteste Zugriffe zuerst)."""
+        try:
+            limit_mb = int(await self._get_setting("player.hls_cache_mb", str(DEFAULT_CACHE_MB)))
+        except ValueError:
+            limit_mb = DEFAULT_CACHE_MB
+        busy = {k.split("/", 1)[0] for k in self._jobs}
+        entries = await asyncio.to_thread(self._scan_cache)
+        evict = pick_evictions(entries, limit_mb * 1024 * 1024, set(keep) | busy)
+        for vid in evict:
+            await asyncio.to_thread(shutil.rmtree, self._dir(vid), True)
+        if evict:
+            logger.info(f"[HLS] Cache-LRU: {len(evict)} Video(s) entfernt")
+        return evict
+
+    async def drop(self, video_id: str):
+        """Alle Renditions eines Videos verwerfen (z.B. nach dem Löschen)."""
+        for key, task in list(self._jobs.items()):
+            if key.startswith(f"{video_id}/"):
+                task.cancel()
+        await asyncio.to_thread(shutil.rmtree, self._dir(video_id), True)
+
+
+# Singleton
+hls_service = HlsService()
@@ -0,0 +1,104 @@
+"""
+TubeVault – HTTP Client Registry v1.0.0
+Ein gemeinsamer httpx.AsyncClient für Thumbnails, Avatare, Banner und externe APIs.
+
+- Keep-Alive-Pool statt neuem Client pro Request → kein TCP+TLS-Handshake
+  pro Bild (Backfills mit tausenden Thumbnails)
+- HTTP/2, wenn das Paket h2 installiert ist (httpx[http2]) – i.ytimg.com &
+  Co. multiplexen dann viele Requests über eine Verbindung
+- Gleichzeitige Requests pro (Kategorie, Host) begrenzt; Kategorien wie im
+  rate_limiter (thumbnail, avatar, rss …) + "api" für Drittanbieter-APIs
+- Lebenszyklus: lazy beim ersten Request, aclose() im Shutdown (main.lifespan);
+  wechselt der Event-Loop (Tests), wird der Client neu aufgebaut
+© HalloWelt42 – Private Nutzung
+"""
+
+import asyncio
+import importlib.util
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+HTTP2 = importlib.util.find_spec("h2") is not None
+DEFAULT_TIMEOUT = 15.0
+LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30.0)
+
+# Max. gleichzeitige Requests pro (Kategorie, Host)
+CATEGORY_CONCURRENCY = {
+    "thumbnail": 8,
+    "avatar": 2,
+    "rss": 4,
+    "caption": 2,
+    "api": 4,
+}
+DEFAULT_CONCURRENCY = 4
+
+
+class HttpClientRegistry:
+    """Anwendungsweiter httpx-Client mit Pro-Host-Limits je Kategorie."""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: dict[tuple[str, str], asyncio.Semaphore] = {}
+        self.stats: dict[str, int] = {}
+
+    def client(self) -> httpx.AsyncClient:
+        """Gemeinsamen Client holen (wird beim ersten Aufruf angelegt)."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            # Alter Client gehört zu einem anderen Loop → nur verwerfen
+            self._client = httpx.AsyncClient(
+                timeout=DEFAULT_TIMEOUT, limits=LIMITS, http2=HTTP2, follow_redirects=True,
+            )
+            self._loop = loop
+            self._slots = {}
+        return self._client
+
+    def _slot(self, category: str, url: str) -> asyncio.Semaphore:
+        key = (category, urlsplit(url).hostname or "")
+        sem = self._slots.get(key)
+        if sem is None:
+            sem = self._slots[key] = asyncio.Semaphore(
+                CATEGORY_CONCURRENCY.get(category, DEFAULT_CONCURRENCY))
+        return sem
+
+    @asynccontextmanager
+    async def slot(self, category: str, url: str):
+        """Platz im Pro-Host-Limit der Kategorie belegen (z.B. für Streaming-Requests)."""
+        client = self.client()
+        async with self._slot(category, url):
+            self.stats[category] = self.stats.get(category, 0) + 1
+            yield client
+
+    async def request(self, method: str, url: str, *, category: str = "api",
+                      **kwargs) -> httpx.Response:
+        """Request über den gemeinsamen Pool; Body ist bei Rückgabe vollständig gelesen."""
+        async with self.slot(category, url) as client:
+            return await client.request(method, url, **kwargs)
+
+    async def get(self, url: str, *, category: str = "api", **kwargs) -> httpx.Response:
+        return await self.request("GET", url, category=category, **kwargs)
+
+    async def post(self, url: str, *, category: str = "api", **kwargs) -> httpx.Response:
+        return await self.request("POST", url, category=category, **kwargs)
+
+    async def aclose(self):
+        """Pool schließen (Shutdown)."""
+        client, self._client = self._client, None
+        self._slots = {}
+        if client is not None and not client.is_closed:
+            try:
+                await client.aclose()
+            except RuntimeError as e:
+                # Client aus einem bereits beendeten Loop
+                logger.debug(f"HTTP-Client close: {e}")
+
+
+# Singleton
+http_clients = HttpClientRegistry()
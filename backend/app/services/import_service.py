@@ -21,7 +21,9 @@ from typing import Optional
 
 from app.config import THUMBNAILS_DIR, VIDEOS_DIR, SUBTITLES_DIR, DATA_DIR
 from app.database import db
+from app.services.archive_service import archive_service
 from app.utils.file_utils import now_sqlite
+from app.utils.fts_query import FTS_ROWIDS, build_match_query
 from app.utils.tag_utils import sanitize_tags
 
 logger = logging.getLogger(__name__)
@@ -443,8 +445,16 @@ class ImportService:
             params.append(channel)
 
         if search:
-            conditions.append("(v.title LIKE ? OR v.channel_name LIKE ? OR v.file_path LIKE ? OR v.import_path LIKE ?)")
-            params.extend([f"%{search}%", f"%{search}%", f"%{search}%", f"%{search}%"])
+            # Text über videos_fts; Dateipfade stehen nicht im Index und werden
+            # nur innerhalb der (kleinen) eigenen Videos per LIKE geprüft
+            text_cond = "v.file_path LIKE ? OR v.import_path LIKE ?"
+            text_params = [f"%{search}%", f"%{search}%"]
+            match = build_match_query(search)
+            if match:
+                text_cond = f"v.rowid IN ({FTS_ROWIDS}) OR {text_cond}"
+                text_params.insert(0, match)
+            conditions.append(f"({text_cond})")
+            params.extend(text_params)
 
         where = "WHERE " + " AND ".join(conditions)
 
@@ -777,20 +787,19 @@ class ImportService:
         return f"{scanned} Dateien gescannt"
 
     async def _insert_staging_batch(self, batch: list):
-        """Batch-Insert in scan_staging."""
-        for row in batch:
-            await db.execute(
-                """INSERT INTO scan_staging (
-                    session_id, file_path, filename, folder_name, channel_folder,
-                    title, channel_name, duration, file_size,
-                    resolution, codec, youtube_id, is_portrait,
-                    nfo_found, info_json_found, thumbnail_path, description_text, subtitles_found,
-                    match_type, match_id, match_title, match_channel,
-                    match_confidence, match_duration, duration_boost, duration_penalty,
-                    match_candidates, already_registered, existing_id
-                ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-                row
-            )
+        """Batch-Insert in scan_staging (ein executemany, ein Commit)."""
+        await db.execute_many(
+            """INSERT INTO scan_staging (
+                session_id, file_path, filename, folder_name, channel_folder,
+                title, channel_name, duration, file_size,
+                resolution, codec, youtube_id, is_portrait,
+                nfo_found, info_json_found, thumbnail_path, description_text, subtitles_found,
+                match_type, match_id, match_title, match_channel,
+                match_confidence, match_duration, duration_boost, duration_penalty,
+                match_candidates, already_registered, existing_id
+            ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
+            batch
+        )
 
     # ─── Scan-Ergebnisse abrufen ──────────────────────────────
 
@@ -1143,6 +1152,7 @@ class ImportService:
                     update += " WHERE id = ?"
                     params.append(vid_id)
                     await db.execute(update, tuple(params))
+                    archive_service.invalidate_path(vid_id)
 
                     # Begleitdateien aufräumen
                     self._delete_companions(r["file_path"])
@@ -1177,13 +1187,11 @@ class ImportService:
             (new_status, session_id)
         )
 
-        # FTS5 Index neu aufbauen (bulk, effizienter als per-Video)
+        # FTS5: die Trigger auf videos haben alle Änderungen eingereiht,
+        # der Indexer arbeitet sie gebündelt ab
         if results["linked"] + results["imported"] + results["replaced"] > 0:
-            try:
-                await db.execute("INSERT INTO videos_fts(videos_fts) VALUES('rebuild')")
-                logger.info(f"FTS5 Index rebuilt nach Execute ({results['linked']+results['imported']+results['replaced']} Videos)")
-            except Exception as e:
-                logger.debug(f"FTS5 rebuild: {e}")
+            from app.services.fts_indexer import fts_indexer
+            fts_indexer.kick()
 
         return results
 
@@ -1370,6 +1378,7 @@ class ImportService:
                    status = 'ready' WHERE id = ?""",
                 (file_path, file_size, video_id)
             )
+            archive_service.invalidate_path(video_id)
         else:
             # RSS-Entry → neues Video anlegen mit verlinkter ID
             await self.import_video(
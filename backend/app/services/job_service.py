@@ -1,5 +1,5 @@
 """
-TubeVault – Job Service v1.7.0
+TubeVault – Job Service v1.8.0
 Zentrales Job-System mit Stale-Recovery, Auto-Cleanup, Abbruch und Pause/Resume
 © HalloWelt42 – Private Nutzung
 
@@ -21,6 +21,8 @@ Status-Flow:
 
 Seit v1.7.0: park() und retry_wait() und requeue() — damit download_service
 nicht mehr direkt in die jobs-Tabelle schreiben muss. Zentraler Status-Writer.
+Seit v1.8.0: retry_after als Spalte (Schema v35); notify() ist zugleich das
+Weck-Signal für den Download-Worker (kein Polling mehr).
 """
 
 import asyncio
@@ -30,6 +32,7 @@ from datetime import datetime
 from typing import Optional, Callable
 
 from app.database import db
+from app.services.counts_service import counts_service
 from app.utils.file_utils import now_sqlite
 
 logger = logging.getLogger(__name__)
@@ -201,6 +204,7 @@ class JobService:
                    WHERE id = ?""",
                 (now_sqlite(), job["id"])
             )
+            counts_service.invalidate("jobs")
             self._sem_held_by.discard(job["id"])  # Sicherheitshalber
             logger.info(f"Job #{job['id']} ({jtype}): nach Neustart als Fehler markiert")
 
@@ -234,6 +238,7 @@ class JobService:
                VALUES (?, ?, ?, ?, ?, ?)""",
             (job_type, title, description, meta_json, parent_id, priority)
         )
+        counts_service.invalidate("jobs")
         job_id = cursor.lastrowid
         job = await self.get(job_id)
         logger.info(f"Job #{job_id} erstellt: [{job_type}] {title}")
@@ -263,6 +268,7 @@ class JobService:
             "UPDATE jobs SET status = 'active', started_at = ? WHERE id = ?",
             (now, job_id)
         )
+        counts_service.invalidate("jobs")
         job = await self.get(job_id)
         await self.notify(job)
         return job
@@ -310,6 +316,7 @@ class JobService:
             "UPDATE jobs SET status = 'done', progress = 1.0, result = ?, completed_at = ? WHERE id = ?",
             (result, now, job_id)
         )
+        counts_service.invalidate("jobs")
         self._release_semaphore(job_id)
         job = await self.get(job_id)
         logger.info(f"Job #{job_id} abgeschlossen")
@@ -323,6 +330,7 @@ class JobService:
             "UPDATE jobs SET status = 'error', error_message = ?, completed_at = ? WHERE id = ?",
             (error, now, job_id)
         )
+        counts_service.invalidate("jobs")
         self._release_semaphore(job_id)
         job = await self.get(job_id)
         logger.error(f"Job #{job_id} fehlgeschlagen: {error}")
@@ -337,6 +345,7 @@ class JobService:
             "UPDATE jobs SET status = 'cancelled', completed_at = ? WHERE id = ? AND status IN ('queued', 'active', 'retry_wait')",
             (now, job_id)
         )
+        counts_service.invalidate("jobs")
         self._release_semaphore(job_id)
         job = await self.get(job_id)
         await self.notify(job)
@@ -349,6 +358,7 @@ class JobService:
             "UPDATE jobs SET status = 'parked', error_message = ?, completed_at = ? WHERE id = ?",
             (error, now, job_id)
         )
+        counts_service.invalidate("jobs")
         self._release_semaphore(job_id)
         job = await self.get(job_id)
         logger.warning(f"Job #{job_id} geparkt: {error[:120]}")
@@ -356,8 +366,8 @@ class JobService:
         return job
 
     async def retry_wait(self, job_id: int, error: str, retry_after: str, retry_count: int = None) -> dict:
-        """Job in Wartestand für Auto-Retry setzen. retry_after als SQLite-Timestamp.
-        Setzt metadata.retry_after (+ retry_count falls mitgegeben).
+        """Job in Wartestand für Auto-Retry setzen. retry_after als SQLite-Timestamp
+        in der Spalte jobs.retry_after (indiziert); retry_count in metadata.
         Queue-Loop holt den Job zurück auf queued, sobald retry_after erreicht ist."""
         # Bestehende Metadata mergen
         existing = await db.fetch_one("SELECT metadata FROM jobs WHERE id = ?", (job_id,))
@@ -367,14 +377,15 @@ class JobService:
                 meta = json.loads(existing["metadata"]) if isinstance(existing["metadata"], str) else dict(existing["metadata"])
             except Exception:
                 meta = {}
-        meta["retry_after"] = retry_after
+        meta.pop("retry_after", None)  # Altbestand (vor v35 in metadata)
         if retry_count is not None:
             meta["retry_count"] = retry_count
 
         await db.execute(
-            "UPDATE jobs SET status = 'retry_wait', error_message = ?, metadata = ? WHERE id = ?",
-            (error, json.dumps(meta), job_id)
+            "UPDATE jobs SET status = 'retry_wait', error_message = ?, metadata = ?, retry_after = ? WHERE id = ?",
+            (error, json.dumps(meta), retry_after, job_id)
         )
+        counts_service.invalidate("jobs")
         self._release_semaphore(job_id)
         job = await self.get(job_id)
         logger.info(f"Job #{job_id} in retry_wait bis {retry_after} ({error[:80]})")
@@ -382,8 +393,8 @@ class JobService:
         return job
 
     async def requeue(self, job_id: int, reset_retry: bool = True, reset_progress: bool = True) -> dict:
-        """Job zurück in die Queue (queued). Optional: retry_count reset, progress reset,
-        error_message leeren, retry_after aus metadata entfernen.
+        """Job zurück in die Queue (queued). Optional: retry_count reset, progress reset.
+        error_message und retry_after werden immer geleert.
         Genutzt für: fix-stale, retry-all, manuelle Wiederholung."""
         existing = await db.fetch_one("SELECT metadata FROM jobs WHERE id = ?", (job_id,))
         meta = {}
@@ -394,9 +405,8 @@ class JobService:
                 meta = {}
         if reset_retry:
             meta["retry_count"] = 0
-            meta.pop("retry_after", None)
 
-        fields = ["status = 'queued'", "error_message = NULL"]
+        fields = ["status = 'queued'", "error_message = NULL", "retry_after = NULL"]
         params = []
         if reset_progress:
             fields.append("progress = 0")
@@ -408,6 +418,7 @@ class JobService:
             f"UPDATE jobs SET {', '.join(fields)} WHERE id = ?",
             tuple(params)
         )
+        counts_service.invalidate("jobs")
         self._release_semaphore(job_id)
         self._cancelled.discard(job_id)
         job = await self.get(job_id)
@@ -506,6 +517,7 @@ class JobService:
                AND completed_at < datetime('now', ? || ' hours')""",
             (f"-{max_age_hours}",)
         )
+        counts_service.invalidate("jobs")
 
     async def cleanup_all(self) -> int:
         """ALLE abgeschlossenen/fehlerhaften/abgebrochenen Jobs löschen."""
@@ -513,6 +525,7 @@ class JobService:
             "DELETE FROM jobs WHERE status IN ('done', 'error', 'cancelled', 'parked')"
         )
         count = cursor.rowcount
+        counts_service.invalidate("jobs")
         # Alle Listener informieren (UI aktualisieren)
         await self.notify({"id": 0, "type": "cleanup", "status": "cleanup"})
         return count
@@ -11,11 +11,10 @@ import asyncio
 from pathlib import Path
 from typing import Optional
 
-import httpx
-
 from app.config import TEXTS_DIR
 from app.database import db
 from app.services.endpoint_service import get_service_url
+from app.services.http_clients import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -275,9 +274,9 @@ async def search_lyrics(
 
     try:
         lrclib_url = await _get_lrclib_url()
-        async with httpx.AsyncClient(timeout=10) as client:
+        async with http_clients.slot("api", lrclib_url) as client:
             # Erst exakte Suche per GET /api/get
-            resp = await client.get(f"{lrclib_url}/get", params=params)
+            resp = await client.get(f"{lrclib_url}/get", params=params, timeout=10)
             if resp.status_code == 200:
                 data = resp.json()
                 if data.get("plainLyrics") or data.get("syncedLyrics"):
@@ -295,6 +294,7 @@ async def search_lyrics(
             resp = await client.get(
                 f"{lrclib_url}/search",
                 params={"artist_name": artist, "track_name": title},
+                timeout=10,
             )
             if resp.status_code == 200:
                 results = resp.json()
@@ -324,10 +324,11 @@ async def search_lyrics_all(
     results = []
     try:
         lrclib_url = await _get_lrclib_url()
-        async with httpx.AsyncClient(timeout=10) as client:
+        async with http_clients.slot("api", lrclib_url) as client:
             resp = await client.get(
                 f"{lrclib_url}/search",
                 params={"artist_name": artist, "track_name": title},
+                timeout=10,
             )
             if resp.status_code == 200:
                 for r in resp.json()[:20]:
@@ -0,0 +1,78 @@
+"""
+Merge-Planung für adaptive Downloads (pure, keine I/O).
+
+Entscheidet anhand der per ffprobe erkannten Codecs, in welchen Container
+Video- und Audio-Spur gemuxt werden und ob die Audio-Spur kopiert werden
+kann oder nach AAC umkodiert werden muss.
+
+Container (Setting download.merge_container):
+  mp4  : immer MP4 (Standard, überall abspielbar). AAC/MP3 → Copy,
+         alles andere (Opus, Vorbis) → AAC
+  auto : WebM, wenn Video VP8/VP9/AV1 und Audio Opus/Vorbis ist
+         (reiner Stream-Copy), sonst wie mp4
+  mkv  : immer Matroska, beide Spuren per Stream-Copy
+
+Faststart (Setting download.faststart, nur MP4):
+  immediate : +faststart direkt beim Merge (zweiter Schreibdurchgang)
+  deferred  : Merge ohne faststart, moov-Atom später im Leerlauf nach vorn
+  off       : nie
+
+Separates Modul, damit Tests ohne ffmpeg möglich sind.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+CONTAINERS = ("mp4", "auto", "mkv")
+FASTSTART_MODES = ("immediate", "deferred", "off")
+
+# Audio-Codecs, die unverändert in MP4 dürfen
+_MP4_AUDIO = {"aac", "mp3"}
+_WEBM_VIDEO = {"vp8", "vp9", "av1"}
+_WEBM_AUDIO = {"opus", "vorbis"}
+
+
+@dataclass(frozen=True)
+class MergePlan:
+    """Ergebnis der Merge-Planung."""
+    # Dateiendung des Ausgabe-Containers (mp4 / webm / mkv)
+    ext: str
+    # True = Audio per Stream-Copy, False = nach AAC umkodieren
+    copy_audio: bool
+    # +faststart direkt beim Merge
+    faststart: bool = False
+    # faststart nachträglich im Leerlauf (nur MP4)
+    defer_faststart: bool = False
+
+    def ffmpeg_args(self) -> list[str]:
+        """Codec-/Muxer-Argumente zwischen den Inputs und dem Output."""
+        args = ["-c:v", "copy", "-c:a", "copy" if self.copy_audio else "aac"]
+        if self.faststart:
+            args += ["-movflags", "+faststart"]
+        return args
+
+
+def plan(video_codec: Optional[str], audio_codec: Optional[str],
+         container: str = "mp4", faststart: str = "deferred") -> MergePlan:
+    """Container + Audio-Behandlung wählen.
+
+    Args:
+        video_codec: ffprobe codec_name der Video-Spur (None = unbekannt)
+        audio_codec: ffprobe codec_name der Audio-Spur (None = unbekannt)
+        container: Setting download.merge_container (mp4/auto/mkv)
+        faststart: Setting download.faststart (immediate/deferred/off)
+    """
+    vc = (video_codec or "").lower()
+    ac = (audio_codec or "").lower()
+    if container == "mkv" and vc and ac:
+        return MergePlan(ext="mkv", copy_audio=True)
+    if container == "auto" and vc in _WEBM_VIDEO and ac in _WEBM_AUDIO:
+        return MergePlan(ext="webm", copy_audio=True)
+    # MP4 – unbekannter Codec → AAC wie bisher (sicherer Weg)
+    if faststart not in FASTSTART_MODES:
+        faststart = "deferred"
+    return MergePlan(
+        ext="mp4",
+        copy_audio=ac in _MP4_AUDIO,
+        faststart=faststart == "immediate",
+        defer_faststart=faststart == "deferred",
+    )
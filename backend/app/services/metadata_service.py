@@ -1,5 +1,5 @@
 """
-TubeVault – Metadata Service v1.3.0
+TubeVault – Metadata Service v1.3.1
 © HalloWelt42 – Private Nutzung
 """
 
@@ -8,7 +8,10 @@ import logging
 from datetime import datetime
 
 from app.database import db
+from app.services.counts_service import counts_service
 from app.utils.file_utils import now_sqlite
+from app.utils.fts_query import FTS_ROWIDS, build_match_query, like_condition
+from app.utils.pagination import CountCache, decode_cursor, encode_cursor, keyset_segments
 from app.utils.tag_utils import sanitize_tags
 
 logger = logging.getLogger(__name__)
@@ -17,6 +20,17 @@ logger = logging.getLogger(__name__)
 class MetadataService:
     """Video-Metadaten verwalten und anreichern."""
 
+    def __init__(self):
+        # COUNT(*) der Library-Liste: beim Durchblättern derselben Filter nicht
+        # bei jeder Seite neu zählen. Schreibpfade hier leeren den Cache.
+        self._count_cache = CountCache(ttl=30.0)
+
+    def invalidate_counts(self, *tables: str):
+        """Gecachte Listen-Counts und die videos-Zähler im counts_service
+        verwerfen (nach Writes auf videos). tables: weitere betroffene Tabellen."""
+        self._count_cache.clear()
+        counts_service.invalidate("videos", *tables)
+
     async def get_video(self, video_id: str) -> dict | None:
         """Einzelnes Video mit allen Details abrufen."""
         row = await db.fetch_one("SELECT * FROM videos WHERE id = ?", (video_id,))
@@ -55,19 +69,27 @@ class MetadataService:
         video_types: str | None = None,
         is_archived: bool | None = None,
         is_music: bool | None = None,
+        cursor: str | None = None,
+        with_total: bool = True,
     ) -> dict:
         """Videos mit Paginierung, Filter und Sortierung abrufen.
         Mehrfachfilter: category_ids, channel_ids, video_types als Komma-getrennte Werte.
         is_archived: True=nur archivierte, False=nur nicht-archivierte, None=alle.
+
+        cursor: Keyset-Modus statt OFFSET. None = klassisch per page, "" = erste
+        Seite, sonst der next_cursor der Vorseite. Tiefe Seiten kosten dann
+        genauso viel wie die erste (Index-Range statt OFFSET-Überspringen).
+        with_total: COUNT(*) mitliefern (gecacht); False → total=None.
         """
         conditions = []
         params = []
 
-        # Archiv-Filter (Standard: nicht-archiviert)
+        # Archiv-Filter (Standard: nicht-archiviert). Ohne COALESCE, damit
+        # idx_videos_status_archived_upload greift (NULLs normalisiert Migration v32).
         if is_archived is True:
-            conditions.append("COALESCE(v.is_archived, 0) = 1")
+            conditions.append("v.is_archived = 1")
         elif is_archived is False:
-            conditions.append("COALESCE(v.is_archived, 0) = 0")
+            conditions.append("v.is_archived = 0")
 
         if status:
             conditions.append("v.status = ?")
@@ -76,10 +98,19 @@ class MetadataService:
             # Standard: nur 'ready' Videos anzeigen (keine Stubs/Bookmarks/Pending)
             conditions.append("v.status = 'ready'")
 
-        if search:
-            conditions.append("(v.title LIKE ? OR v.channel_name LIKE ? OR v.description LIKE ? OR v.notes LIKE ?)")
-            search_term = f"%{search}%"
-            params.extend([search_term, search_term, search_term, search_term])
+        if search and status and status != "ready":
+            # videos_fts indexiert nur 'ready' – Stubs/Pending/… (kleine Mengen) per LIKE
+            cond, like_params = like_condition(search, ["title", "channel_name", "description", "notes"])
+            conditions.append(cond)
+            params.extend(like_params)
+        elif search:
+            # Volltext über videos_fts statt LIKE-Scan über lange Beschreibungen
+            match = build_match_query(search)
+            if match:
+                conditions.append(f"v.rowid IN ({FTS_ROWIDS})")
+                params.append(match)
+            else:
+                conditions.append("0")
 
         # Kategorie-Filter: Mehrfach (category_ids) hat Vorrang vor Einzel (category_id)
         cat_ids = self._parse_multi_int(category_ids) if category_ids else ([category_id] if category_id else [])
@@ -102,14 +133,15 @@ class MetadataService:
             conditions.append(f"COALESCE(v.video_type, 'video') IN ({placeholders})")
             params.extend(vtypes)
 
-        # Tag-Filter: Mehrfach (tags) hat Vorrang vor Einzel (tag), OR-verknüpft
+        # Tag-Filter: Mehrfach (tags) hat Vorrang vor Einzel (tag), OR-verknüpft.
+        # Index-Lookup über video_tags (case-insensitiv wie das frühere LIKE)
         tag_list = self._parse_multi_str(tags) if tags else ([tag] if tag else [])
         if tag_list:
-            tag_conditions = []
-            for t in tag_list:
-                tag_conditions.append("v.tags LIKE ?")
-                params.append(f'%"{t}"%')
-            conditions.append(f"({' OR '.join(tag_conditions)})")
+            placeholders = ",".join("?" * len(tag_list))
+            conditions.append(
+                f"v.id IN (SELECT video_id FROM video_tags WHERE tag COLLATE NOCASE IN ({placeholders}))"
+            )
+            params.extend(tag_list)
 
         # Musik-Filter
         if is_music is True:
@@ -132,19 +164,31 @@ class MetadataService:
 
         # ORDER BY – is_favorite ist virtuell und wird via EXISTS gebaut.
         # Tiebreaker created_at DESC, damit neue Videos bei gleichem
-        # Sortierwert oben bleiben (wichtig bei NULL-Feldern wie upload_date).
+        # Sortierwert oben bleiben (wichtig bei NULL-Feldern wie upload_date),
+        # dann id als eindeutiger Schlüssel für den Keyset-Cursor.
         if sort_by == "is_favorite":
-            order_by = (
-                f"(EXISTS (SELECT 1 FROM favorites f WHERE f.video_id = v.id)) {order}, "
-                f"v.created_at DESC"
-            )
+            sort_expr = "(EXISTS (SELECT 1 FROM favorites f WHERE f.video_id = v.id))"
+            order_by = f"{sort_expr} {order}, "
         else:
+            sort_expr = f"v.{sort_by}"
             # NULLs ans Ende bei DESC, sonst stehen unbekannte Upload-Daten oben
             null_placement = "NULLS LAST" if order == "DESC" else "NULLS FIRST"
-            order_by = f"v.{sort_by} {order} {null_placement}, v.created_at DESC"
-
-        # Total Count
-        total = await db.fetch_val(f"SELECT COUNT(*) FROM videos v {where}", params)
+            order_by = f"{sort_expr} {order} {null_placement}, "
+        tiebreak = ["COALESCE(v.created_at, '')", "v.id"]
+        order_by += f"{tiebreak[0]} DESC, {tiebreak[1]} DESC"
+
+        total = None
+        if with_total:
+            first_page = (not cursor) if cursor is not None else page == 1
+            total = await self._count_cache.count(
+                db.fetch_val, f"SELECT COUNT(*) FROM videos v {where}", params,
+                refresh=first_page)
+
+        if cursor is not None:
+            return await self._get_videos_keyset(
+                where, conditions, params, order_by, sort_expr, order, tiebreak,
+                sort_by != "is_favorite", cursor, per_page, total,
+            )
 
         # Paginierte Ergebnisse
         offset = (page - 1) * per_page
@@ -155,7 +199,7 @@ class MetadataService:
             params + [per_page, offset]
         )
 
-        total_pages = max(1, (total + per_page - 1) // per_page)
+        total_pages = max(1, ((total or 0) + per_page - 1) // per_page)
 
         return {
             "videos": [self._row_to_dict(r) for r in rows],
@@ -165,6 +209,54 @@ class MetadataService:
             "total_pages": total_pages,
         }
 
+    async def _get_videos_keyset(
+        self, where, conditions, params, order_by, sort_expr, order, tiebreak,
+        nullable, cursor, per_page, total,
+    ) -> dict:
+        """Keyset-Seite: Zeilen nach dem Cursor, Segment für Segment (siehe
+        keyset_segments), bis per_page+1 Zeilen da sind (+1 = gibt es mehr?)."""
+        select = (
+            f"SELECT v.*, {sort_expr} AS _sort_key, {tiebreak[0]} AS _tie_created "
+            f"FROM videos v"
+        )
+        want = per_page + 1
+        if not cursor:
+            rows = await db.fetch_all(
+                f"{select} {where} ORDER BY {order_by} LIMIT ?", params + [want])
+        else:
+            values = decode_cursor(cursor, 1 + len(tiebreak))
+            rows = []
+            for seg_sql, seg_params in keyset_segments(sort_expr, order, tiebreak, values, nullable):
+                seg_where = " AND ".join(conditions + [seg_sql])
+                rows += await db.fetch_all(
+                    f"{select} WHERE {seg_where} ORDER BY {order_by} LIMIT ?",
+                    params + seg_params + [want - len(rows)],
+                )
+                if len(rows) >= want:
+                    break
+
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            next_cursor = encode_cursor([last["_sort_key"], last["_tie_created"], last["id"]])
+
+        videos = []
+        for r in rows:
+            d = self._row_to_dict(r)
+            d.pop("_sort_key", None)
+            d.pop("_tie_created", None)
+            videos.append(d)
+        return {
+            "videos": videos,
+            "total": total,
+            "page": 1,
+            "per_page": per_page,
+            "total_pages": max(1, ((total or 0) + per_page - 1) // per_page),
+            "next_cursor": next_cursor,
+        }
+
     async def update_video(self, video_id: str, updates: dict) -> dict | None:
         """Video-Metadaten aktualisieren."""
         # Category-IDs separat behandeln (M:N über video_categories)
@@ -243,6 +335,8 @@ class MetadataService:
                 (updates["video_type"], video_id)
             )
 
+        self.invalidate_counts()
+
         # Meta-Redundanz: Sidecar nachziehen (idempotent, wirft nie)
         from app.services import meta_sidecar
         await meta_sidecar.write_sidecar(video_id)
@@ -289,6 +383,11 @@ class MetadataService:
 
         # Video selbst löschen
         await db.execute("DELETE FROM videos WHERE id = ?", (video_id,))
+        self.invalidate_counts("favorites", "watch_history", "streams", "jobs")
+        from app.services.archive_service import archive_service
+        from app.services.hls_service import hls_service
+        archive_service.invalidate_path(video_id)
+        await hls_service.drop(video_id)
 
         # Playlist video_counts aktualisieren
         await db.execute(
@@ -312,6 +411,7 @@ class MetadataService:
             "INSERT INTO watch_history (video_id, position) VALUES (?, ?)",
             (video_id, position)
         )
+        counts_service.invalidate("videos", "watch_history")
 
     async def save_position(self, video_id: str, position: int):
         """Wiedergabeposition speichern (auf videos + watch_history)."""
@@ -324,6 +424,7 @@ class MetadataService:
                VALUES (?, ?, datetime('now'))""",
             (video_id, position)
         )
+        counts_service.invalidate("watch_history")
 
     async def get_last_position(self, video_id: str) -> int:
         """Letzte Wiedergabeposition abrufen."""
@@ -348,9 +449,14 @@ class MetadataService:
         params = []
 
         if search:
-            conditions.append("(v.title LIKE ? OR v.channel_name LIKE ?)")
-            term = f"%{search}%"
-            params.extend([term, term])
+            # History kennt auch Videos ohne status='ready' (nicht im FTS-Index)
+            like, like_params = like_condition(search, ["title", "channel_name"])
+            match = build_match_query(search, ["title", "channel_name"])
+            if match:
+                conditions.append(f"(v.rowid IN ({FTS_ROWIDS}) OR (v.status != 'ready' AND {like}))")
+                params.extend([match, *like_params])
+            else:
+                conditions.append("0")
 
         # Kanal-Filter
         ch_ids = self._parse_multi_str(channel_ids) if channel_ids else ([channel_id] if channel_id else [])
@@ -424,31 +530,31 @@ class MetadataService:
           category_ids: komma-getrennte category_id-Liste (M2M über video_categories)
           is_archived:  True → nur archivierte, False → nur nicht-archivierte
         """
-        conditions = ["status = 'ready'", "tags != '[]'"]
+        conditions = ["v.status = 'ready'"]
         params: list = []
 
         if is_archived:
-            conditions.append("COALESCE(is_archived, 0) = 1")
+            conditions.append("v.is_archived = 1")
         else:
-            conditions.append("COALESCE(is_archived, 0) = 0")
+            conditions.append("v.is_archived = 0")
 
         if video_types:
             vtypes = [v.strip() for v in video_types.split(",") if v.strip()]
             if vtypes:
                 placeholders = ",".join("?" * len(vtypes))
-                conditions.append(f"COALESCE(video_type, 'video') IN ({placeholders})")
+                conditions.append(f"COALESCE(v.video_type, 'video') IN ({placeholders})")
                 params.extend(vtypes)
         elif video_type == "music":
-            conditions.append("is_music = 1")
+            conditions.append("v.is_music = 1")
         elif video_type in ("video", "short", "live"):
-            conditions.append("COALESCE(video_type, 'video') = ?")
+            conditions.append("COALESCE(v.video_type, 'video') = ?")
             params.append(video_type)
 
         if channel_ids:
             cids = [c.strip() for c in channel_ids.split(",") if c.strip()]
             if cids:
                 placeholders = ",".join("?" * len(cids))
-                conditions.append(f"channel_id IN ({placeholders})")
+                conditions.append(f"v.channel_id IN ({placeholders})")
                 params.extend(cids)
 
         if category_ids:
@@ -456,26 +562,21 @@ class MetadataService:
             if catids:
                 placeholders = ",".join("?" * len(catids))
                 conditions.append(
-                    f"id IN (SELECT video_id FROM video_categories WHERE category_id IN ({placeholders}))"
+                    f"v.id IN (SELECT video_id FROM video_categories WHERE category_id IN ({placeholders}))"
                 )
                 params.extend(catids)
 
+        # Eine GROUP-BY-Query über video_tags statt JSON-Parsing jeder Zeile
         where = " AND ".join(conditions)
-        rows = await db.fetch_all(f"SELECT tags FROM videos WHERE {where}", tuple(params))
-
-        tag_count = {}
-        for row in rows:
-            try:
-                tags = json.loads(row["tags"]) if isinstance(row["tags"], str) else row["tags"]
-                for t in tags:
-                    tag_count[t] = tag_count.get(t, 0) + 1
-            except (json.JSONDecodeError, TypeError):
-                pass
-        return sorted(
-            [{"tag": t, "count": c} for t, c in tag_count.items()],
-            key=lambda x: x["count"],
-            reverse=True,
+        rows = await db.fetch_all(
+            f"""SELECT vt.tag, COUNT(*) AS count
+                FROM video_tags vt JOIN videos v ON v.id = vt.video_id
+                WHERE {where}
+                GROUP BY vt.tag
+                ORDER BY count DESC, vt.tag""",
+            tuple(params),
         )
+        return [{"tag": r["tag"], "count": r["count"]} for r in rows]
 
     async def get_stats(self) -> dict:
         """Statistiken abrufen. Zählungen zentral aus counts_service
@@ -1,6 +1,8 @@
 """
-TubeVault – Rate Limiter v1.7.3
+TubeVault – Rate Limiter v1.8.0
 Globales Rate-Limiting für alle YouTube-Anfragen
+v1.8.0: acquire_bucket() – Token-Bucket mit Burst für parallele Worker
+        (RSS-Tick), ohne die Kategorie über ein Lock zu serialisieren
 © HalloWelt42 – Private Nutzung
 
 Kategorien + Standard-Limits:
@@ -10,11 +12,14 @@ Kategorien + Standard-Limits:
 - channel_scan:  5.0s  (Channel.videos, sehr gefährlich)
 - thumbnail:     1.0s  (Bild-Downloads)
 - download:      3.0s  (Video-Download Start)
+- download_audio: 1.5s (Audio-Download Start, eigene Lane)
 
 Features:
 - Exponential Backoff bei Fehlern (verdoppelt bis max 120s)
 - Reset auf Standard nach Erfolg
 - Manuell deaktivierbar (disabled=True → kein Delay)
+- acquire(): strikt ein Request pro Interval (serialisiert)
+- acquire_bucket(): bis zu `burst` Requests sofort, danach 1/Interval
 - Unterscheidung: YouTube-Rate-Limit vs. normale Fehler (Video unavailable etc.)
 - YouTube-LED zeigt ECHTEN YouTube-Block, nicht internen Limiter
 """
@@ -32,6 +37,7 @@ DEFAULT_INTERVALS = {
     "channel_scan": 5.0,
     "thumbnail": 1.0,
     "download": 3.0,
+    "download_audio": 1.5,
     "caption": 2.0,   # Caption-Download pro Sprache (YouTube drosselt bei ≥3 parallel)
 }
 
@@ -51,6 +57,7 @@ class RateLimiter:
     def __init__(self):
         self._last_request: dict[str, float] = {}
         self._locks: dict[str, asyncio.Lock] = {}
+        self._buckets: dict[str, list[float]] = {}  # category → [tokens, stand]
         self.intervals: dict[str, float] = {**DEFAULT_INTERVALS}
         self._stats: dict[str, dict] = {}
         self._error_counts: dict[str, int] = {}
@@ -80,6 +87,26 @@ class RateLimiter:
             self._last_request[category] = time.time()
             self._track(category, "requests")
 
+    async def acquire_bucket(self, category: str, burst: int):
+        """Token-Bucket: `burst` Tokens, Nachfüllrate 1/Interval (inkl. Backoff).
+
+        Reservierung statt Lock: jeder Aufrufer zieht sofort ein Token (Saldo
+        darf negativ werden) und schläft nur die eigene Wartezeit ab – parallele
+        Worker starten so gestaffelt, ohne sich gegenseitig zu blockieren."""
+        if self.disabled:
+            self._track(category, "requests")
+            return
+        burst = max(1, burst)
+        rate = 1.0 / max(self.intervals.get(category, 1.0), 0.001)
+        now = time.monotonic()
+        bucket = self._buckets.setdefault(category, [float(burst), now])
+        tokens = min(float(burst), bucket[0] + (now - bucket[1]) * rate) - 1.0
+        bucket[0], bucket[1] = tokens, now
+        if tokens < 0:
+            await asyncio.sleep(-tokens / rate)
+        self._last_request[category] = time.time()
+        self._track(category, "requests")
+
     def success(self, category: str):
         """Nach erfolgreicher Anfrage: Backoff reset."""
         self._error_counts[category] = 0
@@ -1,33 +1,57 @@
 """
-TubeVault – RSS Service v1.6.2
+TubeVault – RSS Service v1.10.2
 YouTube RSS Feed Polling + Channel Scan (Videos/Shorts/Live)
 Phasen-Fortschritt, Abbruch-Unterstützung, Fehler-Transparenz
+v1.8.0: Tick parallel – N Worker (Setting rss.workers) + Token-Bucket,
+        Schreiben aller Ergebnisse in einer Transaktion, Tick-Metriken
+v1.9.0: Feed-Probe vor yt-dlp – Conditional GET auf den Atom-Feed
+        (ETag/Last-Modified pro Abo) + Abgleich mit rss_entries
+v1.10.0: Planung über subscriptions.next_check_at (Index) + Min-Heap im
+         Speicher; Intervall aus der Upload-Kadenz (feed_schedule)
+v1.10.1: Kadenz nur aus neuen Videos, ein Zeitpunkt je Video (Feed-Zeit vor
+         yt-dlp-Datum), undatierte Kandidaten zählen nicht
+v1.10.2: manuelle Thumbnail-/Banner-Backfills öffnen gescheiterte und
+         gelöschte Items wieder (backfill_service.reopen)
 © HalloWelt42 – Private Nutzung
 
 Strategie für 800+ Abos:
 - Feeds in Batches, gestaffeltes Polling über 24h verteilt
+- Tick: Abrufen parallel (eigener Thread-Pool), Schreiben gebündelt
+- Tick gestuft: Atom-Feed (304 / nur bekannte IDs) → fertig; yt-dlp nur
+  für Kanäle mit neuen Videos, Feed-Fehler (404) oder ohne yt-dlp-Lauf
+  seit FULL_FETCH_MAX_AGE
 - Nachts: 1 Feed alle 30s (sanft, ~2880 Feeds/24h = reicht für 800)
 - Tags: RSS = XML Feeds (harmlos), pytubefix = Scraping (gefährlich)
 - Error-Backoff: fehlerhafte Feeds zunehmend seltener prüfen
+- Fälligkeit: next_check_at pro Abo, im Speicher als Min-Heap gespiegelt;
+  Intervall aus EWMA der Upload-Abstände + üblicher Upload-Uhrzeit
 - Auto-Download: max 20/Tag, kein Spam-Download
 - Resume: abgebrochene Avatar-Jobs beim Start weitermachen
+- Thumbnail-/Banner-Backfill über backfill_service (parallel, Stand in der DB)
 - KEIN automatischer pytubefix-Massen-Call, NUR auf User-Klick
 """
 
 import asyncio
+import heapq
 import json
 import logging
+import time
 import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 from concurrent.futures import ThreadPoolExecutor
 
-import httpx
-
-from app.config import AVATARS_DIR, RSS_THUMBS_DIR
-from app.utils.file_utils import now_sqlite, past_sqlite
+from app.config import AVATARS_DIR, BANNERS_DIR, RSS_THUMBS_DIR
+from app.constants import SettingsKeys
+from app.utils.file_utils import future_sqlite, now_sqlite, past_sqlite
+from app.utils.pagination import CountCache, decode_cursor, encode_cursor, keyset_segments
 from app.database import db
+from app.services.backfill_service import BackfillTask, backfill_service
+from app.services.counts_service import counts_service
+from app.services.feed_schedule import Cadence, next_interval, parse_published
+from app.services.http_clients import http_clients
 from app.services.job_service import job_service
 from app.services.rate_limiter import rate_limiter
 from app.services.channel_scanner import fetch_all_channel_videos as _scan_channel
@@ -50,11 +74,53 @@ _executor = ThreadPoolExecutor(max_workers=2)
 # Auto-Download: max pro Tag
 AUTO_DL_DAILY_LIMIT = 20
 
+# Tick: parallele Feed-Abrufe (Setting rss.workers)
+DEFAULT_POLL_WORKERS = 4
+MAX_POLL_WORKERS = 16
+MAX_CHECK_INTERVAL = 604800  # 7 Tage
+# Spätestens nach dieser Zeit wieder voll per yt-dlp (Feed kann hinterherhinken)
+FULL_FETCH_MAX_AGE = 86400
+# Heap spätestens nach dieser Zeit aus der DB neu aufbauen (Änderungen über
+# andere Wege als invalidate_schedule())
+SCHEDULE_RELOAD_S = 3600
+
+
+def _file_ok(path, min_size: int) -> bool:
+    """Gecachte Bilddatei vorhanden und nicht abgeschnitten."""
+    try:
+        return path.stat().st_size > min_size
+    except OSError:
+        return False
+
+
+@dataclass
+class FeedPoll:
+    """Ergebnis der Abrufphase eines Feeds (vor dem Schreiben)."""
+    sub: dict
+    channel_name: Optional[str] = None
+    # (video_id, title, published, thumbnail_url, video_type)
+    candidates: list[tuple] = field(default_factory=list)
+    latest_published: str = ""
+    error: Optional[Exception] = None
+    invalid: bool = False      # channel_id unbrauchbar → Abo deaktivieren
+    # "feed" = Atom-Feed ohne Neues (kein yt-dlp), "ytdlp" = volle Extraktion
+    tier: str = "ytdlp"
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # Upload-Zeitpunkte aus dem Atom-Feed: video_id → (epoch, Uhrzeit bekannt)
+    feed_times: dict[str, tuple[float, bool]] = field(default_factory=dict)
+    # Kandidaten ohne Datum von yt-dlp (published = Poll-Zeit, kein Upload-Zeitpunkt)
+    undated: set[str] = field(default_factory=set)
+    seconds: float = 0.0
+    new_count: int = 0         # nach dem Schreiben gesetzt
+
 
 class RSSService:
     """YouTube RSS Feed Manager – produktionsreif."""
 
     def __init__(self):
+        # Feed-Counts (Total/Typ/Tab) für Folgeseiten – erste Seite zählt frisch
+        self._count_cache = CountCache(ttl=60.0)
         self._running = False
         self._polling = False  # Lock: verhindert parallele Tick-Ausführung
         self._auto_dl_today: int = 0
@@ -64,6 +130,13 @@ class RSSService:
         self._last_checked_at: str = ""
         self._feeds_checked_cycle: int = 0
         self._feeds_pending: int = 0
+        self._last_tick: dict = {}  # Metriken des letzten Ticks
+        self._fetch_pool: Optional[ThreadPoolExecutor] = None
+        # Min-Heap (next_check_at, sub_id); "" = sofort fällig. _next_at hält den
+        # gültigen Stand pro Abo, ältere Heap-Einträge werden beim Lesen verworfen
+        self._schedule: list[tuple[str, int]] = []
+        self._next_at: dict[int, str] = {}
+        self._schedule_loaded: float = 0.0
 
     # ─── Worker Lifecycle ─────────────────────────────────
 
@@ -75,6 +148,9 @@ class RSSService:
     async def stop_worker(self):
         """RSS-Service stoppen."""
         self._running = False
+        pool, self._fetch_pool = self._fetch_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
         logger.info("RSS Service gestoppt")
 
     # ─── Tick-basiertes Feed-Polling ───────────────────────
@@ -99,11 +175,19 @@ class RSSService:
         self._polling = True
         try:
             return await self._do_tick(max_feeds)
+        except BaseException:
+            # Aus dem Heap genommene Feeds nicht verlieren
+            self.invalidate_schedule()
+            raise
         finally:
             self._polling = False
 
     async def _do_tick(self, max_feeds: int = 20) -> dict:
-        """Eigentliche Tick-Logik (durch Lock geschützt)."""
+        """Eigentliche Tick-Logik (durch Lock geschützt).
+
+        Zwei Phasen: N Worker holen die fälligen Feeds parallel (Token-Bucket
+        statt seriellem Lock), danach landen alle Ergebnisse in EINER
+        Schreib-Transaktion (_store_polls)."""
         enabled = await self._get_setting("rss.enabled")
         if enabled != "true":
             return {"status": "disabled", "message": "RSS-Polling deaktiviert (rss.enabled=false)"}
@@ -118,16 +202,25 @@ class RSSService:
         if not idle:
             return {"status": "skipped", "message": "System-Job aktiv (Scan/Cleanup) – RSS wartet"}
 
-        # Fällige Feeds holen
-        subs = await db.fetch_all(
-            """SELECT * FROM subscriptions
-               WHERE enabled = 1
-               AND (last_checked IS NULL
-                    OR last_checked < datetime('now', '-' || check_interval || ' seconds'))
-               ORDER BY last_checked ASC NULLS FIRST, error_count ASC
-               LIMIT ?""",
-            (max_feeds,)
-        )
+        # Fällige Feeds aus dem Heap, Zeilen per Primärschlüssel
+        # (lag_s = wie lange schon überfällig)
+        await self._ensure_schedule()
+        now = now_sqlite()
+        due_ids = self._pop_due(now, max_feeds)
+        subs = []
+        if due_ids:
+            rows = await db.fetch_all(
+                f"""SELECT *,
+                          MAX(0, CAST((julianday(?) - julianday(COALESCE(next_check_at, created_at)))
+                                      * 86400 AS INTEGER)) AS lag_s
+                   FROM subscriptions
+                   WHERE id IN ({','.join('?' * len(due_ids))}) AND enabled = 1""",
+                (now, *due_ids)
+            )
+            by_id = {r["id"]: dict(r) for r in rows}
+            subs = [by_id[i] for i in due_ids if i in by_id]
+            for sub_id in set(due_ids) - by_id.keys():
+                self._next_at.pop(sub_id, None)  # gelöscht/deaktiviert
 
         if not subs:
             # Nichts fällig — nächsten fälligen Feed berechnen
@@ -141,133 +234,94 @@ class RSSService:
                 "next_due_in_seconds": next_due,
             }
 
-        subs = [dict(s) for s in subs]
-        total_pending = await db.fetch_val(
-            """SELECT COUNT(*) FROM subscriptions WHERE enabled = 1
-               AND (last_checked IS NULL
-                    OR last_checked < datetime('now', '-' || check_interval || ' seconds'))"""
-        ) or 0
+        total_pending = len(subs) + self._pending_count(now)
         self._feeds_pending = total_pending
+        workers = min(await self._workers(), len(subs))
 
         # Job erstellen (sichtbar im Frontend) – RSS hat höhere Priorität als Downloads
         job = await job_service.create(
             job_type="rss_cycle",
             title=f"RSS-Tick ({len(subs)}/{total_pending} fällig)",
-            description=f"Tick: {len(subs)} Feeds werden geprüft",
-            metadata={"trigger": "tick", "batch_size": len(subs), "total_pending": total_pending},
+            description=f"Tick: {len(subs)} Feeds werden geprüft, {workers} Worker",
+            metadata={"trigger": "tick", "batch_size": len(subs), "total_pending": total_pending,
+                      "workers": workers},
             priority=8,
         )
         await job_service.start(job["id"])
 
-        total_new = 0
-        errors = 0
         default_interval = int(await self._get_setting("rss.interval") or 1800)
-        max_interval = 604800  # 7 Tage
-
-        for i, sub in enumerate(subs):
-            try:
-                await rate_limiter.acquire("rss")
-                new_count = await self._poll_single_feed(sub)
-                total_new += new_count
-                rate_limiter.success("rss")
-
-                # Scheduler-State aktualisieren
-                self._last_checked_channel = sub.get("channel_name") or sub["channel_id"]
-                self._last_checked_at = now_sqlite()
-                self._feeds_checked_cycle += 1
-
-                # ─── Adaptives Interval ───
-                current_interval = sub.get("check_interval", default_interval)
-                if sub.get("error_count", 0) > 0:
-                    # Fehler-Serie beendet → Error-Count reset, Interval beibehalten
-                    await db.execute(
-                        "UPDATE subscriptions SET error_count = 0, last_error = NULL WHERE id = ?",
-                        (sub["id"],)
-                    )
-
-                if new_count > 0:
-                    # Neue Videos → zurück auf Basis-Interval
-                    await db.execute(
-                        "UPDATE subscriptions SET check_interval = ? WHERE id = ?",
-                        (default_interval, sub["id"])
-                    )
-                    if current_interval > default_interval:
-                        logger.info(
-                            f"[ADAPTIVE] {sub.get('channel_name', sub['channel_id'])}: "
-                            f"{new_count} neue Videos → Interval {current_interval//60}min → {default_interval//60}min"
-                        )
+        probe = await self._get_setting(SettingsKeys.RSS_FEED_PROBE) != "false"
+        t0 = time.monotonic()
+
+        # ─── Phase 1: parallel abrufen (nur Netzwerk, keine Schreibzugriffe) ───
+        polls: list[FeedPoll] = []
+        pending = iter(subs)
+
+        async def worker():
+            for sub in pending:
+                await rate_limiter.acquire_bucket("rss", workers)
+                poll = await self._fetch_feed(sub, probe=probe)
+                if poll.error is None:
+                    rate_limiter.success("rss")
+                    # Scheduler-State aktualisieren
+                    self._last_checked_channel = poll.channel_name or sub.get("channel_name") or sub["channel_id"]
+                    self._last_checked_at = now_sqlite()
+                    self._feeds_checked_cycle += 1
                 else:
-                    # Keine neuen Videos → Interval verdoppeln (max 7 Tage)
-                    new_interval = min(current_interval * 2, max_interval)
-                    if new_interval != current_interval:
-                        await db.execute(
-                            "UPDATE subscriptions SET check_interval = ? WHERE id = ?",
-                            (new_interval, sub["id"])
-                        )
-                        logger.debug(
-                            f"[ADAPTIVE] {sub.get('channel_name', sub['channel_id'])}: "
-                            f"Keine neuen Videos → Interval {current_interval//60}min → {new_interval//60}min"
-                        )
+                    rate_limiter.error("rss", str(poll.error)[:200])
+                    logger.warning(f"RSS Cron-Feed Fehler {sub['channel_id']}: {poll.error}")
+                polls.append(poll)
 
-            except Exception as e:
-                errors += 1
-                rate_limiter.error("rss", str(e)[:200])
-                error_count = sub.get("error_count", 0) + 1
-                error_msg = str(e)[:500]
-
-                # 404 = Kanal evtl. gelöscht/umgezogen → starkes Backoff, aber NICHT deaktivieren
-                is_404 = "404" in error_msg
-                if is_404:
-                    new_interval = min(86400, 21600 * error_count)  # 6h, 12h, 24h max
-                    await db.execute(
-                        """UPDATE subscriptions SET
-                           error_count = ?, last_error = ?, check_interval = ?,
-                           last_checked = ?
-                           WHERE id = ?""",
-                        (error_count,
-                         f"[404] Feed nicht erreichbar ({error_count}x) – nächster Versuch in {new_interval//3600}h",
-                         new_interval, now_sqlite(), sub["id"])
-                    )
-                    logger.warning(
-                        f"RSS 404: {sub.get('channel_name', sub['channel_id'])} "
-                        f"– Versuch {error_count}, nächstes Check in {new_interval//3600}h"
-                    )
-                else:
-                    new_interval = min(sub.get("check_interval", 1800) * 2, 86400)
-                    # WICHTIG: last_checked hier AUCH setzen, damit der Kanal nicht
-                    # beim nächsten Tick erneut sofort fällig ist → Endlos-Retry-Loop.
-                    # Der erhöhte check_interval wirkt nur in Kombination mit last_checked.
-                    await db.execute(
-                        """UPDATE subscriptions SET
-                           error_count = ?, last_error = ?, check_interval = ?,
-                           last_checked = ?
-                           WHERE id = ?""",
-                        (error_count, error_msg, new_interval, now_sqlite(), sub["id"])
-                    )
-                logger.warning(f"RSS Cron-Feed Fehler {sub['channel_id']}: {e}")
+                done = len(polls)
+                if done % 5 == 0 or done == len(subs):
+                    errors = sum(1 for p in polls if p.error is not None)
+                    try:
+                        await job_service.progress(
+                            job["id"],
+                            done / len(subs) * 0.9,
+                            f"{done}/{len(subs)} Feeds abgerufen, {errors} Fehler"
+                        )
+                    except Exception:
+                        pass
 
-            # Fortschritt
-            if (i + 1) % 5 == 0 or i == len(subs) - 1:
-                try:
-                    await job_service.progress(
-                        job["id"],
-                        (i + 1) / len(subs),
-                        f"{i + 1}/{len(subs)} Feeds, {total_new} neu, {errors} Fehler"
-                    )
-                except Exception:
-                    pass
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        fetch_seconds = time.monotonic() - t0
+
+        # ─── Phase 2: alle Ergebnisse in einer Transaktion ───
+        t1 = time.monotonic()
+        new_entries = await self._store_polls(polls, default_interval)
+        write_seconds = time.monotonic() - t1
+        await self._after_store(new_entries)
+
+        total_new = len(new_entries)
+        errors = sum(1 for p in polls if p.error is not None)
+        elapsed = time.monotonic() - t0
+        lags = [s.get("lag_s") or 0 for s in subs]
+        metrics = {
+            "workers": workers,
+            "fetch_seconds": round(fetch_seconds, 2),
+            "write_seconds": round(write_seconds, 3),
+            "feeds_per_minute": round(len(polls) / elapsed * 60, 1) if elapsed > 0 else None,
+            "queue_lag_max_s": max(lags),
+            "queue_lag_avg_s": round(sum(lags) / len(lags)),
+            "avg_fetch_seconds": round(sum(p.seconds for p in polls) / len(polls), 2),
+            # yt-dlp-Extraktionen vs. per Feed-Probe erledigt
+            "ytdlp_fetches": sum(1 for p in polls if p.tier == "ytdlp" and not p.invalid),
+            "feed_unchanged": sum(1 for p in polls if p.tier == "feed"),
+        }
+        self._last_tick = {**metrics, "at": now_sqlite(), "checked": len(polls)}
 
         # Job abschließen
         result_msg = f"{total_new} neue Videos, {len(subs)} Feeds geprüft, {errors} Fehler"
+        await job_service.progress(job["id"], 1.0, result_msg, metadata={"metrics": metrics})
         await job_service.complete(job["id"], result_msg)
-        logger.info(f"RSS Tick: {result_msg} (noch {total_pending - len(subs)} fällig)")
+        logger.info(
+            f"RSS Tick: {result_msg} (noch {total_pending - len(subs)} fällig, "
+            f"{metrics['feeds_per_minute']} Feeds/min, Lag max {metrics['queue_lag_max_s']}s)"
+        )
 
         # Verbleibende fällige Feeds + nächster fälliger
-        remaining = await db.fetch_val(
-            """SELECT COUNT(*) FROM subscriptions WHERE enabled = 1
-               AND (last_checked IS NULL
-                    OR last_checked < datetime('now', '-' || check_interval || ' seconds'))"""
-        ) or 0
+        remaining = self._pending_count(now_sqlite())
         self._feeds_pending = remaining
 
         total_enabled = await db.fetch_val(
@@ -284,32 +338,100 @@ class RSSService:
             "errors": errors,
             "remaining_pending": remaining,
             "next_due_in_seconds": next_due,
+            "metrics": metrics,
             "message": result_msg,
         }
 
-    # ─── Einzelner Feed ──────────────────────────────────
+    async def _workers(self) -> int:
+        val = await db.fetch_val("SELECT value FROM settings WHERE key = ?",
+                                 (SettingsKeys.RSS_WORKERS,))
+        try:
+            return max(1, min(MAX_POLL_WORKERS, int(val)))
+        except (TypeError, ValueError):
+            return DEFAULT_POLL_WORKERS
+
+    def _fetch_executor(self) -> ThreadPoolExecutor:
+        if self._fetch_pool is None:
+            self._fetch_pool = ThreadPoolExecutor(max_workers=MAX_POLL_WORKERS,
+                                                  thread_name_prefix="rss-fetch")
+        return self._fetch_pool
+
+    # ─── Planung: next_check_at + Min-Heap ───────────────
+
+    async def _ensure_schedule(self):
+        """Heap aus subscriptions.next_check_at aufbauen (beim ersten Tick,
+        nach invalidate_schedule() und spätestens alle SCHEDULE_RELOAD_S)."""
+        if self._schedule_loaded and time.monotonic() - self._schedule_loaded < SCHEDULE_RELOAD_S:
+            return
+        rows = await db.fetch_all("SELECT id, next_check_at FROM subscriptions WHERE enabled = 1")
+        self._next_at = {r["id"]: r["next_check_at"] or "" for r in rows}
+        self._schedule = [(t, i) for i, t in self._next_at.items()]
+        heapq.heapify(self._schedule)
+        self._schedule_loaded = time.monotonic()
+
+    def invalidate_schedule(self):
+        """Abos außerhalb des Ticks geändert (neu, Intervall, aktiviert …) →
+        Heap beim nächsten Zugriff neu laden."""
+        self._schedule_loaded = 0.0
+
+    def _schedule_set(self, sub_id: int, next_at: Optional[str]):
+        self._next_at[sub_id] = next_at or ""
+        heapq.heappush(self._schedule, (next_at or "", sub_id))
+
+    def _schedule_peek(self) -> Optional[str]:
+        """Frühester gültiger Termin (veraltete Einträge werden verworfen)."""
+        while self._schedule:
+            next_at, sub_id = self._schedule[0]
+            if self._next_at.get(sub_id) == next_at:
+                return next_at
+            heapq.heappop(self._schedule)
+        return None
+
+    def _pop_due(self, now: str, limit: int) -> list[int]:
+        """Bis zu limit fällige Abos aus dem Heap nehmen (früheste zuerst).
+        Nach dem Poll trägt _store_polls den neuen Termin wieder ein."""
+        due = []
+        while len(due) < limit:
+            next_at = self._schedule_peek()
+            if next_at is None or next_at > now:
+                break
+            _, sub_id = heapq.heappop(self._schedule)
+            self._next_at.pop(sub_id, None)
+            due.append(sub_id)
+        return due
+
+    def _pending_count(self, now: str) -> int:
+        return sum(1 for next_at in self._next_at.values() if next_at <= now)
 
     async def _next_due_seconds(self) -> int | None:
         """Sekunden bis der nächste Feed fällig ist. None wenn keine Feeds."""
-        row = await db.fetch_one(
-            """SELECT MIN(
-                 MAX(0, CAST(
-                   (julianday(last_checked) + (check_interval / 86400.0) - julianday('now')) * 86400
-                 AS INTEGER))
-               ) AS next_sec
-               FROM subscriptions
-               WHERE enabled = 1 AND last_checked IS NOT NULL"""
-        )
-        if row and row["next_sec"] is not None:
-            return max(0, int(row["next_sec"]))
-        # Feeds ohne last_checked = sofort fällig
-        has_unchecked = await db.fetch_val(
-            "SELECT COUNT(*) FROM subscriptions WHERE enabled = 1 AND last_checked IS NULL"
-        )
-        return 0 if has_unchecked else None
+        await self._ensure_schedule()
+        next_at = self._schedule_peek()
+        if next_at is None:
+            return None
+        if not next_at:
+            return 0  # noch nie geprüft = sofort fällig
+        delta = datetime.strptime(next_at, "%Y-%m-%d %H:%M:%S") - datetime.now()
+        return max(0, int(delta.total_seconds()))
+
+    # ─── Einzelner Feed ──────────────────────────────────
 
     async def _poll_single_feed(self, sub: dict) -> int:
-        """Einzelnen Kanal prüfen, neue Videos speichern.
+        """Einzelnen Kanal prüfen, neue Videos speichern (Abruf + Schreiben
+        wie im Tick, nur für einen Feed). Fehler werden weitergereicht."""
+        poll = await self._fetch_feed(sub)
+        if poll.error is not None:
+            raise poll.error
+        new_entries = await self._store_polls([poll])
+        await self._after_store(new_entries)
+        return len(new_entries)
+
+    async def _fetch_feed(self, sub: dict, probe: bool = False) -> FeedPoll:
+        """Abrufphase eines Feeds – nur Netzwerk, keine Schreibzugriffe.
+        Exceptions landen in FeedPoll.error.
+
+        probe=True: zuerst _probe_feed(); ohne neue Videos endet der Poll dort
+        (tier="feed"), sonst volle Extraktion wie bisher.
 
         Seit v1.6: RSS (feeds/videos.xml) liefert bei YouTube oft HTTP 404.
         Stattdessen yt-dlp `Channel.videos` (flat) → neueste N Videos.
@@ -317,128 +439,302 @@ class RSSService:
         der Video-Kategorie (flat-mode liefert kein zuverlässiges is_live).
         """
         channel_id = sub["channel_id"]
+        poll = FeedPoll(sub=sub)
 
         # Ungültige channel_ids überspringen (z.B. URLs statt IDs)
         if not channel_id or not channel_id.startswith("UC") or len(channel_id) != 24:
-            logger.warning(f"Ungültige channel_id übersprungen: {channel_id[:60]}… – deaktiviere")
-            await db.execute(
-                "UPDATE subscriptions SET enabled = 0, last_error = ? WHERE id = ?",
-                (f"Ungültige channel_id: {channel_id[:100]}", sub["id"])
-            )
-            return 0
+            poll.invalid = True
+            return poll
 
-        from app.utils.pytube_client import make_channel
-        max_new = int(await self._get_setting("rss.max_videos_per_poll") or 15)
-
-        loop = asyncio.get_event_loop()
-
-        def _fetch_tab(subpath: str):
-            ch = make_channel(
-                f"https://www.youtube.com/channel/{channel_id}{subpath}",
-                max_videos=max_new,
-            )
-            return ch.channel_name, list(ch.videos)
-
-        def _fetch():
-            # Primär /videos. Wenn der Kanal nur Shorts/Live hat, existiert der
-            # Tab nicht (yt-dlp: "does not have a videos tab") → Fallback.
+        t0 = time.monotonic()
+        if probe:
             try:
-                return _fetch_tab("/videos")
+                changed = await self._probe_feed(sub, poll)
             except Exception as e:
-                msg = str(e).lower()
-                if "does not have a videos tab" not in msg and "no videos" not in msg:
-                    raise
-                # Fallback-Reihenfolge: shorts → streams → root (/)
-                for sub_tab in ("/shorts", "/streams", ""):
-                    try:
-                        name, vids = _fetch_tab(sub_tab)
-                        if vids or sub_tab == "":
-                            return name, vids
-                    except Exception:
-                        continue
-                # Alles leer: als erfolgreicher Poll ohne neue Videos zurückgeben
-                return channel_id, []
-
-        channel_name, videos = await loop.run_in_executor(None, _fetch)
-
-        # Kanalname updaten wenn nötig
-        if channel_name and (not sub.get("channel_name") or sub["channel_name"] == sub["channel_id"]):
-            await db.execute(
-                "UPDATE subscriptions SET channel_name = ? WHERE id = ?",
-                (channel_name, sub["id"])
-            )
-
-        now = now_sqlite()
-        max_age = int(await self._get_setting("rss.max_age_days") or 90)
-        cutoff = past_sqlite(days=max_age)
-
-        new_count = 0
-        latest_published = ""
-        for v in videos:
-            video_id = v.video_id
-            if not video_id:
-                continue
-
-            title = v.title or ""
-            thumb_url = v.thumbnail_url
-
-            # yt-dlp liefert upload_date als "YYYYMMDD" (manchmal None bei flat-mode)
-            raw_date = v.publish_date
-            if raw_date and len(raw_date) == 8 and raw_date.isdigit():
-                published = f"{raw_date[:4]}-{raw_date[4:6]}-{raw_date[6:8]}T00:00:00+00:00"
-            else:
-                # Kein Datum bekannt → jetzt (UNIQUE constraint verhindert Duplikate)
-                published = now
-
-            if published < cutoff:
-                continue
-
-            # Video-Typ: Shorts anhand duration; Live-Erkennung in flat-mode unzuverlässig
-            duration = v.length or 0
-            video_type = "short" if 0 < duration <= 60 else "video"
+                logger.debug(f"Feed-Probe {channel_id} fehlgeschlagen: {e}")
+                changed = True
+            if not changed:
+                poll.tier = "feed"
+                poll.seconds = time.monotonic() - t0
+                return poll
+        try:
+            from app.utils.pytube_client import make_channel
+            max_new = int(await self._get_setting("rss.max_videos_per_poll") or 15)
 
-            try:
-                await db.execute(
-                    """INSERT INTO rss_entries (video_id, channel_id, title, published, thumbnail_url, video_type)
-                       VALUES (?, ?, ?, ?, ?, ?)""",
-                    (video_id, channel_id, title, published, thumb_url, video_type)
+            def _fetch_tab(subpath: str):
+                ch = make_channel(
+                    f"https://www.youtube.com/channel/{channel_id}{subpath}",
+                    max_videos=max_new,
                 )
-                new_count += 1
+                return ch.channel_name, list(ch.videos)
 
-                if thumb_url:
-                    try:
-                        await self._cache_rss_thumbnail(video_id, thumb_url)
-                    except Exception:
-                        pass
+            def _fetch():
+                # Primär /videos. Wenn der Kanal nur Shorts/Live hat, existiert der
+                # Tab nicht (yt-dlp: "does not have a videos tab") → Fallback.
+                try:
+                    return _fetch_tab("/videos")
+                except Exception as e:
+                    msg = str(e).lower()
+                    if "does not have a videos tab" not in msg and "no videos" not in msg:
+                        raise
+                    # Fallback-Reihenfolge: shorts → streams → root (/)
+                    for sub_tab in ("/shorts", "/streams", ""):
+                        try:
+                            name, vids = _fetch_tab(sub_tab)
+                            if vids or sub_tab == "":
+                                return name, vids
+                        except Exception:
+                            continue
+                    # Alles leer: als erfolgreicher Poll ohne neue Videos zurückgeben
+                    return channel_id, []
+
+            loop = asyncio.get_running_loop()
+            poll.channel_name, videos = await loop.run_in_executor(self._fetch_executor(), _fetch)
+
+            max_age = int(await self._get_setting("rss.max_age_days") or 90)
+            cutoff = past_sqlite(days=max_age)
+            now = now_sqlite()
+            for v in videos:
+                video_id = v.video_id
+                if not video_id:
+                    continue
 
-                if sub.get("auto_download"):
-                    await self._auto_queue_video(video_id, sub)
+                # yt-dlp liefert upload_date als "YYYYMMDD" (manchmal None bei flat-mode)
+                raw_date = v.publish_date
+                if raw_date and len(raw_date) == 8 and raw_date.isdigit():
+                    published = f"{raw_date[:4]}-{raw_date[4:6]}-{raw_date[6:8]}T00:00:00+00:00"
+                else:
+                    # Kein Datum bekannt → jetzt (UNIQUE constraint verhindert Duplikate)
+                    published = now
+                    poll.undated.add(video_id)
 
-            except Exception:
-                pass  # UNIQUE constraint = bereits bekannt
+                if published < cutoff:
+                    continue
 
-            if published > latest_published:
-                latest_published = published
+                # Video-Typ: Shorts anhand duration; Live-Erkennung in flat-mode unzuverlässig
+                duration = v.length or 0
+                video_type = "short" if 0 < duration <= 60 else "video"
+                poll.candidates.append((video_id, v.title or "", published, v.thumbnail_url, video_type))
 
-        # Subscription aktualisieren
-        await db.execute(
-            """UPDATE subscriptions SET
-               last_checked = ?,
-               video_count = (SELECT COUNT(*) FROM rss_entries WHERE channel_id = ?)
-               WHERE id = ?""",
-            (now, channel_id, sub["id"])
-        )
+                if published > poll.latest_published:
+                    poll.latest_published = published
+        except Exception as e:
+            poll.error = e
+        poll.seconds = time.monotonic() - t0
+        return poll
+
+    async def _store_polls(self, polls: list[FeedPoll],
+                           default_interval: Optional[int] = None) -> list[tuple[dict, str, str]]:
+        """Schreibphase: Einträge + Abo-Updates aller Polls in EINER Transaktion.
+
+        Jeder erfolgreiche Poll aktualisiert die Upload-Kadenz und setzt
+        next_check_at neu. default_interval gesetzt (Tick) → Intervall aus der
+        Kadenz (_adapt_interval) und Fehler-Backoff; sonst bleibt check_interval
+        und nur erfolgreiche Polls werden geschrieben.
+        Rückgabe: neue Einträge als (sub, video_id, thumbnail_url)."""
+        now = now_sqlite()
+        new_entries = []
+        disabled, names, checked, failures = [], [], [], []
+        schedule: list[tuple[int, Optional[str]]] = []
+
+        for poll in polls:
+            sub = poll.sub
+            if poll.invalid:
+                channel_id = sub["channel_id"] or ""
+                logger.warning(f"Ungültige channel_id übersprungen: {channel_id[:60]}… – deaktiviere")
+                disabled.append((f"Ungültige channel_id: {channel_id[:100]}", sub["id"]))
+            elif poll.error is not None:
+                if default_interval is not None:
+                    error_count, last_error, interval = self._error_backoff(sub, poll.error)
+                    next_at = future_sqlite(seconds=interval)
+                    failures.append((error_count, last_error, interval, now, next_at, sub["id"]))
+                    schedule.append((sub["id"], next_at))
+            elif poll.channel_name and (not sub.get("channel_name")
+                                        or sub["channel_name"] == sub["channel_id"]):
+                names.append((poll.channel_name, sub["id"]))
+
+        async with db.transaction():
+            for poll in polls:
+                if poll.invalid or poll.error is not None:
+                    continue
+                sub = poll.sub
+                # rowcount je Zeile → welche Einträge wirklich neu sind
+                uploads = []
+                for video_id, title, published, thumb_url, video_type in poll.candidates:
+                    cursor = await db.execute(
+                        """INSERT OR IGNORE INTO rss_entries (video_id, channel_id, title, published, thumbnail_url, video_type)
+                           VALUES (?, ?, ?, ?, ?, ?)""",
+                        (video_id, sub["channel_id"], title, published, thumb_url, video_type)
+                    )
+                    if cursor.rowcount > 0:
+                        new_entries.append((sub, video_id, thumb_url))
+                        poll.new_count += 1
+                        uploads.append(self._upload_time(poll, video_id, published))
+
+                # Kadenz nur aus neuen Videos, je Video ein Zeitpunkt
+                cadence = Cadence.from_json(sub.get("upload_cadence"))
+                cadence_json = cadence.to_json() if cadence.observe([u for u in uploads if u]) else None
+                if default_interval is not None:
+                    interval = self._adapt_interval(poll, cadence, default_interval)
+                else:
+                    interval = None
+                next_at = future_sqlite(seconds=interval or sub.get("check_interval") or 1800)
+                checked.append((now, sub["channel_id"], poll.latest_published or None,
+                                poll.etag, poll.last_modified,
+                                now if poll.tier == "ytdlp" else None,
+                                cadence_json, interval, next_at, sub["id"]))
+                schedule.append((sub["id"], next_at))
+
+            await db.execute_many(
+                "UPDATE subscriptions SET enabled = 0, last_error = ? WHERE id = ?", disabled)
+            await db.execute_many(
+                "UPDATE subscriptions SET channel_name = ? WHERE id = ?", names)
+            # Erfolgreicher Poll beendet eine Fehler-Serie
+            await db.execute_many(
+                """UPDATE subscriptions SET
+                   last_checked = ?,
+                   video_count = (SELECT COUNT(*) FROM rss_entries WHERE channel_id = ?),
+                   last_video_date = COALESCE(?, last_video_date),
+                   feed_etag = COALESCE(?, feed_etag),
+                   feed_last_modified = COALESCE(?, feed_last_modified),
+                   feed_full_fetch = COALESCE(?, feed_full_fetch),
+                   upload_cadence = COALESCE(?, upload_cadence),
+                   check_interval = COALESCE(?, check_interval),
+                   next_check_at = ?,
+                   error_count = 0, last_error = NULL
+                   WHERE id = ?""", checked)
+            # last_checked/next_check_at auch bei Fehlern setzen, sonst ist der
+            # Kanal beim nächsten Tick sofort wieder fällig → Endlos-Retry-Loop
+            await db.execute_many(
+                """UPDATE subscriptions SET
+                   error_count = ?, last_error = ?, check_interval = ?,
+                   last_checked = ?, next_check_at = ?
+                   WHERE id = ?""", failures)
+
+        for sub_id, next_at in schedule:
+            self._schedule_set(sub_id, next_at)
+        for _, sub_id in disabled:
+            self._next_at.pop(sub_id, None)
+        if disabled or failures or any(p.sub.get("error_count") for p in polls):
+            counts_service.invalidate("subscriptions")
+        if new_entries:
+            counts_service.invalidate("rss_entries")
+        return new_entries
+
+    async def _probe_feed(self, sub: dict, poll: FeedPoll) -> bool:
+        """Günstige Vorstufe: Conditional GET auf den Atom-Feed des Kanals.
+
+        False (kein yt-dlp nötig): 304 Not Modified, oder alle Feed-Einträge
+        innerhalb von rss.max_age_days sind schon in rss_entries.
+        True: neue Video-IDs, Feed nicht nutzbar (404 …) oder letzte volle
+        Extraktion älter als FULL_FETCH_MAX_AGE. ETag/Last-Modified landen in
+        poll und werden erst nach erfolgreichem Poll gespeichert."""
+        full_fetch = sub.get("feed_full_fetch")
+        if not full_fetch or full_fetch < past_sqlite(seconds=FULL_FETCH_MAX_AGE):
+            return True
+
+        headers = {}
+        if sub.get("feed_etag"):
+            headers["If-None-Match"] = sub["feed_etag"]
+        if sub.get("feed_last_modified"):
+            headers["If-Modified-Since"] = sub["feed_last_modified"]
+        resp = await http_clients.get(YT_RSS_URL.format(channel_id=sub["channel_id"]),
+                                      category="rss", timeout=10, headers=headers)
+        if resp.status_code == 304:
+            return False
+        if resp.status_code != 200:
+            return True
+        poll.etag = resp.headers.get("etag")
+        poll.last_modified = resp.headers.get("last-modified")
+
+        root = ET.fromstring(resp.content)
+        cutoff = past_sqlite(days=int(await self._get_setting("rss.max_age_days") or 90))
+        feed_ids = set()
+        for entry in root.findall(f"{ATOM_NS}entry"):
+            video_id = entry.findtext(f"{YT_NS}videoId", "")
+            published = entry.findtext(f"{ATOM_NS}published", "")
+            uploaded = parse_published(published)
+            if video_id and uploaded:
+                poll.feed_times[video_id] = uploaded  # genaue Upload-Zeit für die Kadenz
+            if video_id and (not published or published >= cutoff):
+                feed_ids.add(video_id)
+        if not feed_ids:
+            return False
+        known = await db.fetch_all(
+            f"""SELECT video_id FROM rss_entries
+                WHERE channel_id = ? AND video_id IN ({','.join('?' * len(feed_ids))})""",
+            (sub["channel_id"], *feed_ids))
+        return len(known) < len(feed_ids)
 
-        if latest_published:
-            await db.execute(
-                "UPDATE subscriptions SET last_video_date = ? WHERE id = ?",
-                (latest_published, sub["id"])
-            )
+    @staticmethod
+    def _upload_time(poll: FeedPoll, video_id: str, published: str) -> Optional[tuple[float, bool]]:
+        """Upload-Zeitpunkt eines neuen Videos für die Kadenz: genaue Zeit aus
+        dem Atom-Feed vor dem reinen Datum von yt-dlp; ohne Datum (Poll-Zeit
+        als Platzhalter) → None, sonst lernt die Kadenz das Poll-Intervall."""
+        if video_id in poll.feed_times:
+            return poll.feed_times[video_id]
+        if video_id in poll.undated:
+            return None
+        return parse_published(published)
 
-        if new_count > 0:
-            logger.info(f"Feed: {new_count} neue Videos von {sub.get('channel_name', channel_id)}")
+    @staticmethod
+    def _adapt_interval(poll: FeedPoll, cadence: Cadence, default_interval: int) -> int:
+        """Intervall bis zum nächsten Check aus der Upload-Kadenz
+        (feed_schedule.next_interval); ohne bekannte Kadenz wie bisher:
+        neue Videos → Basis-Interval, sonst verdoppeln (max 7 Tage)."""
+        sub = poll.sub
+        name = sub.get("channel_name") or sub["channel_id"]
+        current = sub.get("check_interval") or default_interval
+        new_interval = next_interval(cadence, time.time(), default_interval,
+                                     MAX_CHECK_INTERVAL, current, poll.new_count)
+        if poll.new_count > 0 and current > new_interval:
+            logger.info(
+                f"[ADAPTIVE] {name}: {poll.new_count} neue Videos → "
+                f"Interval {current//60}min → {new_interval//60}min"
+            )
+        elif new_interval != current:
+            logger.debug(
+                f"[ADAPTIVE] {name}: Interval {current//60}min → {new_interval//60}min"
+                + (f" (Kadenz {cadence.gap / 3600:.1f}h)" if cadence.known else "")
+            )
+        return new_interval
 
-        return new_count
+    @staticmethod
+    def _error_backoff(sub: dict, error: Exception) -> tuple[int, str, int]:
+        """(error_count, last_error, check_interval) nach einem Fehler."""
+        error_count = (sub.get("error_count") or 0) + 1
+        error_msg = str(error)[:500]
+        # 404 = Kanal evtl. gelöscht/umgezogen → starkes Backoff, aber NICHT deaktivieren
+        if "404" in error_msg:
+            new_interval = min(86400, 21600 * error_count)  # 6h, 12h, 24h max
+            logger.warning(
+                f"RSS 404: {sub.get('channel_name', sub['channel_id'])} "
+                f"– Versuch {error_count}, nächstes Check in {new_interval//3600}h"
+            )
+            return (error_count,
+                    f"[404] Feed nicht erreichbar ({error_count}x) – nächster Versuch in {new_interval//3600}h",
+                    new_interval)
+        return error_count, error_msg, min((sub.get("check_interval") or 1800) * 2, 86400)
+
+    async def _after_store(self, new_entries: list[tuple[dict, str, str]]):
+        """Netzwerk (Thumbnails) + Auto-Queue erst NACH dem Commit –
+        der Writer soll nicht über HTTP-Wartezeiten gesperrt bleiben."""
+        per_channel: dict[str, int] = {}
+        for sub, video_id, thumb_url in new_entries:
+            if thumb_url:
+                try:
+                    await self._cache_rss_thumbnail(video_id, thumb_url)
+                except Exception:
+                    pass
+            if sub.get("auto_download"):
+                try:
+                    await self._auto_queue_video(video_id, sub)
+                except Exception as e:
+                    logger.debug(f"Auto-Queue {video_id} Fehler: {e}")
+            name = sub.get("channel_name") or sub["channel_id"]
+            per_channel[name] = per_channel.get(name, 0) + 1
+        for name, count in per_channel.items():
+            logger.info(f"Feed: {count} neue Videos von {name}")
 
     # ─── Typ-getrennte RSS-Feeds (UUSH/UULV) ──────────────
 
@@ -462,15 +758,14 @@ class RSSService:
             playlist_id = self._channel_to_playlist_id(channel_id, prefix)
             url = YT_RSS_TYPED_URL.format(playlist_id=playlist_id)
             try:
-                async with httpx.AsyncClient(timeout=10) as client:
-                    resp = await client.get(url)
-                    if resp.status_code != 200:
-                        return set()
-                    root = ET.fromstring(resp.text)
-                    return {
-                        entry.findtext(f"{YT_NS}videoId", "")
-                        for entry in root.findall(f"{ATOM_NS}entry")
-                    } - {""}
+                resp = await http_clients.get(url, category="rss", timeout=10)
+                if resp.status_code != 200:
+                    return set()
+                root = ET.fromstring(resp.text)
+                return {
+                    entry.findtext(f"{YT_NS}videoId", "")
+                    for entry in root.findall(f"{ATOM_NS}entry")
+                } - {""}
             except Exception:
                 return set()
 
@@ -556,6 +851,7 @@ class RSSService:
             "UPDATE rss_entries SET status = 'queued', auto_queued = 1 WHERE video_id = ?",
             (video_id,)
         )
+        counts_service.invalidate("rss_entries")
 
         self._auto_dl_today += 1
         logger.info(f"Auto-DL queued: {video_id} ({self._auto_dl_today}/{limit} heute)")
@@ -610,6 +906,8 @@ class RSSService:
                VALUES (?, ?, ?, ?, ?, ?, ?)""",
             (channel_id, channel_name, channel_url, avatar_path, auto_download, quality, default_interval)
         )
+        counts_service.invalidate("subscriptions")
+        self.invalidate_schedule()
 
         if cursor.rowcount == 0:
             if avatar_path:
@@ -647,38 +945,79 @@ class RSSService:
             dest = RSS_THUMBS_DIR / f"{video_id}.jpg"
             if dest.exists() and dest.stat().st_size > 0:
                 return str(dest)
-            async with httpx.AsyncClient(timeout=10) as client:
-                resp = await client.get(thumb_url)
-                if resp.status_code == 200 and len(resp.content) > 500:
-                    dest.write_bytes(resp.content)
-                    return str(dest)
+            resp = await http_clients.get(thumb_url, category="thumbnail", timeout=10)
+            if resp.status_code == 200 and len(resp.content) > 500:
+                dest.write_bytes(resp.content)
+                return str(dest)
         except Exception as e:
             logger.debug(f"RSS-Thumb Cache fehlgeschlagen für {video_id}: {e}")
         return None
 
-    async def backfill_missing_thumbnails(self):
-        """Fehlende RSS-Thumbnails beim Start nachcachen (non-blocking)."""
-        import asyncio
-        await asyncio.sleep(15)  # Warte bis System bereit
+    async def backfill_missing_thumbnails(self, delay: float = 15, manual: bool = False) -> dict:
+        """Fehlende RSS-Thumbnails nachcachen (Backfill-Engine, parallel,
+        setzt nach Neustart fort). manual (Button): auch bisher gescheiterte
+        und inzwischen gelöschte Thumbnails erneut holen."""
+        await asyncio.sleep(delay)  # Warte bis System bereit
+        RSS_THUMBS_DIR.mkdir(parents=True, exist_ok=True)
         try:
-            rows = await db.fetch_all(
-                "SELECT video_id, thumbnail_url FROM rss_entries WHERE thumbnail_url IS NOT NULL")
-            cached = 0
-            for row in rows:
-                dest = RSS_THUMBS_DIR / f"{row['video_id']}.jpg"
-                if dest.exists() and dest.stat().st_size > 500:
-                    continue
-                try:
-                    await self._cache_rss_thumbnail(row["video_id"], row["thumbnail_url"])
-                    cached += 1
-                    if cached % 50 == 0:
-                        await asyncio.sleep(2)  # Rate-Limit
-                except Exception:
-                    pass
-            if cached > 0:
-                logger.info(f"[RSS-Thumbs] {cached} fehlende Thumbnails nachgecacht")
+            if manual:
+                await backfill_service.reopen("rss_thumb", lambda key: _file_ok(
+                    RSS_THUMBS_DIR / f"{key}.jpg", 500))
+            return await backfill_service.run(BackfillTask(
+                kind="rss_thumb", title="RSS-Thumbnails nachladen",
+                query="SELECT video_id AS item_key, thumbnail_url FROM rss_entries "
+                      "WHERE thumbnail_url IS NOT NULL",
+                fetch=self._backfill_thumbnail, category="thumbnail",
+            ))
         except Exception as e:
             logger.warning(f"[RSS-Thumbs] Backfill Fehler: {e}")
+            return {}
+
+    async def _backfill_thumbnail(self, row: dict) -> bool:
+        """Ein RSS-Thumbnail für den Backfill. 429/403 → Exception (Backoff)."""
+        dest = RSS_THUMBS_DIR / f"{row['item_key']}.jpg"
+        if _file_ok(dest, 500):
+            return True
+        resp = await http_clients.get(row["thumbnail_url"], category="thumbnail", timeout=10)
+        if resp.status_code == 200 and len(resp.content) > 500:
+            dest.write_bytes(resp.content)
+            return True
+        resp.raise_for_status()
+        return False
+
+    async def backfill_banners(self, delay: float = 30, manual: bool = False) -> dict:
+        """Externe Kanal-Banner lokal cachen und banner_url auf den lokalen
+        Endpoint umstellen (Backfill-Engine). manual wie bei den Thumbnails."""
+        await asyncio.sleep(delay)  # Warte bis System bereit
+        BANNERS_DIR.mkdir(parents=True, exist_ok=True)
+        try:
+            if manual:
+                await backfill_service.reopen("banner", lambda key: _file_ok(
+                    BANNERS_DIR / f"{key}.jpg", 1000))
+            return await backfill_service.run(BackfillTask(
+                kind="banner", title="Kanal-Banner cachen",
+                query="SELECT channel_id AS item_key, banner_url FROM subscriptions "
+                      "WHERE banner_url IS NOT NULL AND banner_url NOT LIKE '/api/%'",
+                fetch=self._backfill_banner, category="thumbnail",
+                on_done=lambda row: (
+                    "UPDATE subscriptions SET banner_url = ? WHERE channel_id = ?",
+                    (f"/api/subscriptions/banner/{row['item_key']}", row["item_key"])),
+            ))
+        except Exception as e:
+            logger.warning(f"Banner-Backfill Fehler: {e}")
+            return {}
+
+    async def _backfill_banner(self, row: dict) -> bool:
+        """Ein Banner für den Backfill; banner_url setzt on_done im Batch um."""
+        dest = BANNERS_DIR / f"{row['item_key']}.jpg"
+        if _file_ok(dest, 1000):
+            return True
+        resp = await http_clients.get(row["banner_url"], category="thumbnail")
+        if resp.status_code == 200 and len(resp.content) > 1000:
+            dest.write_bytes(resp.content)
+            return True
+        resp.raise_for_status()
+        return False
 
     async def _fetch_channel_avatar(self, channel_id: str) -> Optional[str]:
         """Kanal-Avatar per pytubefix holen. Caller muss rate_limiter.acquire('avatar') machen."""
@@ -709,10 +1048,9 @@ class RSSService:
             AVATARS_DIR.mkdir(parents=True, exist_ok=True)
             avatar_file = AVATARS_DIR / f"{channel_id}.jpg"
 
-            async with httpx.AsyncClient(timeout=15) as client:
-                resp = await client.get(thumb_url)
-                resp.raise_for_status()
-                avatar_file.write_bytes(resp.content)
+            resp = await http_clients.get(thumb_url, category="avatar")
+            resp.raise_for_status()
+            avatar_file.write_bytes(resp.content)
 
             if ch_name:
                 await db.execute(
@@ -806,6 +1144,8 @@ class RSSService:
                VALUES (?, ?, ?, ?)""",
             (channel_id, channel_name, channel_url, auto_download)
         )
+        counts_service.invalidate("subscriptions")
+        self.invalidate_schedule()
 
         return {"new": cursor.rowcount > 0, "channel_id": channel_id}
 
@@ -895,6 +1235,8 @@ class RSSService:
     async def remove_subscription(self, sub_id: int):
         await db.execute("DELETE FROM rss_entries WHERE channel_id = (SELECT channel_id FROM subscriptions WHERE id = ?)", (sub_id,))
         await db.execute("DELETE FROM subscriptions WHERE id = ?", (sub_id,))
+        self._next_at.pop(sub_id, None)
+        counts_service.invalidate("subscriptions", "rss_entries")
 
     async def update_subscription(self, sub_id: int, updates: dict):
         import random
@@ -917,8 +1259,15 @@ class RSSService:
             filtered["drip_next_run"] = None
 
         set_clause = ", ".join(f"{k} = ?" for k in filtered)
-        values = list(filtered.values()) + [sub_id]
-        await db.execute(f"UPDATE subscriptions SET {set_clause} WHERE id = ?", values)
+        values = list(filtered.values())
+        if "check_interval" in filtered:
+            # Termin passend zum neuen Intervall (noch nie geprüft → sofort)
+            set_clause += ", next_check_at = datetime(last_checked, '+' || ? || ' seconds')"
+            values.append(filtered["check_interval"])
+        await db.execute(f"UPDATE subscriptions SET {set_clause} WHERE id = ?", values + [sub_id])
+        counts_service.invalidate("subscriptions")
+        if "check_interval" in filtered or "enabled" in filtered:
+            self.invalidate_schedule()
 
     async def get_subscriptions(self, page: int = 1, per_page: int = 50) -> dict:
         total = await db.fetch_val("SELECT COUNT(*) FROM subscriptions")
@@ -978,14 +1327,18 @@ class RSSService:
                              feed_tab: str = "active",
                              page: int = 1, per_page: int = 50,
                              keywords: str = None,
-                             duration_min: int = None, duration_max: int = None) -> dict:
+                             duration_min: int = None, duration_max: int = None,
+                             cursor: str = None) -> dict:
         """Feed-Videos mit Pagination, Mehrfach-Typ/Kanal/Tag-Filter und Feed-Status-Tabs.
         
         feed_tab: active | later | dismissed | archived | all
         keywords: Komma-getrennte Tags zum Filtern (OR-Verknuepfung)
         duration_min/max: Dauer-Filter in Sekunden
+        cursor: Keyset-Modus ("" = erste Seite, sonst next_cursor der Vorseite).
+                Folgeseiten (auch page > 1) nehmen die Counts aus dem Cache.
         """
         offset = (page - 1) * per_page
+        first_page = (not cursor) if cursor is not None else page == 1
 
         # Shorts ausblenden wenn in Einstellungen aktiviert
         hide_shorts = await self._get_setting("feed.hide_shorts")
@@ -1027,11 +1380,13 @@ class RSSService:
         if keywords:
             kw_list = [k.strip() for k in keywords.split(",") if k.strip()]
             if kw_list:
-                conditions = []
-                for kw in kw_list:
-                    conditions.append("r.keywords LIKE ?")
-                    keyword_params.append(f'%"{kw}"%')
-                keyword_filter = f"AND ({' OR '.join(conditions)})"
+                # Index-Lookup über rss_entry_keywords (case-insensitiv wie früher LIKE)
+                placeholders = ",".join("?" * len(kw_list))
+                keyword_filter = (
+                    "AND r.id IN (SELECT entry_id FROM rss_entry_keywords "
+                    f"WHERE keyword COLLATE NOCASE IN ({placeholders}))"
+                )
+                keyword_params = kw_list
 
         # Dauer-Filter
         duration_filter = ""
@@ -1059,42 +1414,44 @@ class RSSService:
         all_params = channel_params + type_params + keyword_params + duration_params
 
         # Total
-        total = await db.fetch_val(
+        total = await self._count_cache.count(
+            db.fetch_val,
             f"""SELECT COUNT(*) FROM rss_entries r
                 JOIN subscriptions s ON r.channel_id = s.channel_id
                 {base_where}""",
-            tuple(all_params)
-        ) or 0
+            all_params, refresh=first_page,
+        )
 
         # Typ-Counts (fuer Filter-Badges) – basieren auf gleichem Status-Tab + Keyword-Filter
         type_counts = {}
         for vt, cond in [("video", "COALESCE(r.video_type, 'video') = 'video'"),
                          ("short", "r.video_type = 'short'"),
                          ("live", "r.video_type = 'live'")]:
-            c = await db.fetch_val(
+            c = await self._count_cache.count(
+                db.fetch_val,
                 f"""SELECT COUNT(*) FROM rss_entries r
                     JOIN subscriptions s ON r.channel_id = s.channel_id
                     WHERE 1=1 {status_filter} {channel_filter} {keyword_filter} {duration_filter} AND {cond}""",
-                tuple(channel_params + keyword_params + duration_params)
-            ) or 0
+                channel_params + keyword_params + duration_params, refresh=first_page,
+            )
             type_counts[vt] = c
 
         # Tab-Counts (fuer Tab-Badges)
         tab_counts = {}
         for tab in ["active", "later", "dismissed", "archived"]:
-            tc = await db.fetch_val(
+            tc = await self._count_cache.count(
+                db.fetch_val,
                 f"""SELECT COUNT(*) FROM rss_entries r
                     JOIN subscriptions s ON r.channel_id = s.channel_id
                     WHERE COALESCE(r.feed_status, 'active') = ?""",
-                (tab,)
-            ) or 0
+                [tab], refresh=first_page,
+            )
             tab_counts[tab] = tc
 
         # Ergebnisse
         # is_in_queue + queue_status via EXISTS-Subquery auf jobs-Tabelle
         # (analog subscriptions.py – Feed-Card zeigt gelben Rahmen + disabled DL-Button)
-        rows = await db.fetch_all(
-            f"""SELECT r.*, s.channel_name, s.download_quality, s.audio_only,
+        select = """SELECT r.*, s.channel_name, s.download_quality, s.audio_only,
                        v.status as video_status,
                        COALESCE(r.video_type, 'video') as video_type_safe,
                        CASE WHEN (SELECT j.id FROM jobs j
@@ -1110,19 +1467,46 @@ class RSSService:
                                  LIMIT 1), '') as queue_status
                 FROM rss_entries r
                 JOIN subscriptions s ON r.channel_id = s.channel_id
-                LEFT JOIN videos v ON r.video_id = v.id
-                {base_where}
-                ORDER BY r.published DESC
-                LIMIT ? OFFSET ?""",
-            tuple(all_params + [per_page, offset])
-        )
+                LEFT JOIN videos v ON r.video_id = v.id"""
+        # Tiebreaker r.id: eindeutige Reihenfolge bei gleichem published (Cursor)
+        order_by = "ORDER BY r.published DESC, r.id DESC"
+
+        next_cursor = None
+        if cursor is None:
+            rows = await db.fetch_all(
+                f"{select} {base_where} {order_by} LIMIT ? OFFSET ?",
+                tuple(all_params + [per_page, offset])
+            )
+            has_more = (page * per_page) < total
+        else:
+            want = per_page + 1
+            if not cursor:
+                rows = await db.fetch_all(
+                    f"{select} {base_where} {order_by} LIMIT ?",
+                    tuple(all_params + [want])
+                )
+            else:
+                values = decode_cursor(cursor, 2)
+                rows = []
+                for seg_sql, seg_params in keyset_segments("r.published", "DESC", ["r.id"], values):
+                    rows += await db.fetch_all(
+                        f"{select} {base_where} AND {seg_sql} {order_by} LIMIT ?",
+                        tuple(all_params + seg_params + [want - len(rows)])
+                    )
+                    if len(rows) >= want:
+                        break
+            has_more = len(rows) > per_page
+            rows = rows[:per_page]
+            if has_more and rows:
+                next_cursor = encode_cursor([rows[-1]["published"], rows[-1]["id"]])
 
         return {
             "entries": [dict(r) for r in rows],
             "total": total,
             "page": page,
             "per_page": per_page,
-            "has_more": (page * per_page) < total,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
             "type_counts": type_counts,
             "tab_counts": tab_counts,
             "feed_tab": feed_tab,
@@ -1138,6 +1522,7 @@ class RSSService:
             "UPDATE rss_entries SET feed_status = ?, dismissed = ? WHERE id = ?",
             (status, 1 if status == "dismissed" else 0, entry_id)
         )
+        counts_service.invalidate("rss_entries")
 
     async def set_feed_status_bulk(self, entry_ids: list[int], status: str):
         """Mehrere Feed-Eintraege auf Status setzen."""
@@ -1150,6 +1535,7 @@ class RSSService:
             f"UPDATE rss_entries SET feed_status = ?, dismissed = ? WHERE id IN ({placeholders})",
             (status, 1 if status == "dismissed" else 0, *entry_ids)
         )
+        counts_service.invalidate("rss_entries")
 
     async def dismiss_entry(self, entry_id: int):
         """Rueckwaertskompatibel: Eintrag ausblenden."""
@@ -1166,6 +1552,7 @@ class RSSService:
             await db.execute(
                 "UPDATE rss_entries SET feed_status = 'dismissed', dismissed = 1 WHERE feed_status = 'active'"
             )
+        counts_service.invalidate("rss_entries")
 
     async def restore_entry(self, entry_id: int):
         """Ausgeblendeten Eintrag wiederherstellen (Undo)."""
@@ -1186,6 +1573,7 @@ class RSSService:
             f"UPDATE rss_entries SET feed_status = ?, dismissed = ? WHERE feed_status = ?{ch_filter}",
             tuple(params)
         )
+        counts_service.invalidate("rss_entries")
 
     async def trigger_poll_now(self) -> dict:
         """Sofortigen RSS-Check für ALLE aktiven Feeds (manuell, ignoriert Intervalle)."""
@@ -1301,13 +1689,9 @@ class RSSService:
         with_errors = await db.fetch_val("SELECT COUNT(*) FROM subscriptions WHERE error_count > 0") or 0
         disabled = total - enabled
 
-        # Fällige Feeds
-        pending = await db.fetch_val(
-            """SELECT COUNT(*) FROM subscriptions
-               WHERE enabled = 1
-               AND (last_checked IS NULL
-                    OR last_checked < datetime('now', '-' || check_interval || ' seconds'))"""
-        ) or 0
+        # Fällige Feeds (Heap)
+        await self._ensure_schedule()
+        pending = self._pending_count(now_sqlite())
 
         # RSS Entries Statistik
         total_entries = await db.fetch_val("SELECT COUNT(*) FROM rss_entries") or 0
@@ -1324,10 +1708,10 @@ class RSSService:
         # Nächste fällige Feeds
         upcoming = await db.fetch_all(
             """SELECT channel_id, channel_name, last_checked, check_interval, error_count,
-                      datetime(last_checked, '+' || check_interval || ' seconds') as next_check
+                      next_check_at as next_check, upload_cadence
                FROM subscriptions
-               WHERE enabled = 1 AND last_checked IS NOT NULL
-               ORDER BY next_check ASC
+               WHERE enabled = 1 AND next_check_at IS NOT NULL
+               ORDER BY next_check_at ASC
                LIMIT 5"""
         )
 
@@ -1360,6 +1744,7 @@ class RSSService:
             "last_checked_at": self._last_checked_at,
             "feeds_pending": pending,
             "feeds_checked_total": self._feeds_checked_cycle,
+            "last_tick": self._last_tick or None,
             "last_cron_job": dict(last_cron_job) if last_cron_job else None,
             # Abo-Statistiken
             "subscriptions": {
@@ -1387,17 +1772,25 @@ class RSSService:
                 "max_age_days": int(max_age),
                 "default_interval": int(interval),
                 "rss_enabled": rss_enabled == "true",
+                "workers": await self._workers(),
             },
             # Check-Intervall Verteilung
             "interval_distribution": [
                 {"interval": r["check_interval"], "count": r["cnt"]} for r in interval_stats
             ],
-            "upcoming": [dict(u) for u in upcoming],
+            "upcoming": [self._upcoming_row(u) for u in upcoming],
             "recent_errors": [dict(e) for e in recent_errors],
         }
 
     # ─── Helpers ─────────────────────────────────────────
 
+    @staticmethod
+    def _upcoming_row(row) -> dict:
+        d = dict(row)
+        cadence = Cadence.from_json(d.pop("upload_cadence", None))
+        d["upload_gap_hours"] = round(cadence.gap / 3600, 1) if cadence.known else None
+        return d
+
     async def _get_setting(self, key: str) -> str:
         val = await db.fetch_val("SELECT value FROM settings WHERE key = ?", (key,))
         return val or ""
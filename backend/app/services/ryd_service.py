@@ -8,10 +8,9 @@ import logging
 import asyncio
 from datetime import datetime, timedelta
 
-import httpx
-
 from app.database import db
 from app.services.endpoint_service import get_service_url
+from app.services.http_clients import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -56,13 +55,12 @@ async def fetch_votes(video_id: str, force: bool = False) -> dict | None:
     url = f"{base_url}/votes?videoId={video_id}"
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(url)
-            if resp.status_code == 404:
-                logger.debug(f"RYD: Video {video_id} nicht gefunden")
-                return None
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await http_clients.get(url, category="api", timeout=10)
+        if resp.status_code == 404:
+            logger.debug(f"RYD: Video {video_id} nicht gefunden")
+            return None
+        resp.raise_for_status()
+        data = resp.json()
     except Exception as e:
         logger.warning(f"RYD-API Fehler für {video_id}: {e}")
         return None
@@ -1,5 +1,5 @@
 """
-TubeVault – Scan Service v1.9.16
+TubeVault – Scan Service v1.9.17
 Inkrementeller Datei-Scan → Identifizieren → Registrieren (ins Vault kopieren).
 Separate scan_index.db für persistenten Index.
 © HalloWelt42 – Private Nutzung
@@ -705,8 +705,11 @@ class ScanService:
         try:
             from app.services.rate_limiter import rate_limiter
 
-            # Rate-Limiter respektieren (gegen YouTube-Sperre)
-            await rate_limiter.acquire("pytubefix")
+            # Rate-Limiter respektieren (gegen YouTube-Sperre) – außer die
+            # Metadaten liegen schon im Extract-Cache
+            from app.utils.pytube_client import is_cached
+            if not is_cached(f"https://www.youtube.com/watch?v={video_id}", need_streams=False):
+                await rate_limiter.acquire("pytubefix")
 
             # pytubefix in Executor ausführen (blockiert sonst Event Loop!)
             def _fetch():
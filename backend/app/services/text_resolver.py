@@ -34,20 +34,27 @@ def _description_file(video_id: str) -> Path:
     return storage.text_file(video_id, "description")
 
 
+def read_description_file(video_id: str) -> str | None:
+    """Nur die Datei-Schicht der Beschreibung, synchron – für Batch-Leser,
+    die viele Dateien im Thread-Pool lesen (FTS-Indexer)."""
+    f = _description_file(video_id)
+    try:
+        if f.exists():
+            return f.read_text(encoding="utf-8") or None
+    except OSError as e:
+        logger.warning(f"Datei-Read fehlgeschlagen {video_id}: {e}")
+    return None
+
+
 async def get_description(video_id: str) -> str | None:
     """Liefert die Beschreibung eines Videos. File-first, DB-Fallback.
 
     Returns:
         str mit Inhalt, oder None wenn weder Datei noch DB-Spalte Text haben.
     """
-    f = _description_file(video_id)
-    try:
-        if f.exists():
-            content = f.read_text(encoding="utf-8")
-            if content:
-                return content
-    except OSError as e:
-        logger.warning(f"Datei-Read fehlgeschlagen {video_id}: {e}")
+    content = read_description_file(video_id)
+    if content:
+        return content
 
     row = await db.fetch_one(
         "SELECT description FROM videos WHERE id = ?", (video_id,)
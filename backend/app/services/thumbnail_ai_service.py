@@ -1,10 +1,11 @@
 """
-TubeVault – Thumbnail AI Service v1.6.21
+TubeVault – Thumbnail AI Service v1.6.22
 © HalloWelt42 – Private Nutzung
 
 Analysiert Video-Thumbnails per LM Studio Vision-Modell (Mac).
 Erkennt: video_type (video/short/live), Kategorie-Vorschläge, Beschreibung.
 Basiert auf ImageVault ai_worker Architektur.
+v1.6.22: Thumbnail-Resize im Prozess-Pool (thumbnail_derivative_service)
 """
 
 import asyncio
@@ -19,6 +20,8 @@ from typing import Optional
 
 import httpx
 from app.database import db
+from app.services.http_clients import http_clients
+from app.services.thumbnail_derivative_service import resize_jpeg, thumbnail_derivative_service
 
 logger = logging.getLogger("tubevault.thumbnail_ai")
 
@@ -168,8 +171,8 @@ class ThumbnailAiService:
         """Prüft Verbindung zu LM Studio und gibt Modell-Info zurück."""
         url = self.config["lm_studio_url"].rstrip("/")
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
-                resp = await client.get(f"{url}/v1/models")
+            async with http_clients.slot("lmstudio", url) as client:
+                resp = await client.get(f"{url}/v1/models", timeout=5)
                 if resp.status_code == 200:
                     data = resp.json()
                     models = data.get("data", [])
@@ -202,8 +205,6 @@ class ThumbnailAiService:
     async def _get_thumbnail_base64(self, video_id: str) -> Optional[str]:
         """Thumbnail laden, auf max_image_size skalieren, als Base64 zurückgeben."""
         from app.config import THUMBNAILS_DIR, RSS_THUMBS_DIR
-        from PIL import Image
-        from io import BytesIO
 
         raw_data = None
 
@@ -241,32 +242,23 @@ class ThumbnailAiService:
                 f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
                 f"https://i.ytimg.com/vi/{video_id}/mqdefault.jpg",
             ]
-            async with httpx.AsyncClient(timeout=10) as client:
-                for url in urls:
-                    try:
-                        resp = await client.get(url)
-                        if resp.status_code == 200 and len(resp.content) > 1000:
-                            raw_data = resp.content
-                            break
-                    except Exception:
-                        pass
+            for url in urls:
+                try:
+                    resp = await http_clients.get(url, category="thumbnail", timeout=10)
+                    if resp.status_code == 200 and len(resp.content) > 1000:
+                        raw_data = resp.content
+                        break
+                except Exception:
+                    pass
 
         if not raw_data:
             return None
 
-        # Resize auf max_image_size (Breite)
+        # Resize auf max_image_size (Breite) – PIL im Prozess-Pool, nicht im Event-Loop
         max_w = self.config.get("max_image_size", 512)
         try:
-            img = Image.open(BytesIO(raw_data))
-            if img.mode in ("RGBA", "P"):
-                img = img.convert("RGB")
-            if img.width > max_w:
-                ratio = max_w / img.width
-                new_h = int(img.height * ratio)
-                img = img.resize((max_w, new_h), Image.LANCZOS)
-            buf = BytesIO()
-            img.save(buf, format="JPEG", quality=80)
-            return base64.b64encode(buf.getvalue()).decode()
+            data = await thumbnail_derivative_service.run(resize_jpeg, raw_data, max_w)
+            return base64.b64encode(data).decode()
         except Exception:
             # Fallback: Originalbild ohne Resize
             return base64.b64encode(raw_data).decode()
@@ -317,8 +309,8 @@ class ThumbnailAiService:
             }
 
             t0 = time.monotonic()
-            async with httpx.AsyncClient(timeout=180) as client:
-                resp = await client.post(f"{url}/v1/chat/completions", json=payload)
+            resp = await http_clients.post(f"{url}/v1/chat/completions", category="lmstudio",
+                                           json=payload, timeout=180)
 
             elapsed = time.monotonic() - t0
 
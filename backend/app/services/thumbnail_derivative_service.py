@@ -0,0 +1,256 @@
+"""
+TubeVault – Thumbnail Derivative Service v1.0.1
+v1.0.1: Cache größenbegrenzt (player.thumb_cache_mb), LRU nach letztem Abruf
+Verkleinerte Thumbnail-Varianten (WebP, WIDTHS) für Grid-Kacheln und KI-Analyse.
+
+- Varianten entstehen beim ersten Abruf oder direkt nach dem Download (warm),
+  alle Breiten in einem Decode-Durchgang
+- content-addressed: Dateiname = SHA-256 der Quelle + Breite → gleiche Bilder
+  teilen sich Varianten, ein neues Thumbnail bekommt automatisch eine neue URL
+  (deshalb darf die Variante immutable ausgeliefert werden)
+- PIL-Arbeit (Decode, Resize, Encode, Hash) läuft im Prozess-Pool, nie im Event-Loop
+- Digest pro Quelle (Pfad + Größe + mtime) im Speicher gemerkt (LRU) →
+  wiederholte Abrufe ohne Lesen der Quelldatei
+- Cache größenbegrenzt (player.thumb_cache_mb): mtime einer Variante =
+  letzter Abruf (höchstens stündlich aufgefrischt), nach jedem PRUNE_EVERY-ten
+  Render fliegen die ältesten Varianten; fehlende entstehen beim nächsten
+  Abruf neu
+
+Layout:  THUMB_CACHE_DIR/<digest[:2]>/<digest>_<breite>.webp
+© HalloWelt42 – Private Nutzung
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+from app.config import THUMB_CACHE_DIR
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+WIDTHS = (160, 320, 640)
+WEBP_QUALITY = 80
+DIGEST_CACHE_SIZE = 4096
+POOL_WORKERS = max(1, min(2, os.cpu_count() or 1))
+NAME_RE = re.compile(r"^([0-9a-f]{64})_(\d+)\.webp$")
+DEFAULT_CACHE_MB = 512
+PRUNE_EVERY = 50          # Cache-Limit nur nach jedem n-ten Render prüfen
+TOUCH_INTERVAL = 3600     # Zugriffszeit (mtime) höchstens so oft auffrischen
+
+
+def snap_width(width: int) -> Optional[int]:
+    """Angefragte Breite auf die nächstgrößere Variante runden.
+    None = breiter als die größte Variante → Original ausliefern."""
+    for w in WIDTHS:
+        if width <= w:
+            return w
+    return None
+
+
+def variant_name(digest: str, width: int) -> str:
+    return f"{digest}_{width}.webp"
+
+
+def variant_path(digest: str, width: int) -> Path:
+    return THUMB_CACHE_DIR / digest[:2] / variant_name(digest, width)
+
+
+def _touch(path: Path) -> bool:
+    """Variante vorhanden? Frischt dabei die mtime (= letzter Abruf) auf,
+    höchstens alle TOUCH_INTERVAL Sekunden – spart Schreibzugriffe."""
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return False
+    if time.time() - mtime > TOUCH_INTERVAL:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    return True
+
+
+def _prune_cache(root: Path, limit: int) -> int:
+    """Älteste Varianten (mtime) löschen, bis der Cache ≤ limit Bytes ist
+    (läuft im Thread). Rückgabe = Anzahl gelöschter Dateien."""
+    entries, total = [], 0
+    for path in root.glob("*/*.webp"):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+    removed = 0
+    for _, size, path in sorted(entries, key=lambda e: e[0]):
+        if total <= limit:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+# ─── Prozess-Pool-Funktionen (modulweit, damit picklebar) ─────────
+
+def _render_variants(src: str, out_dir: str, widths: tuple[int, ...],
+                     quality: int = WEBP_QUALITY) -> str:
+    """Quelle hashen, fehlende Varianten als WebP schreiben → Digest."""
+    from PIL import Image
+
+    with open(src, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    target_dir = Path(out_dir) / digest[:2]
+    missing = [w for w in widths if not (target_dir / variant_name(digest, w)).exists()]
+    if not missing:
+        return digest
+
+    target_dir.mkdir(parents=True, exist_ok=True)
+    img = Image.open(io.BytesIO(raw))
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+    # Größte zuerst, kleinere aus der vorherigen Stufe – spart Resampling-Arbeit
+    for w in sorted(missing, reverse=True):
+        if img.width > w:
+            img = img.resize((w, max(1, round(img.height * w / img.width))), Image.LANCZOS)
+        dst = target_dir / variant_name(digest, w)
+        tmp = dst.with_suffix(f".{os.getpid()}.tmp")
+        img.save(tmp, format="WEBP", quality=quality, method=4)
+        os.replace(tmp, dst)
+    return digest
+
+
+def resize_jpeg(raw: bytes, max_width: int, quality: int = 80) -> bytes:
+    """Bild auf max_width (Breite) verkleinern und als JPEG kodieren."""
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(raw))
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if img.width > max_width:
+        img = img.resize((max_width, int(img.height * max_width / img.width)), Image.LANCZOS)
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+
+class ThumbnailDerivativeService:
+    """Erzeugt und cached Thumbnail-Varianten; PIL im Prozess-Pool."""
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # (pfad, größe, mtime_ns) → Digest der Quelle
+        self._digests: OrderedDict[tuple, str] = OrderedDict()
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._warm_tasks: set[asyncio.Task] = set()
+        self._renders = 0
+        self._prune_task: Optional[asyncio.Task] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=POOL_WORKERS)
+        return self._pool
+
+    async def run(self, fn, *args):
+        """Funktion im Prozess-Pool ausführen; defekten Pool einmal neu starten."""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), fn, *args)
+        except BrokenProcessPool:
+            logger.warning("Thumbnail-Pool defekt – wird neu gestartet")
+            self.shutdown()
+            return await loop.run_in_executor(self._get_pool(), fn, *args)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def variant(self, src: Path, width: int) -> Optional[tuple[str, Path]]:
+        """(Digest, Pfad) der Variante für src in Breite width (aus WIDTHS).
+        Erzeugt bei Bedarf alle Varianten. None, wenn die Quelle fehlt oder
+        kein lesbares Bild ist."""
+        try:
+            st = src.stat()
+        except OSError:
+            return None
+        key = (str(src), st.st_size, st.st_mtime_ns)
+
+        digest = self._digests.get(key)
+        if digest is not None:
+            self._digests.move_to_end(key)
+            path = variant_path(digest, width)
+            if _touch(path):
+                return digest, path
+
+        digest = await self._render(key)
+        if digest is None:
+            return None
+        return digest, variant_path(digest, width)
+
+    async def _render(self, key: tuple) -> Optional[str]:
+        """Varianten einer Quelle erzeugen – gleichzeitige Abrufe teilen sich einen Lauf."""
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(self.run(_render_variants, key[0], str(THUMB_CACHE_DIR), WIDTHS))
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda _f: self._inflight.pop(key, None))
+        try:
+            digest = await asyncio.shield(fut)
+        except Exception as e:
+            logger.warning(f"Thumbnail-Variante fehlgeschlagen ({key[0]}): {e}")
+            return None
+        self._digests[key] = digest
+        self._digests.move_to_end(key)
+        while len(self._digests) > DIGEST_CACHE_SIZE:
+            self._digests.popitem(last=False)
+        self._renders += 1
+        if self._renders % PRUNE_EVERY == 0 and (self._prune_task is None or self._prune_task.done()):
+            self._prune_task = asyncio.create_task(self.enforce_limit())
+        return digest
+
+    async def enforce_limit(self) -> int:
+        """Cache auf player.thumb_cache_mb begrenzen (älteste Abrufe zuerst)."""
+        try:
+            limit_mb = int(await db.fetch_val(
+                "SELECT value FROM settings WHERE key = 'player.thumb_cache_mb'")
+                or DEFAULT_CACHE_MB)
+        except ValueError:
+            limit_mb = DEFAULT_CACHE_MB
+        if not THUMB_CACHE_DIR.exists():
+            return 0
+        removed = await asyncio.to_thread(_prune_cache, THUMB_CACHE_DIR, limit_mb * 1024 * 1024)
+        if removed:
+            logger.info(f"[THUMBS] Cache-LRU: {removed} Variante(n) entfernt")
+        return removed
+
+    def warm(self, src: Path):
+        """Varianten im Hintergrund vorberechnen (z.B. direkt nach dem Download)."""
+        task = asyncio.create_task(self.variant(Path(src), WIDTHS[0]))
+        self._warm_tasks.add(task)
+        task.add_done_callback(self._warm_tasks.discard)
+
+    def file_for(self, name: str) -> Optional[tuple[str, Path]]:
+        """Content-addressed Dateiname → (ETag-Wert, Pfad), None bei ungültig/fehlend."""
+        m = NAME_RE.match(name)
+        if not m or int(m.group(2)) not in WIDTHS:
+            return None
+        path = variant_path(m.group(1), int(m.group(2)))
+        if not _touch(path):
+            return None
+        return f"{m.group(1)}-{m.group(2)}", path
+
+
+# Singleton
+thumbnail_derivative_service = ThumbnailDerivativeService()
@@ -0,0 +1,64 @@
+"""
+TubeVault – FTS5-Suchsyntax v1.0.0
+Nutzereingabe → sicherer FTS5-MATCH-Ausdruck für videos_fts, plus die
+gemeinsamen SQL-Bausteine (Rowid-Filter, bm25-Gewichtung) und ein
+LIKE-Baustein für Zeilen außerhalb des Index (status != 'ready').
+
+Der Index enthält nur Videos mit status='ready' (Trigger in database.py) und
+findet Wortanfänge, keine Teilwörter mitten im Wort.
+© HalloWelt42 – Private Nutzung
+"""
+
+import re
+
+# Spalten von videos_fts: id (UNINDEXED), title, channel_name, description, tags, notes
+# Gewichtung: Titel > Kanal > Tags > Notizen > Beschreibung
+FTS_RANK = "bm25(videos_fts, 0.0, 10.0, 5.0, 1.0, 3.0, 2.0)"
+
+# Rowid-Filter für Listen mit eigener Sortierung (Library, History, eigene Videos)
+FTS_ROWIDS = "SELECT rowid FROM videos_fts WHERE videos_fts MATCH ?"
+
+FTS_COLUMNS = {"title", "channel_name", "description", "tags", "notes"}
+
+# "Phrase" (optional mit * dahinter) oder ein Wort (optional mit *)
+_TOKEN_RE = re.compile(r'"([^"]*)"(\*?)|(\S+)')
+_WORD_CHARS = re.compile(r"\w")
+
+
+def build_match_query(text: str, columns: list[str] | None = None) -> str | None:
+    """Suchtext in einen FTS5-Ausdruck übersetzen.
+
+    - Wörter sind Präfix-Suchen (`apfel` findet "Apfelstrudel"); anders als das
+      frühere LIKE '%…%' keine Treffer mitten im Wort (`tube` findet nicht "YouTube")
+    - "mehrere wörter" in Anführungszeichen = exakte Phrase, "phrase"* = Präfix
+    - alle Teile UND-verknüpft; FTS-Operatoren/Sonderzeichen werden neutralisiert
+    - columns schränkt auf Spalten ein (z.B. ["notes"])
+
+    None, wenn nichts Suchbares übrig bleibt (Aufrufer liefert dann leer)."""
+    parts = []
+    for m in _TOKEN_RE.finditer(text or ""):
+        if m.group(3) is not None:
+            term, prefix = m.group(3).rstrip("*"), True
+        else:
+            term, prefix = m.group(1), bool(m.group(2))
+        # Reine Sonderzeichen würden zu einer leeren Phrase
+        if not _WORD_CHARS.search(term):
+            continue
+        phrase = '"' + term.replace('"', '""') + '"'
+        parts.append(phrase + "*" if prefix else phrase)
+    if not parts:
+        return None
+    expr = " AND ".join(parts)
+    if columns:
+        cols = [c for c in columns if c in FTS_COLUMNS]
+        if cols:
+            expr = "{" + " ".join(cols) + "} : (" + expr + ")"
+    return expr
+
+
+def like_condition(text: str, columns: list[str]) -> tuple[str, list[str]]:
+    """LIKE-Suche (Teilwort, case-insensitiv für ASCII) über columns – für
+    Videos, die nicht im Index stehen (status != 'ready'). Nur für kleine
+    Teilmengen gedacht, sonst Tabellen-Scan."""
+    term = f"%{text}%"
+    return "(" + " OR ".join(f"v.{c} LIKE ?" for c in columns) + ")", [term] * len(columns)
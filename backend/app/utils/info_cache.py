@@ -0,0 +1,241 @@
+"""
+TubeVault – yt-dlp Info-Cache v1.0.1
+v1.0.1: note_negative_hit() zählt unter dem Lock
+Positiv-Cache für extrahierte Info-Dicts (ytdlp_adapter._ydl_extract).
+
+Ein Download läuft durch mehrere Phasen (get_video_info → _resolve →
+_download_inner, dazu enrich_from_youtube/Captions), die jede für sich
+make_youtube() aufrufen. Ohne Cache kostet jede Phase einen eigenen
+YouTube-Extract (Rate-Budget, Bot-Detection-Risiko).
+
+Zwei Stufen, Schlüssel = Video-ID (sonst URL):
+- Speicher: LRU mit MEMORY_MAX Einträgen
+- Platte:   <YTDLP_CACHE_DIR>/<key>.json.gz, höchstens DISK_MAX Dateien
+            (älteste fliegen), überlebt Neustarts
+
+Zwei TTLs pro Eintrag:
+- Metadaten (Titel, Beschreibung, Kapitel, Formatliste): META_TTL
+- Stream-URLs (formats[].url, Untertitel-URLs) laufen bei YouTube ab
+  (expire=… in der URL). Gültig bis min(STREAM_TTL, expire − STREAM_MARGIN).
+  Danach liefert get(…, need_streams=True) einen Miss, Metadaten-Caller
+  (need_streams=False) bekommen den Eintrag weiter.
+
+Thread-sicher – _ydl_extract läuft in Executor-Threads.
+© HalloWelt42 – Private Nutzung
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from app.config import YTDLP_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+META_TTL = 6 * 3600        # Metadaten
+STREAM_TTL = 3600          # Stream-URLs höchstens so lange
+STREAM_MARGIN = 1800       # Abstand zum expire= der URLs (Download braucht Zeit)
+MEMORY_MAX = 256
+DISK_MAX = 2000
+_PRUNE_EVERY = 50          # Platte nur bei jedem n-ten put() aufräumen
+
+_EXPIRE_RE = re.compile(r"[?&/]expire[=/](\d{9,11})")
+_SAFE_KEY_RE = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def streams_valid_until(info: dict, fetched: float, stream_ttl: float = STREAM_TTL) -> float:
+    """Zeitpunkt (epoch), bis zu dem die Stream-URLs im Info-Dict nutzbar sind."""
+    until = fetched + stream_ttl
+    for f in info.get("formats") or []:
+        m = _EXPIRE_RE.search(f.get("url") or "")
+        if m:
+            until = min(until, int(m.group(1)) - STREAM_MARGIN)
+    return until
+
+
+class InfoCache:
+    """Speicher-LRU + Platten-Cache für Info-Dicts.
+
+    Caller dürfen gelieferte Dicts nicht verändern (geteilt mit dem Cache)."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, *, meta_ttl: float = META_TTL,
+                 stream_ttl: float = STREAM_TTL, memory_max: int = MEMORY_MAX,
+                 disk_max: int = DISK_MAX):
+        self.cache_dir = cache_dir
+        self.meta_ttl = meta_ttl
+        self.stream_ttl = stream_ttl
+        self.memory_max = memory_max
+        self.disk_max = disk_max
+        # key → (fetched, streams_until, info)
+        self._mem: OrderedDict[str, tuple[float, float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stream_misses = 0    # Metadaten frisch, Stream-URLs abgelaufen
+        self.negative_hits = 0    # Permanent-Fail-Cache (ytdlp_adapter)
+        self.stores = 0
+
+    def _path(self, key: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        name = _SAFE_KEY_RE.sub("_", key)[:120]
+        return self.cache_dir / f"{name}.json.gz"
+
+    # ─── Lesen ────────────────────────────────────────────────────
+    def get(self, key: str, need_streams: bool = True) -> Optional[dict]:
+        """Info-Dict aus dem Cache oder None (zählt Hit/Miss)."""
+        now = time.time()
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                self._mem.move_to_end(key)
+        from_disk = False
+        if entry is None:
+            entry = self._load(key)
+            from_disk = entry is not None
+        if entry is None or now - entry[0] > self.meta_ttl:
+            if entry is not None:
+                self.drop(key)
+            with self._lock:
+                self.misses += 1
+            return None
+        fetched, streams_until, info = entry
+        if need_streams and now >= streams_until:
+            with self._lock:
+                self.stream_misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            if from_disk:
+                self.disk_hits += 1
+                self._remember(key, entry)
+        return info
+
+    def contains(self, key: str, need_streams: bool = True) -> bool:
+        """Gültiger Eintrag im Speicher? Zählt nicht als Lookup – für Caller,
+        die z.B. nur entscheiden, ob ein Rate-Limit-Slot nötig ist."""
+        now = time.time()
+        with self._lock:
+            entry = self._mem.get(key)
+        if entry is None or now - entry[0] > self.meta_ttl:
+            return False
+        return not need_streams or now < entry[1]
+
+    def _load(self, key: str) -> Optional[tuple[float, float, dict]]:
+        path = self._path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as fh:
+                data = json.load(fh)
+            return float(data["fetched"]), float(data["streams_until"]), data["info"]
+        except Exception as e:
+            logger.debug(f"[INFO-CACHE] {path.name} unlesbar: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def note_negative_hit(self):
+        """Treffer im Permanent-Fail-Cache des Adapters mitzählen."""
+        with self._lock:
+            self.negative_hits += 1
+
+    # ─── Schreiben ────────────────────────────────────────────────
+    def put(self, key: str, info: dict, fetched: Optional[float] = None):
+        fetched = time.time() if fetched is None else fetched
+        entry = (fetched, streams_valid_until(info, fetched, self.stream_ttl), info)
+        with self._lock:
+            self._remember(key, entry)
+            self.stores += 1
+            self._puts += 1
+            prune = self._puts % _PRUNE_EVERY == 0
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=3) as fh:
+                json.dump({"fetched": entry[0], "streams_until": entry[1], "info": info}, fh)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.warning(f"[INFO-CACHE] {key} nicht gespeichert: {e}")
+            return
+        if prune:
+            self._prune_disk()
+
+    def _remember(self, key: str, entry: tuple[float, float, dict]):
+        """Im Speicher ablegen (Lock wird vom Caller gehalten)."""
+        self._mem[key] = entry
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.memory_max:
+            self._mem.popitem(last=False)
+
+    def _prune_disk(self):
+        """Älteste Dateien über disk_max entfernen."""
+        try:
+            files = sorted(self.cache_dir.glob("*.json.gz"), key=lambda p: p.stat().st_mtime)
+        except OSError:
+            return
+        for p in files[:max(0, len(files) - self.disk_max)]:
+            p.unlink(missing_ok=True)
+
+    # ─── Invalidierung ────────────────────────────────────────────
+    def drop(self, key: str):
+        """Eintrag komplett verwerfen."""
+        with self._lock:
+            self._mem.pop(key, None)
+        path = self._path(key)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def drop_streams(self, key: str):
+        """Nur die Stream-URLs als abgelaufen markieren (z.B. nach HTTP 403);
+        Metadaten bleiben nutzbar."""
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                self._mem[key] = (entry[0], 0.0, entry[2])
+        path = self._path(key)
+        if path is not None:
+            # Platte: Eintrag verwerfen, der Speicher hält die Metadaten
+            path.unlink(missing_ok=True)
+
+    def clear(self):
+        """Tests / manuelle Resets: alles leeren, Zähler zurück."""
+        with self._lock:
+            self._mem.clear()
+            self.hits = self.disk_hits = self.misses = 0
+            self.stream_misses = self.negative_hits = self.stores = 0
+        if self.cache_dir is not None and self.cache_dir.exists():
+            for p in self.cache_dir.glob("*.json.gz"):
+                p.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.stream_misses
+            return {
+                "entries": len(self._mem),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "stream_misses": self.stream_misses,
+                "negative_hits": self.negative_hits,
+                "stores": self.stores,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "meta_ttl": self.meta_ttl,
+                "stream_ttl": self.stream_ttl,
+            }
+
+
+# Singleton
+info_cache = InfoCache(YTDLP_CACHE_DIR)
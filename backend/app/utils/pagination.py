@@ -0,0 +1,99 @@
+"""
+TubeVault – Keyset-Pagination v1.0.0
+Opaker Cursor (Sortwert + Tiebreaker) statt LIMIT/OFFSET und ein kurzlebiger
+Count-Cache, damit tiefe Seiten nicht linear teurer werden und der COUNT(*)
+nicht bei jedem Nachladen neu läuft.
+© HalloWelt42 – Private Nutzung
+"""
+
+import base64
+import json
+import time
+
+
+def encode_cursor(values: list) -> str:
+    """Sortschlüssel der letzten Zeile → URL-sicherer, opaker String."""
+    raw = json.dumps(values, separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Cursor zurück in die Sortwerte. ValueError bei kaputtem/fremdem Cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise ValueError("Ungültiger Cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Ungültiger Cursor")
+    return values
+
+
+def keyset_segments(sort_expr: str, order: str, tiebreak: list[str], values: list,
+                    nullable: bool = True) -> list[tuple[str, list]]:
+    """WHERE-Bedingungen für "Zeilen NACH dem Cursor" bauen.
+
+    Sortierung: sort_expr order (NULLs wie SQLite-Default: bei DESC hinten,
+    bei ASC vorne), danach die tiebreak-Spalten alle DESC.
+    values = [sortwert, *tiebreak-werte] der letzten Zeile der Vorseite.
+
+    Rückgabe sind Segmente in Sortierreihenfolge, die der Aufrufer der Reihe
+    nach abfragt bis die Seite voll ist. Die Aufteilung hält die Bedingung
+    frei von `OR ... IS NULL`, so dass `sort_expr <= ?` bzw. `>= ?` als Range
+    auf einem Index landet statt den Index von vorne zu scannen."""
+    sort_val, tie_vals = values[0], list(values[1:])
+    tie_cols = ", ".join(tiebreak)
+    tie_ph = ", ".join("?" * len(tiebreak))
+    tie_after = f"({tie_cols}) < ({tie_ph})"
+    not_same = f"NOT ({sort_expr} = ? AND ({tie_cols}) >= ({tie_ph}))"
+
+    if sort_val is None:
+        # Cursor steht im NULL-Block (DESC: am Ende, ASC: am Anfang)
+        segments = [(f"{sort_expr} IS NULL AND {tie_after}", tie_vals)]
+        if order != "DESC":
+            segments.append((f"{sort_expr} IS NOT NULL", []))
+        return segments
+
+    op = "<=" if order == "DESC" else ">="
+    segments = [(f"{sort_expr} {op} ? AND {not_same}", [sort_val, sort_val, *tie_vals])]
+    if order == "DESC" and nullable:
+        segments.append((f"{sort_expr} IS NULL", []))
+    return segments
+
+
+class CountCache:
+    """Kleiner TTL-Cache für COUNT(*)-Ergebnisse, Schlüssel = (SQL, Params).
+    Beim Scrollen derselben Ergebnisliste wird der Count nur einmal gezählt:
+    die erste Seite zählt frisch, Folgeseiten nehmen den gecachten Wert."""
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: dict[tuple, tuple[float, int]] = {}
+
+    def get(self, key: tuple):
+        hit = self._data.get(key)
+        if hit and time.monotonic() - hit[0] < self.ttl:
+            return hit[1]
+        return None
+
+    def put(self, key: tuple, value: int):
+        if len(self._data) >= self.max_entries:
+            # Älteste Hälfte verwerfen – reicht für eine Handvoll Filterkombis
+            for k in sorted(self._data, key=lambda k: self._data[k][0])[: self.max_entries // 2]:
+                del self._data[k]
+        self._data[key] = (time.monotonic(), value)
+
+    def clear(self):
+        self._data.clear()
+
+    async def count(self, fetch_val, sql: str, params, refresh: bool = False) -> int:
+        """Gecachten Count liefern oder zählen. refresh=True zählt immer neu
+        (erste Seite) und legt das Ergebnis für die Folgeseiten ab."""
+        key = (sql, tuple(params))
+        cached = None if refresh else self.get(key)
+        if cached is not None:
+            return cached
+        value = await fetch_val(sql, tuple(params)) or 0
+        self.put(key, value)
+        return value
@@ -1,5 +1,6 @@
 """
-TubeVault – Zentraler YouTube-Backend-Client v2.0.0
+TubeVault – Zentraler YouTube-Backend-Client v2.1.0
+v2.1.0: is_cached() – Info-Dict liegt im yt-dlp-Extract-Cache
 
 Einheitlicher YouTube/Channel/Playlist/Search-Entrypoint mit umschaltbarem
 Backend: yt-dlp (Default) oder pytubefix (Legacy-Fallback).
@@ -67,3 +68,12 @@ def make_search(query: str, **kwargs):
         return Search(query, **kwargs)
     _, _, _, SearchAdapter = _ytdlp()
     return SearchAdapter(query, **kwargs)
+
+
+def is_cached(url: str, need_streams: bool = True) -> bool:
+    """True wenn make_youtube(url) ohne YouTube-Call auskommt (nur yt-dlp-Backend).
+    Caller überspringen dann den Rate-Limit-Slot."""
+    if YT_BACKEND == "pytubefix":
+        return False
+    from app.utils.ytdlp_adapter import has_cached_info
+    return has_cached_info(url, need_streams)
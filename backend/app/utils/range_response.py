@@ -0,0 +1,135 @@
+"""
+TubeVault – Range-File-Response v1.0.0
+Range-fähige Datei-Auslieferung für den Player, ohne Blocking im Event-Loop.
+
+Aufbauend auf Starlettes FileResponse (Single-/Multi-Range, If-Range,
+Lesen im Threadpool via anyio) ergänzt um:
+- 304 Not Modified über If-None-Match / If-Modified-Since (ETag + Last-Modified)
+- Zero-Copy über die ASGI-Extension http.response.zerocopysend (sendfile),
+  sofern der Server sie anbietet – sonst Threadpool-Reads in 1-MB-Chunks
+- korrekter Content-Type + Content-Length bei Multi-Range (multipart/byteranges)
+- on_missing-Callback, wenn die Datei beim Öffnen fehlt (Pfad-Cache invalidieren)
+© HalloWelt42 – Private Nutzung
+"""
+
+from __future__ import annotations
+
+import os
+from email.utils import parsedate_to_datetime
+from secrets import token_hex
+from typing import Callable, Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+from app.config import CHUNK_SIZE
+
+# Header, die eine 304-Antwort tragen darf (RFC 9110 §15.4.5)
+_NOT_MODIFIED_HEADERS = ("etag", "last-modified", "cache-control", "vary")
+
+
+class RangeFileResponse(FileResponse):
+    """FileResponse mit Conditional-GET (304) und optionalem Zero-Copy."""
+
+    chunk_size = CHUNK_SIZE
+
+    def __init__(self, *args, on_missing: Optional[Callable[[], None]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._on_missing = on_missing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.stat_result is None:
+            try:
+                self.stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+            except FileNotFoundError:
+                # Datei verschwunden (z.B. Platte abgezogen) → Aufrufer räumt Caches auf
+                if self._on_missing:
+                    self._on_missing()
+                return await Response(status_code=404)(scope, receive, send)
+            self.set_stat_headers(self.stat_result)
+
+        req = Headers(scope=scope)
+        if self._not_modified(req):
+            headers = {k: v for k, v in self.headers.items() if k in _NOT_MODIFIED_HEADERS}
+            return await Response(status_code=304, headers=headers)(scope, receive, send)
+
+        self._zerocopy = "http.response.zerocopysend" in scope.get("extensions", {})
+        await super().__call__(scope, receive, send)
+
+    def _not_modified(self, req: Headers) -> bool:
+        """If-None-Match hat Vorrang; If-Modified-Since nur ohne ETag-Bedingung."""
+        if_none_match = req.get("if-none-match")
+        if if_none_match is not None:
+            etag = self.headers["etag"]
+            tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+        if_modified_since = req.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.stat_result.st_mtime) <= since
+        return False
+
+    async def _send_file_range(self, send: Send, start: int, end: int, more_body: bool) -> None:
+        """Bytes [start, end) senden – per sendfile, wenn der Server es kann."""
+        if self._zerocopy:
+            with open(self.path, "rb") as f:
+                await send({"type": "http.response.zerocopysend", "file": f.fileno(),
+                            "offset": start, "count": end - start, "more_body": more_body})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(start)
+            while True:
+                chunk = await file.read(min(self.chunk_size, end - start))
+                start += len(chunk)
+                last = not chunk or start >= end
+                await send({"type": "http.response.body", "body": chunk,
+                            "more_body": more_body or not last})
+                if last:
+                    return
+
+    async def _handle_simple(self, send: Send, send_header_only: bool) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        else:
+            await self._send_file_range(send, 0, self.stat_result.st_size, False)
+
+    async def _handle_single_range(
+        self, send: Send, start: int, end: int, file_size: int, send_header_only: bool
+    ) -> None:
+        self.headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+        self.headers["content-length"] = str(end - start)
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        if send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        else:
+            await self._send_file_range(send, start, end, False)
+
+    async def _handle_multiple_ranges(
+        self, send: Send, ranges: list[tuple[int, int]], file_size: int, send_header_only: bool
+    ) -> None:
+        boundary = token_hex(13)
+        part_type = self.headers["content-type"]
+        parts = [(start, end, (f"--{boundary}\nContent-Type: {part_type}\n"
+                               f"Content-Range: bytes {start}-{end - 1}/{file_size}\n\n"
+                               ).encode("latin-1"))
+                 for start, end in ranges]
+        trailer = f"\n--{boundary}--\n".encode("latin-1")
+        # Länge selbst zählen – Starlettes generate_multipart verrechnet sich beim Trailer
+        content_length = sum(len(head) + (end - start) + 1 for start, end, head in parts) + len(trailer)
+        self.headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+        self.headers["content-length"] = str(content_length)
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        if send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        for start, end, head in parts:
+            await send({"type": "http.response.body", "body": head, "more_body": True})
+            await self._send_file_range(send, start, end, True)
+            await send({"type": "http.response.body", "body": b"\n", "more_body": True})
+        await send({"type": "http.response.body", "body": trailer, "more_body": False})
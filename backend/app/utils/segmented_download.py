@@ -0,0 +1,216 @@
+"""
+TubeVault – Segmentierter Download v1.0.0
+HTTP-Range-Download in N parallelen Byte-Bereichen mit Resume-Journal.
+
+Ablauf:
+- Zieldatei wird als <name>.part in voller Größe angelegt
+- jedes Segment lädt per Range-Request in seinen eigenen Bereich
+- Fortschritt je Segment steht in <name>.segments.json (atomar geschrieben)
+- bricht der Job ab (Fehler, Worker-Restart), bleiben .part + Journal liegen;
+  der nächste Versuch setzt mit frischer Stream-URL dort fort
+- erst wenn alle Segmente vollständig sind: .part → Zieldatei, Journal weg
+
+Sync + Threads, weil StreamAdapter.download im Executor läuft.
+© HalloWelt42 – Private Nutzung
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import httpx
+
+from app.config import CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Kleinere Segmente lohnen den Extra-Request nicht
+MIN_SEGMENT_SIZE = 2 * 1024 * 1024
+# Journal höchstens so oft schreiben (Sekunden) – plus am Ende/bei Abbruch
+JOURNAL_INTERVAL = 1.0
+JOURNAL_VERSION = 1
+
+
+class RangeNotSupported(RuntimeError):
+    """Server ignoriert Range (200 statt 206) – Segmentierung nicht möglich."""
+
+
+@dataclass
+class Segment:
+    """Byte-Bereich [start, end] (inklusiv) und bereits geschriebene Bytes."""
+    index: int
+    start: int
+    end: int
+    done: int = 0
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start + 1
+
+    @property
+    def complete(self) -> bool:
+        return self.done >= self.size
+
+
+def plan_segments(total: int, parts: int, min_size: int = MIN_SEGMENT_SIZE) -> list[Segment]:
+    """Teilt total Bytes in höchstens parts gleich große Segmente auf."""
+    if total <= 0:
+        return []
+    parts = max(1, min(parts, total // max(1, min_size) or 1))
+    step = -(-total // parts)  # aufrunden
+    return [Segment(i, start, min(start + step, total) - 1)
+            for i, start in enumerate(range(0, total, step))]
+
+
+def part_path(target: Path) -> Path:
+    return target.with_name(target.name + ".part")
+
+
+def journal_path(target: Path) -> Path:
+    return target.with_name(target.name + ".segments.json")
+
+
+def load_journal(target: Path, total: int, key: str) -> Optional[list[Segment]]:
+    """Segmente eines unterbrochenen Downloads – nur wenn Journal zu Größe,
+    Stream-Schlüssel und vorhandener .part-Datei passt."""
+    jp, pp = journal_path(target), part_path(target)
+    try:
+        data = json.loads(jp.read_text())
+        if (data.get("version") != JOURNAL_VERSION or data.get("total") != total
+                or data.get("key") != key or pp.stat().st_size != total):
+            return None
+        segs = [Segment(**s) for s in data["segments"]]
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+    if sum(s.size for s in segs) != total:
+        return None
+    return segs
+
+
+def save_journal(target: Path, total: int, key: str, segments: list[Segment]):
+    jp = journal_path(target)
+    tmp = jp.with_name(jp.name + ".tmp")
+    tmp.write_text(json.dumps({
+        "version": JOURNAL_VERSION, "key": key, "total": total,
+        "segments": [asdict(s) for s in segments],
+    }))
+    os.replace(tmp, jp)
+
+
+def discard(target: Path):
+    """Reste eines segmentierten Downloads entfernen (.part + Journal)."""
+    for p in (part_path(target), journal_path(target)):
+        try:
+            p.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def download(
+    url: str,
+    target: Path,
+    total: int,
+    *,
+    parts: int = 4,
+    key: str = "",
+    headers: Optional[dict] = None,
+    ratelimit: int = 0,
+    timeout: float = 30,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    client: Optional[httpx.Client] = None,
+) -> Path:
+    """Lädt url nach target in parallelen Range-Segmenten, resume-fähig.
+
+    Args:
+        total: erwartete Größe in Bytes (muss bekannt sein)
+        key: Stream-Kennung fürs Journal (z.B. itag) – URL ändert sich pro Auflösung
+        ratelimit: Gesamt-Limit in Bytes/s (0 = aus), gleichmäßig auf Segmente verteilt
+        on_progress: (done_bytes, total_bytes), thread-sicher aufgerufen
+    Raises:
+        RangeNotSupported, httpx.HTTPError, OSError – .part + Journal bleiben erhalten.
+    """
+    target = Path(target)
+    pp = part_path(target)
+    segments = load_journal(target, total, key)
+    if segments is None:
+        discard(target)
+        segments = plan_segments(total, parts)
+        with open(pp, "wb") as f:
+            f.truncate(total)
+        save_journal(target, total, key, segments)
+    else:
+        resumed = sum(s.done for s in segments)
+        logger.info(f"[SEGMENTED] {target.name}: Resume bei {resumed}/{total} Bytes")
+
+    open_segments = [s for s in segments if not s.complete]
+    lock = threading.Lock()
+    state = {"done": sum(s.done for s in segments), "saved": time.monotonic()}
+    seg_rate = ratelimit / max(1, len(open_segments)) if ratelimit else 0
+    own_client = client is None
+    if own_client:
+        client = httpx.Client(timeout=timeout, follow_redirects=True,
+                              headers=headers or {})
+
+    def _advance(seg: Segment, n: int):
+        with lock:
+            seg.done += n
+            state["done"] += n
+            now = time.monotonic()
+            if now - state["saved"] >= JOURNAL_INTERVAL:
+                save_journal(target, total, key, segments)
+                state["saved"] = now
+            done = state["done"]
+        if on_progress:
+            try:
+                on_progress(done, total)
+            except Exception:
+                pass
+
+    def _fetch(seg: Segment):
+        start = seg.start + seg.done
+        req_headers = {"Range": f"bytes={start}-{seg.end}"}
+        t0, got = time.monotonic(), 0
+        with open(pp, "r+b") as f:
+            f.seek(start)
+            with client.stream("GET", url, headers=req_headers) as resp:
+                if resp.status_code == 200:
+                    raise RangeNotSupported(f"{target.name}: Server liefert 200 statt 206")
+                resp.raise_for_status()
+                for chunk in resp.iter_bytes(CHUNK_SIZE):
+                    chunk = chunk[:seg.size - seg.done]
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    _advance(seg, len(chunk))
+                    if seg_rate:
+                        got += len(chunk)
+                        ahead = got / seg_rate - (time.monotonic() - t0)
+                        if ahead > 0:
+                            time.sleep(ahead)
+        if not seg.complete:
+            raise httpx.ReadError(
+                f"{target.name}: Segment {seg.index} unvollständig ({seg.done}/{seg.size})")
+
+    try:
+        if open_segments:
+            with ThreadPoolExecutor(max_workers=len(open_segments),
+                                    thread_name_prefix="seg-dl") as pool:
+                futures = [pool.submit(_fetch, s) for s in open_segments]
+                for fut in futures:
+                    fut.result()
+    finally:
+        if own_client:
+            client.close()
+        with lock:
+            save_journal(target, total, key, segments)
+
+    os.replace(pp, target)
+    journal_path(target).unlink(missing_ok=True)
+    return target
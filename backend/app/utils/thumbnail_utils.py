@@ -48,16 +48,16 @@ async def download_yt_thumbnail(
     dest_dir.mkdir(parents=True, exist_ok=True)
     qualities = qualities or YT_THUMB_QUALITIES
 
-    import httpx
+    from app.services.http_clients import http_clients
     for quality in qualities:
         url = f"https://i.ytimg.com/vi/{video_id}/{quality}.jpg"
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                resp = await client.get(url)
-                if resp.status_code == 200 and len(resp.content) > min_size:
-                    dest.write_bytes(resp.content)
-                    logger.info(f"[THUMB] YT-Thumbnail geladen: {video_id} ({quality})")
-                    return dest
+            # Gemeinsamer Pool: alle Qualitätsstufen über dieselbe Verbindung
+            resp = await http_clients.get(url, category="thumbnail", timeout=10)
+            if resp.status_code == 200 and len(resp.content) > min_size:
+                dest.write_bytes(resp.content)
+                logger.info(f"[THUMB] YT-Thumbnail geladen: {video_id} ({quality})")
+                return dest
         except Exception as e:
             logger.debug(f"[THUMB] {quality} fehlgeschlagen für {video_id}: {e}")
             continue
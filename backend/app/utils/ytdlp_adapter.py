@@ -1,5 +1,11 @@
 """
-TubeVault – yt-dlp Adapter v1.3.0
+TubeVault – yt-dlp Adapter v1.5.1
+v1.5.1: Cache-Miss liefert dasselbe sanitisierte Dict wie ein Hit; StreamAdapter
+        arbeitet auf einer Kopie des Format-Dicts (Cache bleibt unverändert)
+v1.5.0: Positiv-Cache für Info-Dicts (info_cache.py) – Metadaten und Stream-URLs
+        mit eigener TTL, Download-Phasen extrahieren ein Video nur noch einmal
+v1.4.0: StreamAdapter.download lädt direkte HTTP-Streams segmentiert + resume-fähig
+        (segmented_download.py), yt-dlp bleibt Fallback
 v1.3.0: exportiert aktuell gewählten Throttle-Wert (für Live-Anzeige im UI)
 Stellt pytubefix-kompatible Objekte bereit, die intern yt-dlp nutzen.
 
@@ -22,8 +28,14 @@ from urllib.parse import urlparse, parse_qs
 
 import yt_dlp
 
+from app.utils import segmented_download as _segdl
+from app.utils.info_cache import info_cache
+
 logger = logging.getLogger(__name__)
 
+# Parallele Range-Segmente je Stream (Setting download.segments, ≤1 = nur yt-dlp)
+_DEFAULT_SEGMENTS = 4
+
 # Live-Throttle: KB/s des aktuell laufenden Downloads (0 = kein Limit).
 # Wird vom ytdlp-Adapter pro Download gesetzt und vom download_service
 # für den WebSocket-Broadcast (Live-Anzeige im UI) ausgelesen.
@@ -359,6 +371,25 @@ def _cache_clear():
     _PERMANENT_FAIL_CACHE.clear()
 
 
+# Positiv-Cache (info_cache.py): nur einfache Video-Extracts. extra_opts/
+# force_clients (Channel-/Playlist-/Such-Listings) liefern andere Dict-Formen.
+_sanitize_info = yt_dlp.YoutubeDL.sanitize_info
+
+
+def _info_cache_key(url: str, extra_opts: Optional[dict],
+                    force_clients: Optional[list[str]]) -> Optional[str]:
+    if extra_opts or force_clients:
+        return None
+    return _extract_video_id(url)
+
+
+def has_cached_info(url: str, need_streams: bool = True) -> bool:
+    """True wenn _ydl_extract(url) ohne YouTube-Call aus dem Speicher-Cache
+    bedient würde (Caller sparen sich dann den Rate-Limit-Slot)."""
+    key = _info_cache_key(url, None, None)
+    return bool(key) and info_cache.contains(key, need_streams)
+
+
 # ──────────────────────────────────────────────────────────────────
 # Retry-Progress-Hook (Live-Sichtbarkeit der Versuche im UI)
 # ──────────────────────────────────────────────────────────────────
@@ -429,7 +460,7 @@ def _pytubefix_extract_fallback(url: str, label: str) -> Optional[dict]:
 
 def _ydl_extract(url: str, extra_opts: Optional[dict] = None,
                  force_clients: Optional[list[str]] = None,
-                 desktop_ua_only: bool = False) -> dict:
+                 desktop_ua_only: bool = False, need_streams: bool = True) -> dict:
     """Zentraler yt-dlp Extract-Call mit Random Anti-Bot-Strategie + Auto-Retry.
     Bei BOT-DETECTION oder AGE-GATE wird im Retry auf cookies-login.txt
     eskaliert (falls vorhanden), damit echte Auth-Cookies gegen Härtefälle
@@ -441,7 +472,9 @@ def _ydl_extract(url: str, extra_opts: Optional[dict] = None,
     desktop_ua_only:  nur Desktop-User-Agents (kein Mobile). Mobile-UA
                       triggert die mobile Web-Seite, die youtube:tab nicht
                       parsen kann ("Unable to recognize tab page").
-    Beide Defaults = altes Verhalten → Stream-Download-Pfad unverändert."""
+    Beide Defaults = altes Verhalten → Stream-Download-Pfad unverändert.
+    need_streams:     False = Caller liest nur Metadaten, ein Cache-Eintrag mit
+                      abgelaufenen Stream-URLs reicht dann noch."""
     label = url.rsplit("v=", 1)[-1][:11] if "v=" in url else url[-32:]
     # Permanent-Fail-Cache: spart die typischen 2-3 Folge-Calls aus den
     # download_service-Phasen für ein Video, das gerade als Members-Only/
@@ -449,7 +482,14 @@ def _ydl_extract(url: str, extra_opts: Optional[dict] = None,
     cached = _cache_check(label)
     if cached:
         logger.debug(f"[YTBOT-CACHE-HIT] {label} permanent-fail cache: {cached[:80]}")
+        info_cache.note_negative_hit()
         raise yt_dlp.utils.DownloadError(cached)
+    cache_key = _info_cache_key(url, extra_opts, force_clients)
+    if cache_key:
+        hit = info_cache.get(cache_key, need_streams=need_streams)
+        if hit is not None:
+            logger.debug(f"[YTBOT-CACHE-HIT] {label} info-cache")
+            return hit
     tried_clients: list[list[str]] = []
     last_exc: Optional[Exception] = None
     use_login = False
@@ -472,6 +512,10 @@ def _ydl_extract(url: str, extra_opts: Optional[dict] = None,
                 result = ydl.extract_info(url, download=False)
             if use_login:
                 logger.info(f"[YTBOT-OK] {label} via Login-Cookies-Eskalation")
+            if cache_key and result:
+                # Gleiche Form wie bei einem Treffer (JSON-fähig, ohne Callables)
+                result = _sanitize_info(result)
+                info_cache.put(cache_key, result)
             return result
         except Exception as e:
             last_exc = e
@@ -573,7 +617,9 @@ class StreamAdapter:
     __slots__ = ("_fmt", "_on_progress", "_watch_url", "_video_duration")
 
     def __init__(self, fmt: dict, on_progress_callback=None, watch_url: str = "", video_duration: int = 0):
-        self._fmt = fmt
+        # Kopie: fmt kann aus dem geteilten info_cache stammen, download()
+        # schreibt filesize nach
+        self._fmt = dict(fmt)
         self._video_duration = video_duration
         self._on_progress = on_progress_callback
         self._watch_url = watch_url
@@ -742,7 +788,8 @@ class StreamAdapter:
             "postprocessors": [],
         })
         # Throttle-Berechnung via throttle_calc.compute() (pure Funktion, getestet).
-        # Liest die 2 Settings direkt aus SQLite (sync, pro Download ok).
+        # Liest die Settings direkt aus SQLite (sync, pro Download ok).
+        seg_parts = _DEFAULT_SEGMENTS
         try:
             import sqlite3 as _sq
             from app.config import DB_PATH as _DB
@@ -757,7 +804,13 @@ class StreamAdapter:
                 "SELECT value FROM settings WHERE key=?",
                 (_K.DOWNLOAD_THROTTLE_KBPS,)
             ).fetchone()
+            _sg = _c.execute(
+                "SELECT value FROM settings WHERE key=?",
+                (_K.DOWNLOAD_SEGMENTS,)
+            ).fetchone()
             _c.close()
+            if _sg and str(_sg[0]).isdigit():
+                seg_parts = int(_sg[0])
             realtime = bool(_rt and str(_rt[0]).lower() == 'true')
             fixed_kbps = int(_kb[0]) if _kb and str(_kb[0]).isdigit() else 0
 
@@ -775,6 +828,24 @@ class StreamAdapter:
             logger.info(f"[throttle] applied: {decision.kbps} KB/s ({decision.reason})")
         except Exception as _e:
             logger.warning(f"[throttle] setup failed: {_e}")
+        # Segmentierter Range-Download (parallel, resume-fähig) für direkte
+        # HTTP-Streams. yt-dlp bleibt Fallback – dort heißt overwrites=True
+        # auch "kein Continue", eine Teildatei wäre verloren.
+        seg_target = out_dir / f"{fname_base}.{self.subtype or 'bin'}"
+        if self._can_segment(seg_parts):
+            try:
+                return str(self._download_segmented(
+                    seg_target, seg_parts, opts.get("ratelimit") or 0, timeout or 30))
+            except Exception as _seg_e:
+                logger.warning(
+                    f"[SEGMENTED-FAIL] {_label} → yt-dlp-Fallback "
+                    f"(Teildatei bleibt für Resume): {str(_seg_e)[:160]}"
+                )
+                # Stream-URL evtl. abgelaufen/gesperrt → nächster Versuch extrahiert neu
+                _cache_id = _extract_video_id(url)
+                if _cache_id:
+                    info_cache.drop_streams(_cache_id)
+
         # Auto-Retry mit neuer Random-Strategie + Login-Eskalation bei
         # BOT-DETECTION/AGE-GATE. Bei FORMAT-MISMATCH öffnen wir den
         # format-Selector damit der neue Player-Client einen kompatiblen
@@ -868,6 +939,7 @@ class StreamAdapter:
                 continue
         if last_exc is not None:
             raise last_exc
+        _segdl.discard(seg_target)
 
         # Pfad bestimmen: was der Hook gemeldet hat, oder fallback Suchen
         if final_path["path"] and _os.path.exists(final_path["path"]):
@@ -880,6 +952,30 @@ class StreamAdapter:
             f"StreamAdapter.download: Zieldatei nicht gefunden (outtmpl={out_tmpl})"
         )
 
+    def _can_segment(self, parts: int) -> bool:
+        """Range-Download nur für direkte HTTP(S)-Streams mit exakter Größe
+        (keine DASH-Fragmente/HLS, kein filesize_approx)."""
+        return (parts > 1 and bool(self._fmt.get("url"))
+                and self._fmt.get("protocol") in ("https", "http")
+                and bool(self._fmt.get("filesize")))
+
+    def _download_segmented(self, target, parts: int, ratelimit: int, timeout: float) -> str:
+        total = int(self._fmt["filesize"])
+        cb = self._on_progress
+
+        def _progress(done: int, _total: int):
+            if cb:
+                cb(self, b"", max(0, _total - done))
+
+        logger.info(f"[SEGMENTED] itag={self.itag} {total / 1048576:.1f} MB in {parts} Segmenten")
+        _segdl.download(
+            self._fmt["url"], target, total,
+            parts=parts, key=f"itag={self.itag}",
+            headers=self._fmt.get("http_headers") or {},
+            ratelimit=ratelimit, timeout=timeout, on_progress=_progress,
+        )
+        return str(target)
+
     def __repr__(self) -> str:
         return (
             f"<Stream itag={self.itag} type={self.type} "
@@ -1063,10 +1159,13 @@ class YoutubeAdapter:
         self.video_id = _extract_video_id(url) or ""
         self.on_progress_callback = on_progress_callback
         self._info: Optional[dict] = None
+        self._info_streams = False   # _info mit gültigen Stream-URLs geholt
 
-    def _ensure(self) -> dict:
-        if self._info is None:
-            self._info = _ydl_extract(self.watch_url)
+    def _ensure(self, streams: bool = False) -> dict:
+        """Info-Dict; streams=True für alles, was URLs nutzt (Streams, Captions)."""
+        if self._info is None or (streams and not self._info_streams):
+            self._info = _ydl_extract(self.watch_url, need_streams=streams)
+            self._info_streams = streams
         return self._info
 
     # Metadaten
@@ -1148,7 +1247,7 @@ class YoutubeAdapter:
     # Streams
     @property
     def streams(self) -> StreamQueryAdapter:
-        info = self._ensure()
+        info = self._ensure(streams=True)
         fmts = info.get("formats") or []
         # Nur Formate mit URL (manche sind nur Platzhalter)
         fmts = [f for f in fmts if f.get("url")]
@@ -1183,7 +1282,7 @@ class YoutubeAdapter:
     # Captions
     @property
     def captions(self) -> list[CaptionAdapter]:
-        info = self._ensure()
+        info = self._ensure(streams=True)
         out: list[CaptionAdapter] = []
         for lang, variants in (info.get("subtitles") or {}).items():
             fmt = _pick_sub_format(variants)
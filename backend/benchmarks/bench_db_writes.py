@@ -0,0 +1,152 @@
+"""
+Benchmark: Schreibdurchsatz auf rss_entries – Commit pro Statement vs. Transaktion
+vs. Upsert.
+
+Simuliert einen vollen Kanal-Scan (Insert-Lauf) und einen Re-Scan (alle Einträge
+existieren → Update-Pfad) auf einer frischen Temp-DB, Standard 50k Einträge.
+
+    cd backend && python -m benchmarks.bench_db_writes --rows 50000
+    cd backend && python -m benchmarks.bench_db_writes --rows 5000 --modes all
+
+Modi:
+- commit-per-row: ältester Pfad, jedes db.execute() committet (2 Commits pro
+                  Eintrag beim Re-Scan) – langsam, nur mit --modes all
+- tx-per-row:     INSERT OR IGNORE + UPDATE pro Eintrag, Chunks à SAVE_CHUNK_SIZE
+                  in einer Transaktion (vorheriges _save_entries_batch)
+- upsert:         channel_scanner._save_entries_batch – INSERT … ON CONFLICT DO
+                  UPDATE per executemany, eine Transaktion pro Chunk
+- execute_many:   reines INSERT OR IGNORE per executemany (Obergrenze)
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_TMP = Path(tempfile.mkdtemp(prefix="tubevault-bench-"))
+os.environ.setdefault("TUBEVAULT_DATA_DIR", str(_TMP))
+os.environ.setdefault("TUBEVAULT_CONFIG_DIR", str(_TMP / "config"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app.database as db_mod  # noqa: E402
+from app.database import Database  # noqa: E402
+
+CHANNEL_ID = "UC" + "b" * 22
+
+INSERT_SQL = """INSERT OR IGNORE INTO rss_entries
+   (video_id, channel_id, title, published, thumbnail_url,
+    duration, views, description, video_type, keywords, status)
+   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'new')"""
+
+UPDATE_SQL = """UPDATE rss_entries SET
+    duration = COALESCE(?, duration), views = COALESCE(?, views),
+    title = COALESCE(?, title)
+   WHERE video_id = ? AND channel_id = ?"""
+
+
+def synthetic_entries(n: int) -> list[dict]:
+    return [{
+        "video_id": f"v{i:010d}",
+        "title": f"Synthetisches Video {i}",
+        "published": f"2024-01-{(i % 28) + 1:02d}T00:00:00+00:00",
+        "thumbnail_url": f"https://i.ytimg.com/vi/v{i:010d}/hqdefault.jpg",
+        "duration": 60 + i % 3600,
+        "views": i * 7,
+        "description": "Lorem ipsum " * 20,
+        "video_type": "video",
+        "keywords": ["bench", f"k{i % 50}"],
+    } for i in range(n)]
+
+
+def _insert_params(v):
+    return (v["video_id"], CHANNEL_ID, v["title"], v["published"], v["thumbnail_url"],
+            v["duration"], v["views"], v["description"], v["video_type"],
+            json.dumps(v["keywords"]))
+
+
+async def commit_per_row(db, entries):
+    for v in entries:
+        cursor = await db.execute(INSERT_SQL, _insert_params(v))
+        if cursor.rowcount == 0:
+            await db.execute(UPDATE_SQL, (v["duration"], v["views"], v["title"],
+                                          v["video_id"], CHANNEL_ID))
+
+
+async def tx_per_row(db, entries):
+    from app.services.channel_scanner import SAVE_CHUNK_SIZE
+    for i in range(0, len(entries), SAVE_CHUNK_SIZE):
+        async with db.transaction():
+            for v in entries[i:i + SAVE_CHUNK_SIZE]:
+                cursor = await db.execute(INSERT_SQL, _insert_params(v))
+                if cursor.rowcount == 0:
+                    await db.execute(UPDATE_SQL, (v["duration"], v["views"], v["title"],
+                                                  v["video_id"], CHANNEL_ID))
+
+
+async def upsert(db, entries):
+    from app.services.channel_scanner import _save_entries_batch, SAVE_CHUNK_SIZE
+    for i in range(0, len(entries), SAVE_CHUNK_SIZE):
+        await _save_entries_batch(entries[i:i + SAVE_CHUNK_SIZE], CHANNEL_ID)
+
+
+async def execute_many(db, entries):
+    await db.execute_many(INSERT_SQL, [_insert_params(v) for v in entries])
+
+
+async def _run_mode(name, fn, entries):
+    tmp = Path(tempfile.mkdtemp(prefix=f"bench-{name}-", dir=str(_TMP)))
+    db = Database(db_path=tmp / "bench.db")
+    await db.connect()
+    db_mod.db = db
+    # channel_scanner hat 'db' beim Import gecached
+    import app.services.channel_scanner as cs
+    cs.db = db
+    try:
+        results = []
+        for phase in ("insert", "rescan"):
+            t0 = time.perf_counter()
+            await fn(db, entries)
+            dt = time.perf_counter() - t0
+            results.append((phase, dt))
+        count = await db.fetch_val("SELECT COUNT(*) FROM rss_entries")
+        assert count == len(entries), f"{name}: {count} != {len(entries)}"
+        return results
+    finally:
+        await db.disconnect()
+
+
+MODES = {
+    "commit-per-row": commit_per_row,
+    "tx-per-row": tx_per_row,
+    "upsert": upsert,
+    "execute_many": execute_many,
+}
+DEFAULT_MODES = ("tx-per-row", "upsert", "execute_many")
+
+
+async def main(rows: int, modes: list[str]):
+    logging.disable(logging.WARNING)  # Migrations-Rauschen der frischen DBs
+    entries = synthetic_entries(rows)
+    print(f"rss_entries Benchmark – {rows} Einträge\n")
+    print(f"{'Modus':<16}{'Phase':<9}{'Zeit':>10}{'Zeilen/s':>12}")
+    for name in modes:
+        for phase, dt in await _run_mode(name, MODES[name], entries):
+            print(f"{name:<16}{phase:<9}{dt:>9.2f}s{rows / dt:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--modes", default=",".join(DEFAULT_MODES),
+                        help=f"kommagetrennt aus {', '.join(MODES)} oder 'all'")
+    args = parser.parse_args()
+    modes = list(MODES) if args.modes == "all" else args.modes.split(",")
+    try:
+        asyncio.run(main(args.rows, modes))
+    finally:
+        shutil.rmtree(_TMP, ignore_errors=True)
@@ -0,0 +1,134 @@
+"""
+Benchmark: Range-Streaming im Player – alter Generator vs. RangeFileResponse.
+
+N gleichzeitige Leser ziehen zufällige Byte-Bereiche aus einer großen Temp-Datei
+(simuliert mehrere Zuschauer, die in 4K-Dateien springen). Gemessen werden
+Durchsatz und Event-Loop-Lag (Verspätung eines 10-ms-Tickers).
+
+    cd backend && python -m benchmarks.bench_range_streaming --readers 8 --size-mb 512
+
+Modi:
+- generator:     alter Pfad, async def generate() mit blockierendem f.read(1 MB)
+- range-response: app.utils.range_response.RangeFileResponse (anyio-Threadpool)
+Hinweis: Page-Cache macht den Generator-Pfad hier noch gutmütig – auf einer
+USB-Platte blockiert jedes f.read() den Loop für die volle Seek-/Lesezeit.
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_TMP = Path(tempfile.mkdtemp(prefix="tubevault-bench-"))
+os.environ.setdefault("TUBEVAULT_DATA_DIR", str(_TMP))
+os.environ.setdefault("TUBEVAULT_CONFIG_DIR", str(_TMP / "config"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from starlette.responses import StreamingResponse  # noqa: E402
+
+from app.utils.range_response import RangeFileResponse  # noqa: E402
+
+CHUNK_SIZE = 1024 * 1024
+TICK = 0.01
+
+
+def legacy_response(path: Path, start: int, end: int, file_size: int):
+    """Nachbau des alten stream_video-Range-Zweigs."""
+    length = end - start + 1
+
+    async def generate():
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    return StreamingResponse(generate(), status_code=206, media_type="video/mp4", headers={
+        "Content-Range": f"bytes {start}-{end}/{file_size}", "Content-Length": str(length)})
+
+
+def new_response(path: Path, start: int, end: int, file_size: int):
+    return RangeFileResponse(str(path), media_type="video/mp4")
+
+
+async def _serve(factory, path: Path, start: int, end: int, file_size: int) -> int:
+    """Eine Antwort über ASGI ausliefern, Body zählen (ohne ihn zu behalten)."""
+    received = 0
+    scope = {"type": "http", "method": "GET", "extensions": {},
+             "headers": [(b"range", f"bytes={start}-{end}".encode())]}
+
+    async def receive():
+        await asyncio.sleep(3600)  # kein Disconnect
+
+    async def send(msg):
+        nonlocal received
+        if msg["type"] == "http.response.body":
+            received += len(msg.get("body", b""))
+
+    await factory(path, start, end, file_size)(scope, receive, send)
+    return received
+
+
+async def _lag_probe(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - t0 - TICK)
+
+
+async def run_mode(factory, path: Path, readers: int, requests: int, span: int):
+    file_size = path.stat().st_size
+    rnd = random.Random(42)
+    stop, lags = asyncio.Event(), []
+    probe = asyncio.create_task(_lag_probe(stop, lags))
+
+    async def reader():
+        total = 0
+        for _ in range(requests):
+            start = rnd.randrange(0, file_size - span)
+            total += await _serve(factory, path, start, start + span - 1, file_size)
+        return total
+
+    t0 = time.perf_counter()
+    totals = await asyncio.gather(*(reader() for _ in range(readers)))
+    dt = time.perf_counter() - t0
+    stop.set()
+    await probe
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99) - 1] if lags else 0.0
+    return sum(totals) / dt / 1048576, p99 * 1000, (lags[-1] if lags else 0.0) * 1000
+
+
+async def main(readers: int, size_mb: int, requests: int, span_mb: int):
+    path = _TMP / "bench.mp4"
+    with open(path, "wb") as f:
+        block = os.urandom(CHUNK_SIZE)
+        for _ in range(size_mb):
+            f.write(block)
+    print(f"Range-Streaming – {readers} Leser × {requests} Requests à {span_mb} MB, "
+          f"Datei {size_mb} MB\n")
+    print(f"{'Modus':<16}{'MB/s':>10}{'Lag p99':>12}{'Lag max':>12}")
+    for name, factory in (("generator", legacy_response), ("range-response", new_response)):
+        mbs, p99, worst = await run_mode(factory, path, readers, requests, span_mb * 1048576)
+        print(f"{name:<16}{mbs:>10.0f}{p99:>10.1f}ms{worst:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=512)
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument("--span-mb", type=int, default=8)
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.readers, args.size_mb, args.requests, args.span_mb))
+    finally:
+        shutil.rmtree(_TMP, ignore_errors=True)
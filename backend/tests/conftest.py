@@ -71,6 +71,16 @@ async def test_db():
             except Exception:
                 pass
 
+    # Zähler-Cache des Singletons darf nicht aus dem Vortest stammen
+    from app.services.counts_service import counts_service
+    counts_service.invalidate()
+    # Pfad-Cache ebenso (Video-IDs wiederholen sich zwischen Tests)
+    from app.services.archive_service import archive_service
+    archive_service.invalidate_path()
+    # Feed-Heap ebenso (Abo-IDs wiederholen sich zwischen Tests)
+    from app.services.rss_service import rss_service
+    rss_service.invalidate_schedule()
+
     try:
         yield test_instance
     finally:
@@ -0,0 +1,97 @@
+"""
+Pfad-Cache von ArchiveService.resolve_video_path.
+
+Kontrakt:
+- wiederholtes Auflösen eines verfügbaren Videos: keine DB-Abfrage, kein stat()
+- Löschen, Mount-Wechsel und Datei-fehlt-beim-Öffnen invalidieren, ebenso
+  die Ghost-Markierung von file_presence_service
+- LRU-Grenze PATH_CACHE_SIZE
+"""
+from pathlib import Path
+
+import pytest
+
+from app.routers.player import router as player_router
+from app.services import archive_service as archive_mod
+from app.services.archive_service import archive_service
+from app.services.file_presence_service import file_presence_service
+from app.services.metadata_service import metadata_service
+
+
+async def _video(test_db, tmp_path, vid="cacheAAAAAA"):
+    path = tmp_path / f"{vid}.mp4"
+    path.write_bytes(b"\0" * 4096)
+    await test_db.execute(
+        "INSERT INTO videos (id, title, status, file_path, file_size, storage_type) "
+        "VALUES (?, 'Cache', 'ready', ?, 4096, 'local')", (vid, str(path)))
+    return path
+
+
+async def test_repeat_resolve_skips_db_and_stat(test_db, tmp_path, monkeypatch):
+    path = await _video(test_db, tmp_path)
+    first = await archive_service.resolve_video_path("cacheAAAAAA")
+    assert first["available"] and first["path"] == str(path)
+
+    calls = []
+
+    async def _no_db(*a, **kw):
+        calls.append(a)
+        raise AssertionError("DB-Zugriff trotz Cache")
+
+    monkeypatch.setattr(test_db, "fetch_one", _no_db)
+    monkeypatch.setattr(test_db, "fetch_all", _no_db)
+    monkeypatch.setattr(Path, "exists", lambda self: calls.append(self) or True)
+    again = await archive_service.resolve_video_path("cacheAAAAAA")
+    assert again == first and calls == []
+    again["path"] = "verändert"  # Kopie – Cache bleibt unberührt
+    assert (await archive_service.resolve_video_path("cacheAAAAAA"))["path"] == str(path)
+
+
+async def test_delete_and_mount_change_invalidate(test_db, tmp_path, monkeypatch):
+    # Mount-Status früherer Tests (gleiche Archiv-ID) würde den Wechsel verdecken
+    monkeypatch.setattr(archive_service, "_mount_status", {})
+    await _video(test_db, tmp_path)
+    await archive_service.resolve_video_path("cacheAAAAAA")
+    await metadata_service.delete_video("cacheAAAAAA", ignore_for_future=False)
+    assert (await archive_service.resolve_video_path("cacheAAAAAA"))["available"] is False
+
+    await _video(test_db, tmp_path, "otherAAAAAA")
+    await archive_service.resolve_video_path("otherAAAAAA")
+    mount = tmp_path / "usb"
+    mount.mkdir()
+    await test_db.execute("INSERT INTO archives (name, mount_path) VALUES ('USB', ?)", (str(mount),))
+    assert await archive_service.check_all_mounts()  # neu erkannt → Wechsel
+    assert archive_service._path_cache == {}
+
+
+async def test_missing_file_on_open_invalidates(test_db, tmp_path, async_client_factory):
+    path = await _video(test_db, tmp_path)
+    async with await async_client_factory(player_router) as client:
+        assert (await client.get("/api/player/cacheAAAAAA")).status_code == 200
+        path.unlink()
+        assert (await client.get("/api/player/cacheAAAAAA")).status_code == 404
+        assert "cacheAAAAAA" not in archive_service._path_cache
+        r = await client.get("/api/player/cacheAAAAAA")
+    assert r.status_code == 404 and r.json()["detail"] == "Video-Datei nicht gefunden"
+
+
+async def test_ghost_marking_invalidates(test_db, tmp_path):
+    path = await _video(test_db, tmp_path)
+    assert (await archive_service.resolve_video_path("cacheAAAAAA"))["available"]
+    path.unlink()
+    report = await file_presence_service.verify(max_age=0)
+    file_presence_service.shutdown()
+    assert [m["id"] for m in report.missing] == ["cacheAAAAAA"]
+    assert "cacheAAAAAA" not in archive_service._path_cache
+    assert (await archive_service.resolve_video_path("cacheAAAAAA"))["available"] is False
+
+
+async def test_lru_bound(test_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_mod, "PATH_CACHE_SIZE", 2)
+    for vid in ("lruAAAAAAAA", "lruBBBBBBBB", "lruCCCCCCCC"):
+        await _video(test_db, tmp_path, vid)
+    await archive_service.resolve_video_path("lruAAAAAAAA")
+    await archive_service.resolve_video_path("lruBBBBBBBB")
+    await archive_service.resolve_video_path("lruAAAAAAAA")  # A wieder frisch
+    await archive_service.resolve_video_path("lruCCCCCCCC")
+    assert list(archive_service._path_cache) == ["lruAAAAAAAA", "lruCCCCCCCC"]
@@ -0,0 +1,143 @@
+"""
+Inkrementeller Archiv-Scan (ArchiveService.scan_archive + archive_files).
+
+Kontrakt:
+- erster Scan: Video-ID aus Dateiname, sonst FFprobe (höchstens
+  FFPROBE_CONCURRENCY gleichzeitig); Dateien ohne ID werden gemerkt
+- Rescan ohne Änderungen: kein FFprobe, keine geänderten Dateien; fehlt für
+  eine unveränderte Datei Archiv-Link oder Video (gelöscht), legt der Rescan
+  beides wieder an
+- geänderte/neue Dateien werden neu bewertet, entfernte fallen aus dem Index,
+  Umbenennungen (gleiche Inode) brauchen kein FFprobe; der Link zeigt auf den
+  neuen Pfad
+- Fehler einer Datei (FFprobe, DB-Write) werden geloggt und übersprungen:
+  der Rest des Scans wird geschrieben, die Datei beim nächsten Scan erneut
+  geprüft
+"""
+import asyncio
+import os
+
+import pytest
+
+from app.services import archive_service as archive_mod
+from app.services.archive_service import archive_service
+
+
+@pytest.fixture
+async def archive(test_db, tmp_path, monkeypatch):
+    root = tmp_path / "archiv"
+    for d in range(6):
+        sub = root / f"kanal{d}" / "2024"
+        sub.mkdir(parents=True)
+        for i in range(20):
+            (sub / f"Titel {d}-{i} [a{d}{i:09d}].mp4").write_bytes(b"x" * (i + 1))
+    (root / "kanal0" / "notiz.txt").write_text("kein Video")
+    for i in range(6):
+        (root / "kanal1" / f"ohne_id_{i}.mkv").write_bytes(b"y" * 10)
+
+    probes = {"calls": [], "active": 0, "peak": 0}
+
+    async def fake_probe(path):
+        probes["calls"].append(path.name)
+        probes["active"] += 1
+        probes["peak"] = max(probes["peak"], probes["active"])
+        await asyncio.sleep(0.01)
+        probes["active"] -= 1
+        # nur ohne_id_0 hat die URL in den Metadaten
+        return "probeAAAAAA" if path.name == "ohne_id_0.mkv" else None
+
+    monkeypatch.setattr(archive_service, "_extract_video_id_ffprobe", fake_probe)
+    monkeypatch.setattr(archive_mod, "FFPROBE_CONCURRENCY", 2)
+    await test_db.execute(
+        "INSERT INTO videos (id, title, status) VALUES ('a0000000000', 'Schon da', 'ready')")
+    arch = await archive_service.add_archive("Test", str(root))
+    yield root, arch["id"], probes
+
+
+async def test_first_scan_then_unchanged_rescan(archive, test_db):
+    root, aid, probes = archive
+    result = await archive_service.scan_archive(aid)
+    assert result["total_files"] == 126 and result["found"] == 121
+    assert result["new_videos"] == 120 and result["linked"] == 121
+    assert len(probes["calls"]) == 6 and probes["peak"] == 2
+    assert await test_db.fetch_val(
+        "SELECT COUNT(*) FROM archive_files WHERE archive_id = ?", (aid,)) == 126
+
+    result = await archive_service.scan_archive(aid)
+    assert result["changed"] == 0 and result["probed"] == 0 and result["found"] == 121
+    assert result["linked"] == 0 and len(probes["calls"]) == 6
+
+
+async def test_changes_renames_and_removals(archive, test_db):
+    root, aid, probes = archive
+    await archive_service.scan_archive(aid)
+    probes["calls"].clear()
+
+    (root / "kanal2" / "2024" / "Titel 2-0 [a2000000000].mp4").write_bytes(b"neu und laenger")
+    (root / "kanal3" / "2024" / "Titel 3-1 [a3000000001].mp4").unlink()
+    os.rename(root / "kanal1" / "ohne_id_0.mkv", root / "kanal4" / "verschoben.mkv")
+    (root / "kanal5" / "Neu [n0000000001].webm").write_bytes(b"z")
+
+    result = await archive_service.scan_archive(aid)
+    assert result["changed"] == 3 and result["removed"] == 2
+    assert probes["calls"] == []  # Umbenennung über Inode erkannt
+    assert result["new_videos"] == 1 and result["found"] == 121
+    link = await test_db.fetch_val(
+        "SELECT file_path FROM video_archives WHERE video_id = 'probeAAAAAA'")
+    assert link == str(root / "kanal4" / "verschoben.mkv")
+    size = await test_db.fetch_val(
+        "SELECT size FROM archive_files WHERE path LIKE '%a2000000000%'")
+    assert size == len(b"neu und laenger")
+
+
+async def test_bad_file_is_skipped_not_fatal(archive, test_db, monkeypatch):
+    root, aid, probes = archive
+    real_probe = archive_service._extract_video_id_ffprobe
+
+    async def flaky_probe(path):
+        if path.name == "ohne_id_1.mkv":
+            raise OSError("ffprobe nicht gefunden")
+        return await real_probe(path)
+
+    monkeypatch.setattr(archive_service, "_extract_video_id_ffprobe", flaky_probe)
+    # Eine Zeile, an der der Sammel-Write scheitert
+    await test_db.execute(
+        """CREATE TRIGGER test_bad_link BEFORE INSERT ON video_archives
+           WHEN NEW.video_id = 'a3000000007'
+           BEGIN SELECT RAISE(ABORT, 'kaputt'); END""")
+
+    result = await archive_service.scan_archive(aid)
+    assert result["skipped"] == 2
+    assert result["found"] == 120 and result["linked"] == 120
+    assert await test_db.fetch_val(
+        "SELECT COUNT(*) FROM archive_files WHERE archive_id = ?", (aid,)) == 124
+    assert await test_db.fetch_val(
+        "SELECT COUNT(*) FROM video_archives WHERE video_id = 'a3000000007'") == 0
+
+    # Nächster Scan: nur die übersprungenen Dateien werden erneut geprüft
+    await test_db.execute("DROP TRIGGER test_bad_link")
+    probes["calls"].clear()
+    monkeypatch.setattr(archive_service, "_extract_video_id_ffprobe", real_probe)
+    result = await archive_service.scan_archive(aid)
+    assert result["changed"] == 2 and result["skipped"] == 0
+    assert probes["calls"] == ["ohne_id_1.mkv"]
+    assert result["found"] == 121
+
+
+async def test_rescan_restores_deleted_link_and_video(archive, test_db):
+    root, aid, probes = archive
+    await archive_service.scan_archive(aid)
+    probes["calls"].clear()
+    await test_db.execute(
+        "DELETE FROM video_archives WHERE video_id = 'a1000000003' AND archive_id = ?", (aid,))
+    await test_db.execute("DELETE FROM videos WHERE id = 'a2000000004'")  # Link per CASCADE
+
+    result = await archive_service.scan_archive(aid)
+    assert result["changed"] == 0 and probes["calls"] == []
+    assert result["linked"] == 2 and result["new_videos"] == 1
+    for vid in ("a1000000003", "a2000000004"):
+        assert await test_db.fetch_val(
+            "SELECT file_path FROM video_archives WHERE video_id = ? AND archive_id = ?",
+            (vid, aid)) == str(next(root.rglob(f"*[[]{vid}].mp4")))
+    assert await test_db.fetch_val(
+        "SELECT status FROM videos WHERE id = 'a2000000004'") == "archived"
@@ -0,0 +1,164 @@
+"""
+Backfill-Engine (backfill_service.py) + RSS-Thumbnail-/Banner-Backfill.
+
+Kontrakt:
+- Items laufen parallel, höchstens `workers` gleichzeitig
+- Status landet in backfill_state: erledigte Items fallen beim nächsten Lauf
+  per SQL raus (kein fetch, kein Job); Fehler bis MAX_ATTEMPTS erneut
+- Exceptions → rate_limiter.error (429 → Backoff); Bot-Erkennung bricht ab,
+  offene Items bleiben für den nächsten Lauf
+- Fortschritt als Job "backfill" mit Durchsatz + ETA
+- manueller Lauf (Button): ausgereizte Fehler und gelöschte Dateien
+  erledigter Items werden erneut geholt
+"""
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services import backfill_service as backfill_mod
+from app.services import rss_service as rss_mod
+from app.services.backfill_service import BackfillTask, backfill_service
+from app.services.http_clients import http_clients
+from app.services.rate_limiter import rate_limiter
+from app.services.rss_service import rss_service
+
+QUERY = "SELECT video_id AS item_key, thumbnail_url FROM rss_entries WHERE thumbnail_url IS NOT NULL"
+
+
+async def _entries(test_db, n, url="http://x/{i}.jpg", prefix="bf"):
+    for i in range(n):
+        await test_db.execute(
+            "INSERT INTO rss_entries (video_id, channel_id, thumbnail_url) VALUES (?, 'UCx', ?)",
+            (f"{prefix}{i:09d}", url.format(i=i)))
+
+
+@pytest.fixture(autouse=True)
+def _limiter(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "intervals", dict(rate_limiter.intervals))
+    monkeypatch.setattr(rate_limiter, "_yt_bot_detected", False)
+    monkeypatch.setattr(backfill_mod, "PROGRESS_INTERVAL", 0.05)
+
+
+async def test_parallel_then_resume_without_work(test_db):
+    await _entries(test_db, 12)
+    active, peak, seen = 0, 0, []
+
+    async def fetch(row):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        seen.append(row["item_key"])
+        return True
+
+    task = BackfillTask(kind="t", title="Test", query=QUERY, fetch=fetch)
+    result = await backfill_service.run(task, workers=4)
+    assert result["done"] == 12 and peak == 4 and len(set(seen)) == 12
+    assert await test_db.fetch_val("SELECT COUNT(*) FROM backfill_state WHERE status = 'done'") == 12
+
+    job = await test_db.fetch_one("SELECT * FROM jobs WHERE type = 'backfill'")
+    meta = json.loads(job["metadata"])
+    assert job["status"] == "done" and meta["items_per_s"] > 0 and meta["total"] == 12
+
+    seen.clear()
+    assert (await backfill_service.run(task, workers=4))["total"] == 0
+    assert seen == [] and await test_db.fetch_val("SELECT COUNT(*) FROM jobs") == 1
+
+
+async def test_failures_retry_until_max_attempts(test_db):
+    await _entries(test_db, 3)
+    calls = []
+
+    async def fetch(row):
+        calls.append(row["item_key"])
+        return row["item_key"] != "bf000000001"
+
+    task = BackfillTask(kind="t", title="Test", query=QUERY, fetch=fetch)
+    for _ in range(backfill_mod.MAX_ATTEMPTS + 1):
+        await backfill_service.run(task, workers=2)
+    assert calls.count("bf000000001") == backfill_mod.MAX_ATTEMPTS
+    assert calls.count("bf000000000") == 1
+
+
+async def test_rate_limit_backoff_and_bot_abort(test_db, monkeypatch):
+    await _entries(test_db, 1)
+
+    async def blocked(row):
+        raise RuntimeError("Client error '429 Too Many Requests'")
+
+    base = rate_limiter.intervals["thumbnail"]
+    await backfill_service.run(BackfillTask(kind="t", title="Test", query=QUERY, fetch=blocked), workers=1)
+    assert rate_limiter.intervals["thumbnail"] > base
+
+    async def ok(row):
+        return True
+
+    await _entries(test_db, 3, prefix="more")
+    monkeypatch.setattr(rate_limiter, "is_bot_detected", lambda: True)
+    result = await backfill_service.run(BackfillTask(kind="u", title="Test", query=QUERY, fetch=ok))
+    assert result["aborted"] and result["done"] == 0
+    assert len(await backfill_service.pending(BackfillTask(kind="u", title="", query=QUERY, fetch=ok))) == 4
+
+
+class _Images(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *a):
+        pass
+
+    def do_GET(self):
+        self.server.hits.append(self.path)
+        body = b"\xff\xd8" + b"\0" * 2000
+        self.send_response(404 if "missing" in self.path else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def image_server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Images)
+    srv.hits = []
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    srv.url = f"http://127.0.0.1:{srv.server_address[1]}"
+    yield srv
+    srv.shutdown()
+
+
+async def test_rss_thumbnails_and_banners(test_db, tmp_path, monkeypatch, image_server):
+    monkeypatch.setattr(rss_mod, "RSS_THUMBS_DIR", tmp_path / "rss")
+    monkeypatch.setattr(rss_mod, "BANNERS_DIR", tmp_path / "banners")
+    await _entries(test_db, 5, image_server.url + "/vi/{i}.jpg")
+    await _entries(test_db, 1, image_server.url + "/missing/{i}.jpg", prefix="gone")
+    await test_db.execute(
+        "INSERT INTO subscriptions (channel_id, banner_url) VALUES ('UCbanner', ?)",
+        (image_server.url + "/banner.jpg",))
+
+    result = await rss_service.backfill_missing_thumbnails(delay=0)
+    assert result["done"] == 5 and result["failed"] == 1
+    assert len(list((tmp_path / "rss").iterdir())) == 5
+    image_server.hits.clear()
+    await rss_service.backfill_missing_thumbnails(delay=0)
+    assert image_server.hits == ["/missing/0.jpg"]  # nur der 404 wird erneut versucht
+
+    # 404 ausgereizt + ein Thumbnail von Hand gelöscht: Startup-Lauf ignoriert
+    # beides, der Button holt beides erneut
+    await test_db.execute("UPDATE backfill_state SET attempts = 3 WHERE item_key = 'gone000000000'")
+    (tmp_path / "rss" / "bf000000002.jpg").unlink()
+    image_server.hits.clear()
+    await rss_service.backfill_missing_thumbnails(delay=0)
+    assert image_server.hits == []
+    result = await rss_service.backfill_missing_thumbnails(delay=0, manual=True)
+    assert sorted(image_server.hits) == ["/missing/0.jpg", "/vi/2.jpg"]
+    assert result["done"] == 1 and (tmp_path / "rss" / "bf000000002.jpg").exists()
+
+    assert (await rss_service.backfill_banners(delay=0))["done"] == 1
+    assert (tmp_path / "banners" / "UCbanner.jpg").exists()
+    assert await test_db.fetch_val(
+        "SELECT banner_url FROM subscriptions WHERE channel_id = 'UCbanner'"
+    ) == "/api/subscriptions/banner/UCbanner"
+    await http_clients.aclose()
@@ -0,0 +1,118 @@
+"""
+Zähler-Cache im counts_service.
+
+Kontrakt:
+- warmer Cache: Badge-Poll ohne DB-Query
+- Schreibpfade (metadata/job/rss/Favoriten) invalidieren ihre Tabelle
+- TTL-Fallback für Schreibpfade ohne Invalidierung
+- Invalidierung während einer laufenden Zählung → Ergebnis wird nicht gecacht
+- /api/system/counts liefert Badges + Jobs + Queue + Bibliothek in einer Antwort
+"""
+import asyncio
+
+import pytest
+
+from app.services.counts_service import counts_service
+from app.services.job_service import job_service
+from app.services.metadata_service import metadata_service
+
+
+async def _video(db, vid, status="ready"):
+    await db.execute(
+        "INSERT INTO videos (id, title, status, is_archived, file_size) VALUES (?, ?, ?, 0, 100)",
+        (vid, vid, status))
+
+
+async def test_warm_cache_skips_db(test_db, monkeypatch):
+    await _video(test_db, "c1")
+    first = await counts_service.badges()
+    assert first["videos"] == 1
+
+    calls = 0
+    orig_one, orig_val = test_db.fetch_one, test_db.fetch_val
+
+    async def _one(*a, **kw):
+        nonlocal calls
+        calls += 1
+        return await orig_one(*a, **kw)
+
+    async def _val(*a, **kw):
+        nonlocal calls
+        calls += 1
+        return await orig_val(*a, **kw)
+
+    monkeypatch.setattr(test_db, "fetch_one", _one)
+    monkeypatch.setattr(test_db, "fetch_val", _val)
+    hits = counts_service.hits
+    assert await counts_service.badges() == first
+    assert calls == 0
+    assert counts_service.hits > hits
+
+
+async def test_write_paths_invalidate(test_db, async_client_factory):
+    await _video(test_db, "c1")
+    await _video(test_db, "c2")
+    assert await counts_service.library_videos() == 2
+    assert (await counts_service.queue_counts())["queued"] == 0
+    assert await counts_service.favorites() == 0
+
+    await metadata_service.record_play("c1")
+    assert await counts_service.history_played() == 1
+
+    job = await job_service.create(job_type="download", title="x")
+    assert (await counts_service.queue_counts())["queued"] == 1
+    await job_service.start(job["id"], exclusive=False)
+    q = await counts_service.queue_counts()
+    assert (q["queued"], q["active"]) == (0, 1)
+
+    from app.routers import favorites, videos
+    async with await async_client_factory(favorites.router, videos.router) as client:
+        await client.post("/api/favorites", json={"video_id": "c1"})
+        await client.post("/api/videos/c2/archive")
+    assert await counts_service.favorites() == 1
+    assert await counts_service.library_videos() == 1
+    assert await counts_service.archived_videos() == 1
+
+
+async def test_ttl_fallback(test_db, monkeypatch):
+    monkeypatch.setattr(counts_service, "ttl", 0.05)
+    await _video(test_db, "c1")
+    assert await counts_service.library_videos() == 1
+    # Direkter SQL-Write ohne Invalidierung → bis TTL-Ablauf alter Wert
+    await _video(test_db, "c2")
+    assert await counts_service.library_videos() == 1
+    await asyncio.sleep(0.06)
+    assert await counts_service.library_videos() == 2
+
+
+async def test_invalidate_during_compute_not_cached(test_db, monkeypatch):
+    await _video(test_db, "c1")
+    orig = test_db.fetch_one
+
+    async def _racing(*a, **kw):
+        row = await orig(*a, **kw)
+        # Schreiber kommt zwischen Query und Cache-Eintrag
+        await _video(test_db, "c2")
+        counts_service.invalidate("videos")
+        monkeypatch.setattr(test_db, "fetch_one", orig)
+        return row
+
+    monkeypatch.setattr(test_db, "fetch_one", _racing)
+    assert await counts_service.library_videos() == 1
+    assert await counts_service.library_videos() == 2
+
+
+async def test_counts_endpoint(test_db, async_client_factory):
+    await _video(test_db, "c1")
+    await test_db.execute("INSERT INTO subscriptions (channel_id, channel_name, enabled) VALUES ('UC1','A',1)")
+    await job_service.create(job_type="download", title="x")
+    from app.routers import system
+    async with await async_client_factory(system.router) as client:
+        body = (await client.get("/api/system/counts")).json()
+        badges = (await client.get("/api/system/badges")).json()
+    assert body["badges"] == badges
+    assert body["badges"]["videos"] == 1
+    assert body["badges"]["active_downloads"] == 1
+    assert body["queue"]["queued"] == 1
+    assert body["subscriptions"] == {"total": 1, "enabled": 1, "error": 0}
+    assert body["library"]["total_size_bytes"] == 100
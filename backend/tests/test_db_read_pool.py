@@ -0,0 +1,114 @@
+"""
+Reader-Pool-Tests für app.database.Database.
+
+Kontrakt:
+- fetch_* laufen über die WAL-Reader, execute über den einen Writer
+- Reader sind query_only (Schreiben über den Lesepfad knallt)
+- committete Writes sind für Reader sofort sichtbar
+- eine offene Writer-Transaktion blockiert Lesungen nicht
+- read_pool_size=0 → alles über den Writer (altes Verhalten)
+- Zählungen betroffener Zeilen kommen aus cursor.rowcount, nicht aus
+  changes() (pro Connection → auf einem Reader immer 0)
+"""
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.database import Database
+
+
+async def test_pool_opens_configured_readers(test_db):
+    assert len(test_db._readers) == test_db.read_pool_size
+    assert test_db._reader_queue is not None
+    assert test_db._reader_queue.qsize() == test_db.read_pool_size
+
+
+async def test_fetch_goes_through_reader_not_writer(test_db):
+    async with test_db._reader() as conn:
+        assert conn is not test_db.conn
+        assert conn in test_db._readers
+
+
+async def test_readers_are_query_only(test_db):
+    async with test_db._reader() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            await conn.execute(
+                "INSERT INTO settings (key, value) VALUES ('x', 'y')"
+            )
+
+
+async def test_committed_write_visible_to_readers(test_db):
+    await test_db.execute(
+        "INSERT INTO videos (id, title, status) VALUES ('rp1', 'Pool', 'ready')"
+    )
+    # Alle Reader einmal durchlaufen – jeder muss den Write sehen
+    for _ in range(test_db.read_pool_size):
+        assert await test_db.fetch_val(
+            "SELECT title FROM videos WHERE id = 'rp1'"
+        ) == "Pool"
+
+
+async def test_open_write_transaction_does_not_block_reads(test_db):
+    await test_db.execute(
+        "INSERT INTO videos (id, title, status) VALUES ('rp2', 'Alt', 'ready')"
+    )
+    await test_db.conn.execute("BEGIN IMMEDIATE")
+    await test_db.conn.execute("UPDATE videos SET title = 'Neu' WHERE id = 'rp2'")
+    try:
+        # Reader sieht den letzten committeten Stand, ohne zu warten
+        title = await asyncio.wait_for(
+            test_db.fetch_val("SELECT title FROM videos WHERE id = 'rp2'"), 2
+        )
+        assert title == "Alt"
+    finally:
+        await test_db.conn.commit()
+    assert await test_db.fetch_val(
+        "SELECT title FROM videos WHERE id = 'rp2'"
+    ) == "Neu"
+
+
+async def test_parallel_reads_use_distinct_readers(test_db):
+    seen = set()
+
+    async def _grab():
+        async with test_db._reader() as conn:
+            seen.add(id(conn))
+            await asyncio.sleep(0.05)
+
+    await asyncio.gather(*[_grab() for _ in range(test_db.read_pool_size)])
+    assert len(seen) == test_db.read_pool_size
+
+
+async def test_zero_pool_falls_back_to_writer(tmp_path):
+    d = Database(db_path=tmp_path / "nopool.db", read_pool_size=0)
+    await d.connect()
+    try:
+        assert d._readers == []
+        async with d._reader() as conn:
+            assert conn is d.conn
+        await d.execute("INSERT INTO settings (key, value) VALUES ('k', 'v')")
+        assert await d.fetch_val("SELECT value FROM settings WHERE key = 'k'") == "v"
+    finally:
+        await d.disconnect()
+
+
+async def test_disconnect_closes_pool(tmp_path):
+    d = Database(db_path=tmp_path / "close.db", read_pool_size=2)
+    await d.connect()
+    assert len(d._readers) == 2
+    await d.disconnect()
+    assert d._readers == []
+    assert d._reader_queue is None
+
+
+async def test_reset_errors_counts_via_rowcount(test_db, async_client_factory):
+    from app.routers.subscriptions import router as subscriptions_router
+
+    for i, (errors, enabled) in enumerate([(3, 1), (0, 0), (0, 1)]):
+        await test_db.execute(
+            "INSERT INTO subscriptions (channel_id, channel_name, error_count, enabled) "
+            "VALUES (?, ?, ?, ?)", (f"UCreset{i}", f"K{i}", errors, enabled))
+    async with await async_client_factory(subscriptions_router) as client:
+        data = (await client.post("/api/subscriptions/reset-errors")).json()
+    assert data["reset"] == 2
@@ -0,0 +1,184 @@
+"""
+Transaktions-/Batch-API von app.database.Database.
+
+Kontrakt:
+- transaction(): alle Writes im Block landen in einem Commit, Exception → Rollback
+- innerhalb der Transaktion sieht der eigene Task seine Writes (Read-your-writes),
+  andere Tasks (Reader-Pool) erst nach dem Commit
+- execute() eines anderen Tasks committet eine fremde offene Transaktion NICHT mit;
+  das gilt auch für Tasks, die im Block per create_task() gestartet werden
+- execute_many(): ein Statement, viele Parameter, Rückgabe = betroffene Zeilen
+- write_batch(): Group-Commit nach N Statements, nach Zeit und am Blockende
+- channel_scanner._save_entries_batch nutzt eine Transaktion pro Batch und
+  einen Upsert: leere Werte überschreiben nichts, status/published bleiben
+"""
+import asyncio
+
+import pytest
+
+
+async def test_transaction_commits_all_writes_at_end(test_db):
+    async with test_db.transaction():
+        await test_db.execute("INSERT INTO settings (key, value) VALUES ('t1', 'a')")
+        await test_db.execute("INSERT INTO settings (key, value) VALUES ('t2', 'b')")
+        # Eigener Task liest über den Writer → sieht die offenen Writes
+        assert await test_db.fetch_val(
+            "SELECT COUNT(*) FROM settings WHERE key IN ('t1', 't2')") == 2
+        # Reader-Pool (anderer Task) sieht noch nichts
+        other = await asyncio.create_task(_count_outside(test_db))
+        assert other == 0
+    assert await test_db.fetch_val(
+        "SELECT COUNT(*) FROM settings WHERE key IN ('t1', 't2')") == 2
+
+
+async def _count_outside(db):
+    return await db.fetch_val(
+        "SELECT COUNT(*) FROM settings WHERE key IN ('t1', 't2')")
+
+
+async def test_transaction_rolls_back_on_exception(test_db):
+    with pytest.raises(RuntimeError):
+        async with test_db.transaction():
+            await test_db.execute("INSERT INTO settings (key, value) VALUES ('rb', 'x')")
+            raise RuntimeError("boom")
+    assert await test_db.fetch_val("SELECT COUNT(*) FROM settings WHERE key = 'rb'") == 0
+    # Writer ist danach wieder benutzbar
+    await test_db.execute("INSERT INTO settings (key, value) VALUES ('rb', 'y')")
+    assert await test_db.fetch_val("SELECT value FROM settings WHERE key = 'rb'") == "y"
+
+
+async def test_nested_transaction_joins_outer(test_db):
+    async with test_db.transaction():
+        await test_db.execute("INSERT INTO settings (key, value) VALUES ('n1', '1')")
+        async with test_db.transaction():
+            await test_db.execute("INSERT INTO settings (key, value) VALUES ('n2', '2')")
+    assert await test_db.fetch_val(
+        "SELECT COUNT(*) FROM settings WHERE key IN ('n1', 'n2')") == 2
+
+
+async def test_foreign_execute_waits_for_open_transaction(test_db):
+    """Ein execute() aus einem anderen Task darf die offene Transaktion nicht
+    mit-committen – es wartet, bis die Transaktion fertig ist."""
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def _txn():
+        with pytest.raises(RuntimeError):
+            async with test_db.transaction():
+                await test_db.execute("INSERT INTO settings (key, value) VALUES ('tx', '1')")
+                started.set()
+                await release.wait()
+                raise RuntimeError("rollback")
+
+    async def _foreign():
+        await started.wait()
+        await test_db.execute("INSERT INTO settings (key, value) VALUES ('fx', '1')")
+
+    t1 = asyncio.create_task(_txn())
+    t2 = asyncio.create_task(_foreign())
+    await started.wait()
+    await asyncio.sleep(0.05)
+    assert not t2.done(), "fremdes execute() muss auf die Transaktion warten"
+    release.set()
+    await asyncio.gather(t1, t2)
+    # tx zurückgerollt, fx geschrieben
+    assert await test_db.fetch_val("SELECT COUNT(*) FROM settings WHERE key = 'tx'") == 0
+    assert await test_db.fetch_val("SELECT COUNT(*) FROM settings WHERE key = 'fx'") == 1
+
+
+async def test_child_task_does_not_join_transaction(test_db):
+    """Ein im Block gestarteter Task ist NICHT Teil der Transaktion: er wartet
+    auf den Lock und sein Write überlebt den Rollback der Transaktion."""
+    child = None
+    with pytest.raises(RuntimeError):
+        async with test_db.transaction():
+            await test_db.execute("INSERT INTO settings (key, value) VALUES ('own', '1')")
+            child = asyncio.create_task(test_db.execute(
+                "INSERT INTO settings (key, value) VALUES ('child', '1')"))
+            await asyncio.sleep(0.05)
+            assert not child.done(), "Kind-Task muss auf den Write-Lock warten"
+            raise RuntimeError("rollback")
+    await child
+    assert await test_db.fetch_val("SELECT COUNT(*) FROM settings WHERE key = 'own'") == 0
+    assert await test_db.fetch_val("SELECT COUNT(*) FROM settings WHERE key = 'child'") == 1
+
+
+async def test_execute_many_returns_rowcount(test_db):
+    n = await test_db.execute_many(
+        "INSERT INTO settings (key, value) VALUES (?, ?)",
+        [(f"em{i}", str(i)) for i in range(50)],
+    )
+    assert n == 50
+    assert await test_db.execute_many("INSERT INTO settings (key, value) VALUES (?, ?)", []) == 0
+
+
+async def test_write_batch_flushes_on_statement_limit(test_db):
+    async with test_db.write_batch(max_statements=10, max_delay_ms=60000) as batch:
+        for i in range(25):
+            await batch.execute("INSERT INTO settings (key, value) VALUES (?, ?)", (f"wb{i}", "x"))
+        # 2 volle Flushes à 10, Rest (5) noch gepuffert
+        assert batch.flushes == 2
+        assert await test_db.fetch_val(
+            "SELECT COUNT(*) FROM settings WHERE key LIKE 'wb%'") == 20
+    assert await test_db.fetch_val(
+        "SELECT COUNT(*) FROM settings WHERE key LIKE 'wb%'") == 25
+
+
+async def test_write_batch_flushes_after_delay(test_db):
+    async with test_db.write_batch(max_statements=1000, max_delay_ms=30) as batch:
+        await batch.execute("INSERT INTO settings (key, value) VALUES ('wd', 'x')")
+        await asyncio.sleep(0.1)  # Schreiber "wartet auf HTTP"
+        assert await test_db.fetch_val("SELECT COUNT(*) FROM settings WHERE key = 'wd'") == 1
+        assert batch.flushes == 1
+
+
+async def test_save_entries_batch_single_transaction(test_db, monkeypatch):
+    from app.services import channel_scanner
+
+    entries = [{"video_id": f"se{i}", "title": f"T{i}"} for i in range(30)]
+    commits = 0
+    orig_commit = test_db.conn.commit
+
+    async def _counting_commit():
+        nonlocal commits
+        commits += 1
+        await orig_commit()
+
+    monkeypatch.setattr(test_db.conn, "commit", _counting_commit)
+    ins, upd, errs = await channel_scanner._save_entries_batch(entries, "UC" + "x" * 22)
+    assert (ins, upd, errs) == (30, 0, 0)
+    assert commits == 1
+
+    commits = 0
+    ins, upd, errs = await channel_scanner._save_entries_batch(entries, "UC" + "x" * 22)
+    assert (ins, upd, errs) == (0, 30, 0)
+    assert commits == 1
+
+
+async def test_save_entries_batch_upsert_semantics(test_db):
+    from app.services import channel_scanner
+
+    cid = "UC" + "u" * 22
+    await channel_scanner._save_entries_batch([
+        {"video_id": "up1", "title": "Alt", "description": "Beschreibung", "video_type": "short",
+         "keywords": ["a"], "duration": 30, "published": "2024-01-01T00:00:00+00:00"},
+    ], cid)
+    await test_db.execute("UPDATE rss_entries SET status = 'dismissed' WHERE video_id = 'up1'")
+
+    # Re-Scan: leere/fehlende Werte überschreiben nichts, Duplikat im Batch = Update,
+    # Eintrag ohne video_id = Fehler
+    ins, upd, errs = await channel_scanner._save_entries_batch([
+        {"video_id": "up1", "title": None, "description": "", "video_type": None,
+         "keywords": [], "duration": None, "views": 99},
+        {"video_id": "up2", "title": "Neu"},
+        {"video_id": "up2", "title": "Neu 2"},
+        {"title": "kaputt"},
+    ], cid)
+    assert (ins, upd, errs) == (1, 2, 1)
+    row = dict(await test_db.fetch_one("SELECT * FROM rss_entries WHERE video_id = 'up1'"))
+    assert (row["title"], row["description"], row["video_type"], row["keywords"]) == \
+        ("Alt", "Beschreibung", "short", '["a"]')
+    assert (row["duration"], row["views"], row["status"]) == (30, 99, "dismissed")
+    assert row["published"] == "2024-01-01T00:00:00+00:00"
+    assert await test_db.fetch_val(
+        "SELECT title || '/' || video_type FROM rss_entries WHERE video_id = 'up2'") == "Neu 2/video"
@@ -0,0 +1,184 @@
+"""
+Parallele Download-Lanes (download_lanes.py + DownloadService).
+
+Kontrakt:
+- Audio-Jobs laufen in eigener Lane neben einem langen Video-Download
+- Parallelität je Lane aus den Settings; kein Job wird doppelt gezogen
+- Rate-Limit erhöht nur den Cooldown der betroffenen Lane, Bot-Erkennung alle
+- Metriken je Lane (/api/downloads/lanes), yt-dlp-Retry-Hook findet den richtigen Job
+Der pytubefix/yt-dlp-Layer ist durch einen lokalen Fake ersetzt (_resolve/_download_inner).
+"""
+import asyncio
+
+import pytest
+
+from app.services.download_lanes import build_lanes, lane_for
+from app.services.download_service import download_service
+from app.services.job_service import job_service
+from app.services.rate_limiter import rate_limiter
+
+
+class FakeYouTube:
+    """Ersetzt Auflösen + Download: Video-Jobs warten auf release, Audio sofort."""
+
+    def __init__(self, tmp_path):
+        self.tmp = tmp_path
+        self.release = asyncio.Event()
+        self.running = 0
+        self.peak = {"video": 0, "audio": 0}
+        self._running_by_lane = {"video": 0, "audio": 0}
+        self.fail_with: str | None = None
+
+    async def resolve(self, url):
+        vid = url.rsplit("v=", 1)[-1]
+        return {"title": f"Titel {vid}", "channel_name": "Kanal", "channel_id": "UCfake",
+                "description": "", "duration": 60, "upload_date": None, "view_count": 1,
+                "tags": [], "thumbnail_url": None, "stream_count": 1, "chapters": [],
+                "video_type": "video"}
+
+    async def download(self, job_id, vid, url, opts, meta):
+        lane = lane_for(opts)
+        self._running_by_lane[lane] += 1
+        self.peak[lane] = max(self.peak[lane], self._running_by_lane[lane])
+        try:
+            if self.fail_with:
+                raise RuntimeError(self.fail_with)
+            if lane == "video":
+                await self.release.wait()
+            else:
+                await asyncio.sleep(0.02)
+            path = self.tmp / f"{vid}.mp4"
+            path.write_bytes(b"x" * 2048)
+            info = {"type": "audio" if lane == "audio" else "video", "itag": 18,
+                    "mime": "video/mp4", "quality": "720p", "codec": "avc1"}
+            return path, 2048, info, False
+        finally:
+            self._running_by_lane[lane] -= 1
+
+
+@pytest.fixture
+async def fake_yt(test_db, tmp_path, monkeypatch):
+    fake = FakeYouTube(tmp_path)
+    monkeypatch.setattr(download_service, "_resolve", fake.resolve)
+    monkeypatch.setattr(download_service, "_download_inner", fake.download)
+    monkeypatch.setattr(download_service, "_lanes", build_lanes())
+    monkeypatch.setattr(rate_limiter, "disabled", True)
+    from app.services import ryd_service
+
+    async def _no_votes(vid):
+        return None
+
+    monkeypatch.setattr(ryd_service, "fetch_votes", _no_votes)
+    return fake
+
+
+@pytest.fixture
+async def lane_worker(fake_yt, test_db, set_setting, monkeypatch):
+    await set_setting("download.cooldown_base_s", "0")
+    await set_setting("download.concurrent", "1")
+    await set_setting("download.audio_concurrent", "2")
+    monkeypatch.setattr(job_service, "_callbacks", [download_service._on_job_event])
+    monkeypatch.setattr(job_service, "_paused", False)
+    task = asyncio.create_task(download_service._queue_loop())
+    await asyncio.sleep(0.05)
+    yield fake_yt
+    fake_yt.release.set()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def _job(vid, audio_only=False):
+    return await job_service.create(
+        job_type="download", title=vid,
+        metadata={"video_id": vid, "url": f"https://www.youtube.com/watch?v={vid}",
+                  "download_options": {"audio_only": audio_only, "download_thumbnail": False},
+                  "retry_count": 0, "max_retries": 3})
+
+
+async def _status(job):
+    return (await job_service.get(job["id"]))["status"]
+
+
+async def _until(cond, timeout=3.0):
+    for _ in range(int(timeout / 0.01)):
+        if await cond():
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+async def test_audio_lane_runs_beside_long_video(lane_worker, async_client_factory):
+    video = await _job("vidAAAAAAAA")
+    assert await _until(lambda: _async(download_service._lanes["video"].active))
+    audios = [await _job(f"aud{i}AAAAAAA", audio_only=True) for i in range(4)]
+
+    async def _audios_done():
+        return all([await _status(a) == "done" for a in audios])
+
+    assert await _until(_audios_done)
+    assert await _status(video) == "active"  # Video hängt noch, Audio ist durch
+    assert lane_worker.peak["audio"] == 2
+
+    lane_worker.release.set()
+
+    async def _video_done():
+        return await _status(video) == "done"
+
+    assert await _until(_video_done)
+
+    from app.routers import downloads
+    async with await async_client_factory(downloads.router) as client:
+        lanes = {l["name"]: l for l in (await client.get("/api/downloads/lanes")).json()["lanes"]}
+    assert lanes["audio"]["done"] == 4 and lanes["audio"]["concurrency"] == 2
+    assert lanes["video"]["done"] == 1 and lanes["video"]["started"] == 1
+    assert lanes["audio"]["done_last_hour"] == 4 and lanes["audio"]["bytes_done"] == 4 * 2048
+
+
+async def _async(value):
+    return bool(value)
+
+
+async def test_concurrent_slots_never_share_a_job(lane_worker):
+    jobs = [await _job(f"par{i}AAAAAAA", audio_only=True) for i in range(6)]
+
+    async def _all_done():
+        return all([await _status(j) == "done" for j in jobs])
+
+    assert await _until(_all_done)
+    assert download_service._lanes["audio"].started == 6
+
+
+async def test_rate_limit_backs_off_only_its_lane(fake_yt, test_db):
+    download_service._cooldown_base = 30
+    for lane in download_service._lanes.values():
+        lane.cooldown = lane.base_cooldown(30)
+    fake_yt.fail_with = "HTTP Error 429: Too Many Requests"
+
+    job = await _job("rlAAAAAAAAA", audio_only=True)
+    await job_service.start(job["id"], exclusive=False)
+    item = await test_db.fetch_one("SELECT * FROM jobs WHERE id = ?", (job["id"],))
+    assert await download_service._process(dict(item)) is None
+    assert await _status(job) == "retry_wait"
+    assert download_service._lanes["audio"].cooldown == 30  # 15 → 30
+    assert download_service._lanes["video"].cooldown == 30  # unverändert
+
+    fake_yt.fail_with = "HTTP Error 403: detected as a bot"
+    job = await _job("botAAAAAAAA", audio_only=True)
+    await job_service.start(job["id"], exclusive=False)
+    item = await test_db.fetch_one("SELECT * FROM jobs WHERE id = ?", (job["id"],))
+    await download_service._process(dict(item))
+    assert all(l.cooldown >= 3600 for l in download_service._lanes.values())
+
+
+async def test_retry_hook_targets_running_job(monkeypatch):
+    seen = []
+
+    async def _update(job_id, msg):
+        seen.append((job_id, msg))
+
+    monkeypatch.setattr(download_service, "_update_job_retry_status", _update)
+    monkeypatch.setattr(download_service, "_running", {"aaaaaaaaaaa": 1, "bbbbbbbbbbb": 2})
+    monkeypatch.setattr(download_service, "_loop", asyncio.get_running_loop())
+    download_service._on_yt_retry("bbbbbbbbbbb/itag=18", 2, 4, "TIMEOUT", "Versuch 2/4")
+    await asyncio.sleep(0.01)
+    assert seen == [(2, "Versuch 2/4")]
@@ -0,0 +1,169 @@
+"""
+Download-Pipeline (DownloadService._download_inner + Lane-Slots).
+
+Kontrakt:
+- adaptive Downloads: Video- und Audio-Spur laden gleichzeitig
+- nach der Netzwerk-Phase ist der Lane-Slot frei: Job N+1 lädt, während
+  Job N noch merged/finalisiert (Lane-Metrik "finishing")
+- Stufen-Zeiten je Job in jobs.metadata.stage_timings, Mittelwerte je Lane
+"""
+import asyncio
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.services import download_service as dl_mod
+from app.services.download_lanes import build_lanes
+from app.services.download_service import download_service
+from app.services.job_service import job_service
+from app.services.rate_limiter import rate_limiter
+
+
+class FakeStream:
+    def __init__(self, itag, kind, barrier):
+        self.itag, self.type, self.barrier = itag, kind, barrier
+        self.subtype = "mp4" if kind == "video" else "m4a"
+        self.mime_type = f"{kind}/{self.subtype}"
+        self.codecs = ["avc1" if kind == "video" else "mp4a"]
+        self.resolution = "1080p" if kind == "video" else None
+        self.abr = "128kbps" if kind == "audio" else None
+        self.is_progressive = False
+        self.filesize = 4096
+        self.on_progress = None
+
+    def download(self, output_path, filename):
+        # Beide Streams müssen gleichzeitig laufen, sonst BrokenBarrierError
+        self.barrier.wait(timeout=2)
+        path = Path(output_path) / filename
+        path.write_bytes(b"x" * self.filesize)
+        self.on_progress(self, b"", 0)
+        return str(path)
+
+
+class FakeStreams:
+    def __init__(self, streams):
+        self._by_itag = {s.itag: s for s in streams}
+
+    def get_by_itag(self, itag):
+        return self._by_itag.get(itag)
+
+
+async def test_video_and_audio_download_concurrently(test_db, tmp_path, monkeypatch):
+    barrier = threading.Barrier(2)
+    streams = [FakeStream(137, "video", barrier), FakeStream(140, "audio", barrier)]
+
+    def fake_youtube(url, on_progress_callback=None):
+        for s in streams:
+            s.on_progress = on_progress_callback
+        return type("YT", (), {"streams": FakeStreams(streams)})()
+
+    async def fake_merge(vdir, vpath, apath, duration=0, job_id=0, vid=""):
+        out = vdir / "video.mp4"
+        out.write_bytes(Path(vpath).read_bytes() + Path(apath).read_bytes())
+        return str(out)
+
+    monkeypatch.setattr(dl_mod, "make_youtube", fake_youtube)
+    monkeypatch.setattr(dl_mod, "VIDEOS_DIR", tmp_path)
+    monkeypatch.setattr(download_service, "_ffmpeg_merge", fake_merge)
+    monkeypatch.setattr(download_service, "_timings", {7: {}})
+
+    final, size, info, merged = await download_service._download_inner(
+        7, "pipeAAAAAAA", "https://www.youtube.com/watch?v=pipeAAAAAAA",
+        {"itag": 137, "audio_itag": 140}, {"duration": 60})
+    assert merged and size == 8192 and info["itag"] == 137
+    timings = download_service._timings[7]
+    assert {"download", "download_video", "download_audio", "merge"} <= set(timings)
+
+
+@pytest.fixture
+async def pipeline_worker(test_db, tmp_path, set_setting, monkeypatch):
+    """Lane-Worker mit Fake-Download: Netzwerk-Phase, dann Merge bis release."""
+    state = {"fetching": [], "merge_release": asyncio.Event()}
+
+    async def resolve(url):
+        vid = url.rsplit("v=", 1)[-1]
+        return {"title": f"Titel {vid}", "channel_name": "Kanal", "channel_id": "UCfake",
+                "description": "", "duration": 60, "upload_date": None, "view_count": 1,
+                "tags": [], "thumbnail_url": None, "stream_count": 2, "chapters": [],
+                "video_type": "video"}
+
+    async def download(job_id, vid, url, opts, meta):
+        state["fetching"].append(vid)
+        await asyncio.sleep(0.02)
+        await download_service._release_network(job_id)
+        with download_service._stage_timer(job_id, "merge"):
+            await state["merge_release"].wait()
+        path = tmp_path / f"{vid}.mp4"
+        path.write_bytes(b"x" * 1024)
+        return path, 1024, {"type": "video", "itag": 137, "mime": "video/mp4",
+                            "quality": "1080p", "codec": "avc1"}, True
+
+    monkeypatch.setattr(download_service, "_resolve", resolve)
+    monkeypatch.setattr(download_service, "_download_inner", download)
+    monkeypatch.setattr(download_service, "_lanes", build_lanes())
+    monkeypatch.setattr(rate_limiter, "disabled", True)
+    from app.services import ryd_service
+
+    async def _no_votes(vid):
+        return None
+
+    monkeypatch.setattr(ryd_service, "fetch_votes", _no_votes)
+    await set_setting("download.cooldown_base_s", "0")
+    await set_setting("download.concurrent", "1")
+    monkeypatch.setattr(job_service, "_callbacks", [download_service._on_job_event])
+    monkeypatch.setattr(job_service, "_paused", False)
+    task = asyncio.create_task(download_service._queue_loop())
+    await asyncio.sleep(0.05)
+    yield state
+    state["merge_release"].set()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def _job(vid):
+    return await job_service.create(
+        job_type="download", title=vid,
+        metadata={"video_id": vid, "url": f"https://www.youtube.com/watch?v={vid}",
+                  "download_options": {"download_thumbnail": False},
+                  "retry_count": 0, "max_retries": 3})
+
+
+async def _until(cond, timeout=3.0):
+    for _ in range(int(timeout / 0.01)):
+        if await cond():
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+async def test_next_job_fetches_while_previous_merges(pipeline_worker, test_db):
+    jobs = [await _job(f"pip{i}AAAAAAA") for i in range(3)]
+    lane = download_service._lanes["video"]
+
+    async def _two_finishing():
+        return len(lane.finishing) == dl_mod.POST_PROCESS_CONCURRENCY
+
+    # Slot (Parallelität 1) lädt weiter, während zwei Jobs im Merge hängen;
+    # der dritte wartet mit belegtem Slot auf einen freien Post-Slot
+    assert await _until(_two_finishing)
+    assert await _until(lambda: _true(len(pipeline_worker["fetching"]) == 3))
+    assert len(lane.active) == 3 and lane.snapshot(0)["finishing"] == 2
+
+    pipeline_worker["merge_release"].set()
+
+    async def _all_done():
+        return all([(await job_service.get(j["id"]))["status"] == "done" for j in jobs])
+
+    assert await _until(_all_done)
+    for j in jobs:
+        raw = await test_db.fetch_val("SELECT metadata FROM jobs WHERE id = ?", (j["id"],))
+        timings = json.loads(raw)["stage_timings"]
+        assert {"resolve", "post_wait", "merge", "finalize", "total"} <= set(timings)
+    snap = lane.snapshot(0)
+    assert snap["finishing"] == 0 and snap["avg_stage_seconds"]["merge"] > 0
+
+
+async def _true(value):
+    return value
@@ -0,0 +1,123 @@
+"""
+Ereignisgesteuerter Download-Queue-Worker (Schema v35: jobs.retry_after).
+
+Kontrakt:
+- retry_after liegt in einer indizierten Spalte, nicht mehr in metadata
+- fällige retry_wait-Jobs gehen zurück auf queued, retry_count bleibt
+- Worker wacht bei neuem Download sofort auf und fragt im Leerlauf die DB nicht ab
+- aktiver System-Job blockiert; sein Ende weckt den Worker
+"""
+import asyncio
+import json
+
+import pytest
+
+from app.services.download_service import download_service
+from app.services.job_service import job_service
+from app.utils.file_utils import future_sqlite, past_sqlite
+
+
+async def _download_job(title="dl"):
+    return await job_service.create(
+        job_type="download", title=title,
+        metadata={"video_id": title, "retry_count": 0, "max_retries": 3})
+
+
+async def test_migration_moves_retry_after_to_column(test_db):
+    await test_db.execute(
+        "INSERT INTO jobs (type, title, status, metadata) VALUES ('download', 'alt', 'retry_wait', ?)",
+        (json.dumps({"video_id": "alt", "retry_after": "2030-01-01 10:00:00"}),))
+    await test_db.execute("DELETE FROM schema_version WHERE version > 34")
+    await test_db._init_schema()
+    row = await test_db.fetch_one("SELECT retry_after, metadata FROM jobs WHERE title = 'alt'")
+    assert row["retry_after"] == "2030-01-01 10:00:00"
+    assert json.loads(row["metadata"]) == {"video_id": "alt"}
+
+
+async def test_promote_due_retries(test_db):
+    due = await _download_job("due")
+    later = await _download_job("later")
+    await job_service.retry_wait(due["id"], "x", past_sqlite(seconds=5), retry_count=2)
+    await job_service.retry_wait(later["id"], "x", future_sqlite(minutes=10), retry_count=1)
+    assert "retry_after" not in (await job_service.get(due["id"]))["metadata"]
+
+    next_due = await download_service._promote_due_retries()
+    job = await job_service.get(due["id"])
+    assert job["status"] == "queued" and job["retry_after"] is None
+    assert job["metadata"]["retry_count"] == 2
+    assert (await job_service.get(later["id"]))["status"] == "retry_wait"
+    assert next_due == (await job_service.get(later["id"]))["retry_after"]
+
+    plan = await test_db.fetch_all(
+        "EXPLAIN QUERY PLAN SELECT id FROM jobs "
+        "WHERE type='download' AND status='retry_wait' AND retry_after <= ?", ("x",))
+    assert any("idx_jobs_retry_due" in r["detail"] for r in plan)
+
+
+@pytest.fixture
+async def worker(test_db, monkeypatch):
+    """_queue_loop mit Fake-_process, ohne Cooldown, mit job_service-Listener."""
+    await test_db.execute(
+        "INSERT OR REPLACE INTO settings (key, value) VALUES ('download.cooldown_base_s', '0')")
+    processed = []
+
+    async def _fake_process(item, lane=None):
+        processed.append(item["id"])
+        await job_service.complete(item["id"])
+
+    monkeypatch.setattr(download_service, "_process", _fake_process)
+    monkeypatch.setattr(job_service, "_callbacks", [download_service._on_job_event])
+    monkeypatch.setattr(job_service, "_paused", False)
+    task = asyncio.create_task(download_service._queue_loop())
+    await asyncio.sleep(0.05)
+    yield processed
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def _until(cond, timeout=1.0):
+    for _ in range(int(timeout / 0.01)):
+        if cond():
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+async def test_worker_wakes_on_new_job_and_idles_quietly(test_db, worker, monkeypatch):
+    calls = 0
+    orig = test_db.fetch_one
+
+    async def _counting(*a, **kw):
+        nonlocal calls
+        calls += 1
+        return await orig(*a, **kw)
+
+    monkeypatch.setattr(test_db, "fetch_one", _counting)
+    await asyncio.sleep(0.3)
+    assert calls == 0  # Leerlauf: kein Polling
+
+    job = await _download_job()
+    assert await _until(lambda: job["id"] in worker)
+
+
+async def test_system_job_blocks_until_done(test_db, worker):
+    scan = await job_service.create(job_type="channel_scan", title="scan")
+    await job_service.start(scan["id"], exclusive=False)
+    job = await _download_job()
+    await asyncio.sleep(0.2)
+    assert worker == []
+    await job_service.complete(scan["id"])
+    assert await _until(lambda: job["id"] in worker)
+
+
+async def test_progress_updates_do_not_wake(test_db, monkeypatch):
+    wake = asyncio.Event()
+    monkeypatch.setattr(download_service, "_wake_events", {wake})
+    await download_service._on_job_event(
+        {"type": "job_update", "job": {"type": "download", "status": "active"}})
+    await download_service._on_job_event(
+        {"type": "job_update", "job": {"type": "rss_cycle", "status": "active"}})
+    assert not wake.is_set()
+    await download_service._on_job_event(
+        {"type": "job_update", "job": {"id": 0, "type": "queue_resumed", "status": "resumed"}})
+    assert wake.is_set()
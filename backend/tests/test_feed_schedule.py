@@ -0,0 +1,159 @@
+"""
+Adaptive Feed-Planung (feed_schedule.py + RSSService-Heap/next_check_at).
+
+Kontrakt:
+- Kadenz = EWMA der Upload-Abstände + Upload-Uhrzeit; ältere Uploads ändern nichts
+- bekannte Kadenz: kurz nach der üblichen Upload-Zeit prüfen, häufig postende
+  Kanäle oft, ruhende selten (max_interval); unbekannt → Basis/verdoppeln
+- je neuem Video genau ein Upload-Zeitpunkt (Atom-Zeit vor yt-dlp-Datum),
+  bekannte Videos und undatierte Kandidaten (Poll-Zeit) zählen nicht
+- Tick wählt fällige Abos über den Heap (NULL = sofort), schreibt
+  next_check_at + upload_cadence; Intervall-Änderungen setzen next_check_at neu
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.feed_schedule import Cadence, next_interval, parse_published
+from app.services.rate_limiter import rate_limiter
+from app.services.rss_service import FeedPoll, rss_service
+
+HOUR, DAY = 3600, 86400
+BASE, MAX = 1800, 7 * DAY
+
+
+def _daily_at_15(days: int) -> tuple[Cadence, float]:
+    last = datetime(2026, 10, 1, 15, 0, tzinfo=timezone.utc).timestamp()
+    cadence = Cadence()
+    cadence.observe([(last - d * DAY, True) for d in range(days)])
+    return cadence, last
+
+
+def test_cadence_ewma_and_time_of_day():
+    cadence, last = _daily_at_15(10)
+    assert cadence.known and cadence.samples == 9 and cadence.gap == pytest.approx(DAY)
+    assert cadence.tod_seconds == pytest.approx(15 * HOUR, abs=1)
+    assert cadence.tod_strength == pytest.approx(1.0)
+    assert not cadence.observe([(last - 5 * DAY, True)])  # älter → ignoriert
+
+    restored = Cadence.from_json(cadence.to_json())
+    assert restored.samples == 9 and restored.gap == pytest.approx(DAY)
+    assert Cadence.from_json("kaputt").samples == 0
+
+    assert parse_published("2026-10-01T00:00:00+00:00")[1] is False
+    ts, has_time = parse_published("2026-10-01T15:00:00+00:00")
+    assert has_time and ts == last
+
+
+def test_next_interval_follows_cadence():
+    # täglich 15:00 UTC, jetzt 16:00 → morgen kurz nach 15:00 (+ Slack)
+    cadence, last = _daily_at_15(10)
+    assert next_interval(cadence, last + HOUR, BASE, MAX, BASE, 1) == pytest.approx(23.5 * HOUR, abs=60)
+    # zwei Stunden überfällig → bald wieder, aber nicht seltener als die Kadenz
+    overdue = next_interval(cadence, last + 26 * HOUR, BASE, MAX, BASE, 0)
+    assert BASE <= overdue < 2 * BASE
+
+    # alle 2 h ein Upload → knapp vor dem nächsten erwarteten prüfen
+    busy = Cadence()
+    busy.observe([(last - i * 2 * HOUR, False) for i in range(6)])
+    assert next_interval(busy, last + 600, BASE, MAX, BASE, 1) == pytest.approx(98 * 60, abs=60)
+
+    # ruhender Kanal (alle 30 Tage, letzter vor 120 Tagen) → max_interval
+    dormant = Cadence()
+    dormant.observe([(last - i * 30 * DAY, False) for i in range(5)])
+    assert next_interval(dormant, last + 120 * DAY, BASE, MAX, BASE, 0) == MAX
+
+    # unbekannt → bisheriges Verhalten
+    assert next_interval(Cadence(), last, BASE, MAX, 4 * HOUR, 0) == 8 * HOUR
+    assert next_interval(Cadence(), last, BASE, MAX, 4 * HOUR, 2) == BASE
+
+
+@pytest.fixture
+async def subs(test_db, set_setting, monkeypatch):
+    """Drei Abos: überfällig, erst in 1 h fällig, noch nie geprüft."""
+    from app.utils import pytube_client
+
+    calls = []
+    dates = [(datetime.now(timezone.utc) - timedelta(days=d)).strftime("%Y%m%d") for d in range(4)]
+
+    def fake_make_channel(url, max_videos=15):
+        cid = url.split("/channel/")[1].split("/")[0]
+        calls.append(cid)
+        return SimpleNamespace(channel_name=cid, videos=[
+            SimpleNamespace(video_id=f"{cid[-3:]}v{i:07d}", title="V", thumbnail_url=None,
+                            publish_date=d, length=300)
+            for i, d in enumerate(dates)])
+
+    monkeypatch.setattr(pytube_client, "make_channel", fake_make_channel)
+    monkeypatch.setitem(rate_limiter.intervals, "rss", 0.001)
+    monkeypatch.setattr(rate_limiter, "_buckets", {})
+    await set_setting("rss.feed_probe", "false")
+    ids = {}
+    for cid, offset in (("UC" + "a" * 22, "-5 minutes"), ("UC" + "b" * 22, "+1 hour"),
+                        ("UC" + "c" * 22, None)):
+        next_at = f"datetime('now', 'localtime', '{offset}')" if offset else "NULL"
+        cursor = await test_db.execute(
+            f"""INSERT INTO subscriptions (channel_id, channel_name, check_interval, last_checked,
+                                           next_check_at)
+                VALUES (?, ?, 1800, datetime('now', 'localtime', '-1 hour'), {next_at})""",
+            (cid, cid))
+        ids[cid] = cursor.lastrowid
+    yield ids, calls
+    if rss_service._fetch_pool is not None:
+        rss_service._fetch_pool.shutdown(wait=True)
+        rss_service._fetch_pool = None
+
+
+async def test_tick_uses_heap_and_persists_schedule(subs, test_db):
+    ids, calls = subs
+    due_a, later_b, new_c = ids
+    result = await rss_service.tick(max_feeds=10)
+    assert result["checked"] == 2 and sorted(calls) == sorted([due_a, new_c])
+
+    row = await test_db.fetch_one(
+        "SELECT check_interval, next_check_at, upload_cadence FROM subscriptions WHERE channel_id = ?",
+        (due_a,))
+    cadence = Cadence.from_json(row["upload_cadence"])
+    assert cadence.samples == 3 and cadence.gap == pytest.approx(DAY)
+    expected = next_interval(cadence, time.time(), 1800, MAX, 1800, 4)
+    assert row["check_interval"] == pytest.approx(expected, abs=5)
+    next_at = datetime.strptime(row["next_check_at"], "%Y-%m-%d %H:%M:%S")
+    assert (next_at - datetime.now()).total_seconds() == pytest.approx(expected, abs=5)
+
+    # b ist als nächstes dran (in ~1 h), oder a/c falls deren Intervall kürzer ist
+    assert 0 < await rss_service._next_due_seconds() <= 3600
+    assert (await rss_service.tick(max_feeds=10))["status"] == "idle"
+
+    # Intervall-Änderung per API → Termin neu berechnet, Heap neu geladen
+    calls.clear()
+    await rss_service.update_subscription(ids[later_b], {"check_interval": 60})
+    result = await rss_service.tick(max_feeds=10)
+    assert result["checked"] == 1 and calls == [later_b]
+
+
+async def test_cadence_counts_each_new_video_once(test_db):
+    last = datetime(2026, 10, 10, 15, 0, tzinfo=timezone.utc).timestamp()
+    cid = "UC" + "d" * 22
+    await test_db.execute(
+        "INSERT INTO subscriptions (channel_id, channel_name, upload_cadence) VALUES (?, ?, ?)",
+        (cid, cid, Cadence(last=last).to_json()))
+    await test_db.execute(
+        "INSERT INTO rss_entries (video_id, channel_id, published) VALUES ('known000001', ?, ?)",
+        (cid, "2026-10-16T00:00:00+00:00"))
+    sub = dict(await test_db.fetch_one("SELECT * FROM subscriptions WHERE channel_id = ?", (cid,)))
+
+    exact = datetime(2026, 10, 17, 15, 0, tzinfo=timezone.utc).timestamp()
+    poll = FeedPoll(sub=sub, candidates=[
+        ("same0000001", "Neu", "2026-10-17T00:00:00+00:00", None, "video"),   # auch im Feed
+        ("known000001", "Alt", "2026-10-16T00:00:00+00:00", None, "video"),   # schon bekannt
+        ("nodate00001", "?", "2026-10-18 12:00:00", None, "video"),           # Poll-Zeit
+    ], feed_times={"same0000001": (exact, True),
+                   "known000001": (exact - DAY, True)}, undated={"nodate00001"})
+    await rss_service._store_polls([poll])
+
+    cadence = Cadence.from_json(await test_db.fetch_val(
+        "SELECT upload_cadence FROM subscriptions WHERE channel_id = ?", (cid,)))
+    assert cadence.samples == 1 and cadence.gap == pytest.approx(7 * DAY)
+    assert cadence.last == exact and cadence.tod_seconds == pytest.approx(15 * HOUR, abs=1)
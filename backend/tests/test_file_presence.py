@@ -0,0 +1,82 @@
+"""
+Datei-Existenz-Tracker (file_presence_service.py + System-Endpoints).
+
+Kontrakt:
+- fehlende Dateien → status='ghost', Ergebnis je Video in file_presence
+- stat() läuft im Thread-Pool (Batches), nicht im Event-Loop
+- jünger als max_age geprüfte Einträge werden übersprungen, außer der Pfad
+  hat sich geändert; max_age=0 prüft alles
+- /cleanup-ghosts prüft alles neu, summary() liefert den Stand ohne stat()
+"""
+import threading
+
+import pytest
+
+from app.routers.system import router as system_router
+from app.services import file_presence_service as presence_mod
+from app.services.file_presence_service import file_presence_service
+
+
+@pytest.fixture
+async def videos(test_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(presence_mod, "BATCH_SIZE", 4)
+    paths = {}
+    for i in range(10):
+        vid = f"pres{i:07d}"
+        path = tmp_path / f"{vid}.mp4"
+        path.write_bytes(b"x" * (i + 1))
+        paths[vid] = path
+        await test_db.execute(
+            "INSERT INTO videos (id, title, status, file_path) VALUES (?, ?, 'ready', ?)",
+            (vid, f"Video {i}", str(path)))
+    yield paths
+    file_presence_service.shutdown()
+
+
+async def test_missing_files_become_ghosts(videos, test_db, monkeypatch):
+    threads = set()
+    real = presence_mod._stat_batch
+
+    def spy(items):
+        threads.add(threading.current_thread().name)
+        return real(items)
+
+    monkeypatch.setattr(presence_mod, "_stat_batch", spy)
+    videos["pres0000003"].unlink()
+    videos["pres0000007"].unlink()
+
+    report = await file_presence_service.verify(max_age=0)
+    assert report.checked == 10 and report.present == 8
+    assert sorted(m["id"] for m in report.missing) == ["pres0000003", "pres0000007"]
+    assert all(t.startswith("file-presence") for t in threads) and len(threads) >= 1
+    assert await test_db.fetch_val("SELECT COUNT(*) FROM videos WHERE status = 'ghost'") == 2
+    row = await test_db.fetch_one("SELECT size, present FROM file_presence WHERE video_id = 'pres0000004'")
+    assert (row["size"], row["present"]) == (5, 1)
+
+
+async def test_recently_verified_are_skipped(videos, test_db, tmp_path):
+    await file_presence_service.verify(max_age=0)
+    report = await file_presence_service.verify()  # Setting: 6 h
+    assert report.checked == 0 and report.skipped == 10
+
+    moved = tmp_path / "neu.mp4"
+    videos["pres0000001"].rename(moved)
+    await test_db.execute("UPDATE videos SET file_path = ? WHERE id = 'pres0000001'", (str(moved),))
+    report = await file_presence_service.verify()
+    assert report.checked == 1 and not report.missing
+
+    presence = await file_presence_service.presence(["pres0000001", "pres0000002"])
+    assert presence["pres0000001"]["path"] == str(moved) and presence["pres0000002"]["size"] == 3
+
+
+async def test_cleanup_ghosts_endpoint_and_summary(videos, async_client_factory):
+    await file_presence_service.verify(max_age=0)
+    videos["pres0000009"].unlink()
+    async with await async_client_factory(system_router) as client:
+        data = (await client.post("/api/system/cleanup-ghosts")).json()
+    assert data["ghosts_found"] == 1 and data["entries"][0]["id"] == "pres0000009"
+    assert data["verify"]["checked"] == 10
+
+    summary = await file_presence_service.summary()
+    assert summary["tracked"] == 10 and summary["missing"] == 1
+    assert summary["bytes"] == sum(range(1, 10))
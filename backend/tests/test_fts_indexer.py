@@ -0,0 +1,157 @@
+"""
+Inkrementelle FTS-Pflege: Trigger → fts_queue → Batch-Indexer (Migration v34).
+
+Kontrakt:
+- Trigger reihen Insert/relevantes Update/Delete/Replace ein, irrelevante
+  Updates (play_count) nicht
+- drain(): ein Commit pro Chunk, description File-first, nicht-ready fliegt raus
+- was während eines Chunks neu eingereiht wird, geht nicht verloren
+- rebuild(): meldet Fortschritt, entfernt verwaiste Einträge; als Job über /api/admin
+"""
+import asyncio
+
+import pytest
+
+from app.services.fts_indexer import fts_indexer
+
+
+async def _queue(db):
+    rows = await db.fetch_all("SELECT video_rowid FROM fts_queue ORDER BY id")
+    return [r["video_rowid"] for r in rows]
+
+
+async def _rowid(db, vid):
+    return await db.fetch_val("SELECT rowid FROM videos WHERE id = ?", (vid,))
+
+
+async def _hits(db, term):
+    rows = await db.fetch_all(
+        "SELECT id FROM videos_fts WHERE videos_fts MATCH ? ORDER BY id", (f'"{term}"*',))
+    return [r["id"] for r in rows]
+
+
+async def test_triggers_fill_queue(test_db):
+    await test_db.execute("DELETE FROM fts_queue")
+    await test_db.execute("INSERT INTO videos (id, title, status) VALUES ('q1', 'A', 'pending')")
+    assert await _queue(test_db) == []  # nicht ready → nichts zu indizieren
+
+    await test_db.execute("UPDATE videos SET status = 'ready' WHERE id = 'q1'")
+    rid = await _rowid(test_db, "q1")
+    assert await _queue(test_db) == [rid]
+
+    await test_db.execute("UPDATE videos SET play_count = 5, title = 'A' WHERE id = 'q1'")
+    assert await _queue(test_db) == [rid]  # keine relevante Änderung
+
+    await test_db.execute("UPDATE videos SET notes = 'n' WHERE id = 'q1'")
+    await test_db.execute("DELETE FROM videos WHERE id = 'q1'")
+    assert await _queue(test_db) == [rid, rid, rid]
+
+
+async def test_replace_drops_old_rowid(test_db):
+    await test_db.execute("INSERT INTO videos (id, title, status) VALUES ('q2', 'Alttitel', 'ready')")
+    await fts_indexer.drain()
+    old = await _rowid(test_db, "q2")
+    await test_db.execute(
+        "INSERT OR REPLACE INTO videos (id, title, status) VALUES ('q2', 'Neutitel', 'ready')")
+    assert old in await _queue(test_db)
+    await fts_indexer.drain()
+    assert await _hits(test_db, "alttitel") == []
+    assert await _hits(test_db, "neutitel") == ["q2"]
+    assert await test_db.fetch_val("SELECT COUNT(*) FROM videos_fts WHERE id = 'q2'") == 1
+
+
+async def test_drain_commits_per_chunk_and_reads_files(test_db, tmp_path, monkeypatch):
+    from app.services import text_export as te
+    monkeypatch.setattr(te, "TEXTS_DIR", tmp_path)
+    monkeypatch.setattr(fts_indexer, "chunk_size", 10)
+
+    await test_db.execute_many(
+        "INSERT INTO videos (id, title, description, status) VALUES (?, ?, 'db-text', 'ready')",
+        [(f"d{i:02d}", f"T{i}") for i in range(25)],
+    )
+    (tmp_path / "d07").mkdir()
+    (tmp_path / "d07" / "description.txt").write_text("Dateitext Kolibri")
+
+    commits = 0
+    orig_commit = test_db.conn.commit
+
+    async def _counting_commit():
+        nonlocal commits
+        commits += 1
+        await orig_commit()
+
+    monkeypatch.setattr(test_db.conn, "commit", _counting_commit)
+    assert await fts_indexer.drain() == 25
+    assert commits == 3
+    assert await fts_indexer.pending() == 0
+    assert await _hits(test_db, "kolibri") == ["d07"]
+    assert len(await _hits(test_db, "db")) == 24
+
+    await test_db.execute("UPDATE videos SET status = 'ghost' WHERE id = 'd01'")
+    await fts_indexer.drain()
+    assert "d01" not in await _hits(test_db, "db")
+
+
+async def test_entries_queued_during_chunk_survive(test_db, monkeypatch):
+    await test_db.execute("INSERT INTO videos (id, title, status) VALUES ('r1', 'Eins', 'ready')")
+    orig = fts_indexer._read_descriptions
+
+    async def _slow_read(ids):
+        # Während der Chunk läuft, ändert jemand das Video erneut
+        await test_db.execute("UPDATE videos SET title = 'Zwei' WHERE id = 'r1'")
+        monkeypatch.setattr(fts_indexer, "_read_descriptions", orig)
+        return await orig(ids)
+
+    monkeypatch.setattr(fts_indexer, "_read_descriptions", _slow_read)
+    await fts_indexer.process_chunk()
+    assert await fts_indexer.pending() == 1
+    await fts_indexer.drain()
+    assert await _hits(test_db, "zwei") == ["r1"]
+
+
+async def test_rebuild_reports_progress_and_prunes(test_db):
+    await test_db.execute_many(
+        "INSERT INTO videos (id, title, status) VALUES (?, 'Rebuild', 'ready')",
+        [(f"rb{i}",) for i in range(5)],
+    )
+    await fts_indexer.drain()
+    # Verwaister Eintrag (z.B. aus altem Index)
+    await test_db.execute(
+        "INSERT INTO videos_fts(rowid, id, title, channel_name, description, tags, notes) "
+        "VALUES (99999, 'weg', 'Rebuild', '', '', '', '')")
+    seen = []
+
+    async def _progress(done, total):
+        seen.append((done, total))
+
+    stats = await fts_indexer.rebuild(_progress)
+    assert stats == {"rebuilt": 5, "fts_count": 5}
+    assert seen[-1] == (5, 5)
+    assert "weg" not in await _hits(test_db, "rebuild")
+
+
+async def test_rebuild_endpoint_runs_as_job(test_db, async_client_factory):
+    await test_db.execute("INSERT INTO videos (id, title, status) VALUES ('j1', 'Jobvideo', 'ready')")
+    from app.routers import admin
+    async with await async_client_factory(admin.router) as client:
+        r = await client.post("/api/admin/fts/rebuild")
+    body = r.json()
+    assert body["started"] is True
+    for _ in range(100):
+        job = await test_db.fetch_one("SELECT status, progress FROM jobs WHERE id = ?", (body["job_id"],))
+        if job["status"] == "done":
+            break
+        await asyncio.sleep(0.02)
+    assert job["status"] == "done" and job["progress"] == 1.0
+    assert await _hits(test_db, "jobvideo") == ["j1"]
+
+
+async def test_migration_v34_recreates_index(test_db):
+    await test_db.execute(
+        "INSERT INTO videos (id, title, description, status) VALUES ('m1', 'Migriert', 'x', 'ready')")
+    await test_db.execute("DELETE FROM fts_queue")
+    await test_db.execute("DELETE FROM schema_version WHERE version > 33")
+    await test_db._init_schema()
+    # Sofort suchbar (DB-description), Datei-Nachzug über die Queue
+    assert await _hits(test_db, "migriert") == ["m1"]
+    assert await _queue(test_db) == [await _rowid(test_db, "m1")]
@@ -0,0 +1,171 @@
+"""
+Volltextsuche über videos_fts für alle Library-Suchpfade.
+
+Kontrakt:
+- build_match_query: Wörter = Präfix, "…" = Phrase, Sonderzeichen neutralisiert
+- /api/search/local nutzt FTS5 auch mit source/scope-Filter, bm25: Titel vor Beschreibung;
+  noch nicht indizierte Videos (fts_queue) findet sie sofort per LIKE, ohne Dubletten
+- get_videos(search=), Watch-History, eigene Videos und /search/notes laufen über den Index
+- Videos außerhalb des Index (status != 'ready') per LIKE: get_videos(status=…),
+  Watch-History und /search/notes finden sie weiterhin
+- update_video / delete_video halten den Index aktuell (Trigger → Queue → Indexer)
+- gefilterte Suche liest videos per Rowid statt Tabellen-Scan
+"""
+import pytest
+
+from app.services.fts_indexer import fts_indexer
+from app.services.import_service import import_service
+from app.services.metadata_service import metadata_service
+from app.utils.fts_query import build_match_query
+
+
+async def _add(db, vid, title, description="", source="youtube", channel="Kanal", notes=None,
+               file_path=None):
+    await db.execute(
+        """INSERT INTO videos (id, title, channel_name, description, notes, source, status,
+                               is_archived, file_path, file_size)
+           VALUES (?, ?, ?, ?, ?, ?, 'ready', 0, ?, ?)""",
+        (vid, title, channel, description, notes, source, file_path, 100 if file_path else None),
+    )
+
+
+def test_build_match_query():
+    assert build_match_query("apfel kuchen") == '"apfel"* AND "kuchen"*'
+    assert build_match_query('"apfel kuchen" torte*') == '"apfel kuchen" AND "torte"*'
+    assert build_match_query('"apfel ku"*') == '"apfel ku"*'
+    # FTS-Operatoren/Sonderzeichen dürfen keinen Syntaxfehler erzeugen
+    assert build_match_query('a"b OR - NEAR(') == '"a""b"* AND "OR"* AND "NEAR("*'
+    assert build_match_query("- * ()") is None
+    assert build_match_query("x", ["notes"]) == '{notes} : ("x"*)'
+
+
+@pytest.fixture
+async def fts_library(test_db, monkeypatch):
+    from app.services import text_resolver
+
+    async def _desc(video_id):
+        row = await test_db.fetch_one("SELECT description FROM videos WHERE id = ?", (video_id,))
+        return row["description"] if row else None
+
+    monkeypatch.setattr(text_resolver, "get_description", _desc)
+    await _add(test_db, "f_desc", "Etwas anderes", description="Ein Rezept für Apfelstrudel")
+    await _add(test_db, "f_title", "Apfelstrudel backen", description="Oma erklärt")
+    await _add(test_db, "f_own", "Apfelstrudel privat", source="local",
+               file_path="/media/urlaub.mp4", notes="Zutaten: Zimt")
+    await _add(test_db, "f_other", "Schwarzwälder Torte")
+    await test_db.execute("INSERT INTO favorites (video_id) VALUES ('f_desc')")
+    await fts_indexer.drain()
+    return test_db
+
+
+async def test_search_local_ranks_and_filters(fts_library, async_client_factory):
+    from app.routers import search
+    async with await async_client_factory(search.router) as client:
+        body = (await client.get("/api/search/local", params={"q": "apfel"})).json()
+        assert body["engine"] == "fts5"
+        assert [v["id"] for v in body["videos"]][-1] == "f_desc"  # nur Beschreibung → hinten
+        assert body["total"] == 3
+
+        body = (await client.get("/api/search/local", params={"q": "apfel", "source": "youtube"})).json()
+        assert {v["id"] for v in body["videos"]} == {"f_desc", "f_title"}
+
+        body = (await client.get("/api/search/local", params={"q": "apfel", "scope": "favorites"})).json()
+        assert [v["id"] for v in body["videos"]] == ["f_desc"]
+
+        body = (await client.get("/api/search/local", params={"q": '"strudel backen"'})).json()
+        assert body["total"] == 0
+
+
+async def test_search_local_sees_unindexed_videos(fts_library, async_client_factory):
+    from app.routers import search
+    await _add(fts_library, "f_new", "Apfeltarte frisch geladen")
+    await fts_library.execute(
+        "UPDATE videos SET title = 'Apfelkompott' WHERE id = 'f_other'")
+    async with await async_client_factory(search.router) as client:
+        body = (await client.get("/api/search/local", params={"q": "apfel"})).json()
+        assert body["total"] == 5
+        assert {v["id"] for v in body["videos"][:2]} == {"f_new", "f_other"}
+        page2 = (await client.get("/api/search/local",
+                                  params={"q": "apfel", "per_page": 3, "page": 2})).json()
+        assert [v["id"] for v in page2["videos"]][-1] == "f_desc" and page2["total"] == 5
+
+        await fts_indexer.drain()
+        body = (await client.get("/api/search/local", params={"q": "apfel"})).json()
+    ids = [v["id"] for v in body["videos"]]
+    assert body["total"] == 5 and len(set(ids)) == 5
+
+
+async def test_library_history_own_and_notes_search(fts_library, async_client_factory):
+    res = await metadata_service.get_videos(search="apfel", channel_ids="Kanal")
+    assert res["total"] == 0
+    res = await metadata_service.get_videos(search="apfel")
+    assert {v["id"] for v in res["videos"]} == {"f_desc", "f_title", "f_own"}
+
+    await metadata_service.record_play("f_title")
+    await metadata_service.record_play("f_other")
+    hist = await metadata_service.get_watch_history(search="apfel")
+    assert [v["id"] for v in hist["videos"]] == ["f_title"]
+
+    own = await import_service.get_own_videos(search="apfel")
+    assert [v["id"] for v in own["videos"]] == ["f_own"]
+    own = await import_service.get_own_videos(search="urlaub")  # Dateiname, nicht im Index
+    assert [v["id"] for v in own["videos"]] == ["f_own"]
+
+    from app.routers import videos
+    async with await async_client_factory(videos.router) as client:
+        body = (await client.get("/api/videos/search/notes", params={"q": "zimt"})).json()
+        assert [r["id"] for r in body["results"]] == ["f_own"]
+        # Titel-Treffer zählen in der Notizsuche nicht
+        body = (await client.get("/api/videos/search/notes", params={"q": "apfel"})).json()
+        assert body["results"] == []
+
+
+async def test_non_ready_videos_found_via_like(fts_library):
+    await fts_library.execute(
+        "INSERT INTO videos (id, title, channel_name, status) VALUES ('f_pend', 'Apfelstrudel später', 'Kanal', 'pending')")
+    await fts_library.execute("INSERT INTO watch_history (video_id) VALUES ('f_pend')")
+    await fts_library.execute("INSERT INTO watch_history (video_id) VALUES ('f_title')")
+    await fts_indexer.drain()
+
+    pending = await metadata_service.get_videos(status="pending", search="strudel")
+    assert [v["id"] for v in pending["videos"]] == ["f_pend"]
+    assert (await metadata_service.get_videos(search="apfelstrudel"))["total"] == 3  # nur ready
+
+    history = await metadata_service.get_watch_history(search="apfelstrudel")
+    assert sorted(v["id"] for v in history["videos"]) == ["f_pend", "f_title"]
+
+
+async def test_notes_on_non_ready_videos_found(fts_library, async_client_factory):
+    await fts_library.execute(
+        "INSERT INTO videos (id, title, status, notes) VALUES "
+        "('f_ghost', 'Weg', 'ghost', 'Rezept mit Zimtsterne')")
+    await fts_indexer.drain()
+
+    from app.routers import videos
+    async with await async_client_factory(videos.router) as client:
+        body = (await client.get("/api/videos/search/notes", params={"q": "zimt"})).json()
+    assert sorted(r["id"] for r in body["results"]) == ["f_ghost", "f_own"]
+
+
+async def test_update_and_delete_keep_index_current(fts_library):
+    await metadata_service.update_video("f_other", {"title": "Käsekuchen klassisch"})
+    await fts_indexer.drain()
+    assert [v["id"] for v in (await metadata_service.get_videos(search="käsekuchen"))["videos"]] == ["f_other"]
+    assert (await metadata_service.get_videos(search="schwarzwälder"))["total"] == 0
+
+    await metadata_service.delete_video("f_other", ignore_for_future=False)
+    await fts_indexer.drain()
+    assert await fts_library.fetch_val(
+        "SELECT COUNT(*) FROM videos_fts WHERE videos_fts MATCH ?", ('"käsekuchen"*',)) == 0
+
+
+async def test_filtered_search_reads_videos_by_rowid(fts_library):
+    plan = await fts_library.fetch_all(
+        """EXPLAIN QUERY PLAN SELECT v.id FROM videos v
+           WHERE v.status = 'ready' AND v.channel_id = ?
+           AND v.rowid IN (SELECT rowid FROM videos_fts WHERE videos_fts MATCH ?)""",
+        ("UCx", '"apfel"*'),
+    )
+    details = [r["detail"] for r in plan]
+    assert any("VIRTUAL TABLE INDEX" in d for d in details)
+    assert "SCAN v" not in details, details
@@ -0,0 +1,193 @@
+"""
+HLS-Packaging on-demand (hls_service.py + Player-Endpoints).
+
+Kontrakt:
+- Master-Playlist kommt, sobald das erste Segment da ist (nicht erst am Ende)
+- Segmente, die noch entstehen, werden abgewartet; ungültige Namen → 404
+- fertig gepackte Renditions erscheinen in der Master-Playlist, fehlende
+  werden im Hintergrund angestoßen
+- Segment-Cache: LRU nach letztem Zugriff, laufende Jobs bleiben
+- parallele Requests starten EIN Packaging; geänderte Quelle → alte Segmente
+  werden nicht mehr ausgeliefert; fehlendes ffmpeg → 500 statt 404
+Ohne ffmpeg wird der Packager durch ein kleines Python-Skript ersetzt;
+der echte ffmpeg-Lauf ist ein eigener, überspringbarer Test.
+"""
+import asyncio
+import json
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from app.routers.player import router as player_router
+from app.services import hls_service as hls_mod
+from app.services.hls_service import (
+    build_master, ffmpeg_cmd, hls_service, pick_evictions, playlist_duration,
+)
+
+# Schreibt wie ffmpeg -hls_playlist_type event: Playlist wächst, ENDLIST am Schluss
+_FAKE_PACKAGER = r"""
+import sys, time, pathlib
+out = pathlib.Path(sys.argv[1])
+(out / "init.mp4").write_bytes(b"init")
+head = "#EXTM3U\n#EXT-X-VERSION:7\n#EXT-X-PLAYLIST-TYPE:EVENT\n#EXT-X-MAP:URI=\"init.mp4\"\n"
+body = ""
+for i in range(3):
+    (out / f"seg_{i:05d}.m4s").write_bytes(b"seg%d" % i)
+    body += f"#EXTINF:4.000000,\nseg_{i:05d}.m4s\n"
+    (out / "index.m3u8").write_text(head + body)
+    time.sleep(float(sys.argv[2]))
+(out / "index.m3u8").write_text(head + body + "#EXT-X-ENDLIST\n")
+"""
+
+
+@pytest.fixture
+async def hls_video(test_db, tmp_path, monkeypatch, set_setting):
+    monkeypatch.setattr(hls_mod, "HLS_DIR", tmp_path / "hls")
+    src = tmp_path / "video.mp4"
+    src.write_bytes(b"\0" * 400_000)
+    await test_db.execute(
+        "INSERT INTO videos (id, title, status, file_path, file_size, duration, storage_type) "
+        "VALUES ('hlsAAAAAAAA', 'HLS', 'ready', ?, 400000, 10, 'local')", (str(src),))
+    await set_setting("player.hls_renditions", "480p")
+    yield src
+    for task in list(hls_service._jobs.values()):
+        task.cancel()
+    await asyncio.gather(*hls_service._jobs.values(), return_exceptions=True)
+
+
+async def _idle():
+    for _ in range(200):
+        if not hls_service._jobs:
+            return
+        await asyncio.sleep(0.05)
+    raise AssertionError("Packaging hängt")
+
+
+@pytest.fixture
+def fake_packager(monkeypatch):
+    delay = {"s": 0.3}
+    monkeypatch.setattr(hls_mod, "ffmpeg_cmd", lambda src, out, rendition: [
+        sys.executable, "-c", _FAKE_PACKAGER, str(out), str(delay["s"])])
+    return delay
+
+
+def test_pure_helpers(tmp_path):
+    assert playlist_duration("#EXTINF:4.0,\na\n#EXTINF:2.5,\nb\n") == 6.5
+    master = build_master([("source", 3_000_000), ("480p", 1_200_000)])
+    assert master.splitlines()[3:] == ["#EXT-X-STREAM-INF:BANDWIDTH=3000000", "source/index.m3u8",
+                                       "#EXT-X-STREAM-INF:BANDWIDTH=1200000", "480p/index.m3u8"]
+    entries = [("a", 1.0, 50), ("b", 3.0, 50), ("c", 2.0, 50)]
+    assert pick_evictions(entries, 100) == ["a"]
+    assert pick_evictions(entries, 50, keep={"a"}) == ["c", "b"]
+    copy = ffmpeg_cmd(tmp_path / "v.mp4", tmp_path, "source")
+    assert copy[copy.index("-c") + 1] == "copy" and "fmp4" in copy
+    assert "libx264" in ffmpeg_cmd(tmp_path / "v.mp4", tmp_path, "480p")
+
+
+async def test_playback_starts_before_packaging_ends(hls_video, fake_packager, async_client_factory):
+    async with await async_client_factory(player_router) as client:
+        r = await client.get("/api/player/hlsAAAAAAAA/hls/master.m3u8")
+        assert r.status_code == 200
+        assert "source/index.m3u8" in r.text and "480p" not in r.text  # 480p läuft noch
+        assert "hlsAAAAAAAA/source" in hls_service._jobs  # Packaging noch nicht fertig
+
+        media = await client.get("/api/player/hlsAAAAAAAA/hls/source/index.m3u8")
+        assert "seg_00000.m4s" in media.text
+
+        # Segment 2 existiert noch nicht → Request wartet darauf
+        seg = await client.get("/api/player/hlsAAAAAAAA/hls/source/seg_00002.m4s")
+        assert seg.status_code == 200 and seg.content == b"seg2"
+
+        assert (await client.get("/api/player/hlsAAAAAAAA/hls/source/..%2Fvideo.mp4")).status_code == 404
+        assert (await client.get("/api/player/hlsAAAAAAAA/hls/9999p/index.m3u8")).status_code == 404
+
+        await _idle()
+        r = await client.get("/api/player/hlsAAAAAAAA/hls/master.m3u8")
+    assert "480p/index.m3u8" in r.text
+    assert "#EXT-X-ENDLIST" in (hls_mod.HLS_DIR / "hlsAAAAAAAA/source/index.m3u8").read_text()
+
+
+async def test_source_change_repackages(hls_video, fake_packager):
+    fake_packager["s"] = 0
+    out = await hls_service.ensure("hlsAAAAAAAA")
+    await _idle()
+    assert (out / "source.json").exists()
+    assert await hls_service.ensure("hlsAAAAAAAA") == out and not hls_service._jobs
+
+    hls_video.write_bytes(b"\0" * 500_000)  # neu heruntergeladen
+    await hls_service.ensure("hlsAAAAAAAA")
+    await _idle()
+    assert json.loads((out / "source.json").read_text())["size"] == 500_000
+
+
+async def test_concurrent_requests_package_once(hls_video, fake_packager, monkeypatch):
+    fake_packager["s"] = 0.05
+    runs = []
+    real = hls_service._run_ffmpeg
+
+    async def spy(video_id, rendition, src, sig):
+        runs.append(rendition)
+        await real(video_id, rendition, src, sig)
+
+    monkeypatch.setattr(hls_service, "_run_ffmpeg", spy)
+    await asyncio.gather(
+        hls_service.ensure("hlsAAAAAAAA"),
+        hls_service.file_path("hlsAAAAAAAA", "source", "seg_00001.m4s"),
+        hls_service.file_path("hlsAAAAAAAA", "source", "index.m3u8"),
+    )
+    await _idle()
+    assert runs == ["source"]
+
+
+async def test_stale_segments_not_served(hls_video, fake_packager):
+    fake_packager["s"] = 0
+    out = await hls_service.ensure("hlsAAAAAAAA")
+    await _idle()
+    (out / "seg_00002.m4s").write_bytes(b"alt")   # Marker: Segment der alten Quelle
+
+    hls_video.write_bytes(b"\0" * 500_000)         # Quelle ersetzt
+    path = await hls_service.file_path("hlsAAAAAAAA", "source", "seg_00002.m4s")
+    assert path.read_bytes() == b"seg2"
+    await _idle()
+    assert (out / "source.json").exists()
+
+
+async def test_missing_ffmpeg_is_server_error(hls_video, monkeypatch, async_client_factory):
+    monkeypatch.setattr(hls_mod, "ffmpeg_cmd", lambda src, out, rendition: ["/nicht/da/ffmpeg"])
+    async with await async_client_factory(player_router) as client:
+        r = await client.get("/api/player/hlsAAAAAAAA/hls/master.m3u8")
+        assert r.status_code == 500 and "ffmpeg" in r.json()["detail"]
+        r = await client.get("/api/player/hlsAAAAAAAA/hls/source/seg_00000.m4s")
+        assert r.status_code == 500
+
+
+async def test_cache_lru_eviction(hls_video, set_setting):
+    root = hls_mod.HLS_DIR
+    for i, vid in enumerate(("oldAAAAAAAA", "newAAAAAAAA")):
+        (root / vid / "source").mkdir(parents=True)
+        (root / vid / "source" / "seg_00000.m4s").write_bytes(b"\0" * 700_000)
+        hls_service._touch(vid)
+        await asyncio.sleep(0.02 * (i + 1))
+    await set_setting("player.hls_cache_mb", "1")
+    assert await hls_service.enforce_limit() == ["oldAAAAAAAA"]
+    assert not (root / "oldAAAAAAAA").exists() and (root / "newAAAAAAAA").exists()
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg fehlt")
+async def test_real_ffmpeg_copy_packaging(hls_video, set_setting):
+    await set_setting("player.hls_renditions", "")
+    subprocess.run(
+        ["ffmpeg", "-y", "-f", "lavfi", "-i", "testsrc=duration=9:size=320x240:rate=10",
+         "-f", "lavfi", "-i", "sine=frequency=440:duration=9",
+         "-c:v", "libx264", "-g", "10", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest",
+         "-f", "mp4", str(hls_video)],
+        check=True, capture_output=True,
+    )
+    await hls_service.master_playlist("hlsAAAAAAAA")
+    await _idle()
+    out = hls_mod.HLS_DIR / "hlsAAAAAAAA" / "source"
+    text = (out / "index.m3u8").read_text()
+    assert "#EXT-X-ENDLIST" in text and (out / "init.mp4").exists()
+    assert 8.5 < playlist_duration(text) < 9.5
@@ -0,0 +1,121 @@
+"""
+Gemeinsamer HTTP-Client (http_clients.py).
+
+Kontrakt:
+- viele Thumbnail-Fetches hintereinander → eine Keep-Alive-Verbindung
+- gleichzeitige Requests pro (Kategorie, Host) ≤ CATEGORY_CONCURRENCY
+- neuer Event-Loop → neuer Client; aclose() schließt den Pool
+- Download-Thumbnails (download_service._dl_thumbnail) laufen über die
+  Registry; ein Fehler dort fällt im Test auf statt im except zu verschwinden
+Gegen einen lokalen HTTP/1.1-Server getestet, der Verbindungen zählt.
+"""
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.services import rss_service as rss_mod
+from app.services.http_clients import CATEGORY_CONCURRENCY, http_clients
+from app.services.rss_service import rss_service
+
+IMAGE = b"\xff\xd8" + b"\0" * 2000
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-Alive
+
+    def log_message(self, *a):
+        pass
+
+    def do_GET(self):
+        srv = self.server
+        with srv.lock:
+            srv.peers.add(self.client_address)
+            srv.active += 1
+            srv.peak = max(srv.peak, srv.active)
+        time.sleep(srv.delay)
+        with srv.lock:
+            srv.active -= 1
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(IMAGE)))
+        self.end_headers()
+        self.wfile.write(IMAGE)
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    srv.lock, srv.peers, srv.active, srv.peak, srv.delay = threading.Lock(), set(), 0, 0, 0.0
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    srv.url = f"http://127.0.0.1:{srv.server_address[1]}"
+    yield srv
+    srv.shutdown()
+
+
+async def test_thumbnail_fetches_share_connection(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(rss_mod, "RSS_THUMBS_DIR", tmp_path)
+    for i in range(20):
+        path = await rss_service._cache_rss_thumbnail(f"vid{i:08d}", f"{server.url}/vi/{i}.jpg")
+        assert path and (tmp_path / f"vid{i:08d}.jpg").read_bytes() == IMAGE
+    assert len(server.peers) == 1
+    await http_clients.aclose()
+
+
+async def test_per_host_limit_by_category(server):
+    server.delay = 0.05
+    await asyncio.gather(*(http_clients.get(f"{server.url}/a/{i}", category="avatar")
+                           for i in range(8)))
+    assert server.peak == CATEGORY_CONCURRENCY["avatar"]
+
+    server.peak = 0
+    await asyncio.gather(*(http_clients.get(f"{server.url}/t/{i}", category="thumbnail")
+                           for i in range(16)))
+    assert 2 < server.peak <= CATEGORY_CONCURRENCY["thumbnail"]
+    await http_clients.aclose()
+
+
+def test_new_loop_gets_new_client():
+    async def _client():
+        return http_clients.client()
+
+    first = asyncio.run(_client())
+    second = asyncio.run(_client())
+    assert first is not second and not second.is_closed
+
+    async def _close():
+        http_clients.client()
+        await http_clients.aclose()
+
+    asyncio.run(_close())
+    assert http_clients._client is None
+
+
+async def test_download_thumbnail_uses_registry(tmp_path, monkeypatch):
+    from app.services import download_service as dl_mod
+    from app.services.download_service import download_service
+
+    calls = []
+
+    async def fake_get(url, *, category="api", **kwargs):
+        calls.append((url, category))
+        return httpx.Response(200, content=IMAGE, request=httpx.Request("GET", url))
+
+    async def no_wait(category):
+        return None
+
+    errors = []
+    monkeypatch.setattr(dl_mod, "THUMBNAILS_DIR", tmp_path)
+    monkeypatch.setattr(http_clients, "get", fake_get)
+    monkeypatch.setattr(dl_mod.rate_limiter, "acquire", no_wait)
+    monkeypatch.setattr(dl_mod.rate_limiter, "error", lambda *a: errors.append(a))
+    monkeypatch.setattr(dl_mod.thumbnail_derivative_service, "warm", lambda p: None)
+
+    path = await download_service._dl_thumbnail("thumbDLAAAA", "https://i.ytimg.com/vi/x/hq.jpg")
+    assert errors == []
+    assert path == str(tmp_path / "thumbDLAAAA" / "thumbnail.jpg")
+    assert (tmp_path / "thumbDLAAAA" / "thumbnail.jpg").read_bytes() == IMAGE
+    assert calls == [("https://i.ytimg.com/vi/x/hq.jpg", "thumbnail")]
@@ -0,0 +1,140 @@
+"""
+Positiv-Cache für yt-dlp Info-Dicts (info_cache.py + ytdlp_adapter._ydl_extract).
+
+Kontrakt:
+- gleiches Video (egal welche URL-Form) → ein Extract, danach Cache-Hits
+- Listings mit extra_opts/force_clients werden nie gecacht
+- Stream-URLs haben eigene TTL (inkl. expire= der URL): Metadaten-Caller
+  bekommen den Eintrag weiter, Streams/Captions lösen neuen Extract aus
+- Platten-Cache überlebt einen Neustart, Metadaten-TTL gilt auch dort
+- Hit/Miss-Zähler in stats(), Permanent-Fehler zählen als negative_hits
+- Miss und Hit liefern dieselbe (sanitisierte) Form; StreamAdapter verändert
+  das geteilte Format-Dict im Cache nicht
+"""
+import time
+
+import pytest
+
+from app.utils import ytdlp_adapter as adapter
+from app.utils.info_cache import STREAM_MARGIN, InfoCache, info_cache
+
+VID = "dQw4w9WgXcQ"
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    """Fake-YoutubeDL: zählt extract_info-Calls, Stream-URLs mit expire=."""
+    state = {"calls": [], "expire": int(time.time()) + 6 * 3600}
+
+    class FakeYDL:
+        def __init__(self, opts):
+            self.opts = opts
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download=False):
+            state["calls"].append(url)
+            if "private" in url:
+                raise adapter.yt_dlp.utils.DownloadError("ERROR: Private video")
+            url_ = f"https://rr1.googlevideo.com/videoplayback?expire={state['expire']}&itag=18"
+            return {"id": VID, "title": f"Titel {len(state['calls'])}", "duration": 212,
+                    "formats": [{"format_id": "18", "ext": "mp4", "url": url_,
+                                 "vcodec": "avc1", "acodec": "mp4a"}]}
+
+    monkeypatch.setattr(adapter.yt_dlp, "YoutubeDL", FakeYDL)
+    info_cache.clear()
+    adapter._cache_clear()
+    yield state
+    info_cache.clear()
+
+
+def test_same_video_is_extracted_once(extractor):
+    first = adapter._ydl_extract(f"https://www.youtube.com/watch?v={VID}")
+    again = adapter._ydl_extract(f"https://youtu.be/{VID}")
+    assert first["title"] == again["title"] == "Titel 1"
+    assert len(extractor["calls"]) == 1
+
+    # Listings (Channel/Playlist/Suche) nicht cachen
+    adapter._ydl_extract(f"https://www.youtube.com/watch?v={VID}",
+                         extra_opts={"extract_flat": True})
+    assert len(extractor["calls"]) == 2
+
+    with pytest.raises(Exception):
+        adapter._ydl_extract("https://www.youtube.com/watch?v=private0000")
+    with pytest.raises(Exception):
+        adapter._ydl_extract("https://www.youtube.com/watch?v=private0000")
+    assert len(extractor["calls"]) == 3
+
+    stats = info_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["negative_hits"]) == (1, 2, 1)
+    assert adapter.has_cached_info(f"https://www.youtube.com/shorts/{VID}")
+
+
+def test_miss_and_hit_same_shape_cache_not_mutated(extractor):
+    url = f"https://www.youtube.com/watch?v={VID}"
+    miss = adapter._ydl_extract(url)
+    hit = adapter._ydl_extract(url)
+    assert miss == hit and len(extractor["calls"]) == 1
+
+    stream = adapter.StreamAdapter(hit["formats"][0], watch_url=url)
+    stream._fmt["filesize"] = 4096           # wie der Progress-Hook in download()
+    assert stream.filesize == 4096
+    assert "filesize" not in adapter._ydl_extract(url)["formats"][0]
+
+
+def test_youtube_adapter_phases_share_one_extract(extractor):
+    url = f"https://www.youtube.com/watch?v={VID}"
+    # get_video_info → _resolve → _download_inner: je ein eigenes Adapter-Objekt
+    for _ in range(3):
+        yt = adapter.YoutubeAdapter(url)
+        assert yt.title == "Titel 1" and yt.length == 212
+        assert [s.itag for s in yt.streams] == ["18"]
+    assert len(extractor["calls"]) == 1
+
+
+def test_expiring_stream_urls_have_own_ttl(extractor):
+    # URLs laufen in weniger als STREAM_MARGIN ab → Streams sofort "abgelaufen"
+    extractor["expire"] = int(time.time()) + STREAM_MARGIN // 2
+    url = f"https://www.youtube.com/watch?v={VID}"
+    yt = adapter.YoutubeAdapter(url)
+    assert yt.title == "Titel 1"
+
+    meta = adapter.YoutubeAdapter(url)
+    assert meta.description == "" and meta.title == "Titel 1"   # Metadaten: Hit
+    assert len(extractor["calls"]) == 1
+    assert not adapter.has_cached_info(url) and adapter.has_cached_info(url, need_streams=False)
+
+    list(meta.streams)                                            # Streams: neu holen
+    assert len(extractor["calls"]) == 2
+    assert info_cache.stats()["stream_misses"] == 1
+
+    # nach fehlgeschlagenem Download: Stream-URLs verwerfen, Metadaten bleiben
+    extractor["expire"] = int(time.time()) + 6 * 3600
+    list(adapter.YoutubeAdapter(url).streams)
+    info_cache.drop_streams(VID)
+    assert adapter.YoutubeAdapter(url).title and len(extractor["calls"]) == 3
+    list(adapter.YoutubeAdapter(url).streams)
+    assert len(extractor["calls"]) == 4
+
+
+def test_disk_cache_survives_restart(tmp_path):
+    info = {"id": VID, "title": "Platte", "formats": []}
+    InfoCache(tmp_path, stream_ttl=60).put(VID, info)
+
+    restarted = InfoCache(tmp_path, stream_ttl=60)
+    assert restarted.get(VID)["title"] == "Platte"
+    assert restarted.stats()["disk_hits"] == 1
+
+    stale = InfoCache(tmp_path, meta_ttl=60)
+    stale.put(VID, info, fetched=time.time() - 120)
+    assert InfoCache(tmp_path, meta_ttl=60).get(VID) is None
+    assert not list(tmp_path.glob("*.json.gz"))   # abgelaufen → gelöscht
+
+    small = InfoCache(tmp_path, memory_max=2)
+    for i in range(3):
+        small.put(f"video{i:06d}", info)
+    assert small.stats()["entries"] == 2
@@ -0,0 +1,139 @@
+"""
+Keyset-Pagination (Cursor) für /api/videos und den Feed.
+
+Kontrakt:
+- Durchblättern per next_cursor liefert exakt dieselbe Reihenfolge wie
+  LIMIT/OFFSET – ohne Duplikate/Lücken, auch bei gleichen Sortwerten und NULLs
+- letzte Seite hat next_cursor=None
+- with_total=False spart den COUNT(*) (total=None)
+- kaputter Cursor → HTTP 400
+- die Cursor-Query der Library nutzt idx_videos_status_archived_upload
+"""
+import pytest
+
+from app.services.metadata_service import metadata_service
+from app.services.rss_service import rss_service
+from app.utils.pagination import encode_cursor, decode_cursor
+
+
+@pytest.fixture
+async def library(test_db):
+    rows = []
+    for i in range(57):
+        # viele gleiche upload_dates + ein NULL-Block → Tiebreaker werden gebraucht
+        upload = None if i % 9 == 0 else f"2024-0{1 + i % 3}-01"
+        created = f"2024-05-{1 + i % 4:02d} 10:00:00"
+        rows.append((f"kv{i:03d}", f"Titel {i % 7}", upload, created, 100 + i % 5))
+    for vid, title, upload, created, dur in rows:
+        await test_db.execute(
+            """INSERT INTO videos (id, title, upload_date, created_at, duration, status, is_archived)
+               VALUES (?, ?, ?, ?, ?, 'ready', 0)""",
+            (vid, title, upload, created, dur),
+        )
+    await test_db.execute("INSERT INTO favorites (video_id) VALUES ('kv005')")
+    await test_db.execute("INSERT INTO favorites (video_id) VALUES ('kv030')")
+    return [r[0] for r in rows]
+
+
+async def _walk(per_page, **kw):
+    ids, cursor, pages = [], "", 0
+    while cursor is not None:
+        res = await metadata_service.get_videos(per_page=per_page, cursor=cursor, **kw)
+        ids += [v["id"] for v in res["videos"]]
+        cursor = res["next_cursor"]
+        pages += 1
+        assert pages < 100
+    return ids
+
+
+@pytest.mark.parametrize("sort_by,sort_order", [
+    ("upload_date", "desc"), ("upload_date", "asc"),
+    ("title", "asc"), ("duration", "desc"),
+    ("is_favorite", "desc"), ("created_at", "asc"),
+])
+async def test_cursor_walk_matches_offset_order(library, sort_by, sort_order):
+    full = await metadata_service.get_videos(
+        per_page=100, sort_by=sort_by, sort_order=sort_order)
+    expected = [v["id"] for v in full["videos"]]
+    assert len(expected) == 57
+
+    walked = await _walk(10, sort_by=sort_by, sort_order=sort_order)
+    assert walked == expected
+
+
+async def test_last_page_has_no_cursor(library):
+    res = await metadata_service.get_videos(per_page=100, cursor="")
+    assert len(res["videos"]) == 57
+    assert res["next_cursor"] is None
+    assert res["total"] == 57
+
+
+async def test_without_total(library):
+    res = await metadata_service.get_videos(per_page=5, cursor="", with_total=False)
+    assert res["total"] is None
+    assert len(res["videos"]) == 5
+    assert res["next_cursor"]
+
+
+async def test_cursor_query_uses_composite_index(library, test_db):
+    cursor = encode_cursor(["2024-02-01", "2024-05-01 10:00:00", "kv010"])
+    seen = []
+    orig = test_db.fetch_all
+
+    async def _spy(sql, params=None):
+        seen.append((sql, params))
+        return await orig(sql, params)
+
+    test_db.fetch_all = _spy
+    try:
+        await metadata_service.get_videos(per_page=5, cursor=cursor, is_archived=False)
+    finally:
+        test_db.fetch_all = orig
+    sql, params = seen[0]
+    plan = await test_db.fetch_all("EXPLAIN QUERY PLAN " + sql, params)
+    detail = " ".join(r["detail"] for r in plan)
+    assert "idx_videos_status_archived_upload" in detail
+    assert "upload_date<" in detail.replace(" ", "")
+
+
+def test_cursor_roundtrip_and_garbage():
+    c = encode_cursor(["2024-01-01", None, "abc"])
+    assert decode_cursor(c, 3) == ["2024-01-01", None, "abc"]
+    with pytest.raises(ValueError):
+        decode_cursor("nicht-base64!!", 3)
+    with pytest.raises(ValueError):
+        decode_cursor(c, 2)
+
+
+async def test_invalid_cursor_returns_400(library, async_client_factory):
+    from app.routers import videos
+    async with await async_client_factory(videos.router) as client:
+        r = await client.get("/api/videos", params={"cursor": "kaputt"})
+        assert r.status_code == 400
+        r = await client.get("/api/videos", params={"cursor": "", "per_page": 7})
+        assert r.status_code == 200
+        body = r.json()
+        assert len(body["videos"]) == 7 and body["next_cursor"]
+
+
+async def test_feed_cursor_walk_matches_offset(test_db):
+    ch = "UC" + "f" * 22
+    await test_db.execute(
+        "INSERT INTO subscriptions (channel_id, channel_name) VALUES (?, 'Feed')", (ch,))
+    for i in range(33):
+        published = None if i % 10 == 0 else f"2024-03-{1 + i % 5:02d}T00:00:00+00:00"
+        await test_db.execute(
+            "INSERT INTO rss_entries (video_id, channel_id, title, published) VALUES (?, ?, ?, ?)",
+            (f"fe{i:03d}", ch, f"E{i}", published),
+        )
+    full = await rss_service.get_new_videos(per_page=100)
+    expected = [e["video_id"] for e in full["entries"]]
+    assert len(expected) == 33
+
+    walked, cursor = [], ""
+    while cursor is not None:
+        res = await rss_service.get_new_videos(per_page=8, cursor=cursor)
+        walked += [e["video_id"] for e in res["entries"]]
+        cursor = res["next_cursor"]
+        assert res["total"] == 33
+    assert walked == expected
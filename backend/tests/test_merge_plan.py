@@ -0,0 +1,141 @@
+"""
+Merge-Fast-Path (merge_plan.py + DownloadService._ffmpeg_merge).
+
+Kontrakt:
+- AAC/MP3 in MP4 → Audio per Stream-Copy, Opus/unbekannt → AAC wie bisher
+- auto: VP9/AV1 + Opus → WebM (reiner Copy), sonst MP4; mkv: immer Copy
+- faststart: immediate → beim Merge, deferred → Leerlauf-Task erst wenn
+  kein Job aktiv ist, off → nie; Vormerkungen stehen in faststart_pending
+  und werden nach einem Neustart fortgesetzt
+"""
+import asyncio
+import shutil
+import subprocess
+
+import pytest
+
+from app.services import download_service as dl_mod
+from app.services.download_service import download_service
+from app.services.merge_plan import plan
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg fehlt")
+
+
+def test_mp4_copies_compatible_audio():
+    p = plan("h264", "aac")
+    assert (p.ext, p.copy_audio, p.faststart, p.defer_faststart) == ("mp4", True, False, True)
+    assert p.ffmpeg_args() == ["-c:v", "copy", "-c:a", "copy"]
+    assert not plan("vp9", "opus").copy_audio
+    assert not plan(None, None).copy_audio  # ffprobe fehlgeschlagen → AAC
+
+    p = plan("h264", "aac", faststart="immediate")
+    assert p.ffmpeg_args()[-2:] == ["-movflags", "+faststart"] and not p.defer_faststart
+    assert not plan("h264", "aac", faststart="off").defer_faststart
+
+
+def test_webm_and_mkv_when_allowed():
+    assert plan("vp9", "opus", container="auto").ext == "webm"
+    assert plan("av1", "opus", container="auto").copy_audio
+    assert plan("h264", "opus", container="auto").ext == "mp4"
+    p = plan("h264", "opus", container="mkv")
+    assert p.ext == "mkv" and p.copy_audio and not p.faststart and not p.defer_faststart
+
+
+async def test_deferred_faststart_waits_for_idle(test_db, monkeypatch):
+    done = []
+
+    async def fake_apply(vid, path):
+        done.append(vid)
+
+    monkeypatch.setattr(dl_mod, "FASTSTART_IDLE_POLL", 0.01)
+    monkeypatch.setattr(download_service, "_apply_faststart", fake_apply)
+    monkeypatch.setattr(download_service, "_faststart_task", None)
+    await test_db.execute(
+        "INSERT INTO jobs (type, title, status) VALUES ('download', 'busy', 'active')")
+
+    await download_service._defer_faststart("fastAAAAAAA", "/tmp/video.mp4")
+    await asyncio.sleep(0.05)
+    assert done == []
+
+    await test_db.execute("UPDATE jobs SET status = 'done'")
+    await asyncio.wait_for(download_service._faststart_task, 1)
+    assert done == ["fastAAAAAAA"]
+    assert await test_db.fetch_val("SELECT COUNT(*) FROM faststart_pending") == 0
+
+
+async def test_deferred_faststart_survives_restart(test_db, monkeypatch):
+    done = []
+
+    async def fake_apply(vid, path):
+        done.append((vid, str(path)))
+
+    monkeypatch.setattr(dl_mod, "FASTSTART_IDLE_POLL", 0.01)
+    monkeypatch.setattr(download_service, "_apply_faststart", fake_apply)
+    monkeypatch.setattr(download_service, "_faststart_task", None)
+    await test_db.execute(
+        "INSERT INTO jobs (type, title, status) VALUES ('download', 'busy', 'active')")
+    await download_service._defer_faststart("rstAAAAAAAA", "/tmp/a.mp4")
+    await download_service._defer_faststart("rstBBBBBBBB", "/tmp/b.mp4")
+
+    # "Neustart": Leerlauf-Task stirbt, bevor er drankommt
+    download_service._faststart_task.cancel()
+    await asyncio.gather(download_service._faststart_task, return_exceptions=True)
+    monkeypatch.setattr(download_service, "_faststart_task", None)
+    await test_db.execute("UPDATE jobs SET status = 'error'")
+
+    assert await download_service.resume_faststart() == 2
+    await asyncio.wait_for(download_service._faststart_task, 1)
+    assert sorted(done) == [("rstAAAAAAAA", "/tmp/a.mp4"), ("rstBBBBBBBB", "/tmp/b.mp4")]
+    assert await download_service.resume_faststart() == 0
+
+
+def _ffmpeg(*args):
+    subprocess.run(["ffmpeg", "-y", "-v", "error", *args], check=True)
+
+
+def _codecs(path):
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "stream=codec_name",
+         "-of", "default=nw=1:nk=1", str(path)],
+        capture_output=True, text=True, check=True).stdout
+    return out.split()
+
+
+@needs_ffmpeg
+async def test_merge_copies_aac_and_defers_faststart(test_db, tmp_path, monkeypatch):
+    video, audio = tmp_path / "video_tmp.mp4", tmp_path / "audio_tmp.m4a"
+    _ffmpeg("-f", "lavfi", "-i", "testsrc=size=160x90:rate=10", "-t", "2",
+            "-c:v", "libx264", "-an", str(video))
+    _ffmpeg("-f", "lavfi", "-i", "sine=frequency=440", "-t", "2", "-c:a", "aac", str(audio))
+    deferred = []
+    async def fake_defer(vid, p):
+        deferred.append(p)
+
+    monkeypatch.setattr(download_service, "_defer_faststart", fake_defer)
+
+    out = await download_service._ffmpeg_merge(tmp_path, str(video), str(audio), 2, 0, "mrgAAAAAAAA")
+    assert out.endswith("video.mp4") and _codecs(out) == ["h264", "aac"]
+    assert deferred == [out] and not video.exists()
+
+    data = open(out, "rb").read()
+    assert data.index(b"moov") > data.index(b"mdat")
+    await test_db.execute(
+        "INSERT INTO videos (id, title, status, file_path) VALUES ('mrgAAAAAAAA', 'M', 'ready', ?)",
+        (out,))
+    await download_service._apply_faststart("mrgAAAAAAAA", tmp_path / "video.mp4")
+    data = open(out, "rb").read()
+    assert data.index(b"moov") < data.index(b"mdat")
+
+
+@needs_ffmpeg
+async def test_merge_auto_container_webm(test_db, tmp_path, set_setting):
+    await set_setting("download.merge_container", "auto")
+    video, audio = tmp_path / "video_tmp.webm", tmp_path / "audio_tmp.webm"
+    _ffmpeg("-f", "lavfi", "-i", "testsrc=size=160x90:rate=10", "-t", "1",
+            "-c:v", "libvpx-vp9", "-an", str(video))
+    _ffmpeg("-f", "lavfi", "-i", "sine=frequency=440", "-t", "1", "-c:a", "libopus", str(audio))
+    (tmp_path / "video.mp4").write_bytes(b"alt")
+
+    out = await download_service._ffmpeg_merge(tmp_path, str(video), str(audio), 1, 0, "")
+    assert out.endswith("video.webm") and _codecs(out) == ["vp9", "opus"]
+    assert not (tmp_path / "video.mp4").exists()
@@ -0,0 +1,98 @@
+"""
+Range-Streaming im Player (RangeFileResponse).
+
+Kontrakt:
+- Single-Range → 206 mit Content-Range, offenes Ende und Suffix-Range
+- Multi-Range → multipart/byteranges
+- ETag/Last-Modified: If-None-Match bzw. If-Modified-Since → 304
+- If-Range mit altem ETag → komplette Datei (200) statt Teilbereich
+- Zero-Copy, wenn der Server http.response.zerocopysend anbietet
+"""
+import os
+
+import pytest
+
+from app.routers.player import router as player_router
+from app.utils.range_response import RangeFileResponse
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 17)
+
+
+@pytest.fixture
+async def video(test_db, tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(PAYLOAD)
+    await test_db.execute(
+        "INSERT INTO videos (id, title, status, file_path, file_size, storage_type) "
+        "VALUES ('rangeAAAAAA', 'Range', 'ready', ?, ?, 'local')",
+        (str(path), len(PAYLOAD)))
+    return path
+
+
+async def test_single_and_suffix_ranges(video, async_client_factory):
+    async with await async_client_factory(player_router) as client:
+        r = await client.get("/api/player/rangeAAAAAA", headers={"Range": "bytes=100-199"})
+        assert r.status_code == 206 and r.content == PAYLOAD[100:200]
+        assert r.headers["content-range"] == f"bytes 100-199/{len(PAYLOAD)}"
+
+        r = await client.get("/api/player/rangeAAAAAA", headers={"Range": "bytes=3145728-"})
+        assert r.status_code == 206 and r.content == PAYLOAD[3145728:]
+
+        r = await client.get("/api/player/rangeAAAAAA", headers={"Range": "bytes=-10"})
+        assert r.content == PAYLOAD[-10:]
+
+        r = await client.get("/api/player/rangeAAAAAA")
+        assert r.status_code == 200 and r.content == PAYLOAD
+        assert r.headers["accept-ranges"] == "bytes"
+
+        r = await client.get("/api/player/rangeAAAAAA", headers={"Range": f"bytes={len(PAYLOAD)}-"})
+        assert r.status_code == 416
+
+
+async def test_multi_range(video, async_client_factory):
+    async with await async_client_factory(player_router) as client:
+        r = await client.get("/api/player/rangeAAAAAA", headers={"Range": "bytes=0-9,2000-2009"})
+    assert r.status_code == 206
+    assert r.headers["content-type"].startswith("multipart/byteranges; boundary=")
+    assert int(r.headers["content-length"]) == len(r.content)
+    assert PAYLOAD[0:10] in r.content and PAYLOAD[2000:2010] in r.content
+
+
+async def test_conditional_requests(video, async_client_factory):
+    async with await async_client_factory(player_router) as client:
+        first = await client.get("/api/player/rangeAAAAAA", headers={"Range": "bytes=0-99"})
+        etag, modified = first.headers["etag"], first.headers["last-modified"]
+
+        r = await client.get("/api/player/rangeAAAAAA",
+                             headers={"Range": "bytes=0-99", "If-None-Match": etag})
+        assert r.status_code == 304 and r.content == b"" and r.headers["etag"] == etag
+
+        r = await client.get("/api/player/rangeAAAAAA", headers={"If-Modified-Since": modified})
+        assert r.status_code == 304
+
+        r = await client.get("/api/player/rangeAAAAAA",
+                             headers={"Range": "bytes=0-99", "If-Range": etag})
+        assert r.status_code == 206
+
+        r = await client.get("/api/player/rangeAAAAAA",
+                             headers={"Range": "bytes=0-99", "If-Range": '"veraltet"'})
+        assert r.status_code == 200 and len(r.content) == len(PAYLOAD)
+
+
+async def test_zerocopy_extension(video):
+    sent = []
+
+    async def send(msg):
+        if msg["type"] == "http.response.zerocopysend":
+            fd = os.dup(msg["file"])
+            with os.fdopen(fd, "rb") as f:
+                f.seek(msg["offset"])
+                msg = {**msg, "data": f.read(msg["count"])}
+        sent.append(msg)
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"range", b"bytes=10-19")],
+             "extensions": {"http.response.zerocopysend": {}}}
+    await RangeFileResponse(str(video), media_type="video/mp4")(scope, None, send)
+    assert sent[0]["status"] == 206
+    assert sent[1]["type"] == "http.response.zerocopysend"
+    assert sent[1]["data"] == PAYLOAD[10:20] and sent[1]["more_body"] is False
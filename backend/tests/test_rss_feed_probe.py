@@ -0,0 +1,132 @@
+"""
+Gestufter RSS-Tick: Atom-Feed-Probe vor yt-dlp (RSSService._probe_feed).
+
+Kontrakt:
+- Feed mit nur bekannten Video-IDs → kein make_channel, ETag wird gespeichert
+- nächster Tick schickt If-None-Match; 304 → wieder kein make_channel
+- neue Video-ID im Feed, Feed-Fehler (404) oder noch nie voll extrahiert
+  → yt-dlp wie bisher; danach feed_full_fetch gesetzt
+- rss.feed_probe=false → immer yt-dlp
+"""
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import rss_service as rss_mod
+from app.services.rate_limiter import rate_limiter
+from app.services.rss_service import rss_service
+
+PUBLISHED = (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+KNOWN, FRESH, DEAD, NEW = (f"UC{c * 20}00" for c in "KFDN")
+
+
+def _atom(*video_ids: str) -> bytes:
+    entries = "".join(
+        f"<entry><yt:videoId>{v}</yt:videoId><published>{PUBLISHED}</published></entry>"
+        for v in video_ids)
+    return (f'<feed xmlns="http://www.w3.org/2005/Atom" '
+            f'xmlns:yt="http://www.youtube.com/xml/schemas/2015">{entries}</feed>').encode()
+
+
+@pytest.fixture
+async def feeds(test_db, set_setting, monkeypatch):
+    """Lokaler Feed-Server: KNOWN nur bekannte IDs, FRESH eine neue, DEAD 404,
+    NEW nur das Video, das der make_channel-Stub liefert."""
+    served = {KNOWN: _atom("known000001", "known000002"),
+              FRESH: _atom("fresh000001", "fresh000002"),
+              NEW: _atom(f"yt{NEW[2:11]}")}
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            cid = self.path.split("channel_id=")[1]
+            requests.append((cid, self.headers.get("If-None-Match")))
+            if cid not in served:
+                self.send_response(404)
+                self.end_headers()
+                return
+            etag = f'"{cid}-v1"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = served[cid]
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(rss_mod, "YT_RSS_URL",
+                        f"http://127.0.0.1:{server.server_port}/feed?channel_id={{channel_id}}")
+
+    extracted = []
+
+    def fake_make_channel(url, max_videos=15):
+        cid = url.split("/channel/")[1].split("/")[0]
+        extracted.append(cid)
+        video = SimpleNamespace(video_id=f"yt{cid[2:11]}", title="Neu", thumbnail_url=None,
+                                publish_date=PUBLISHED[:10].replace("-", ""), length=300)
+        return SimpleNamespace(channel_name=cid, videos=[video])
+
+    from app.utils import pytube_client
+    monkeypatch.setattr(pytube_client, "make_channel", fake_make_channel)
+    monkeypatch.setitem(rate_limiter.intervals, "rss", 0.001)
+    monkeypatch.setattr(rate_limiter, "_buckets", {})
+
+    for cid in (KNOWN, FRESH, DEAD):
+        await test_db.execute(
+            """INSERT INTO subscriptions (channel_id, channel_name, check_interval, feed_full_fetch)
+               VALUES (?, ?, 1800, datetime('now', 'localtime', '-1 hour'))""", (cid, cid))
+    await test_db.execute(
+        "INSERT INTO subscriptions (channel_id, channel_name, check_interval) VALUES (?, ?, 1800)",
+        (NEW, NEW))
+    for vid, cid in (("known000001", KNOWN), ("known000002", KNOWN), ("fresh000001", FRESH)):
+        await test_db.execute(
+            "INSERT INTO rss_entries (video_id, channel_id, published) VALUES (?, ?, ?)",
+            (vid, cid, PUBLISHED))
+    yield requests, extracted
+    server.shutdown()
+    server.server_close()
+
+
+async def _due_again(test_db):
+    await test_db.execute(
+        "UPDATE subscriptions SET next_check_at = datetime('now', 'localtime', '-1 minute')")
+    rss_service.invalidate_schedule()
+
+
+async def test_probe_skips_unchanged_channels(feeds, test_db):
+    requests, extracted = feeds
+    result = await rss_service.tick(max_feeds=50)
+
+    assert sorted(extracted) == sorted([FRESH, DEAD, NEW])
+    assert result["metrics"]["feed_unchanged"] == 1 and result["metrics"]["ytdlp_fetches"] == 3
+    assert NEW not in {cid for cid, _ in requests}  # noch nie voll extrahiert → direkt yt-dlp
+    row = await test_db.fetch_one(
+        "SELECT feed_etag, last_checked FROM subscriptions WHERE channel_id = ?", (KNOWN,))
+    assert row["feed_etag"] == f'"{KNOWN}-v1"' and row["last_checked"]
+
+    # zweiter Lauf: KNOWN/FRESH → 304 (ETag), NEW kennt nur Bekanntes, DEAD bleibt 404
+    requests.clear()
+    extracted.clear()
+    await _due_again(test_db)
+    result = await rss_service.tick(max_feeds=50)
+    assert (KNOWN, f'"{KNOWN}-v1"') in requests and (NEW, None) in requests
+    assert extracted == [DEAD]
+    assert result["metrics"]["feed_unchanged"] == 3
+
+
+async def test_probe_can_be_disabled(feeds, test_db, set_setting):
+    requests, extracted = feeds
+    await set_setting("rss.feed_probe", "false")
+    await rss_service.tick(max_feeds=50)
+    assert requests == [] and len(extracted) == 4
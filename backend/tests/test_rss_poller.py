@@ -0,0 +1,134 @@
+"""
+Paralleler RSS-Tick (RSSService._do_tick + RateLimiter.acquire_bucket).
+
+Kontrakt:
+- fällige Feeds werden von rss.workers Workern parallel abgerufen
+  (eigener Thread-Pool), nie mehr als rss.workers gleichzeitig
+- alle Ergebnisse landen gesammelt in EINEM Schreibdurchgang (_store_polls)
+- Fehler: Backoff + last_checked gesetzt, 404 → 6h; ungültige channel_id →
+  Abo deaktiviert; neue Videos → Basis-Interval, keine → verdoppeln
+- Tick-Metriken: feeds_per_minute, queue_lag_*; Token-Bucket erlaubt
+  `burst` Requests sofort, danach 1/Interval
+"""
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.rate_limiter import rate_limiter
+from app.services.rss_service import rss_service
+
+TODAY = datetime.now().strftime("%Y%m%d")
+
+
+def _cid(i: int) -> str:
+    return f"UC{i:022d}"
+
+
+@pytest.fixture
+async def poller(test_db, set_setting, monkeypatch):
+    """12 fällige Abos, make_channel gestubbt (je 2 Videos, 404 für Abo 5)."""
+    from app.utils import pytube_client
+
+    state = {"active": 0, "peak": 0, "threads": set(), "calls": 0}
+    lock = threading.Lock()
+
+    def fake_make_channel(url, max_videos=15):
+        cid = url.split("/channel/")[1].split("/")[0]
+        with lock:
+            state["calls"] += 1
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            state["threads"].add(threading.current_thread().name)
+        time.sleep(0.05)
+        with lock:
+            state["active"] -= 1
+        if cid == _cid(5):
+            raise RuntimeError("HTTP Error 404: Not Found")
+        videos = [SimpleNamespace(video_id=f"v{cid[-6:]}{n:04d}", title=f"Video {n}",
+                                  thumbnail_url=None, publish_date=TODAY, length=300)
+                  for n in range(2)]
+        return SimpleNamespace(channel_name=f"Kanal {cid[-2:]}", videos=videos)
+
+    monkeypatch.setattr(pytube_client, "make_channel", fake_make_channel)
+    monkeypatch.setitem(rate_limiter.intervals, "rss", 0.001)
+    monkeypatch.setattr(rate_limiter, "_buckets", {})
+    await set_setting("rss.workers", "4")
+    await set_setting("rss.interval", "1800")
+    for i in range(12):
+        # zwei Stunden her, Interval 30 min → 90 min überfällig
+        await test_db.execute(
+            """INSERT INTO subscriptions (channel_id, channel_name, check_interval, last_checked,
+                                          next_check_at)
+               VALUES (?, ?, 1800, datetime('now', 'localtime', '-2 hours'),
+                       datetime('now', 'localtime', '-90 minutes'))""", (_cid(i), _cid(i)))
+    await test_db.execute(
+        "INSERT INTO subscriptions (channel_id, check_interval) VALUES ('UCkaputt', 1800)")
+    yield state
+    rss_service._fetch_pool, pool = None, rss_service._fetch_pool
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+async def test_tick_fetches_in_parallel_and_writes_once(poller, test_db, monkeypatch):
+    batches = []
+    real = rss_service._store_polls
+
+    async def spy(polls, default_interval=None):
+        batches.append(len(polls))
+        return await real(polls, default_interval)
+
+    monkeypatch.setattr(rss_service, "_store_polls", spy)
+    result = await rss_service.tick(max_feeds=50)
+
+    assert result["status"] == "completed" and result["checked"] == 13
+    assert result["new_videos"] == 22 and result["errors"] == 1
+    assert poller["peak"] == 4 and poller["calls"] == 12
+    assert all(t.startswith("rss-fetch") for t in poller["threads"])
+    assert batches == [13]
+    assert await test_db.fetch_val("SELECT COUNT(*) FROM rss_entries") == 22
+
+    m = result["metrics"]
+    assert m["workers"] == 4 and m["feeds_per_minute"] > 0
+    assert 5300 <= m["queue_lag_max_s"] <= 5500
+    assert rss_service._last_tick["checked"] == 13
+
+
+async def test_tick_backoff_and_adaptive_intervals(poller, test_db):
+    await test_db.execute(
+        "UPDATE subscriptions SET error_count = 2, last_error = 'alt' WHERE channel_id = ?",
+        (_cid(1),))
+    await rss_service.tick(max_feeds=50)
+
+    rows = {r["channel_id"]: dict(r) for r in await test_db.fetch_all("SELECT * FROM subscriptions")}
+    ok, failed, bad = rows[_cid(1)], rows[_cid(5)], rows["UCkaputt"]
+    assert (ok["error_count"], ok["last_error"], ok["check_interval"]) == (0, None, 1800)
+    assert ok["video_count"] == 2 and ok["channel_name"] == "Kanal 01"
+    assert ok["last_video_date"].startswith(f"{TODAY[:4]}-{TODAY[4:6]}")
+    assert failed["error_count"] == 1 and failed["check_interval"] == 21600
+    assert failed["last_error"].startswith("[404]")
+    assert await test_db.fetch_val(
+        "SELECT last_checked > datetime('now', '-1 minute') FROM subscriptions WHERE channel_id = ?",
+        (_cid(5),)) == 1
+    assert bad["enabled"] == 0 and "Ungültige" in bad["last_error"]
+
+    # zweiter Lauf ohne neue Videos → Interval verdoppelt
+    await test_db.execute(
+        "UPDATE subscriptions SET next_check_at = datetime('now', 'localtime', '-1 minute')")
+    rss_service.invalidate_schedule()
+    await rss_service.tick(max_feeds=50)
+    assert await test_db.fetch_val(
+        "SELECT check_interval FROM subscriptions WHERE channel_id = ?", (_cid(1),)) == 3600
+
+
+async def test_token_bucket_allows_burst(monkeypatch):
+    monkeypatch.setitem(rate_limiter.intervals, "rss", 0.1)
+    monkeypatch.setattr(rate_limiter, "_buckets", {})
+    t0 = time.monotonic()
+    for _ in range(3):
+        await rate_limiter.acquire_bucket("rss", 3)
+    assert time.monotonic() - t0 < 0.05
+    await rate_limiter.acquire_bucket("rss", 3)
+    assert time.monotonic() - t0 >= 0.09
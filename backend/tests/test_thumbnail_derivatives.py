@@ -0,0 +1,125 @@
+"""
+Thumbnail-Varianten (thumbnail_derivative_service.py + Player-Endpoints).
+
+Kontrakt:
+- ?w= rundet auf die nächstgrößere Variante (160/320/640) und leitet auf
+  /thumbs/<sha256>_<w>.webp um; zu breit → Original wie bisher
+- Variante: WebP, Breite ≤ w, immutable + starkes ETag, If-None-Match → 304
+- gleicher Inhalt → gleicher Name; neues Thumbnail → neuer Digest
+- Erzeugung einmal pro Quelle, auch bei gleichzeitigen Abrufen
+- Cache auf player.thumb_cache_mb begrenzt: am längsten nicht abgerufene
+  Varianten fliegen zuerst, gelöschte entstehen beim nächsten Abruf neu
+"""
+import asyncio
+import io
+import os
+import time
+
+import pytest
+from PIL import Image
+
+from app.routers.player import router as player_router
+from app.services import thumbnail_derivative_service as thumb_mod
+from app.services.thumbnail_derivative_service import (
+    resize_jpeg, snap_width, thumbnail_derivative_service,
+)
+
+
+def _jpeg(width=1280, height=720, color=(200, 30, 30)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+async def thumb_video(test_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(thumb_mod, "THUMB_CACHE_DIR", tmp_path / "thumb_cache")
+    monkeypatch.setattr(thumbnail_derivative_service, "_digests", type(thumbnail_derivative_service._digests)())
+    src = tmp_path / "thumbnail.jpg"
+    src.write_bytes(_jpeg())
+    await test_db.execute(
+        "INSERT INTO videos (id, title, status, thumbnail_path) "
+        "VALUES ('thumbAAAAAA', 'Thumb', 'ready', ?)", (str(src),))
+    yield src
+    thumbnail_derivative_service.shutdown()
+
+
+def test_snap_and_resize():
+    assert [snap_width(w) for w in (1, 160, 161, 640, 641)] == [160, 160, 320, 640, None]
+    img = Image.open(io.BytesIO(resize_jpeg(_jpeg(), 512)))
+    assert img.format == "JPEG" and img.size == (512, 288)
+
+
+async def test_variant_redirect_and_immutable(thumb_video, async_client_factory):
+    async with await async_client_factory(player_router) as client:
+        r = await client.get("/api/player/thumbAAAAAA/thumbnail?w=300")
+        assert r.status_code == 307
+        url = r.headers["location"]
+        assert url.startswith("/api/player/thumbs/") and url.endswith("_320.webp")
+
+        r = await client.get(url)
+        assert r.status_code == 200 and r.headers["content-type"] == "image/webp"
+        assert "immutable" in r.headers["cache-control"]
+        etag = r.headers["etag"]
+        assert not etag.startswith("W/")
+        assert Image.open(io.BytesIO(r.content)).size == (320, 180)
+
+        assert (await client.get(url, headers={"If-None-Match": etag})).status_code == 304
+        assert (await client.get("/api/player/thumbs/..%2Fthumbnail.jpg")).status_code == 404
+        assert (await client.get(url.replace("_320", "_999"))).status_code == 404
+
+        # Breiter als die größte Variante → Original-JPEG
+        r = await client.get("/api/player/thumbAAAAAA/thumbnail?w=1280")
+        assert r.status_code == 200 and r.headers["content-type"] == "image/jpeg"
+
+
+async def test_new_thumbnail_new_digest(thumb_video):
+    first, _ = await thumbnail_derivative_service.variant(thumb_video, 160)
+    again, path = await thumbnail_derivative_service.variant(thumb_video, 640)
+    assert again == first and Image.open(path).size == (640, 360)
+
+    thumb_video.write_bytes(_jpeg(color=(10, 200, 10)))
+    changed, _ = await thumbnail_derivative_service.variant(thumb_video, 160)
+    assert changed != first
+    assert await thumbnail_derivative_service.variant(thumb_video.with_name("fehlt.jpg"), 160) is None
+
+
+async def test_concurrent_requests_render_once(thumb_video, monkeypatch):
+    calls = []
+    real_run = thumbnail_derivative_service.run
+
+    async def counting_run(fn, *args):
+        calls.append(fn)
+        return await real_run(fn, *args)
+
+    monkeypatch.setattr(thumbnail_derivative_service, "run", counting_run)
+    results = await asyncio.gather(*(thumbnail_derivative_service.variant(thumb_video, 320)
+                                     for _ in range(5)))
+    assert len(calls) == 1 and len({r[0] for r in results}) == 1
+    await thumbnail_derivative_service.variant(thumb_video, 160)
+    assert len(calls) == 1  # Digest gemerkt, Variante existiert
+
+
+async def test_cache_pruned_least_recently_used_first(thumb_video, set_setting):
+    cache = thumb_mod.THUMB_CACHE_DIR
+    stale = time.time() - 2 * thumb_mod.TOUCH_INTERVAL
+    names = []
+    for k, digest in enumerate(("a" * 64, "b" * 64, "c" * 64)):
+        for width in (160, 320):
+            f = thumb_mod.variant_path(digest, width)
+            f.parent.mkdir(parents=True, exist_ok=True)
+            f.write_bytes(b"\0" * 400_000)
+            os.utime(f, (stale - len(names), stale - len(names)))   # a_160 = jüngste
+            names.append(f.name)
+    # Abruf der ältesten Variante frischt ihre Zugriffszeit auf → bleibt
+    assert thumbnail_derivative_service.file_for(names[-1])
+
+    await set_setting("player.thumb_cache_mb", "1")
+    assert await thumbnail_derivative_service.enforce_limit() == 4
+    assert sorted(p.name for p in cache.glob("*/*.webp")) == sorted([names[0], names[-1]])
+
+    # Gelöschte Variante einer echten Quelle entsteht beim nächsten Abruf neu
+    digest, path = await thumbnail_derivative_service.variant(thumb_video, 320)
+    path.unlink()
+    again = await thumbnail_derivative_service.variant(thumb_video, 320)
+    assert again == (digest, path) and path.exists()
@@ -0,0 +1,111 @@
+"""
+Normalisierte Tags: video_tags / rss_entry_keywords (Migration v33).
+
+Kontrakt:
+- Trigger halten die Tabellen bei Insert/Update/Delete/Replace synchron
+  (damit automatisch für update_video, Downloader, Importe)
+- kaputtes JSON in videos.tags bricht keinen Insert
+- Tag-Filter in get_videos / Keyword-Filter im Feed: case-insensitiv, OR
+- get_all_tags / Feed-Tags: eine GROUP-BY-Aggregation mit denselben Filtern
+- Migration v33 befüllt bestehende Daten
+"""
+import json
+
+from app.services.metadata_service import metadata_service
+from app.services.rss_service import rss_service
+
+
+async def _tags(db, vid):
+    rows = await db.fetch_all("SELECT tag FROM video_tags WHERE video_id = ? ORDER BY tag", (vid,))
+    return [r["tag"] for r in rows]
+
+
+async def _add_video(db, vid, tags, **kw):
+    await db.execute(
+        "INSERT INTO videos (id, title, tags, status, channel_id, is_archived) VALUES (?, ?, ?, 'ready', ?, ?)",
+        (vid, vid, json.dumps(tags) if not isinstance(tags, str) else tags,
+         kw.get("channel_id", "UCx"), kw.get("is_archived", 0)),
+    )
+
+
+async def test_triggers_keep_video_tags_in_sync(test_db):
+    await _add_video(test_db, "vt1", ["Musik", " Live ", 2024, ""])
+    assert await _tags(test_db, "vt1") == ["2024", "Live", "Musik"]
+
+    await metadata_service.update_video("vt1", {"tags": ["Neu"]})
+    assert await _tags(test_db, "vt1") == ["Neu"]
+
+    await test_db.execute(
+        "INSERT OR REPLACE INTO videos (id, title, tags, status) VALUES ('vt1', 'x', '[\"Ersetzt\"]', 'ready')")
+    assert await _tags(test_db, "vt1") == ["Ersetzt"]
+
+    await test_db.execute("DELETE FROM videos WHERE id = 'vt1'")
+    assert await _tags(test_db, "vt1") == []
+
+
+async def test_invalid_json_does_not_break_insert(test_db):
+    await _add_video(test_db, "vt2", "kein json")
+    await _add_video(test_db, "vt3", '{"a": 1}')
+    assert await test_db.fetch_val("SELECT COUNT(*) FROM videos WHERE id IN ('vt2', 'vt3')") == 2
+    assert await _tags(test_db, "vt2") == []
+    assert await _tags(test_db, "vt3") == []
+
+
+async def test_tag_filter_is_case_insensitive_or(test_db):
+    await _add_video(test_db, "a", ["Rock", "Live"])
+    await _add_video(test_db, "b", ["jazz"])
+    await _add_video(test_db, "c", ["Pop"])
+    res = await metadata_service.get_videos(tags="rock,JAZZ")
+    assert {v["id"] for v in res["videos"]} == {"a", "b"}
+    res = await metadata_service.get_videos(tag="live")
+    assert [v["id"] for v in res["videos"]] == ["a"]
+
+
+async def test_get_all_tags_aggregates_with_filters(test_db):
+    await _add_video(test_db, "a", ["Rock", "Live"], channel_id="UC1")
+    await _add_video(test_db, "b", ["Rock"], channel_id="UC2")
+    await _add_video(test_db, "c", ["Rock", "Alt"], channel_id="UC1", is_archived=1)
+
+    assert await metadata_service.get_all_tags() == [
+        {"tag": "Rock", "count": 2}, {"tag": "Live", "count": 1},
+    ]
+    assert await metadata_service.get_all_tags(channel_ids="UC1") == [
+        {"tag": "Live", "count": 1}, {"tag": "Rock", "count": 1},
+    ]
+    assert await metadata_service.get_all_tags(is_archived=True) == [
+        {"tag": "Alt", "count": 1}, {"tag": "Rock", "count": 1},
+    ]
+
+
+async def test_feed_keywords_filter_and_cloud(test_db, async_client_factory):
+    ch = "UC" + "k" * 22
+    await test_db.execute("INSERT INTO subscriptions (channel_id, channel_name) VALUES (?, 'K')", (ch,))
+    for vid, kws in [("r1", ["Tech", "News"]), ("r2", ["tech"]), ("r3", ["Games"])]:
+        await test_db.execute(
+            "INSERT INTO rss_entries (video_id, channel_id, title, keywords) VALUES (?, ?, ?, ?)",
+            (vid, ch, vid, json.dumps(kws)),
+        )
+    res = await rss_service.get_new_videos(keywords="TECH")
+    assert {e["video_id"] for e in res["entries"]} == {"r1", "r2"}
+
+    # Keywords-Update über den Scanner-Pfad (UPDATE ... keywords) zieht nach
+    await test_db.execute("UPDATE rss_entries SET keywords = '[\"Games\"]' WHERE video_id = 'r2'")
+    res = await rss_service.get_new_videos(keywords="games")
+    assert {e["video_id"] for e in res["entries"]} == {"r2", "r3"}
+
+    from app.routers import feed_router
+    async with await async_client_factory(feed_router.router) as client:
+        r = await client.get("/api/subscriptions/feed/tags")
+    assert r.json() == [
+        {"tag": "Games", "count": 2}, {"tag": "News", "count": 1}, {"tag": "Tech", "count": 1},
+    ]
+
+
+async def test_migration_backfills_existing_rows(test_db):
+    await _add_video(test_db, "m1", ["A", "B"])
+    # Zustand vor v33 simulieren: Tabelle leer, Schema-Version zurück
+    await test_db.execute("DELETE FROM video_tags")
+    await test_db.execute("DELETE FROM schema_version WHERE version > 32")
+    await test_db.execute("INSERT OR REPLACE INTO schema_version (version) VALUES (32)")
+    await test_db._init_schema()
+    assert await _tags(test_db, "m1") == ["A", "B"]
@@ -108,7 +108,7 @@ export const api = {
 
   // Player
   streamUrl: (videoId) => `${API_BASE}/api/player/${videoId}`,
-  thumbnailUrl: (videoId) => `${API_BASE}/api/player/${videoId}/thumbnail`,
+  thumbnailUrl: (videoId, w) => `${API_BASE}/api/player/${videoId}/thumbnail${w ? `?w=${w}` : ''}`,
   videoDownloadUrl: (videoId) => `${API_BASE}/api/player/${videoId}/download`,
   audioDownloadUrl: (videoId, format = 'mp3') => `${API_BASE}/api/player/${videoId}/audio/download?format=${format}`,
 